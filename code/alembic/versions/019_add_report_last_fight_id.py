@@ -0,0 +1,25 @@
+"""add last_fight_id to reports for incremental live-log ingestion
+
+Revision ID: 019
+Revises: 018
+Create Date: 2026-10-16
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "019"
+down_revision: str | None = "018"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column("reports", sa.Column("last_fight_id", sa.Integer, nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("reports", "last_fight_id")
@@ -0,0 +1,28 @@
+"""add multi-resolution sample_levels_json to resource_snapshots
+
+Revision ID: 020
+Revises: 019
+Create Date: 2026-10-16
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "020"
+down_revision: str | None = "019"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "resource_snapshots",
+        sa.Column("sample_levels_json", sa.Text, nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("resource_snapshots", "sample_levels_json")
@@ -0,0 +1,68 @@
+"""add ingest_jobs queue table
+
+Revision ID: 021
+Revises: 020
+Create Date: 2026-10-16
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "021"
+down_revision: str | None = "020"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ingest_jobs",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("report_code", sa.String(50), nullable=False),
+        sa.Column(
+            "status", sa.String(20), nullable=False, server_default="queued"
+        ),
+        sa.Column("priority", sa.Integer, nullable=False, server_default="1"),
+        sa.Column("source", sa.String(20), nullable=False),
+        sa.Column(
+            "with_tables", sa.Boolean, nullable=False, server_default=sa.text("false")
+        ),
+        sa.Column(
+            "with_events", sa.Boolean, nullable=False, server_default=sa.text("false")
+        ),
+        sa.Column("attempts", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("max_attempts", sa.Integer, nullable=False, server_default="3"),
+        sa.Column(
+            "run_after", sa.DateTime, nullable=False, server_default=sa.func.now()
+        ),
+        sa.Column("locked_by", sa.String(100), nullable=True),
+        sa.Column("locked_at", sa.DateTime, nullable=True),
+        sa.Column("stage", sa.String(30), nullable=True),
+        sa.Column("stages", sa.JSON, nullable=True),
+        sa.Column("last_error", sa.Text, nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime, nullable=False, server_default=sa.func.now()
+        ),
+        sa.Column("finished_at", sa.DateTime, nullable=True),
+        sa.CheckConstraint(
+            "status IN ('queued', 'running', 'done', 'failed')",
+            name="ck_ingest_jobs_status",
+        ),
+    )
+    op.create_index(
+        "ix_ingest_jobs_claim", "ingest_jobs", ["status", "priority", "run_after"],
+    )
+    op.create_index(
+        "uq_ingest_jobs_active_report", "ingest_jobs", ["report_code"],
+        unique=True,
+        postgresql_where=sa.text("status IN ('queued', 'running')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_ingest_jobs_active_report", table_name="ingest_jobs")
+    op.drop_index("ix_ingest_jobs_claim", table_name="ingest_jobs")
+    op.drop_table("ingest_jobs")
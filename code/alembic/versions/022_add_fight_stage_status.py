@@ -0,0 +1,40 @@
+"""add fight_stage_status enrichment checkpoints
+
+Revision ID: 022
+Revises: 021
+Create Date: 2026-10-16
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "022"
+down_revision: str | None = "021"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "fight_stage_status",
+        sa.Column(
+            "fight_id", sa.Integer,
+            sa.ForeignKey("fights.id", ondelete="CASCADE"), primary_key=True,
+        ),
+        sa.Column("stage", sa.String(30), primary_key=True),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("error", sa.Text, nullable=True),
+        sa.Column(
+            "updated_at", sa.DateTime, nullable=False, server_default=sa.func.now()
+        ),
+        sa.CheckConstraint(
+            "status IN ('done', 'failed')", name="ck_fight_stage_status_status",
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("fight_stage_status")
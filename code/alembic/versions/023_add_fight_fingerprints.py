@@ -0,0 +1,29 @@
+"""add fights.fingerprint and fights.rankings_fingerprint
+
+Revision ID: 023
+Revises: 022
+Create Date: 2026-10-16
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "023"
+down_revision: str | None = "022"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column("fights", sa.Column("fingerprint", sa.String(64), nullable=True))
+    op.add_column(
+        "fights", sa.Column("rankings_fingerprint", sa.String(64), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("fights", "rankings_fingerprint")
+    op.drop_column("fights", "fingerprint")
@@ -0,0 +1,79 @@
+"""add natural-key unique constraints and ranking_fetches
+
+Revision ID: 024
+Revises: 023
+Create Date: 2026-10-16
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy import text
+
+from alembic import op
+
+revision: str = "024"
+down_revision: str | None = "023"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Table -> natural key columns upserts conflict on (uq_<table>_key)
+NATURAL_KEYS: dict[str, list[str]] = {
+    "fight_performances": ["fight_id", "player_name", "player_server"],
+    "top_rankings": ["encounter_id", "class", "spec", "metric", "rank_position"],
+    "speed_rankings": ["encounter_id", "rank_position"],
+    "ability_metrics": ["fight_id", "player_name", "metric_type", "spell_id"],
+    "buff_uptimes": ["fight_id", "player_name", "metric_type", "spell_id"],
+    "death_details": ["fight_id", "player_name", "death_index"],
+    "cast_metrics": ["fight_id", "player_name"],
+    "cooldown_usage": ["fight_id", "player_name", "spell_id"],
+    "cancelled_casts": ["fight_id", "player_name"],
+    "fight_consumables": ["fight_id", "player_name", "spell_id"],
+    "gear_snapshots": ["fight_id", "player_name", "slot"],
+    "resource_snapshots": ["fight_id", "player_name", "resource_type"],
+}
+
+
+def upgrade() -> None:
+    for table, columns in NATURAL_KEYS.items():
+        # Keep the newest row of any duplicate key before adding the constraint
+        match = " AND ".join(f'a."{c}" = b."{c}"' for c in columns)
+        op.execute(text(
+            f"DELETE FROM {table} a USING {table} b "
+            f"WHERE a.id < b.id AND {match}"
+        ))
+        op.create_unique_constraint(f"uq_{table}_key", table, columns)
+
+    op.create_table(
+        "ranking_fetches",
+        sa.Column("kind", sa.String(10), primary_key=True),
+        sa.Column(
+            "encounter_id", sa.Integer,
+            sa.ForeignKey("encounters.id", ondelete="CASCADE"), primary_key=True,
+        ),
+        sa.Column("class", sa.String(50), primary_key=True),
+        sa.Column("spec", sa.String(50), primary_key=True),
+        sa.Column("metric", sa.String(20), primary_key=True),
+        sa.Column(
+            "fetched_at", sa.DateTime, nullable=False, server_default=sa.func.now()
+        ),
+    )
+    # Seed from the fetch times the ranking rows carried until now
+    op.execute(text(
+        'INSERT INTO ranking_fetches (kind, encounter_id, "class", spec, metric, '
+        "fetched_at) "
+        "SELECT 'top', encounter_id, \"class\", spec, metric, max(fetched_at) "
+        'FROM top_rankings GROUP BY encounter_id, "class", spec, metric'
+    ))
+    op.execute(text(
+        'INSERT INTO ranking_fetches (kind, encounter_id, "class", spec, metric, '
+        "fetched_at) "
+        "SELECT 'speed', encounter_id, '', '', '', max(fetched_at) "
+        "FROM speed_rankings GROUP BY encounter_id"
+    ))
+
+
+def downgrade() -> None:
+    op.drop_table("ranking_fetches")
+    for table in reversed(NATURAL_KEYS):
+        op.drop_constraint(f"uq_{table}_key", table, type_="unique")
@@ -0,0 +1,48 @@
+"""add cast_event_series (columnar per-fight, per-player cast events)
+
+Revision ID: 025
+Revises: 024
+Create Date: 2026-10-16
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+revision: str = "025"
+down_revision: str | None = "024"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Existing cast_events rows stay readable (pipeline.cast_series falls back
+    # to them) and are replaced by a series when their fight is re-ingested
+    op.create_table(
+        "cast_event_series",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column(
+            "fight_id", sa.Integer,
+            sa.ForeignKey("fights.id", ondelete="CASCADE"), nullable=False,
+        ),
+        sa.Column("player_name", sa.String(100), nullable=False),
+        sa.Column("event_count", sa.Integer, nullable=False),
+        sa.Column(
+            "timestamps_ms", postgresql.ARRAY(sa.BigInteger), nullable=False,
+        ),
+        sa.Column("spell_ids", postgresql.ARRAY(sa.Integer), nullable=False),
+        sa.Column("begincast_bitmap", sa.LargeBinary, nullable=False),
+        sa.Column("target_idx", postgresql.ARRAY(sa.SmallInteger), nullable=False),
+        sa.Column("ability_names_json", sa.Text, nullable=False),
+        sa.Column("target_names_json", sa.Text, nullable=False),
+        sa.UniqueConstraint(
+            "fight_id", "player_name", name="uq_cast_event_series_key",
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("cast_event_series")
@@ -0,0 +1,48 @@
+"""add event_archives (compressed raw WCL event pages per fight and data type)
+
+Revision ID: 026
+Revises: 025
+Create Date: 2026-10-16
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy import text
+
+from alembic import op
+
+revision: str = "026"
+down_revision: str | None = "025"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "event_archives",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column(
+            "fight_id", sa.Integer,
+            sa.ForeignKey("fights.id", ondelete="CASCADE"), nullable=False,
+        ),
+        sa.Column("data_type", sa.String(20), nullable=False),
+        sa.Column("codec", sa.String(10), nullable=False),
+        sa.Column("page_count", sa.Integer, nullable=False),
+        sa.Column("event_count", sa.Integer, nullable=False),
+        sa.Column("raw_bytes", sa.BigInteger, nullable=False),
+        sa.Column("data", sa.LargeBinary, nullable=False),
+        sa.Column("context_json", sa.Text, nullable=True),
+        sa.Column(
+            "archived_at", sa.DateTime, nullable=False, server_default=sa.func.now(),
+        ),
+        sa.UniqueConstraint("fight_id", "data_type", name="uq_event_archives_key"),
+    )
+    # The blobs are already compressed; skip TOAST's own pglz pass
+    op.execute(text(
+        "ALTER TABLE event_archives ALTER COLUMN data SET STORAGE EXTERNAL"
+    ))
+
+
+def downgrade() -> None:
+    op.drop_table("event_archives")
@@ -0,0 +1,159 @@
+"""partition per-fight event tables by report month
+
+Adds fights.report_month (UTC month of the report's start) and rebuilds
+ability_metrics, buff_uptimes, death_details, gear_snapshots, cast_events and
+cast_event_series as RANGE (report_month) partitioned tables carrying the
+same column, one partition per month present plus the current and next
+month. Rows are copied in, ids and sequences are kept. The partition key
+joins every primary and natural key (Postgres requires it on unique
+constraints of a partitioned table).
+
+Revision ID: 027
+Revises: 026
+Create Date: 2026-10-16
+
+"""
+from collections.abc import Sequence
+
+from sqlalchemy import text
+
+from alembic import op
+
+revision: str = "027"
+down_revision: str | None = "026"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Matches shukketsu.db.partitions (report_month, partition names)
+REPORT_MONTH_SQL = (
+    "date_trunc('month', to_timestamp(r.start_time / 1000.0) AT TIME ZONE 'UTC')::date"
+)
+
+# table -> (natural key columns or None, [(index name, columns)])
+TABLE_KEYS = {
+    "ability_metrics": (
+        "fight_id, player_name, metric_type, spell_id",
+        [
+            ("ix_ability_metrics_fight_player", "fight_id, player_name"),
+            ("ix_ability_metrics_spell_type", "spell_id, metric_type"),
+        ],
+    ),
+    "buff_uptimes": (
+        "fight_id, player_name, metric_type, spell_id",
+        [("ix_buff_uptimes_fight_player", "fight_id, player_name")],
+    ),
+    "death_details": (
+        "fight_id, player_name, death_index",
+        [("ix_death_details_fight_player", "fight_id, player_name")],
+    ),
+    "gear_snapshots": (
+        "fight_id, player_name, slot",
+        [("ix_gear_snapshots_fight_player", "fight_id, player_name")],
+    ),
+    "cast_events": (
+        None,
+        [
+            ("ix_cast_events_fight_player", "fight_id, player_name"),
+            ("ix_cast_events_fight_spell", "fight_id, spell_id"),
+        ],
+    ),
+    "cast_event_series": (
+        "fight_id, player_name",
+        [],
+    ),
+}
+PARTITIONED_TABLES = list(TABLE_KEYS)
+
+
+def _swap_in(table: str, new: str) -> None:
+    """Replace ``table`` by ``new``, keeping the id sequence.
+
+    ``new`` was created ``LIKE`` the old table ``INCLUDING DEFAULTS``, so the
+    server defaults carry over; the id default is re-pointed here once the
+    sequence belongs to the renamed table.
+    """
+    op.execute(text(f"ALTER SEQUENCE {table}_id_seq OWNED BY NONE"))
+    op.execute(text(f"DROP TABLE {table}"))
+    op.execute(text(f"ALTER TABLE {new} RENAME TO {table}"))
+    op.execute(text(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id"))
+    op.execute(text(
+        f"ALTER TABLE {table} ALTER COLUMN id SET DEFAULT nextval('{table}_id_seq')"
+    ))
+
+
+def _add_keys(table: str, *, partitioned: bool) -> None:
+    natural_key, indexes = TABLE_KEYS[table]
+    suffix = ", report_month" if partitioned else ""
+    op.execute(text(f"ALTER TABLE {table} ADD PRIMARY KEY (id{suffix})"))
+    op.execute(text(
+        f"ALTER TABLE {table} ADD CONSTRAINT {table}_fight_id_fkey "
+        "FOREIGN KEY (fight_id) REFERENCES fights (id) ON DELETE CASCADE"
+    ))
+    if natural_key is not None:
+        op.execute(text(
+            f"ALTER TABLE {table} ADD CONSTRAINT uq_{table}_key "
+            f"UNIQUE ({natural_key}{suffix})"
+        ))
+    for name, columns in indexes:
+        op.execute(text(f"CREATE INDEX {name} ON {table} ({columns})"))
+
+
+def upgrade() -> None:
+    op.execute(text("ALTER TABLE fights ADD COLUMN report_month date"))
+    op.execute(text(
+        "UPDATE fights f SET report_month = "
+        f"{REPORT_MONTH_SQL} "
+        "FROM reports r WHERE r.code = f.report_code"
+    ))
+    op.execute(text("ALTER TABLE fights ALTER COLUMN report_month SET NOT NULL"))
+    op.create_index("ix_fights_report_month", "fights", ["report_month"])
+
+    months = op.get_bind().execute(text(
+        "SELECT DISTINCT report_month FROM fights "
+        "UNION SELECT date_trunc('month', now() AT TIME ZONE 'UTC')::date "
+        "UNION SELECT (date_trunc('month', now() AT TIME ZONE 'UTC') "
+        "+ interval '1 month')::date"
+    )).scalars().all()
+
+    for table in PARTITIONED_TABLES:
+        new = f"{table}_partitioned"
+        op.execute(text(
+            f"CREATE TABLE {new} (LIKE {table} INCLUDING DEFAULTS "
+            "INCLUDING CONSTRAINTS INCLUDING STORAGE, report_month date NOT NULL) "
+            "PARTITION BY RANGE (report_month)"
+        ))
+        for month in sorted(months):
+            op.execute(text(
+                f"CREATE TABLE {table}_p{month:%Y%m} PARTITION OF {new} "
+                f"FOR VALUES FROM ('{month}') TO ('{month}'::date + interval '1 month')"
+            ))
+        op.execute(text(
+            f"INSERT INTO {new} SELECT t.*, f.report_month "
+            f"FROM {table} t JOIN fights f ON f.id = t.fight_id"
+        ))
+        _swap_in(table, new)
+        _add_keys(table, partitioned=True)
+
+
+def downgrade() -> None:
+    for table in PARTITIONED_TABLES:
+        new = f"{table}_unpartitioned"
+        op.execute(text(
+            f"CREATE TABLE {new} (LIKE {table} INCLUDING DEFAULTS "
+            "INCLUDING CONSTRAINTS INCLUDING STORAGE)"
+        ))
+        op.execute(text(f"ALTER TABLE {new} DROP COLUMN report_month"))
+        columns = ", ".join(
+            op.get_bind().execute(text(
+                "SELECT column_name FROM information_schema.columns "
+                "WHERE table_name = :table ORDER BY ordinal_position"
+            ), {"table": new}).scalars()
+        )
+        op.execute(text(
+            f"INSERT INTO {new} ({columns}) SELECT {columns} FROM {table}"
+        ))
+        _swap_in(table, new)
+        _add_keys(table, partitioned=False)
+
+    op.drop_index("ix_fights_report_month", table_name="fights")
+    op.execute(text("ALTER TABLE fights DROP COLUMN report_month"))
@@ -16,6 +16,7 @@ from shukketsu.agent.tool_utils import (
 from shukketsu.db import queries as q
 from shukketsu.db.queries.benchmark import GET_BENCHMARK_BY_ENCOUNTER_ID
 from shukketsu.db.queries.table_data import ABILITY_BREAKDOWN, OVERHEAL_ANALYSIS
+from shukketsu.pipeline.cast_series import fetch_player_casts
 from shukketsu.pipeline.constants import (
     CLASSIC_COOLDOWNS,
     ENCOUNTER_CONTEXTS,
@@ -353,7 +354,8 @@ async def get_dot_management(
     Shows early refresh rates, clipped ticks, and refresh timing quality.
     Only applies to DoT-based specs (Warlock, Shadow Priest, Balance Druid).
     Requires event data ingestion."""
-    from shukketsu.pipeline.constants import CLASSIC_DOTS, DOT_BY_SPELL_ID
+    from shukketsu.pipeline.cast_events import DotRefreshExtension
+    from shukketsu.pipeline.constants import CLASSIC_DOTS
 
     # Get player class
     pn_like = wildcard(player_name)
@@ -371,75 +373,46 @@ async def get_dot_management(
 
     player_class = info_row.player_class
     class_dots = CLASSIC_DOTS.get(player_class, [])
-    dot_spell_ids = {d.spell_id for d in class_dots}
+    dots = {d.spell_id: d for d in class_dots}
 
-    if not dot_spell_ids:
+    if not dots:
         return (
             f"{player_name} ({player_class}) does not have "
             f"tracked DoTs for this class."
         )
 
     # Get cast events
-    cast_result = await session.execute(
-        q.CAST_EVENTS_FOR_DOT_ANALYSIS,
-        {"report_code": report_code, "fight_id": fight_id,
-         "player_name": pn_like},
+    cast_rows = await fetch_player_casts(
+        session, report_code, fight_id, pn_like, event_type="cast",
     )
-    cast_rows = cast_result.fetchall()
 
-    casts_by_spell: dict[int, list[int]] = defaultdict(list)
-    spell_names: dict[int, str] = {}
-    for r in cast_rows:
-        if r.spell_id in dot_spell_ids:
-            casts_by_spell[r.spell_id].append(r.timestamp_ms)
-            spell_names[r.spell_id] = r.ability_name
-
-    if not casts_by_spell:
+    dot_casts = [r for r in cast_rows if r.spell_id in dots]
+    if not dot_casts:
         return (
             f"No DoT casts found for '{player_name}' in fight "
             f"{fight_id}. {EVENT_DATA_HINT}"
         )
 
+    extension = DotRefreshExtension(dots)
+    for ce in dot_casts:
+        extension.add(ce)
+
     lines = [
         f"DoT management for {player_name} in "
         f"{report_code}#{fight_id}:\n"
     ]
-    for spell_id, timestamps in casts_by_spell.items():
-        dot_def = DOT_BY_SPELL_ID.get(spell_id)
-        if not dot_def or len(timestamps) < 2:
-            continue
-
-        total_refreshes = len(timestamps) - 1
-        early_refreshes = 0
-        clipped_ticks_total = 0.0
-
-        for i in range(1, len(timestamps)):
-            gap = timestamps[i] - timestamps[i - 1]
-            if gap < dot_def.duration_ms:
-                remaining_ms = dot_def.duration_ms - gap
-                if remaining_ms > 0.3 * dot_def.duration_ms:
-                    early_refreshes += 1
-                clipped_ticks_total += (
-                    remaining_ms / dot_def.tick_interval_ms
-                )
-
-        early_pct = (
-            (early_refreshes / total_refreshes * 100)
-            if total_refreshes > 0 else 0.0
-        )
-
-        grade = grade_below(
-            early_pct,
-            [(10, "GOOD"), (25, "FAIR")],
-            "NEEDS WORK",
-        )
-
-        name = spell_names.get(spell_id, dot_def.name)
-        lines.append(
-            f"  [{grade}] {name}: {total_refreshes} refreshes | "
-            f"Early: {early_refreshes} ({early_pct:.1f}%) | "
-            f"Est. clipped ticks: {clipped_ticks_total:.1f}"
-        )
+    for refreshes in extension.results(0).values():
+        for dot in refreshes:
+            grade = grade_below(
+                dot.early_pct,
+                [(10, "GOOD"), (25, "FAIR")],
+                "NEEDS WORK",
+            )
+            lines.append(
+                f"  [{grade}] {dot.name}: {dot.refreshes} refreshes | "
+                f"Early: {dot.early_refreshes} ({dot.early_pct:.1f}%) | "
+                f"Est. clipped ticks: {dot.clipped_ticks:.1f}"
+            )
 
     if len(lines) == 1:
         return (
@@ -85,9 +85,30 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None]:
     set_auto_ingest_service(auto_ingest)
     await auto_ingest.start()
 
+    # Durable ingest queue workers (optional; see pipeline/ingest_jobs.py)
+    ingest_workers = None
+    if settings.ingest_queue.enabled and settings.ingest_queue.workers > 0:
+        from shukketsu.api.routes.auto_ingest import set_worker_pool
+        from shukketsu.pipeline.ingest_jobs import IngestWorkerPool
+
+        ingest_workers = IngestWorkerPool(settings, session_factory, wcl_factory)
+        set_worker_pool(ingest_workers)
+        await ingest_workers.start()
+
+    # Raw event retention/compaction (optional; see pipeline/compaction.py)
+    from shukketsu.api.routes.auto_ingest import set_compaction_service
+    from shukketsu.pipeline.compaction import CompactionService
+
+    compaction = CompactionService(settings, session_factory)
+    set_compaction_service(compaction)
+    await compaction.start()
+
     yield
 
     # Shutdown
+    await compaction.stop()
+    if ingest_workers is not None:
+        await ingest_workers.stop()
     await auto_ingest.stop()
     await wcl_factory.stop()
     if langfuse_enabled:
@@ -1,5 +1,7 @@
 """Pydantic response models for data API endpoints."""
 
+from datetime import datetime
+
 from pydantic import BaseModel
 
 
@@ -146,6 +148,8 @@ class IngestResponse(BaseModel):
     performances: int
     table_rows: int = 0
     event_rows: int = 0
+    fights_unchanged: int = 0
+    rows_changed: int = 0
 
 
 class TableDataResponse(BaseModel):
@@ -414,6 +418,24 @@ class AutoIngestStatus(BaseModel):
     stats: dict
 
 
+class IngestJobResponse(BaseModel):
+    id: int
+    report_code: str
+    status: str
+    priority: int
+    source: str
+    with_tables: bool
+    with_events: bool
+    attempts: int
+    max_attempts: int
+    stage: str | None
+    stages: dict | None
+    last_error: str | None
+    created_at: datetime
+    run_after: datetime
+    finished_at: datetime | None
+
+
 class EventsAvailable(BaseModel):
     has_data: bool
 
@@ -436,6 +458,7 @@ class ResourceSnapshotResponse(BaseModel):
     time_at_zero_ms: int
     time_at_zero_pct: float
     samples_json: str | None
+    sample_resolution: int | None = None
 
 
 class DotRefreshResponse(BaseModel):
@@ -1,11 +1,22 @@
 """Auto-ingest management endpoints."""
 
-from fastapi import APIRouter
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from shukketsu.api.deps import get_db
+from shukketsu.api.models import IngestJobResponse, IngestRequest
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/auto-ingest", tags=["auto-ingest"])
 
-# Module-level service reference (set during lifespan)
+# Module-level service references (set during lifespan)
 _service = None
+_worker_pool = None
+_compaction = None
 
 
 def set_service(service):
@@ -13,6 +24,22 @@ def set_service(service):
     _service = service
 
 
+def set_worker_pool(pool):
+    global _worker_pool
+    _worker_pool = pool
+
+
+def set_compaction_service(service):
+    global _compaction
+    _compaction = service
+
+
+def _get_compaction():
+    if _compaction is None:
+        raise RuntimeError("CompactionService not initialized")
+    return _compaction
+
+
 def _get_service():
     if _service is None:
         raise RuntimeError("AutoIngestService not initialized")
@@ -29,3 +56,84 @@ async def get_status():
 async def trigger_poll():
     """Manually trigger a poll."""
     return await _get_service().trigger_now()
+
+
+@router.get("/compaction")
+async def get_compaction_status():
+    """Retention/compaction status, including bytes reclaimed per policy."""
+    return _get_compaction().get_status()
+
+
+@router.post("/compaction/trigger")
+async def trigger_compaction():
+    """Manually run the retention policies once."""
+    return await _get_compaction().trigger_now()
+
+
+@router.get("/wcl-queue")
+async def get_wcl_queue():
+    """WCL request queue depth per priority class, so the UI can show the wait."""
+    from shukketsu.api.deps import get_wcl_factory
+
+    return get_wcl_factory().scheduler.status()
+
+
+@router.post("/jobs", response_model=IngestJobResponse)
+async def enqueue_job(req: IngestRequest, session: AsyncSession = Depends(get_db)):
+    """Queue a report for the ingest workers (returns the existing job if active)."""
+    from shukketsu.config import get_settings
+    from shukketsu.db.models import IngestJob
+    from shukketsu.pipeline.ingest_jobs import enqueue_ingest_job
+    from shukketsu.wcl.scheduler import Priority
+
+    try:
+        job_id = await enqueue_ingest_job(
+            session, req.report_code, source="api",
+            priority=Priority.INTERACTIVE,
+            with_tables=req.with_tables,
+            with_events=req.with_events,
+            max_attempts=get_settings().ingest_queue.max_attempts,
+        )
+        await session.commit()
+        job = await session.get(IngestJob, job_id)
+        return IngestJobResponse.model_validate(job, from_attributes=True)
+    except Exception:
+        await session.rollback()
+        logger.exception("Failed to enqueue ingest of %s", req.report_code)
+        raise HTTPException(status_code=500, detail="Internal server error") from None
+
+
+@router.get("/jobs", response_model=list[IngestJobResponse])
+async def list_jobs(
+    status: str | None = None, limit: int = 50,
+    session: AsyncSession = Depends(get_db),
+):
+    """Most recent ingest jobs, optionally filtered by status."""
+    from shukketsu.db.models import IngestJob
+
+    query = select(IngestJob).order_by(IngestJob.id.desc()).limit(min(limit, 500))
+    if status:
+        query = query.where(IngestJob.status == status)
+    result = await session.execute(query)
+    return [
+        IngestJobResponse.model_validate(job, from_attributes=True)
+        for job in result.scalars().all()
+    ]
+
+
+@router.get("/jobs/workers")
+async def get_workers():
+    """In-process ingest worker pool status (empty when workers run elsewhere)."""
+    if _worker_pool is None:
+        return {"workers": 0, "running": {}, "stats": {}}
+    return _worker_pool.get_status()
+
+
+@router.get("/jobs/{job_id}", response_model=IngestJobResponse)
+async def get_job(job_id: int, session: AsyncSession = Depends(get_db)):
+    from shukketsu.db.models import IngestJob
+
+    job = await session.get(IngestJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return IngestJobResponse.model_validate(job, from_attributes=True)
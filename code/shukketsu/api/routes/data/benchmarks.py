@@ -167,6 +167,7 @@ async def refresh_benchmarks(
     from shukketsu.api.deps import get_wcl_factory
     from shukketsu.db.models import Encounter
     from shukketsu.pipeline.benchmarks import run_benchmark_pipeline
+    from shukketsu.wcl.scheduler import Priority
 
     try:
         stmt = sa_select(Encounter.id)
@@ -179,7 +180,7 @@ async def refresh_benchmarks(
                 status_code=404, detail="No encounters found"
             )
 
-        async with get_wcl_factory()() as wcl:
+        async with get_wcl_factory()(priority=Priority.BACKFILL) as wcl:
             result = await run_benchmark_pipeline(
                 wcl, session, force=force,
             )
@@ -2,7 +2,6 @@
 
 import json
 import logging
-from collections import defaultdict
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import text as sa_text
@@ -99,17 +98,18 @@ async def fight_cast_timeline(
     session: AsyncSession = Depends(get_db),
 ):
     """Get cast event timeline for a player in a fight."""
+    from shukketsu.pipeline.cast_series import fetch_player_casts
+
     try:
-        result = await session.execute(
-            q.CAST_TIMELINE,
-            {
-                "report_code": report_code,
-                "fight_id": fight_id,
-                "player_name": player,
-            },
-        )
-        rows = result.fetchall()
-        return [CastEventResponse(**dict(r._mapping)) for r in rows]
+        rows = await fetch_player_casts(session, report_code, fight_id, player)
+        return [
+            CastEventResponse(
+                player_name=r.player_name, timestamp_ms=r.timestamp_ms,
+                spell_id=r.spell_id, ability_name=r.ability_name,
+                event_type=r.event_type, target_name=r.target_name,
+            )
+            for r in rows
+        ]
     except Exception:
         logger.exception("Failed to get cast timeline")
         raise HTTPException(status_code=500, detail="Internal server error") from None
@@ -121,9 +121,16 @@ async def fight_cast_timeline(
 )
 async def fight_resources(
     report_code: str, fight_id: int, player: str,
+    resolution: int | None = None,
     session: AsyncSession = Depends(get_db),
 ):
-    """Get resource snapshots for a player in a fight."""
+    """Get resource snapshots for a player in a fight.
+
+    ``resolution`` swaps samples_json for the closest stored sample level
+    (e.g. 500 points for a zoomed-in chart).
+    """
+    from shukketsu.pipeline.resource_events import decode_sample_level
+
     try:
         result = await session.execute(
             q.RESOURCE_USAGE,
@@ -134,9 +141,16 @@ async def fight_resources(
             },
         )
         rows = result.fetchall()
-        return [
-            ResourceSnapshotResponse(**dict(r._mapping)) for r in rows
-        ]
+        snapshots = []
+        for r in rows:
+            data = dict(r._mapping)
+            levels_json = data.pop("sample_levels_json", None)
+            if resolution is not None and levels_json:
+                chosen, samples = decode_sample_level(levels_json, resolution)
+                data["samples_json"] = json.dumps(samples)
+                data["sample_resolution"] = chosen
+            snapshots.append(ResourceSnapshotResponse(**data))
+        return snapshots
     except Exception:
         logger.exception("Failed to get resource snapshots")
         raise HTTPException(status_code=500, detail="Internal server error") from None
@@ -151,7 +165,9 @@ async def fight_dot_refreshes(
     session: AsyncSession = Depends(get_db),
 ):
     """Analyze DoT refresh patterns for a player in a fight."""
-    from shukketsu.pipeline.constants import CLASSIC_DOTS, DOT_BY_SPELL_ID
+    from shukketsu.pipeline.cast_events import DotRefreshExtension
+    from shukketsu.pipeline.cast_series import fetch_player_casts
+    from shukketsu.pipeline.constants import CLASSIC_DOTS
 
     try:
         # Get player class
@@ -167,72 +183,32 @@ async def fight_dot_refreshes(
                 detail=f"No data for {player} in fight {fight_id}",
             )
 
-        player_class = info_row.player_class
-        class_dots = CLASSIC_DOTS.get(player_class, [])
-        dot_spell_ids = {d.spell_id for d in class_dots}
-
-        if not dot_spell_ids:
+        dots = {d.spell_id: d for d in CLASSIC_DOTS.get(info_row.player_class, [])}
+        if not dots:
             return []
 
         # Get cast events
-        cast_result = await session.execute(
-            q.CAST_EVENTS_FOR_DOT_ANALYSIS,
-            {"report_code": report_code, "fight_id": fight_id,
-             "player_name": player},
+        cast_rows = await fetch_player_casts(
+            session, report_code, fight_id, player, event_type="cast",
         )
-        cast_rows = cast_result.fetchall()
+        extension = DotRefreshExtension(dots)
+        for ce in cast_rows:
+            extension.add(ce)
 
-        # Group by spell_id, filter to DoT spells only
-        casts_by_spell: dict[int, list[int]] = defaultdict(list)
-        spell_names: dict[int, str] = {}
-        for r in cast_rows:
-            if r.spell_id in dot_spell_ids:
-                casts_by_spell[r.spell_id].append(r.timestamp_ms)
-                spell_names[r.spell_id] = r.ability_name
-
-        results = []
-        for spell_id, timestamps in casts_by_spell.items():
-            dot_def = DOT_BY_SPELL_ID.get(spell_id)
-            if not dot_def or len(timestamps) < 2:
-                continue
-
-            total_refreshes = len(timestamps) - 1
-            early_refreshes = 0
-            remaining_values = []
-            clipped_ticks_total = 0.0
-
-            for i in range(1, len(timestamps)):
-                gap = timestamps[i] - timestamps[i - 1]
-                if gap < dot_def.duration_ms:
-                    remaining_ms = dot_def.duration_ms - gap
-                    remaining_values.append(remaining_ms)
-                    # Early if > 30% of duration remains
-                    if remaining_ms > 0.3 * dot_def.duration_ms:
-                        early_refreshes += 1
-                    clipped_ticks_total += (
-                        remaining_ms / dot_def.tick_interval_ms
-                    )
-
-            avg_remaining = (
-                sum(remaining_values) / len(remaining_values)
-                if remaining_values else 0.0
-            )
-            early_pct = (
-                (early_refreshes / total_refreshes * 100)
-                if total_refreshes > 0 else 0.0
-            )
-
-            results.append(DotRefreshResponse(
+        results = [
+            DotRefreshResponse(
                 player_name=player,
-                spell_id=spell_id,
-                ability_name=spell_names.get(spell_id, dot_def.name),
-                total_refreshes=total_refreshes,
-                early_refreshes=early_refreshes,
-                early_refresh_pct=round(early_pct, 1),
-                avg_remaining_ms=round(avg_remaining, 1),
-                clipped_ticks_est=round(clipped_ticks_total, 1),
-            ))
-
+                spell_id=dot.spell_id,
+                ability_name=dot.name,
+                total_refreshes=dot.refreshes,
+                early_refreshes=dot.early_refreshes,
+                early_refresh_pct=round(dot.early_pct, 1),
+                avg_remaining_ms=round(dot.avg_remaining_ms, 1),
+                clipped_ticks_est=round(dot.clipped_ticks, 1),
+            )
+            for refreshes in extension.results(0).values()
+            for dot in refreshes
+        ]
         return results
     except HTTPException:
         raise
@@ -390,6 +366,7 @@ async def fight_phases_player(
     session: AsyncSession = Depends(get_db),
 ):
     """Get per-player phase metrics for a fight."""
+    from shukketsu.pipeline.cast_series import fetch_player_casts
     from shukketsu.pipeline.constants import ENCOUNTER_PHASES, PhaseDef
 
     try:
@@ -422,12 +399,9 @@ async def fight_phases_player(
         ])
 
         # Get cast events for the player in this fight
-        cast_result = await session.execute(
-            q.CAST_EVENTS_FOR_PHASES,
-            {"report_code": report_code, "fight_id": fight_id,
-             "player_name": player},
+        cast_rows = await fetch_player_casts(
+            session, report_code, fight_id, player, event_type="cast",
         )
-        cast_rows = cast_result.fetchall()
         cast_timestamps = [r.timestamp_ms for r in cast_rows]
         total_casts = len(cast_timestamps)
 
@@ -65,6 +65,7 @@ async def refresh_rankings(
     from shukketsu.db.models import Encounter
     from shukketsu.pipeline.constants import TBC_SPECS
     from shukketsu.pipeline.rankings import ingest_all_rankings
+    from shukketsu.wcl.scheduler import Priority
 
     try:
         stmt = select(Encounter.id)
@@ -77,7 +78,7 @@ async def refresh_rankings(
                 status_code=404, detail="No encounters found"
             )
 
-        async with get_wcl_factory()() as wcl:
+        async with get_wcl_factory()(priority=Priority.BACKFILL) as wcl:
             result = await ingest_all_rankings(
                 wcl, session, encounter_ids, list(TBC_SPECS), force=force,
             )
@@ -111,6 +112,7 @@ async def refresh_speed_rankings(
     from shukketsu.api.deps import get_wcl_factory
     from shukketsu.db.models import Encounter
     from shukketsu.pipeline.speed_rankings import ingest_all_speed_rankings
+    from shukketsu.wcl.scheduler import Priority
 
     try:
         stmt = select(Encounter.id)
@@ -123,7 +125,7 @@ async def refresh_speed_rankings(
                 status_code=404, detail="No encounters found"
             )
 
-        async with get_wcl_factory()() as wcl:
+        async with get_wcl_factory()(priority=Priority.BACKFILL) as wcl:
             result = await ingest_all_speed_rankings(
                 wcl, session, encounter_ids, force=force,
             )
@@ -172,6 +172,8 @@ async def ingest_report_endpoint(
             performances=result.performances,
             table_rows=result.table_rows,
             event_rows=result.event_rows,
+            fights_unchanged=result.fights_unchanged,
+            rows_changed=result.rows.changed,
         )
     except HTTPException:
         raise
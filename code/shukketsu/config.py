@@ -1,14 +1,45 @@
 from functools import lru_cache
+from typing import Literal
 
 from pydantic import BaseModel, SecretStr, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+class WCLCredential(BaseModel):
+    client_id: str
+    client_secret: SecretStr
+
+
 class WCLConfig(BaseModel):
     client_id: str = ""
     client_secret: SecretStr = SecretStr("")
+    # Additional API clients, each with its own hourly point budget, e.g.
+    # WCL__EXTRA_CREDENTIALS='[{"client_id": "...", "client_secret": "..."}]'
+    extra_credentials: list[WCLCredential] = []
     api_url: str = "https://fresh.warcraftlogs.com/api/v2/client"
     oauth_url: str = "https://fresh.warcraftlogs.com/oauth/token"
+    # Opt-in on-disk cache of finished-report responses (see wcl/cache.py)
+    cache_enabled: bool = False
+    cache_dir: str = "data/wcl_cache"
+    cache_max_mb: int = 1024
+    cache_live_window_hours: int = 12
+    # Append every GraphQL exchange to this JSONL file for offline replay
+    # (see wcl/replay.py). Cache hits are not recorded, so leave the cache off.
+    record_path: str | None = None
+    # Spread requests evenly over the hour using learned query costs
+    rate_limit_pacing: bool = True
+    # Request scheduler (see wcl/scheduler.py): concurrent WCL requests, and
+    # the share of the hourly budget auto-ingest / backfill must leave unspent
+    scheduler_max_in_flight: int = 4
+    auto_ingest_headroom: float = 0.15
+    backfill_headroom: float = 0.35
+
+    def credentials(self) -> list[WCLCredential]:
+        """Primary credential pair followed by any extras."""
+        primary = WCLCredential(
+            client_id=self.client_id, client_secret=self.client_secret,
+        )
+        return [primary, *self.extra_credentials]
 
 
 class DatabaseConfig(BaseModel):
@@ -49,6 +80,22 @@ class AutoIngestConfig(BaseModel):
     zone_ids: list[int] = []  # Empty = all zones
     with_tables: bool = True
     with_events: bool = True
+    enrichment_concurrency: int = 1  # >1 = concurrent enrichment fetches
+    # Live logs: re-poll reports still being uploaded and append new fights
+    live_enabled: bool = False
+    live_poll_seconds: int = 90
+    live_idle_minutes: int = 30  # stop following a report after no growth this long
+
+
+class IngestQueueConfig(BaseModel):
+    # Durable ingest_jobs queue (see pipeline/ingest_jobs.py). When enabled the
+    # poll loop enqueues new reports instead of ingesting them inline.
+    enabled: bool = False
+    workers: int = 2  # in-process workers; 0 = only external run-ingest-workers
+    idle_poll_seconds: float = 5.0
+    max_attempts: int = 3
+    retry_backoff_seconds: int = 60  # doubled per failed attempt
+    lease_minutes: int = 60  # running jobs older than this are re-claimed
 
 
 class BenchmarkConfig(BaseModel):
@@ -58,6 +105,41 @@ class BenchmarkConfig(BaseModel):
     zone_ids: list[int] = []  # Empty = all zones
 
 
+class RetentionPolicy(BaseModel):
+    # Raw per-fight rows of `table` for reports older than max_age_days are
+    # deleted, or for cast_events folded into cast_event_series (see
+    # pipeline/compaction.py). reports: "all", "non_guild" (guild_id is not
+    # GUILD__ID) or "benchmark" (listed in benchmark_reports).
+    table: Literal["cast_events", "cast_event_series", "event_archives"]
+    max_age_days: int
+    reports: Literal["all", "non_guild", "benchmark"] = "non_guild"
+    action: Literal["delete", "fold"] = "delete"
+
+    @model_validator(mode="after")
+    def _check_fold_table(self):
+        if self.action == "fold" and self.table != "cast_events":
+            raise ValueError(
+                "COMPACTION__POLICIES action 'fold' only applies to cast_events"
+            )
+        return self
+
+
+class CompactionConfig(BaseModel):
+    enabled: bool = False
+    interval_minutes: int = 360
+    batch_fights: int = 50  # fights per transaction
+    batch_pause_seconds: float = 0.5  # between batches, lets ingest take locks
+    max_batches_per_run: int = 200  # per policy; the rest waits for the next run
+    lock_timeout_ms: int = 5000
+    policies: list[RetentionPolicy] = [
+        RetentionPolicy(
+            table="cast_events", max_age_days=0, reports="all", action="fold",
+        ),
+        RetentionPolicy(table="cast_event_series", max_age_days=60),
+        RetentionPolicy(table="event_archives", max_age_days=60),
+    ]
+
+
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -74,7 +156,9 @@ class Settings(BaseSettings):
     langfuse: LangfuseConfig = LangfuseConfig()
     guild: GuildConfig = GuildConfig()
     auto_ingest: AutoIngestConfig = AutoIngestConfig()
+    ingest_queue: IngestQueueConfig = IngestQueueConfig()
     benchmark: BenchmarkConfig = BenchmarkConfig()
+    compaction: CompactionConfig = CompactionConfig()
 
     @model_validator(mode="after")
     def _check_cross_field_deps(self):
@@ -91,10 +175,39 @@ class Settings(BaseSettings):
                 raise ValueError(
                     "LANGFUSE__ENABLED=true requires LANGFUSE__SECRET_KEY"
                 )
+        if self.auto_ingest.enrichment_concurrency < 1:
+            raise ValueError(
+                "AUTO_INGEST__ENRICHMENT_CONCURRENCY must be >= 1"
+            )
+        if self.auto_ingest.live_poll_seconds < 30:
+            raise ValueError("AUTO_INGEST__LIVE_POLL_SECONDS must be >= 30")
+        client_ids = [c.client_id for c in self.wcl.credentials()]
+        if self.wcl.extra_credentials and len(set(client_ids)) != len(client_ids):
+            raise ValueError(
+                "WCL__EXTRA_CREDENTIALS must not repeat a client_id"
+            )
+        if self.wcl.scheduler_max_in_flight < 1:
+            raise ValueError("WCL__SCHEDULER_MAX_IN_FLIGHT must be >= 1")
+        if not (
+            0 <= self.wcl.auto_ingest_headroom <= self.wcl.backfill_headroom < 1
+        ):
+            raise ValueError(
+                "WCL headroom must satisfy 0 <= WCL__AUTO_INGEST_HEADROOM"
+                " <= WCL__BACKFILL_HEADROOM < 1"
+            )
+        if self.ingest_queue.workers < 0:
+            raise ValueError("INGEST_QUEUE__WORKERS must be >= 0")
+        if self.ingest_queue.max_attempts < 1:
+            raise ValueError("INGEST_QUEUE__MAX_ATTEMPTS must be >= 1")
         if self.benchmark.max_reports_per_encounter < 1:
             raise ValueError(
                 "BENCHMARK__MAX_REPORTS_PER_ENCOUNTER must be >= 1"
             )
+        if self.compaction.batch_fights < 1:
+            raise ValueError("COMPACTION__BATCH_FIGHTS must be >= 1")
+        for policy in self.compaction.policies:
+            if policy.max_age_days < 0:
+                raise ValueError("COMPACTION__POLICIES max_age_days must be >= 0")
         return self
 
 
@@ -1,20 +1,25 @@
-from datetime import datetime
+from datetime import date, datetime
 
 from sqlalchemy import (
+    ARRAY,
     JSON,
     BigInteger,
     Boolean,
     CheckConstraint,
     Computed,
+    Date,
     DateTime,
     Float,
     ForeignKey,
     Index,
     Integer,
+    LargeBinary,
+    SmallInteger,
     String,
     Text,
     UniqueConstraint,
     func,
+    text,
 )
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
@@ -68,6 +73,8 @@ class Report(Base):
     start_time: Mapped[int] = mapped_column(BigInteger, index=True)
     end_time: Mapped[int] = mapped_column(BigInteger)
     fetched_at: Mapped[datetime] = mapped_column(default=func.now())
+    # Highest WCL fight ID (boss or trash) already ingested; see ingest_report_incremental
+    last_fight_id: Mapped[int | None] = mapped_column(Integer)
 
     fights: Mapped[list["Fight"]] = relationship(back_populates="report")
 
@@ -79,6 +86,7 @@ class Fight(Base):
         Index("ix_fights_report_code", "report_code"),
         Index("ix_fights_encounter_id", "encounter_id"),
         Index("ix_fights_report_encounter_kill", "report_code", "encounter_id", "kill"),
+        Index("ix_fights_report_month", "report_month"),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -93,6 +101,14 @@ class Fight(Base):
     kill: Mapped[bool] = mapped_column(Boolean)
     difficulty: Mapped[int] = mapped_column(Integer, default=0)
     fight_percentage: Mapped[float | None] = mapped_column(Float)
+    # UTC month of the report's start; partition key of the per-fight event
+    # tables (see db.partitions)
+    report_month: Mapped[date] = mapped_column(Date)
+    # Content hashes compared on re-ingest (see pipeline.ingest)
+    fingerprint: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    rankings_fingerprint: Mapped[str | None] = mapped_column(
+        String(64), nullable=True
+    )
 
     report: Mapped["Report"] = relationship(back_populates="fights")
     encounter: Mapped["Encounter"] = relationship(back_populates="fights")
@@ -109,11 +125,21 @@ class Fight(Base):
         back_populates="fight"
     )
     cast_events: Mapped[list["CastEvent"]] = relationship(back_populates="fight")
+    cast_event_series: Mapped[list["CastEventSeries"]] = relationship(
+        back_populates="fight"
+    )
+    event_archives: Mapped[list["EventArchive"]] = relationship(
+        back_populates="fight"
+    )
 
 
 class FightPerformance(Base):
     __tablename__ = "fight_performances"
     __table_args__ = (
+        UniqueConstraint(
+            "fight_id", "player_name", "player_server",
+            name="uq_fight_performances_key",
+        ),
         Index("ix_fight_performances_fight_id", "fight_id"),
         Index("ix_fight_performances_player_name", "player_name"),
         Index("ix_fight_performances_fight_player", "fight_id", "player_name"),
@@ -160,6 +186,10 @@ class FightPerformance(Base):
 class TopRanking(Base):
     __tablename__ = "top_rankings"
     __table_args__ = (
+        UniqueConstraint(
+            "encounter_id", "class", "spec", "metric", "rank_position",
+            name="uq_top_rankings_key",
+        ),
         Index("ix_top_rankings_encounter_class_spec", "encounter_id", "class", "spec"),
     )
 
@@ -185,6 +215,9 @@ class TopRanking(Base):
 class SpeedRanking(Base):
     __tablename__ = "speed_rankings"
     __table_args__ = (
+        UniqueConstraint(
+            "encounter_id", "rank_position", name="uq_speed_rankings_key",
+        ),
         Index("ix_speed_rankings_encounter_id", "encounter_id"),
     )
 
@@ -200,6 +233,28 @@ class SpeedRanking(Base):
     encounter: Mapped["Encounter"] = relationship(back_populates="speed_rankings")
 
 
+class RankingFetch(Base):
+    """When a top/speed rankings combo was last fetched (staleness checks).
+
+    Kept apart from the ranking rows, whose ``fetched_at`` only moves when
+    the row's values change (see db.upsert). Speed rankings use "" for the
+    class/spec/metric columns.
+    """
+
+    __tablename__ = "ranking_fetches"
+
+    kind: Mapped[str] = mapped_column(String(10), primary_key=True)  # top, speed
+    encounter_id: Mapped[int] = mapped_column(
+        ForeignKey("encounters.id", ondelete="CASCADE"), primary_key=True
+    )
+    class_: Mapped[str] = mapped_column("class", String(50), primary_key=True)
+    spec: Mapped[str] = mapped_column(String(50), primary_key=True)
+    metric: Mapped[str] = mapped_column(String(20), primary_key=True)
+    fetched_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, server_default=func.now()
+    )
+
+
 class WatchedGuild(Base):
     __tablename__ = "watched_guilds"
     __table_args__ = (
@@ -276,8 +331,13 @@ class ProgressionSnapshot(Base):
 class AbilityMetric(Base):
     __tablename__ = "ability_metrics"
     __table_args__ = (
+        UniqueConstraint(
+            "fight_id", "player_name", "metric_type", "spell_id", "report_month",
+            name="uq_ability_metrics_key",
+        ),
         Index("ix_ability_metrics_fight_player", "fight_id", "player_name"),
         Index("ix_ability_metrics_spell_type", "spell_id", "metric_type"),
+        {"postgresql_partition_by": "RANGE (report_month)"},
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -293,17 +353,25 @@ class AbilityMetric(Base):
     pct_of_total: Mapped[float] = mapped_column(Float, default=0.0)
     overheal_total: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
 
+    # Partition key: the fight's report_month
+    report_month: Mapped[date] = mapped_column(Date, primary_key=True)
+
     fight: Mapped["Fight"] = relationship(back_populates="ability_metrics")
 
 
 class BuffUptime(Base):
     __tablename__ = "buff_uptimes"
     __table_args__ = (
+        UniqueConstraint(
+            "fight_id", "player_name", "metric_type", "spell_id", "report_month",
+            name="uq_buff_uptimes_key",
+        ),
         Index("ix_buff_uptimes_fight_player", "fight_id", "player_name"),
         CheckConstraint(
             "uptime_pct >= 0 AND uptime_pct <= 100",
             name="ck_bu_uptime_pct",
         ),
+        {"postgresql_partition_by": "RANGE (report_month)"},
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -315,13 +383,21 @@ class BuffUptime(Base):
     uptime_pct: Mapped[float] = mapped_column(Float, default=0.0)
     stack_count: Mapped[float] = mapped_column(Float, default=0.0)
 
+    # Partition key: the fight's report_month
+    report_month: Mapped[date] = mapped_column(Date, primary_key=True)
+
     fight: Mapped["Fight"] = relationship(back_populates="buff_uptimes")
 
 
 class DeathDetail(Base):
     __tablename__ = "death_details"
     __table_args__ = (
+        UniqueConstraint(
+            "fight_id", "player_name", "death_index", "report_month",
+            name="uq_death_details_key",
+        ),
         Index("ix_death_details_fight_player", "fight_id", "player_name"),
+        {"postgresql_partition_by": "RANGE (report_month)"},
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -334,12 +410,16 @@ class DeathDetail(Base):
     damage_taken_total: Mapped[int] = mapped_column(BigInteger, default=0)
     events_json: Mapped[str] = mapped_column(Text)
 
+    # Partition key: the fight's report_month
+    report_month: Mapped[date] = mapped_column(Date, primary_key=True)
+
     fight: Mapped["Fight"] = relationship(back_populates="death_details")
 
 
 class CastMetric(Base):
     __tablename__ = "cast_metrics"
     __table_args__ = (
+        UniqueConstraint("fight_id", "player_name", name="uq_cast_metrics_key"),
         Index("ix_cast_metrics_fight_player", "fight_id", "player_name"),
         CheckConstraint(
             "gcd_uptime_pct >= 0 AND gcd_uptime_pct <= 100",
@@ -366,6 +446,10 @@ class CastMetric(Base):
 class CooldownUsage(Base):
     __tablename__ = "cooldown_usage"
     __table_args__ = (
+        UniqueConstraint(
+            "fight_id", "player_name", "spell_id",
+            name="uq_cooldown_usage_key",
+        ),
         Index("ix_cooldown_usage_fight_player", "fight_id", "player_name"),
         CheckConstraint(
             "efficiency_pct >= 0 AND efficiency_pct <= 100",
@@ -391,6 +475,7 @@ class CooldownUsage(Base):
 class CancelledCast(Base):
     __tablename__ = "cancelled_casts"
     __table_args__ = (
+        UniqueConstraint("fight_id", "player_name", name="uq_cancelled_casts_key"),
         Index("ix_cancelled_casts_fight_player", "fight_id", "player_name"),
         CheckConstraint(
             "cancel_pct >= 0 AND cancel_pct <= 100",
@@ -413,6 +498,10 @@ class CancelledCast(Base):
 class FightConsumable(Base):
     __tablename__ = "fight_consumables"
     __table_args__ = (
+        UniqueConstraint(
+            "fight_id", "player_name", "spell_id",
+            name="uq_fight_consumables_key",
+        ),
         Index("ix_fight_consumables_fight_player", "fight_id", "player_name"),
     )
 
@@ -430,7 +519,12 @@ class FightConsumable(Base):
 class GearSnapshot(Base):
     __tablename__ = "gear_snapshots"
     __table_args__ = (
+        UniqueConstraint(
+            "fight_id", "player_name", "slot", "report_month",
+            name="uq_gear_snapshots_key",
+        ),
         Index("ix_gear_snapshots_fight_player", "fight_id", "player_name"),
+        {"postgresql_partition_by": "RANGE (report_month)"},
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -443,12 +537,19 @@ class GearSnapshot(Base):
     temporary_enchant: Mapped[int | None] = mapped_column(Integer, nullable=True)
     gems_json: Mapped[str | None] = mapped_column(Text, nullable=True)
 
+    # Partition key: the fight's report_month
+    report_month: Mapped[date] = mapped_column(Date, primary_key=True)
+
     fight: Mapped["Fight"] = relationship(back_populates="gear_snapshots")
 
 
 class ResourceSnapshot(Base):
     __tablename__ = "resource_snapshots"
     __table_args__ = (
+        UniqueConstraint(
+            "fight_id", "player_name", "resource_type",
+            name="uq_resource_snapshots_key",
+        ),
         Index(
             "ix_resource_snapshots_fight_player", "fight_id", "player_name"
         ),
@@ -468,6 +569,8 @@ class ResourceSnapshot(Base):
     time_at_zero_ms: Mapped[int] = mapped_column(BigInteger, default=0)
     time_at_zero_pct: Mapped[float] = mapped_column(Float, default=0.0)
     samples_json: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # {"<resolution>": {"t": [first, *deltas], "v": [...]}} per SAMPLE_RESOLUTIONS
+    sample_levels_json: Mapped[str | None] = mapped_column(Text, nullable=True)
 
     fight: Mapped["Fight"] = relationship(back_populates="resource_snapshots")
 
@@ -477,6 +580,7 @@ class CastEvent(Base):
     __table_args__ = (
         Index("ix_cast_events_fight_player", "fight_id", "player_name"),
         Index("ix_cast_events_fight_spell", "fight_id", "spell_id"),
+        {"postgresql_partition_by": "RANGE (report_month)"},
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -488,4 +592,138 @@ class CastEvent(Base):
     event_type: Mapped[str] = mapped_column(String(20))
     target_name: Mapped[str | None] = mapped_column(String(100), nullable=True)
 
+    # Partition key: the fight's report_month
+    report_month: Mapped[date] = mapped_column(Date, primary_key=True)
+
     fight: Mapped["Fight"] = relationship(back_populates="cast_events")
+
+
+class CastEventSeries(Base):
+    """One player's cast events in a fight, stored column-wise.
+
+    Replaces one ``cast_events`` row per cast (see pipeline.cast_series):
+    event i happened at ``timestamps_ms[i]`` with ``spell_ids[i]``, bit i of
+    ``begincast_bitmap`` marks a begincast (otherwise a cast), and
+    ``target_idx[i]`` indexes ``target_names_json`` (0 = no target). Names
+    are stored once per series.
+    """
+
+    __tablename__ = "cast_event_series"
+    __table_args__ = (
+        UniqueConstraint(
+            "fight_id", "player_name", "report_month",
+            name="uq_cast_event_series_key",
+        ),
+        {"postgresql_partition_by": "RANGE (report_month)"},
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    fight_id: Mapped[int] = mapped_column(ForeignKey("fights.id", ondelete="CASCADE"))
+    player_name: Mapped[str] = mapped_column(String(100))
+    event_count: Mapped[int] = mapped_column(Integer, default=0)
+    timestamps_ms: Mapped[list[int]] = mapped_column(ARRAY(BigInteger))
+    spell_ids: Mapped[list[int]] = mapped_column(ARRAY(Integer))
+    begincast_bitmap: Mapped[bytes] = mapped_column(LargeBinary)
+    target_idx: Mapped[list[int]] = mapped_column(ARRAY(SmallInteger))
+    # {"<spell_id>": ability_name}
+    ability_names_json: Mapped[str] = mapped_column(Text)
+    # [target_name, ...]; target_idx k refers to entry k - 1
+    target_names_json: Mapped[str] = mapped_column(Text)
+
+    # Partition key: the fight's report_month
+    report_month: Mapped[date] = mapped_column(Date, primary_key=True)
+
+    fight: Mapped["Fight"] = relationship(back_populates="cast_event_series")
+
+
+class EventArchive(Base):
+    """Compressed raw WCL event pages of one fight and data type.
+
+    ``data`` holds one JSON line per page, compressed with ``codec``;
+    ``context_json`` the actor and class maps the pipeline needs to recompute
+    the derived rows offline (see pipeline.event_archive).
+    """
+
+    __tablename__ = "event_archives"
+    __table_args__ = (
+        UniqueConstraint("fight_id", "data_type", name="uq_event_archives_key"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    fight_id: Mapped[int] = mapped_column(ForeignKey("fights.id", ondelete="CASCADE"))
+    data_type: Mapped[str] = mapped_column(String(20))
+    codec: Mapped[str] = mapped_column(String(10))
+    page_count: Mapped[int] = mapped_column(Integer, default=0)
+    event_count: Mapped[int] = mapped_column(Integer, default=0)
+    # Uncompressed size of the JSON lines
+    raw_bytes: Mapped[int] = mapped_column(BigInteger, default=0)
+    data: Mapped[bytes] = mapped_column(LargeBinary)
+    context_json: Mapped[str | None] = mapped_column(Text, nullable=True)
+    archived_at: Mapped[datetime] = mapped_column(default=func.now())
+
+    fight: Mapped["Fight"] = relationship(back_populates="event_archives")
+
+
+class IngestJob(Base):
+    """Durable ingest_report work item, claimed by workers (see pipeline.ingest_jobs)."""
+
+    __tablename__ = "ingest_jobs"
+    __table_args__ = (
+        # What workers scan when claiming
+        Index("ix_ingest_jobs_claim", "status", "priority", "run_after"),
+        # At most one queued/running job per report
+        Index(
+            "uq_ingest_jobs_active_report", "report_code", unique=True,
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+        CheckConstraint(
+            "status IN ('queued', 'running', 'done', 'failed')",
+            name="ck_ingest_jobs_status",
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    report_code: Mapped[str] = mapped_column(String(50))
+    status: Mapped[str] = mapped_column(String(20), default="queued")
+    # wcl.scheduler.Priority value; lower is claimed (and fetched) first
+    priority: Mapped[int] = mapped_column(Integer, default=1)
+    source: Mapped[str] = mapped_column(String(20))  # api, cli, poll
+    with_tables: Mapped[bool] = mapped_column(Boolean, default=False)
+    with_events: Mapped[bool] = mapped_column(Boolean, default=False)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, default=3)
+    run_after: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, server_default=func.now()
+    )
+    locked_by: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    locked_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    # Stage the job is in / stopped at, and per-stage outcome once finished
+    stage: Mapped[str | None] = mapped_column(String(30), nullable=True)
+    stages: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, server_default=func.now()
+    )
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+
+class FightStageStatus(Base):
+    """Per-(fight, enrichment stage) checkpoint (see pipeline.checkpoints)."""
+
+    __tablename__ = "fight_stage_status"
+    __table_args__ = (
+        CheckConstraint(
+            "status IN ('done', 'failed')", name="ck_fight_stage_status_status",
+        ),
+    )
+
+    # Rows go with the fight, so a full re-ingest starts from no checkpoints
+    fight_id: Mapped[int] = mapped_column(
+        ForeignKey("fights.id", ondelete="CASCADE"), primary_key=True
+    )
+    stage: Mapped[str] = mapped_column(String(30), primary_key=True)
+    status: Mapped[str] = mapped_column(String(20))
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, server_default=func.now()
+    )
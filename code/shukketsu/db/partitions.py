@@ -0,0 +1,202 @@
+"""Monthly range partitions of the per-fight event tables.
+
+The large per-fight tables listed in ``PARTITIONED_TABLES`` are partitioned
+by ``report_month``, the first day of the UTC month its report started in.
+``fights`` carries the same column, so every child row is written with its
+fight's month (``UpsertBatch`` scopes include it) and report-level deletes
+and queries that join on ``report_month`` only touch one partition.
+Retention drops whole month partitions (``drop_partitions_before``) instead
+of deleting rows, so nothing is left for vacuum.
+
+Partitions are named ``<table>_pYYYYMM``. ``ensure_partitions`` creates the
+missing ones for a report's month before its rows are written; there is no
+default partition, so a row for a month without one fails loudly instead of
+landing somewhere retention cannot drop. Every writer of these tables
+(ingest, resume, table backfill, recompute, the compaction fold) calls it
+for its fights' months, since retention may have dropped a month after its
+report was ingested. They use ``ensure_partitions_committed``, which creates
+them in a short transaction of its own: creating a partition locks its parent
+table until the creating transaction ends, which inside a long ingest would
+block every reader of the table until the ingest commits.
+"""
+
+import logging
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import UTC, date, datetime
+
+from sqlalchemy import String, bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_TABLES = (
+    "ability_metrics",
+    "buff_uptimes",
+    "death_details",
+    "gear_snapshots",
+    "cast_events",
+    "cast_event_series",
+)
+
+# report_month for a report starting at reports.start_time (epoch ms), in SQL
+REPORT_MONTH_SQL = (
+    "date_trunc('month', to_timestamp({start_time} / 1000.0) AT TIME ZONE 'UTC')::date"
+)
+
+
+@dataclass(frozen=True)
+class Partition:
+    table: str
+    name: str
+    month: date
+    size_bytes: int = 0
+
+
+def report_month(start_time_ms: int) -> date:
+    """First day of the UTC month a report starting at ``start_time_ms`` is in."""
+    return datetime.fromtimestamp(start_time_ms / 1000, UTC).date().replace(day=1)
+
+
+def next_month(month: date) -> date:
+    if month.month == 12:
+        return date(month.year + 1, 1, 1)
+    return date(month.year, month.month + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+def partition_ddl(table: str, month: date) -> str:
+    """CREATE statement for ``table``'s partition holding ``month``."""
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, month)} "
+        f"PARTITION OF {table} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month(month).isoformat()}')"
+    )
+
+
+async def missing_partitions(
+    session, months: Iterable[date], tables: Iterable[str] = PARTITIONED_TABLES,
+) -> list[tuple[str, date]]:
+    """(table, month) of the partitions of ``tables`` for ``months`` not yet created."""
+    wanted = {
+        partition_name(table, month): (table, month)
+        for table in tables for month in set(months)
+    }
+    if not wanted:
+        return []
+    result = await session.execute(
+        text("SELECT relname FROM pg_class WHERE relname = ANY(:names)").bindparams(
+            bindparam("names", sorted(wanted), type_=ARRAY(String)),
+        )
+    )
+    existing = set(result.scalars())
+    return [wanted[name] for name in sorted(set(wanted) - existing)]
+
+
+async def _create_partitions(conn, missing: list[tuple[str, date]]) -> list[str]:
+    for table, month in missing:
+        await conn.execute(text(partition_ddl(table, month)))
+    created = [partition_name(table, month) for table, month in missing]
+    if created:
+        logger.info("Created partitions: %s", ", ".join(created))
+    return created
+
+
+async def ensure_partitions(
+    session, months: Iterable[date], tables: Iterable[str] = PARTITIONED_TABLES,
+) -> list[str]:
+    """Create any missing partitions of ``tables`` for ``months``.
+
+    One catalog lookup, then one CREATE per missing partition (creating a
+    partition locks its parent, so existing ones are not touched). Returns
+    the names of the partitions created.
+    """
+    missing = await missing_partitions(session, months, tables)
+    return await _create_partitions(session, missing)
+
+
+async def ensure_partitions_committed(
+    session,
+    months: Iterable[date],
+    tables: Iterable[str] = PARTITIONED_TABLES,
+    *,
+    lock_timeout_ms: int = 5000,
+) -> list[str]:
+    """Like ``ensure_partitions``, but outside ``session``'s transaction.
+
+    The catalog lookup runs on ``session``; missing partitions are created
+    on a separate connection of its engine, in a transaction that sets a
+    ``lock_timeout`` and commits right away, so the parent tables are only
+    locked for the CREATEs. If that fails (a lock timeout, or the caller's
+    transaction already holding a lock on a parent) they are created in
+    ``session`` instead.
+    """
+    missing = await missing_partitions(session, months, tables)
+    if not missing:
+        return []
+    if session.bind is not None:
+        try:
+            async with session.bind.connect() as conn, conn.begin():
+                await conn.execute(text(f"SET LOCAL lock_timeout = {int(lock_timeout_ms)}"))
+                return await _create_partitions(conn, missing)
+        except Exception as exc:
+            logger.warning(
+                "Creating partitions in their own transaction failed, "
+                "creating them in the caller's: %s", exc,
+            )
+    return await _create_partitions(session, missing)
+
+
+async def list_partitions(
+    session, tables: Iterable[str] = PARTITIONED_TABLES,
+) -> list[Partition]:
+    """Month partitions of ``tables`` with their on-disk size, oldest first."""
+    result = await session.execute(
+        text(
+            "SELECT parent.relname AS table_name, child.relname AS name, "
+            "pg_total_relation_size(child.oid) AS size_bytes "
+            "FROM pg_inherits i "
+            "JOIN pg_class parent ON parent.oid = i.inhparent "
+            "JOIN pg_class child ON child.oid = i.inhrelid "
+            "WHERE parent.relname = ANY(:tables)"
+        ).bindparams(bindparam("tables", list(tables), type_=ARRAY(String)))
+    )
+    partitions = []
+    for row in result:
+        suffix = row.name.removeprefix(f"{row.table_name}_p")
+        if len(suffix) != 6 or not suffix.isdigit():
+            continue
+        month = date(int(suffix[:4]), int(suffix[4:]), 1)
+        partitions.append(
+            Partition(row.table_name, row.name, month, row.size_bytes or 0),
+        )
+    return sorted(partitions, key=lambda p: (p.month, p.table))
+
+
+async def drop_partitions_before(
+    session, cutoff: date, tables: Iterable[str] = PARTITIONED_TABLES,
+) -> list[Partition]:
+    """Drop every partition of ``tables`` for months before ``cutoff``'s month.
+
+    Each partition is detached, then dropped, so its rows disappear without
+    a DELETE. Returns the dropped partitions (with their sizes).
+    """
+    cutoff = cutoff.replace(day=1)
+    dropped = []
+    for partition in await list_partitions(session, tables):
+        if partition.month >= cutoff:
+            continue
+        await session.execute(text(
+            f"ALTER TABLE {partition.table} DETACH PARTITION {partition.name}"
+        ))
+        await session.execute(text(f"DROP TABLE {partition.name}"))
+        dropped.append(partition)
+    if dropped:
+        logger.info(
+            "Dropped %d partitions before %s (%d bytes)",
+            len(dropped), cutoff, sum(p.size_bytes for p in dropped),
+        )
+    return dropped
@@ -87,7 +87,7 @@ RAID_ABILITY_SUMMARY = text("""
     SELECT am.player_name, am.ability_name, am.spell_id,
            am.total, am.pct_of_total, am.crit_pct
     FROM ability_metrics am
-    JOIN fights f ON am.fight_id = f.id
+    JOIN fights f ON am.fight_id = f.id AND am.report_month = f.report_month
     WHERE f.report_code = :report_code
       AND f.fight_id = :fight_id
       AND am.metric_type = 'damage'
@@ -99,7 +99,7 @@ FIGHT_ABILITIES = text("""
     SELECT am.player_name, am.metric_type, am.ability_name, am.spell_id,
            am.total, am.hit_count, am.crit_count, am.crit_pct, am.pct_of_total
     FROM ability_metrics am
-    JOIN fights f ON am.fight_id = f.id
+    JOIN fights f ON am.fight_id = f.id AND am.report_month = f.report_month
     WHERE f.report_code = :report_code
       AND f.fight_id = :fight_id
     ORDER BY am.player_name, am.metric_type, am.pct_of_total DESC
@@ -109,7 +109,7 @@ FIGHT_ABILITIES_PLAYER = text("""
     SELECT am.player_name, am.metric_type, am.ability_name, am.spell_id,
            am.total, am.hit_count, am.crit_count, am.crit_pct, am.pct_of_total
     FROM ability_metrics am
-    JOIN fights f ON am.fight_id = f.id
+    JOIN fights f ON am.fight_id = f.id AND am.report_month = f.report_month
     WHERE f.report_code = :report_code
       AND f.fight_id = :fight_id
       AND am.player_name ILIKE :player_name
@@ -120,7 +120,7 @@ FIGHT_BUFFS = text("""
     SELECT bu.player_name, bu.metric_type, bu.ability_name, bu.spell_id,
            bu.uptime_pct, bu.stack_count
     FROM buff_uptimes bu
-    JOIN fights f ON bu.fight_id = f.id
+    JOIN fights f ON bu.fight_id = f.id AND bu.report_month = f.report_month
     WHERE f.report_code = :report_code
       AND f.fight_id = :fight_id
     ORDER BY bu.player_name, bu.metric_type, bu.uptime_pct DESC
@@ -130,7 +130,7 @@ FIGHT_BUFFS_PLAYER = text("""
     SELECT bu.player_name, bu.metric_type, bu.ability_name, bu.spell_id,
            bu.uptime_pct, bu.stack_count
     FROM buff_uptimes bu
-    JOIN fights f ON bu.fight_id = f.id
+    JOIN fights f ON bu.fight_id = f.id AND bu.report_month = f.report_month
     WHERE f.report_code = :report_code
       AND f.fight_id = :fight_id
       AND bu.player_name ILIKE :player_name
@@ -140,7 +140,7 @@ FIGHT_BUFFS_PLAYER = text("""
 TABLE_DATA_EXISTS = text("""
     SELECT EXISTS(
         SELECT 1 FROM ability_metrics am
-        JOIN fights f ON am.fight_id = f.id
+        JOIN fights f ON am.fight_id = f.id AND am.report_month = f.report_month
         WHERE f.report_code = :report_code
     ) AS has_data
 """)
@@ -149,7 +149,7 @@ EVENT_DATA_EXISTS = text("""
     SELECT (
         EXISTS(
             SELECT 1 FROM death_details dd
-            JOIN fights f ON dd.fight_id = f.id
+            JOIN fights f ON dd.fight_id = f.id AND dd.report_month = f.report_month
             WHERE f.report_code = :report_code
         ) OR EXISTS(
             SELECT 1 FROM cast_metrics cm
@@ -242,7 +242,7 @@ FIGHT_DEATHS = text("""
            dd.killing_blow_ability, dd.killing_blow_source,
            dd.damage_taken_total, dd.events_json
     FROM death_details dd
-    JOIN fights f ON dd.fight_id = f.id
+    JOIN fights f ON dd.fight_id = f.id AND dd.report_month = f.report_month
     WHERE f.report_code = :report_code
       AND f.fight_id = :fight_id
     ORDER BY dd.timestamp_ms ASC, dd.death_index ASC
@@ -251,7 +251,7 @@ FIGHT_DEATHS = text("""
 GEAR_SNAPSHOT = text("""
     SELECT gs.slot, gs.item_id, gs.item_level, gs.player_name
     FROM gear_snapshots gs
-    JOIN fights f ON gs.fight_id = f.id
+    JOIN fights f ON gs.fight_id = f.id AND gs.report_month = f.report_month
     WHERE f.report_code = :report_code AND f.fight_id = :fight_id
       AND gs.player_name ILIKE :player_name
     ORDER BY gs.slot
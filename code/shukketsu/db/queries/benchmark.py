@@ -108,7 +108,7 @@ BENCHMARK_SPEC_ABILITIES = text("""
         SELECT am.fight_id, am.player_name,
                SUM(am.total) AS player_total
         FROM ability_metrics am
-        JOIN fights f ON am.fight_id = f.id
+        JOIN fights f ON am.fight_id = f.id AND am.report_month = f.report_month
         JOIN benchmark_reports br ON br.report_code = f.report_code
         WHERE f.kill = true
           AND am.metric_type = 'damage'
@@ -124,7 +124,7 @@ BENCHMARK_SPEC_ABILITIES = text("""
                     ELSE 0 END
            )::numeric, 1) AS avg_damage_pct
     FROM ability_metrics am
-    JOIN fights f ON am.fight_id = f.id
+    JOIN fights f ON am.fight_id = f.id AND am.report_month = f.report_month
     JOIN fight_performances fp
         ON fp.fight_id = f.id AND fp.player_name = am.player_name
     JOIN benchmark_reports br ON br.report_code = f.report_code
@@ -148,7 +148,7 @@ BENCHMARK_SPEC_BUFFS = text("""
            bu.ability_name AS buff_name,
            ROUND(AVG(bu.uptime_pct)::numeric, 1) AS avg_uptime
     FROM buff_uptimes bu
-    JOIN fights f ON bu.fight_id = f.id
+    JOIN fights f ON bu.fight_id = f.id AND bu.report_month = f.report_month
     JOIN fight_performances fp
         ON fp.fight_id = f.id AND fp.player_name = bu.player_name
     JOIN benchmark_reports br ON br.report_code = f.report_code
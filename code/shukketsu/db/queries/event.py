@@ -1,4 +1,4 @@
-"""Event-data SQL queries for --with-events agent tools (15 queries).
+"""Event-data SQL queries for --with-events agent tools (14 queries).
 
 Used by: agent/tools/event_tools.py, api/routes/data/events.py,
          api/routes/data/fights.py, api/routes/data/comparison.py
@@ -17,10 +17,9 @@ __all__ = [
     "PHASE_BREAKDOWN",
     "FIGHT_CAST_METRICS",
     "FIGHT_COOLDOWNS",
+    "CAST_SERIES",
     "CAST_TIMELINE",
-    "CAST_EVENTS_FOR_DOT_ANALYSIS",
     "PLAYER_FIGHT_INFO",
-    "CAST_EVENTS_FOR_PHASES",
     "ENCHANT_GEM_CHECK",
 ]
 
@@ -30,7 +29,7 @@ DEATH_ANALYSIS = text("""
            dd.damage_taken_total, dd.events_json,
            e.name AS encounter_name, f.fight_id, f.duration_ms
     FROM death_details dd
-    JOIN fights f ON dd.fight_id = f.id
+    JOIN fights f ON dd.fight_id = f.id AND dd.report_month = f.report_month
     JOIN encounters e ON f.encounter_id = e.id
     WHERE f.report_code = :report_code
       AND f.fight_id = :fight_id
@@ -89,7 +88,7 @@ RESOURCE_USAGE = text("""
     SELECT rs.player_name, rs.resource_type,
            rs.min_value, rs.max_value, rs.avg_value,
            rs.time_at_zero_ms, rs.time_at_zero_pct,
-           rs.samples_json
+           rs.samples_json, rs.sample_levels_json
     FROM resource_snapshots rs
     JOIN fights f ON rs.fight_id = f.id
     WHERE f.report_code = :report_code
@@ -101,7 +100,7 @@ GEAR_CHANGES = text("""
     WITH old_gear AS (
         SELECT gs.slot, gs.item_id, gs.item_level
         FROM gear_snapshots gs
-        JOIN fights f ON gs.fight_id = f.id
+        JOIN fights f ON gs.fight_id = f.id AND gs.report_month = f.report_month
         WHERE f.report_code = :report_code_old
           AND gs.player_name ILIKE :player_name
           AND f.id = (
@@ -112,7 +111,7 @@ GEAR_CHANGES = text("""
     new_gear AS (
         SELECT gs.slot, gs.item_id, gs.item_level
         FROM gear_snapshots gs
-        JOIN fights f ON gs.fight_id = f.id
+        JOIN fights f ON gs.fight_id = f.id AND gs.report_month = f.report_month
         WHERE f.report_code = :report_code_new
           AND gs.player_name ILIKE :player_name
           AND f.id = (
@@ -166,26 +165,27 @@ FIGHT_COOLDOWNS = text("""
     ORDER BY cu.efficiency_pct ASC
 """)
 
-CAST_TIMELINE = text("""
-    SELECT ce.player_name, ce.timestamp_ms, ce.spell_id,
-           ce.ability_name, ce.event_type, ce.target_name
-    FROM cast_events ce
-    JOIN fights f ON ce.fight_id = f.id
+CAST_SERIES = text("""
+    SELECT cs.fight_id, cs.player_name, cs.timestamps_ms, cs.spell_ids,
+           cs.begincast_bitmap, cs.target_idx,
+           cs.ability_names_json, cs.target_names_json
+    FROM cast_event_series cs
+    JOIN fights f ON cs.fight_id = f.id AND cs.report_month = f.report_month
     WHERE f.report_code = :report_code
       AND f.fight_id = :fight_id
-      AND ce.player_name ILIKE :player_name
-    ORDER BY ce.timestamp_ms ASC
+      AND cs.player_name ILIKE :player_name
 """)
 
-CAST_EVENTS_FOR_DOT_ANALYSIS = text("""
-    SELECT ce.spell_id, ce.ability_name, ce.timestamp_ms, ce.event_type
+# Legacy one-row-per-cast storage (fights not yet in cast_event_series)
+CAST_TIMELINE = text("""
+    SELECT ce.fight_id, ce.player_name, ce.timestamp_ms, ce.spell_id,
+           ce.ability_name, ce.event_type, ce.target_name
     FROM cast_events ce
-    JOIN fights f ON ce.fight_id = f.id
+    JOIN fights f ON ce.fight_id = f.id AND ce.report_month = f.report_month
     WHERE f.report_code = :report_code
       AND f.fight_id = :fight_id
       AND ce.player_name ILIKE :player_name
-      AND ce.event_type = 'cast'
-    ORDER BY ce.spell_id, ce.timestamp_ms ASC
+    ORDER BY ce.timestamp_ms ASC
 """)
 
 PLAYER_FIGHT_INFO = text("""
@@ -200,22 +200,11 @@ PLAYER_FIGHT_INFO = text("""
       AND fp.player_name ILIKE :player_name
 """)
 
-CAST_EVENTS_FOR_PHASES = text("""
-    SELECT ce.timestamp_ms, ce.event_type
-    FROM cast_events ce
-    JOIN fights f ON ce.fight_id = f.id
-    WHERE f.report_code = :report_code
-      AND f.fight_id = :fight_id
-      AND ce.player_name ILIKE :player_name
-      AND ce.event_type = 'cast'
-    ORDER BY ce.timestamp_ms ASC
-""")
-
 ENCHANT_GEM_CHECK = text("""
     SELECT gs.player_name, gs.slot, gs.item_id, gs.item_level,
            gs.permanent_enchant, gs.temporary_enchant, gs.gems_json
     FROM gear_snapshots gs
-    JOIN fights f ON gs.fight_id = f.id
+    JOIN fights f ON gs.fight_id = f.id AND gs.report_month = f.report_month
     WHERE f.report_code = :report_code
       AND f.fight_id = :fight_id
       AND gs.player_name ILIKE :player_name
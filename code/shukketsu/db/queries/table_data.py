@@ -15,7 +15,7 @@ ABILITY_BREAKDOWN = text("""
     SELECT am.player_name, am.metric_type, am.ability_name, am.spell_id,
            am.total, am.hit_count, am.crit_count, am.crit_pct, am.pct_of_total
     FROM ability_metrics am
-    JOIN fights f ON am.fight_id = f.id
+    JOIN fights f ON am.fight_id = f.id AND am.report_month = f.report_month
     WHERE f.report_code = :report_code
       AND f.fight_id = :fight_id
       AND am.player_name ILIKE :player_name
@@ -26,7 +26,7 @@ BUFF_ANALYSIS = text("""
     SELECT bu.player_name, bu.metric_type, bu.ability_name, bu.spell_id,
            bu.uptime_pct, bu.stack_count
     FROM buff_uptimes bu
-    JOIN fights f ON bu.fight_id = f.id
+    JOIN fights f ON bu.fight_id = f.id AND bu.report_month = f.report_month
     WHERE f.report_code = :report_code
       AND f.fight_id = :fight_id
       AND bu.player_name ILIKE :player_name
@@ -42,7 +42,7 @@ OVERHEAL_ANALYSIS = text("""
                      / (am.total + COALESCE(am.overheal_total, 0))::numeric) * 100, 1)
                 ELSE 0 END AS overheal_pct
     FROM ability_metrics am
-    JOIN fights f ON am.fight_id = f.id
+    JOIN fights f ON am.fight_id = f.id AND am.report_month = f.report_month
     WHERE f.report_code = :report_code
       AND f.fight_id = :fight_id
       AND am.player_name ILIKE :player_name
@@ -0,0 +1,292 @@
+"""Natural-key upserts for tables rewritten on every re-ingest.
+
+Each such table carries a ``uq_<table>_key`` unique constraint on its natural
+key (e.g. fight + player + spell). ``upsert_rows`` writes the complete new row
+set for one scope (a fight, a rankings combo, ...) with
+``INSERT ... ON CONFLICT (key) DO UPDATE``, where the update only fires for
+rows whose values actually differ (``IS DISTINCT FROM``), then deletes rows in
+the scope whose key is gone. Re-running an ingest over unchanged data
+therefore rewrites nothing: no dead tuples, no index churn.
+
+Counts are returned per call and, inside ``collect_upsert_stats()``, also
+summed for the whole run (e.g. one ``ingest_report``).
+"""
+
+import logging
+from collections.abc import Iterable, Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import (
+    Table,
+    UniqueConstraint,
+    and_,
+    delete,
+    inspect,
+    literal_column,
+    or_,
+    select,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+logger = logging.getLogger(__name__)
+
+# Postgres caps a statement at 32767 bind parameters
+MAX_PARAMS = 32000
+
+
+@dataclass
+class UpsertStats:
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+
+    @property
+    def changed(self) -> int:
+        """Rows actually written or removed."""
+        return self.inserted + self.updated + self.deleted
+
+    def add(self, other: "UpsertStats") -> None:
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.unchanged += other.unchanged
+        self.deleted += other.deleted
+
+    def as_dict(self) -> dict[str, int]:
+        return {
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "unchanged": self.unchanged,
+            "deleted": self.deleted,
+        }
+
+
+_collector: ContextVar[UpsertStats | None] = ContextVar(
+    "upsert_stats", default=None,
+)
+
+
+@contextmanager
+def collect_upsert_stats() -> Iterator[UpsertStats]:
+    """Sum the counts of every ``upsert_rows`` call made inside the block."""
+    stats = UpsertStats()
+    token = _collector.set(stats)
+    try:
+        yield stats
+    finally:
+        _collector.reset(token)
+
+
+def natural_key(table: Table) -> list:
+    """Columns of the table's ``uq_<table>_key`` constraint."""
+    name = f"uq_{table.name}_key"
+    for constraint in table.constraints:
+        if isinstance(constraint, UniqueConstraint) and constraint.name == name:
+            return list(constraint.columns)
+    raise ValueError(f"{table.name} has no {name} constraint")
+
+
+def _writable_columns(table: Table) -> list:
+    return [
+        c for c in table.columns
+        if not (c.primary_key and c.autoincrement is True) and c.computed is None
+    ]
+
+
+def _get(row: Any, attr: str) -> Any:
+    return row.get(attr) if isinstance(row, Mapping) else getattr(row, attr, None)
+
+
+def _as_mapping(row: Any, attrs: list[str]) -> Mapping[str, Any]:
+    if isinstance(row, Mapping):
+        return row
+    return {attr: getattr(row, attr, None) for attr in attrs}
+
+
+def _row_values(columns: list, attrs: list[str], row: Any) -> dict[str, Any]:
+    values = {}
+    for c, attr in zip(columns, attrs, strict=True):
+        value = _get(row, attr)
+        if value is None:
+            if c.default is not None and c.default.is_scalar:
+                value = c.default.arg
+            elif c.default is not None or c.server_default is not None:
+                # SQL-expression / server default (e.g. fetched_at = now())
+                continue
+        values[c.key] = value
+    return values
+
+
+async def upsert_rows(
+    session,
+    model,
+    rows: Iterable[Any],
+    *,
+    scope: list | None = None,
+) -> UpsertStats:
+    """Make ``model``'s rows within ``scope`` equal ``rows``, by natural key.
+
+    ``rows`` are row records, ORM instances or mappings keyed by attribute.
+    ``scope`` is a list of WHERE clauses (e.g. ``[Model.fight_id == 7]``)
+    bounding the rows ``rows`` replaces; rows in it whose key is not in
+    ``rows`` are deleted. ``None`` only inserts/updates. Rows sharing a key
+    collapse to the last one. Columns with SQL-expression defaults (such as
+    ``fetched_at``) are refreshed only on rows that changed.
+
+    The stale-row delete is one ``NOT IN (keys)`` statement while the keys fit
+    in ``MAX_PARAMS`` bind parameters. Larger row sets (a whole report's
+    ability metrics) read the scope's stored keys instead and delete the
+    stale ones in chunks that fit.
+    """
+    table = model.__table__
+    key_columns = natural_key(table)
+    key_names = [c.key for c in key_columns]
+    columns = _writable_columns(table)
+    # Rows use the ORM attribute names (``class_`` for the "class" column)
+    mapper = inspect(model)
+    attrs = [mapper.get_property_by_column(c).key for c in columns]
+
+    by_key: dict[tuple, dict[str, Any]] = {}
+    for row in rows:
+        values = _row_values(columns, attrs, row)
+        by_key[tuple(values.get(k) for k in key_names)] = values
+    stats = UpsertStats()
+
+    if by_key:
+        compare = [
+            c for c in columns
+            if c.key not in key_names and not (
+                c.default is not None and not c.default.is_scalar
+            )
+        ]
+        touch = [
+            c for c in columns
+            if c.default is not None and not c.default.is_scalar
+        ]
+        records = list(by_key.values())
+        chunk = max(1, MAX_PARAMS // len(columns))
+        for i in range(0, len(records), chunk):
+            stmt = pg_insert(table).values(records[i:i + chunk])
+            excluded = stmt.excluded
+            set_ = {c.key: excluded[c.key] for c in compare}
+            set_.update({c.key: c.default.arg for c in touch})
+            stmt = stmt.on_conflict_do_update(
+                index_elements=key_columns,
+                set_=set_,
+                where=or_(*(
+                    table.c[c.key].is_distinct_from(excluded[c.key]) for c in compare
+                )) if compare else None,
+            ).returning(literal_column("xmax = 0").label("inserted"))
+            written = (await session.execute(stmt)).all()
+            inserted = sum(1 for row in written if row.inserted)
+            stats.inserted += inserted
+            stats.updated += len(written) - inserted
+        stats.unchanged = len(by_key) - stats.inserted - stats.updated
+
+    if scope is not None:
+        stats.deleted = await _delete_stale(session, table, key_names, by_key, scope)
+
+    collector = _collector.get()
+    if collector is not None:
+        collector.add(stats)
+    logger.debug(
+        "Upserted %s: %d inserted, %d updated, %d unchanged, %d deleted",
+        table.name, stats.inserted, stats.updated, stats.unchanged, stats.deleted,
+    )
+    return stats
+
+
+async def _delete_stale(
+    session, table: Table, key_names: list[str], by_key: dict[tuple, Any], scope: list,
+) -> int:
+    """Delete rows in ``scope`` whose natural key is not in ``by_key``."""
+    key = tuple_(*(table.c[k] for k in key_names))
+    stale = delete(table).where(and_(*scope))
+    if len(by_key) * len(key_names) <= MAX_PARAMS:
+        if by_key:
+            stale = stale.where(key.not_in(list(by_key)))
+        result = await session.execute(stale)
+        return result.rowcount or 0
+
+    stored = await session.execute(
+        select(*(table.c[k] for k in key_names)).where(and_(*scope))
+    )
+    gone = [tuple(row) for row in stored.all() if tuple(row) not in by_key]
+    deleted = 0
+    chunk = max(1, MAX_PARAMS // len(key_names))
+    for i in range(0, len(gone), chunk):
+        result = await session.execute(stale.where(key.in_(gone[i:i + chunk])))
+        deleted += result.rowcount or 0
+    return deleted
+
+
+class UpsertBatch:
+    """Row sets for many scopes, written with one ``upsert_rows`` per table.
+
+    ``add(Model, rows, fight_id=7)`` stages the complete rows of one scope,
+    given as column values (e.g. a fight, or a fight + metric_type). Rows
+    that leave a scope column unset take the scope's value, so partitioned
+    tables get their ``report_month`` from the scope (see db.partitions).
+    ``flush()`` then upserts each model once over every staged scope
+    (``(fight_id, ...) IN (...)``), so writing a stage for a whole report
+    costs a couple of statements per table rather than per fight. A scope
+    staged with no rows still has its stale rows deleted.
+    """
+
+    def __init__(self, session) -> None:
+        self._session = session
+        # (model, scope column names) -> (scope values, rows)
+        self._staged: dict[tuple, tuple[set[tuple], list[Any]]] = {}
+
+    def add(self, model, rows: Iterable[Any], **scope: Any) -> None:
+        names = tuple(sorted(scope))
+        scopes, staged = self._staged.setdefault((model, names), (set(), []))
+        scopes.add(tuple(scope[name] for name in names))
+        for row in rows:
+            missing = [name for name in names if _get(row, name) is None]
+            if missing and isinstance(row, Mapping):
+                row = {**row, **scope}
+            else:
+                for name in missing:
+                    setattr(row, name, scope[name])
+            staged.append(row)
+
+    def export(self) -> list[tuple]:
+        """Everything staged, as picklable (model, scope names, scopes, rows).
+
+        Rows become mappings keyed by attribute, so a worker process can
+        compute a batch without a session and hand it back for ``merge()``.
+        """
+        exported = []
+        for (model, names), (scopes, rows) in self._staged.items():
+            attrs = [attr.key for attr in inspect(model).column_attrs]
+            exported.append((model, names, set(scopes), [
+                _as_mapping(row, attrs) for row in rows
+            ]))
+        return exported
+
+    def merge(self, exported: Iterable[tuple]) -> None:
+        """Stage the scopes and rows of another batch's ``export()``."""
+        for model, names, scopes, rows in exported:
+            staged_scopes, staged = self._staged.setdefault(
+                (model, tuple(names)), (set(), []),
+            )
+            staged_scopes.update(scopes)
+            staged.extend(rows)
+
+    async def flush(self) -> UpsertStats:
+        """Write everything staged so far; returns the summed counts."""
+        stats = UpsertStats()
+        staged, self._staged = self._staged, {}
+        for (model, names), (scopes, rows) in staged.items():
+            columns = [getattr(model, name) for name in names]
+            if len(columns) == 1:
+                clause = columns[0].in_([values[0] for values in scopes])
+            else:
+                clause = tuple_(*columns).in_(list(scopes))
+            stats.add(await upsert_rows(self._session, model, rows, scope=[clause]))
+        return stats
@@ -1,15 +1,27 @@
-"""Background service that polls WCL for new guild reports and auto-ingests them."""
+"""Background service that polls WCL for new guild reports and auto-ingests them.
+
+With ``INGEST_QUEUE__ENABLED`` new reports are queued as ``ingest_jobs`` for
+the worker pool (see ``pipeline.ingest_jobs``) instead of being ingested one
+at a time inside the poll.
+
+With ``AUTO_INGEST__LIVE_ENABLED``, reports whose end time is still recent
+(a raid being live-logged) are also followed by a faster loop that appends
+only the fights added since the last pass (``ingest_report_incremental``),
+until the report stops growing for ``live_idle_minutes``.
+"""
 
 import asyncio
 import contextlib
 import logging
 from datetime import UTC, datetime
 
-from sqlalchemy import select
+from sqlalchemy import exists, select
 
 from shukketsu.db.models import Encounter, Report
-from shukketsu.pipeline.ingest import ingest_report
+from shukketsu.pipeline.ingest import ingest_report, ingest_report_incremental
 from shukketsu.pipeline.speed_rankings import ingest_all_speed_rankings
+from shukketsu.wcl.factory import WCLClientFactory
+from shukketsu.wcl.scheduler import Priority
 
 logger = logging.getLogger(__name__)
 
@@ -17,10 +29,10 @@ logger = logging.getLogger(__name__)
 class AutoIngestService:
     """Background service that polls WCL for new guild reports and auto-ingests them."""
 
-    def __init__(self, settings, session_factory, wcl_factory):
+    def __init__(self, settings, session_factory, wcl_factory: WCLClientFactory):
         self.settings = settings
         self._session_factory = session_factory
-        self._wcl_factory = wcl_factory  # callable returning async context manager
+        self._wcl_factory = wcl_factory
         self._task: asyncio.Task | None = None
         self._trigger_task: asyncio.Task | None = None
         self._poll_lock = asyncio.Lock()
@@ -36,6 +48,9 @@ class AutoIngestService:
         self._benchmark_task: asyncio.Task | None = None
         self._last_benchmark_run: datetime | None = None
         self._last_speed_rankings_run: datetime | None = None
+        self._live_task: asyncio.Task | None = None
+        # code -> {"end_time": WCL endTime ms, "last_growth": datetime}
+        self._live_reports: dict[str, dict] = {}
 
     @property
     def enabled(self) -> bool:
@@ -59,9 +74,19 @@ class AutoIngestService:
                 "Benchmark auto-refresh enabled (every %d days)",
                 self._benchmark_interval_days,
             )
+        if self.settings.auto_ingest.live_enabled:
+            self._live_task = asyncio.create_task(self._live_loop())
+            logger.info(
+                "Live report polling enabled (every %ds)",
+                self.settings.auto_ingest.live_poll_seconds,
+            )
 
     async def stop(self):
         """Stop the background polling loop."""
+        if self._live_task and not self._live_task.done():
+            self._live_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._live_task
         if self._benchmark_task:
             self._benchmark_task.cancel()
             with contextlib.suppress(asyncio.CancelledError):
@@ -83,7 +108,10 @@ class AutoIngestService:
         while True:
             await asyncio.sleep(interval)
             try:
-                async with self._ingest_lock, self._wcl_factory() as wcl:
+                async with (
+                    self._ingest_lock,
+                    self._wcl_factory(priority=Priority.BACKFILL) as wcl,
+                ):
                     # Step 1: Refresh speed rankings
                     try:
                         await self._refresh_speed_rankings(wcl)
@@ -199,7 +227,7 @@ class AutoIngestService:
             "rateLimitData { pointsSpentThisHour limitPerHour pointsResetIn }"
         )
 
-        async with self._wcl_factory() as wcl:
+        async with self._wcl_factory(priority=Priority.AUTO_INGEST) as wcl:
             # Fetch guild reports from WCL
             zone_ids = self.settings.auto_ingest.zone_ids
             if zone_ids:
@@ -237,6 +265,8 @@ class AutoIngestService:
                 self._status = "idle"
                 return
 
+            self._track_live_reports(all_reports)
+
             # Check which reports are already in DB
             report_codes = [r["code"] for r in all_reports]
             async with self._session_factory() as session:
@@ -250,6 +280,11 @@ class AutoIngestService:
                 self._status = "idle"
                 return
 
+            if self.settings.ingest_queue.enabled:
+                await self._enqueue_reports(new_reports)
+                self._status = "idle"
+                return
+
             logger.info("Found %d new reports to ingest", len(new_reports))
             self._status = "ingesting"
 
@@ -274,6 +309,9 @@ class AutoIngestService:
                                 my_character_names=my_names,
                                 ingest_tables=cfg.with_tables,
                                 ingest_events=cfg.with_events,
+                                enrichment_concurrency=(
+                                    cfg.enrichment_concurrency
+                                ),
                             )
                         if ingest_result.enrichment_errors:
                             logger.warning(
@@ -309,6 +347,163 @@ class AutoIngestService:
 
         self._status = "idle"
 
+    async def _enqueue_reports(self, reports: list[dict]) -> None:
+        """Hand new reports to the ingest_jobs queue instead of ingesting inline.
+
+        Reports that already have a job (in any state) are skipped, so a
+        report whose job failed for good is not requeued on every poll.
+        """
+        from shukketsu.db.models import IngestJob
+        from shukketsu.pipeline.ingest_jobs import enqueue_ingest_job
+
+        cfg = self.settings.auto_ingest
+        codes = [r["code"] for r in reports]
+        async with self._session_factory() as session, session.begin():
+            result = await session.execute(
+                select(IngestJob.report_code).where(IngestJob.report_code.in_(codes))
+            )
+            known = {row[0] for row in result}
+            queued = 0
+            for code in codes:
+                if code in known:
+                    continue
+                await enqueue_ingest_job(
+                    session, code, source="poll",
+                    priority=Priority.AUTO_INGEST,
+                    with_tables=cfg.with_tables,
+                    with_events=cfg.with_events,
+                    max_attempts=self.settings.ingest_queue.max_attempts,
+                )
+                queued += 1
+        self._stats["reports_queued"] = self._stats.get("reports_queued", 0) + queued
+        logger.info("Queued %d new reports for ingestion", queued)
+
+    def _track_live_reports(self, reports: list[dict]) -> None:
+        """Start following reports whose end time is recent (still being logged)."""
+        cfg = self.settings.auto_ingest
+        if not cfg.live_enabled:
+            return
+        now = datetime.now(UTC)
+        cutoff_ms = (now.timestamp() - cfg.live_idle_minutes * 60) * 1000
+        for report in reports:
+            code = report["code"]
+            end_time = report.get("endTime") or 0
+            if code in self._live_reports or end_time < cutoff_ms:
+                continue
+            self._live_reports[code] = {"end_time": end_time, "last_growth": now}
+            logger.info("Following live report %s", code)
+
+    async def _appendable_live_reports(self, session) -> set[str]:
+        """Followed reports the live poll may append to right now.
+
+        A report not in the database yet, or with a queued or running
+        ingest job, belongs to that (first) ingest: queue workers do not take
+        ``_ingest_lock``, and ``ingest_report_incremental`` falls back to a
+        full ingest for unknown reports, so appending here would ingest the
+        same report in two concurrent transactions.
+        """
+        from shukketsu.db.models import IngestJob
+        from shukketsu.pipeline.ingest_jobs import ACTIVE_STATUSES
+
+        result = await session.execute(
+            select(Report.code).where(
+                Report.code.in_(list(self._live_reports)),
+                ~exists().where(
+                    IngestJob.report_code == Report.code,
+                    IngestJob.status.in_(ACTIVE_STATUSES),
+                ),
+            )
+        )
+        return {row[0] for row in result}
+
+    async def _live_loop(self) -> None:
+        """Re-poll followed live reports every ``live_poll_seconds``."""
+        interval = self.settings.auto_ingest.live_poll_seconds
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self._poll_live_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.exception("Error in live report poll")
+                self._last_error = str(exc)
+                self._stats["errors"] += 1
+
+    async def _poll_live_once(self) -> None:
+        """Append new fights of every followed report; drop reports gone idle."""
+        if not self._live_reports:
+            return
+        from shukketsu.db.models import MyCharacter
+
+        cfg = self.settings.auto_ingest
+        async with self._session_factory() as session:
+            char_result = await session.execute(select(MyCharacter.name))
+            my_names = {row[0] for row in char_result}
+            ready = await self._appendable_live_reports(session)
+
+        async with (
+            self._ingest_lock,
+            self._wcl_factory(priority=Priority.AUTO_INGEST) as wcl,
+        ):
+            for code in list(self._live_reports):
+                if code not in ready:
+                    # Still followed; appended once its first ingest is done
+                    continue
+                tracked = self._live_reports[code]
+                # Followed reports are still growing: never serve them from
+                # the response cache, whatever its live window
+                wcl.mark_report_live(code)
+                try:
+                    async with (
+                        self._session_factory() as session,
+                        session.begin(),
+                    ):
+                        result = await ingest_report_incremental(
+                            wcl, session, code,
+                            my_character_names=my_names,
+                            ingest_tables=cfg.with_tables,
+                            ingest_events=cfg.with_events,
+                            enrichment_concurrency=cfg.enrichment_concurrency,
+                        )
+                except Exception as exc:
+                    logger.exception("Failed live ingest of report %s", code)
+                    self._last_error = str(exc)
+                    self._stats["errors"] += 1
+                    continue
+
+                now = datetime.now(UTC)
+                if result.fights:
+                    self._stats["live_fights_ingested"] = (
+                        self._stats.get("live_fights_ingested", 0) + result.fights
+                    )
+                    logger.info(
+                        "Live report %s: appended %d fights", code, result.fights,
+                    )
+                    try:
+                        async with (
+                            self._session_factory() as session,
+                            session.begin(),
+                        ):
+                            from shukketsu.pipeline.progression import (
+                                snapshot_all_characters,
+                            )
+                            await snapshot_all_characters(session)
+                    except Exception:
+                        logger.exception(
+                            "Failed to auto-snapshot progression "
+                            "after live ingest of %s", code,
+                        )
+                if (result.report_end_time or 0) > tracked["end_time"]:
+                    tracked["end_time"] = result.report_end_time
+                    tracked["last_growth"] = now
+                elif (
+                    (now - tracked["last_growth"]).total_seconds()
+                    > cfg.live_idle_minutes * 60
+                ):
+                    logger.info("Live report %s stopped growing", code)
+                    del self._live_reports[code]
+
     async def trigger_now(self) -> dict:
         """Manual trigger, runs poll in background."""
         if self._poll_lock.locked():
@@ -337,4 +532,13 @@ class AutoIngestService:
                 self._last_speed_rankings_run.isoformat()
                 if self._last_speed_rankings_run else None
             ),
+            "wcl_credentials": self._wcl_factory.credential_status(),
+            "live_reports": [
+                {
+                    "code": code,
+                    "end_time": tracked["end_time"],
+                    "last_growth": tracked["last_growth"].isoformat(),
+                }
+                for code, tracked in self._live_reports.items()
+            ],
         }
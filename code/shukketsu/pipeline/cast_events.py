@@ -3,18 +3,27 @@
 import json
 import logging
 import math
-from collections import defaultdict
+from abc import ABC, abstractmethod
+from array import array
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from typing import Any
 
 from sqlalchemy import delete
 
 from shukketsu.db.models import (
     CancelledCast,
     CastEvent,
+    CastEventSeries,
     CastMetric,
     CooldownUsage,
 )
-from shukketsu.pipeline.constants import CLASSIC_COOLDOWNS
-from shukketsu.wcl.events import fetch_all_events
+from shukketsu.db.upsert import UpsertBatch
+from shukketsu.pipeline.cast_series import CastSeriesBuilder
+from shukketsu.pipeline.constants import CLASSIC_COOLDOWNS, DOT_BY_SPELL_ID, DotDef
+from shukketsu.pipeline.kernels import gcd_stats
+from shukketsu.pipeline.rows import CastEventRow
+from shukketsu.wcl.events import PLAYER_SOURCE_FILTER, fetch_all_events
 
 logger = logging.getLogger(__name__)
 
@@ -22,13 +31,16 @@ logger = logging.getLogger(__name__)
 GCD_MS = 1500          # Global cooldown in milliseconds
 GAP_THRESHOLD_MS = 2500  # Gaps longer than this are tracked
 
+# Only player casts are stored (parse_cast_events skips everything else)
+CAST_EVENTS_FILTER = {"filter_expression": PLAYER_SOURCE_FILTER}
+
 
 def parse_cast_events(
     events: list[dict],
     fight_id: int,
     actors: dict[int, str],
-) -> list[CastEvent]:
-    """Parse raw WCL cast events into CastEvent ORM objects.
+) -> list[CastEventRow]:
+    """Parse raw WCL cast events into CastEventRow records.
 
     Args:
         events: Raw WCL events (dataType="Casts").
@@ -37,9 +49,9 @@ def parse_cast_events(
                 sourceID not in this mapping (NPCs) are skipped.
 
     Returns:
-        List of CastEvent ORM objects ready for insertion.
+        List of CastEventRow records ready for upsert.
     """
-    results: list[CastEvent] = []
+    results: list[CastEventRow] = []
     for event in events:
         event_type = event.get("type")
         if event_type not in ("cast", "begincast"):
@@ -53,230 +65,512 @@ def parse_cast_events(
         ability = event.get("ability") or {}
         target = event.get("target") or {}
 
-        results.append(CastEvent(
-            fight_id=fight_id,
-            player_name=player_name,
-            timestamp_ms=event.get("timestamp", 0),
-            spell_id=ability.get("guid", 0),
-            ability_name=ability.get("name", f"Spell-{ability.get('guid', 0)}"),
-            event_type=event_type,
-            target_name=target.get("name") or None,
+        results.append(CastEventRow(
+            fight_id,
+            player_name,
+            event.get("timestamp", 0),
+            ability.get("guid", 0),
+            ability.get("name", f"Spell-{ability.get('guid', 0)}"),
+            event_type,
+            target.get("name") or None,
         ))
 
     return results
 
 
+# Spell ids CooldownUsage reports on; casts of anything else need no use tracking
+_THROUGHPUT_COOLDOWN_IDS = frozenset(
+    cd.spell_id
+    for cooldowns in CLASSIC_COOLDOWNS.values()
+    for cd in cooldowns
+    if cd.cd_type == "throughput"
+)
+
+
+class _PlayerCasts:
+    """One player's running state for every metric CastAnalyzer derives."""
+
+    __slots__ = ("cast_times", "total_begins", "spells")
+
+    def __init__(self) -> None:
+        # Completed-cast timestamps; GCD and gap stats are reduced from these
+        # by the kernels in results()
+        self.cast_times = array("q")
+        self.total_begins = 0
+        # spell_id -> [begins, casts, first_cast_ms, last_cast_ms]
+        self.spells: dict[int, list] = {}
+
+
+class CastExtension(ABC):
+    """Extra per-cast metric computed in CastAnalyzer's single pass.
+
+    Subclasses set ``name`` and receive every parsed cast (in timestamp
+    order) through ``add``; ``results`` becomes ``CastAnalysis.extra[name]``.
+    """
+
+    name: str = ""
+
+    @abstractmethod
+    def add(self, ce: CastEventRow) -> None:
+        """Consume one cast or begincast."""
+
+    @abstractmethod
+    def results(self, fight_duration_ms: int) -> Any:
+        """The extension's metric for the fight."""
+
+
+# A recast with more than this share of the DoT still running is "early"
+EARLY_REFRESH_FRACTION = 0.3
+
+
+@dataclass
+class DotRefresh:
+    """Refresh timing of one DoT for one player."""
+
+    spell_id: int
+    name: str
+    refreshes: int = 0
+    early_refreshes: int = 0
+    clipped_ticks: float = 0.0
+    # Refreshes made while the previous application was still running
+    overlapping: int = 0
+    remaining_ms: float = 0.0  # summed over the overlapping refreshes
+
+    @property
+    def early_pct(self) -> float:
+        return self.early_refreshes / self.refreshes * 100 if self.refreshes else 0.0
+
+    @property
+    def avg_remaining_ms(self) -> float:
+        return self.remaining_ms / self.overlapping if self.overlapping else 0.0
+
+
+class DotRefreshExtension(CastExtension):
+    """Early DoT refreshes and the ticks they clip, per player and DoT.
+
+    Every completed recast of a DoT after its first is a refresh; one made
+    while more than ``EARLY_REFRESH_FRACTION`` of the previous application
+    was still running counts as early, and the remaining duration of any
+    overlapping recast is counted in clipped ticks.
+    """
+
+    name = "dot_refreshes"
+
+    def __init__(self, dots: Mapping[int, DotDef] = DOT_BY_SPELL_ID) -> None:
+        self._dots = dots
+        # (player_name, spell_id) -> [last_cast_ms, DotRefresh]
+        self._state: dict[tuple[str, int], list] = {}
+
+    def add(self, ce: CastEventRow) -> None:
+        if ce.event_type != "cast":
+            return
+        dot = self._dots.get(ce.spell_id)
+        if dot is None:
+            return
+        key = (ce.player_name, ce.spell_id)
+        state = self._state.get(key)
+        if state is None:
+            name = ce.ability_name or dot.name
+            self._state[key] = [ce.timestamp_ms, DotRefresh(ce.spell_id, name)]
+            return
+        refresh = state[1]
+        refresh.refreshes += 1
+        remaining_ms = dot.duration_ms - (ce.timestamp_ms - state[0])
+        if remaining_ms > 0:
+            if remaining_ms > EARLY_REFRESH_FRACTION * dot.duration_ms:
+                refresh.early_refreshes += 1
+            refresh.clipped_ticks += remaining_ms / dot.tick_interval_ms
+            refresh.overlapping += 1
+            refresh.remaining_ms += remaining_ms
+        state[0] = ce.timestamp_ms
+
+    def results(self, fight_duration_ms: int) -> dict[str, list[DotRefresh]]:
+        """DotRefresh per DoT a player recast at least once, by player_name."""
+        results: dict[str, list[DotRefresh]] = {}
+        for (player_name, _), (_, refresh) in self._state.items():
+            if refresh.refreshes:
+                results.setdefault(player_name, []).append(refresh)
+        return results
+
+
+@dataclass
+class CastAnalysis:
+    metrics: dict[str, CastMetric]
+    cooldowns: list[CooldownUsage]
+    cancelled: dict[str, CancelledCast]
+    extra: dict[str, Any] = field(default_factory=dict)
+
+
+class CastAnalyzer:
+    """Single pass over a fight's casts for every derived cast metric.
+
+    GCD uptime, CPM and gaps, cooldown usage and cancel rates all come from
+    one per-player state object, so each cast costs one player lookup and one
+    spell lookup. Casts must be added in timestamp order (as WCL pages deliver
+    them); beyond running counts only an int64 column of completed-cast
+    timestamps is kept per player, which ``kernels.gcd_stats`` reduces (with
+    NumPy when installed). Additional metrics plug in as ``CastExtension``s.
+    """
+
+    def __init__(self, extensions: Iterable[CastExtension] = ()) -> None:
+        self._players: dict[str, _PlayerCasts] = {}
+        self._spell_names: dict[int, str] = {}
+        self._extensions = list(extensions)
+
+    def add(self, ce: CastEventRow) -> None:
+        self.add_rows((ce,))
+
+    def add_rows(self, rows: Iterable[CastEventRow]) -> None:
+        players = self._players
+        spell_names = self._spell_names
+        extensions = self._extensions
+        cooldown_ids = _THROUGHPUT_COOLDOWN_IDS
+        for ce in rows:
+            event_type = ce.event_type
+            if event_type == "cast":
+                is_cast = True
+            elif event_type == "begincast":
+                is_cast = False
+            else:
+                continue
+
+            player = players.get(ce.player_name)
+            if player is None:
+                player = players[ce.player_name] = _PlayerCasts()
+            spell_id = ce.spell_id
+            spell_names[spell_id] = ce.ability_name
+            spell = player.spells.get(spell_id)
+            if spell is None:
+                spell = player.spells[spell_id] = [0, 0, None, None]
+
+            if is_cast:
+                ts = ce.timestamp_ms
+                player.cast_times.append(ts)
+                spell[1] += 1
+                if spell_id in cooldown_ids:
+                    if spell[2] is None or ts < spell[2]:
+                        spell[2] = ts
+                    if spell[3] is None or ts > spell[3]:
+                        spell[3] = ts
+            else:
+                player.total_begins += 1
+                spell[0] += 1
+
+            for extension in extensions:
+                extension.add(ce)
+
+    def results(
+        self, fight_duration_ms: int, player_class_map: dict[str, str],
+    ) -> CastAnalysis:
+        """Derived rows for the fight (without fight_id set)."""
+        return CastAnalysis(
+            metrics=self.cast_metrics(fight_duration_ms),
+            cooldowns=self.cooldown_usage(fight_duration_ms, player_class_map),
+            cancelled=self.cancelled_casts(),
+            extra={
+                ext.name: ext.results(fight_duration_ms) for ext in self._extensions
+            },
+        )
+
+    def cast_metrics(self, fight_duration_ms: int) -> dict[str, CastMetric]:
+        """CastMetric per player_name with at least one completed cast."""
+        if fight_duration_ms <= 0:
+            return {}
+
+        results: dict[str, CastMetric] = {}
+        for player_name, player in self._players.items():
+            total_casts = len(player.cast_times)
+            if not total_casts:
+                continue
+            cpm = total_casts / (fight_duration_ms / 60_000)
+
+            stats = gcd_stats(player.cast_times, GCD_MS, GAP_THRESHOLD_MS)
+            # Last cast gets full GCD credit; cap active_time at fight duration
+            active_time = min(stats.active_time_ms + GCD_MS, fight_duration_ms)
+            gcd_uptime_pct = active_time / fight_duration_ms * 100
+            downtime = fight_duration_ms - active_time
+            avg_gap_ms = (
+                stats.gap_total_ms / stats.gap_count if stats.gap_count else 0.0
+            )
+
+            results[player_name] = CastMetric(
+                player_name=player_name,
+                total_casts=total_casts,
+                casts_per_minute=round(cpm, 2),
+                gcd_uptime_pct=round(gcd_uptime_pct, 1),
+                active_time_ms=active_time,
+                downtime_ms=downtime,
+                longest_gap_ms=stats.longest_gap_ms,
+                longest_gap_at_ms=stats.longest_gap_at_ms,
+                avg_gap_ms=round(avg_gap_ms, 1),
+                gap_count=stats.gap_count,
+            )
+        return results
+
+    def cooldown_usage(
+        self, fight_duration_ms: int, player_class_map: dict[str, str],
+    ) -> list[CooldownUsage]:
+        """CooldownUsage per player and throughput cooldown of their class."""
+        if fight_duration_ms <= 0:
+            return []
+
+        results: list[CooldownUsage] = []
+        for player_name, class_name in player_class_map.items():
+            cooldowns = [
+                cd for cd in CLASSIC_COOLDOWNS.get(class_name, [])
+                if cd.cd_type == "throughput"
+            ]
+            player = self._players.get(player_name)
+            for cd in cooldowns:
+                if cd.cooldown_sec <= 0:
+                    continue
+
+                spell = player.spells.get(cd.spell_id) if player else None
+                times_used = spell[1] if spell else 0
+                first_use = spell[2] if times_used else None
+                last_use = spell[3] if times_used else None
+                max_possible = math.floor(
+                    fight_duration_ms / (cd.cooldown_sec * 1000)
+                ) + 1
+                efficiency = min(
+                    (times_used / max_possible * 100) if max_possible > 0 else 0.0,
+                    100.0,
+                )
+
+                results.append(CooldownUsage(
+                    player_name=player_name,
+                    spell_id=cd.spell_id,
+                    ability_name=cd.name,
+                    cooldown_sec=cd.cooldown_sec,
+                    times_used=times_used,
+                    max_possible_uses=max_possible,
+                    first_use_ms=first_use,
+                    last_use_ms=last_use,
+                    efficiency_pct=round(efficiency, 1),
+                ))
+
+        return results
+
+    def cancelled_casts(self) -> dict[str, CancelledCast]:
+        """CancelledCast per player with any begincast or cast."""
+        results: dict[str, CancelledCast] = {}
+        for player_name, player in self._players.items():
+            total_begins = player.total_begins
+            total_completions = len(player.cast_times)
+            cancel_count = max(0, total_begins - total_completions)
+            cancel_pct = (
+                (cancel_count / total_begins * 100) if total_begins > 0 else 0.0
+            )
+
+            # Top cancelled spells: per-spell begincast - cast, top 5
+            spell_cancels: list[dict] = []
+            for spell_id, (begins, casts, _, _) in player.spells.items():
+                diff = begins - casts
+                if diff > 0:
+                    spell_cancels.append({
+                        "spell_id": spell_id,
+                        "name": self._spell_names.get(spell_id, f"Spell-{spell_id}"),
+                        "cancel_count": diff,
+                    })
+
+            spell_cancels.sort(key=lambda x: x["cancel_count"], reverse=True)
+            top_cancelled = spell_cancels[:5]
+
+            results[player_name] = CancelledCast(
+                player_name=player_name,
+                total_begins=total_begins,
+                total_completions=total_completions,
+                cancel_count=cancel_count,
+                cancel_pct=round(cancel_pct, 1),
+                top_cancelled_json=json.dumps(top_cancelled) if top_cancelled else None,
+            )
+
+        return results
+
+
 def compute_cast_metrics(
-    cast_events: list[CastEvent],
+    cast_events: list[CastEventRow],
     fight_duration_ms: int,
 ) -> dict[str, CastMetric]:
     """Compute GCD uptime, CPM, and gap analysis per player.
 
     Args:
-        cast_events: Parsed CastEvent objects for a single fight.
+        cast_events: Parsed CastEventRow records for a single fight.
         fight_duration_ms: Total fight duration in milliseconds.
 
     Returns:
         Dict keyed by player_name -> CastMetric ORM object (without fight_id set).
     """
-    if fight_duration_ms <= 0:
-        return {}
-
-    # Group completed casts by player
-    casts_by_player: dict[str, list[int]] = defaultdict(list)
-    for ce in cast_events:
-        if ce.event_type == "cast":
-            casts_by_player[ce.player_name].append(ce.timestamp_ms)
-
-    results: dict[str, CastMetric] = {}
-    for player_name, timestamps in casts_by_player.items():
-        timestamps.sort()
-        total_casts = len(timestamps)
-        cpm = total_casts / (fight_duration_ms / 60_000)
-
-        # GCD uptime: for each cast, credit min(GCD, gap_to_next).
-        # Last cast gets full GCD credit (capped at remaining fight time).
-        active_time = 0
-        gaps: list[tuple[int, int]] = []  # (gap_ms, gap_start_timestamp)
-
-        for i in range(total_casts):
-            if i < total_casts - 1:
-                gap_to_next = timestamps[i + 1] - timestamps[i]
-                active_time += min(GCD_MS, gap_to_next)
-                if gap_to_next > GAP_THRESHOLD_MS:
-                    gaps.append((gap_to_next, timestamps[i]))
-            else:
-                # Last cast: credit GCD (capped by fight duration remaining)
-                active_time += GCD_MS
-
-        # Cap active_time at fight_duration_ms
-        active_time = min(active_time, fight_duration_ms)
-        gcd_uptime_pct = active_time / fight_duration_ms * 100
-        downtime = fight_duration_ms - active_time
-
-        # Gap statistics
-        gap_count = len(gaps)
-        longest_gap_ms = 0
-        longest_gap_at_ms = 0
-        avg_gap_ms = 0.0
-        if gaps:
-            longest = max(gaps, key=lambda g: g[0])
-            longest_gap_ms = longest[0]
-            longest_gap_at_ms = longest[1]
-            avg_gap_ms = sum(g[0] for g in gaps) / gap_count
-
-        results[player_name] = CastMetric(
-            player_name=player_name,
-            total_casts=total_casts,
-            casts_per_minute=round(cpm, 2),
-            gcd_uptime_pct=round(gcd_uptime_pct, 1),
-            active_time_ms=active_time,
-            downtime_ms=downtime,
-            longest_gap_ms=longest_gap_ms,
-            longest_gap_at_ms=longest_gap_at_ms,
-            avg_gap_ms=round(avg_gap_ms, 1),
-            gap_count=gap_count,
-        )
-
-    return results
+    analyzer = CastAnalyzer()
+    analyzer.add_rows(sorted(cast_events, key=lambda ce: ce.timestamp_ms))
+    return analyzer.cast_metrics(fight_duration_ms)
 
 
 def compute_cooldown_usage(
-    cast_events: list[CastEvent],
+    cast_events: list[CastEventRow],
     fight_duration_ms: int,
     player_class_map: dict[str, str],
 ) -> list[CooldownUsage]:
     """Compute cooldown efficiency per player per cooldown ability.
 
     Args:
-        cast_events: Parsed CastEvent objects for a single fight.
+        cast_events: Parsed CastEventRow records for a single fight.
         fight_duration_ms: Total fight duration in milliseconds.
         player_class_map: Mapping of player_name -> class_name.
 
     Returns:
         List of CooldownUsage ORM objects (without fight_id set).
     """
-    if fight_duration_ms <= 0:
-        return []
-
-    # Index completed casts by (player, spell_id)
-    casts_by_player_spell: dict[tuple[str, int], list[int]] = defaultdict(list)
-    for ce in cast_events:
-        if ce.event_type == "cast":
-            casts_by_player_spell[(ce.player_name, ce.spell_id)].append(
-                ce.timestamp_ms
-            )
-
-    results: list[CooldownUsage] = []
-    for player_name, class_name in player_class_map.items():
-        cooldowns = [
-            cd for cd in CLASSIC_COOLDOWNS.get(class_name, [])
-            if cd.cd_type == "throughput"
-        ]
-        for cd in cooldowns:
-            if cd.cooldown_sec <= 0:
-                continue
-
-            key = (player_name, cd.spell_id)
-            timestamps = casts_by_player_spell.get(key, [])
-            times_used = len(timestamps)
-            max_possible = math.floor(
-                fight_duration_ms / (cd.cooldown_sec * 1000)
-            ) + 1
-            efficiency = min(
-                (times_used / max_possible * 100) if max_possible > 0 else 0.0,
-                100.0,
-            )
-
-            first_use = min(timestamps) if timestamps else None
-            last_use = max(timestamps) if timestamps else None
-
-            results.append(CooldownUsage(
-                player_name=player_name,
-                spell_id=cd.spell_id,
-                ability_name=cd.name,
-                cooldown_sec=cd.cooldown_sec,
-                times_used=times_used,
-                max_possible_uses=max_possible,
-                first_use_ms=first_use,
-                last_use_ms=last_use,
-                efficiency_pct=round(efficiency, 1),
-            ))
-
-    return results
+    analyzer = CastAnalyzer()
+    analyzer.add_rows(cast_events)
+    return analyzer.cooldown_usage(fight_duration_ms, player_class_map)
 
 
 def compute_cancelled_casts(
-    cast_events: list[CastEvent],
+    cast_events: list[CastEventRow],
 ) -> dict[str, CancelledCast]:
     """Compute cancel rates per player by comparing begincast vs cast counts.
 
     Args:
-        cast_events: Parsed CastEvent objects for a single fight.
+        cast_events: Parsed CastEventRow records for a single fight.
 
     Returns:
         Dict keyed by player_name -> CancelledCast ORM object (without fight_id set).
     """
-    # Per-player totals
-    begins_by_player: dict[str, int] = defaultdict(int)
-    completions_by_player: dict[str, int] = defaultdict(int)
-
-    # Per-player per-spell counts for top cancelled
-    spell_begins: dict[str, dict[int, int]] = defaultdict(lambda: defaultdict(int))
-    spell_completions: dict[str, dict[int, int]] = defaultdict(lambda: defaultdict(int))
-    spell_names: dict[int, str] = {}
-
-    for ce in cast_events:
-        if ce.event_type == "begincast":
-            begins_by_player[ce.player_name] += 1
-            spell_begins[ce.player_name][ce.spell_id] += 1
-        elif ce.event_type == "cast":
-            completions_by_player[ce.player_name] += 1
-            spell_completions[ce.player_name][ce.spell_id] += 1
-        spell_names[ce.spell_id] = ce.ability_name
-
-    # All players who had any begincast or cast events
-    all_players = set(begins_by_player.keys()) | set(completions_by_player.keys())
-
-    results: dict[str, CancelledCast] = {}
-    for player_name in all_players:
-        total_begins = begins_by_player.get(player_name, 0)
-        total_completions = completions_by_player.get(player_name, 0)
-        cancel_count = max(0, total_begins - total_completions)
-        cancel_pct = (
-            (cancel_count / total_begins * 100) if total_begins > 0 else 0.0
+    analyzer = CastAnalyzer()
+    analyzer.add_rows(cast_events)
+    return analyzer.cancelled_casts()
+
+
+async def delete_cast_events_for_fights(session, fight_ids: list[int]) -> None:
+    """Delete the legacy per-cast rows of several fights in one statement.
+
+    New ingests store casts in ``cast_event_series``; this clears rows a
+    fight still has in ``cast_events`` from before.
+    """
+    await session.execute(delete(CastEvent).where(CastEvent.fight_id.in_(fight_ids)))
+
+
+async def delete_cast_data_for_fights(session, fight_ids: list[int]) -> None:
+    """Delete cast events and derived cast metrics, one statement per table."""
+    for model in (
+        CastEvent, CastEventSeries, CastMetric, CooldownUsage, CancelledCast,
+    ):
+        await session.execute(
+            delete(model).where(model.fight_id.in_(fight_ids))
         )
 
-        # Top cancelled spells: per-spell begincast - cast, top 5
-        player_spell_begins = spell_begins.get(player_name, {})
-        player_spell_completions = spell_completions.get(player_name, {})
-        all_spell_ids = set(player_spell_begins.keys())
-
-        spell_cancels: list[dict] = []
-        for spell_id in all_spell_ids:
-            sb = player_spell_begins.get(spell_id, 0)
-            sc = player_spell_completions.get(spell_id, 0)
-            diff = sb - sc
-            if diff > 0:
-                spell_cancels.append({
-                    "spell_id": spell_id,
-                    "name": spell_names.get(spell_id, f"Spell-{spell_id}"),
-                    "cancel_count": diff,
-                })
-
-        spell_cancels.sort(key=lambda x: x["cancel_count"], reverse=True)
-        top_cancelled = spell_cancels[:5]
-
-        results[player_name] = CancelledCast(
-            player_name=player_name,
-            total_begins=total_begins,
-            total_completions=total_completions,
-            cancel_count=cancel_count,
-            cancel_pct=round(cancel_pct, 1),
-            top_cancelled_json=json.dumps(top_cancelled) if top_cancelled else None,
+
+def stage_cast_metrics_for_fight(
+    upserts: UpsertBatch, fight_id: int, analysis: CastAnalysis,
+) -> None:
+    """Stage a fight's complete derived cast metric rows in ``upserts``."""
+    for model, rows in (
+        (CastMetric, list(analysis.metrics.values())),
+        (CooldownUsage, analysis.cooldowns),
+        (CancelledCast, list(analysis.cancelled.values())),
+    ):
+        for row in rows:
+            row.fight_id = fight_id
+        upserts.add(model, rows, fight_id=fight_id)
+
+
+class CastEventsStream:
+    """Streams one fight's cast events into the session page by page.
+
+    Each page is parsed into CastEventRow records, folded into the metric
+    accumulators and appended to the fight's per-player columns
+    (``CastSeriesBuilder``); the raw page is not kept. ``finish()`` upserts
+    one ``cast_event_series`` row per player plus the derived metric rows,
+    so a re-ingest of unchanged casts rewrites nothing. Assumes the fight's
+    legacy ``cast_events`` rows were already deleted.
+
+    An ``upserts`` batch shared by several streams batches the writes across
+    fights; the caller then flushes it after the last ``finish()``.
+    """
+
+    def __init__(
+        self,
+        session,
+        report_code: str,
+        fight,
+        actors: dict[int, str],
+        player_class_map: dict[str, str],
+        *,
+        upserts: UpsertBatch | None = None,
+    ) -> None:
+        self._session = session
+        self._report_code = report_code
+        self._fight = fight
+        self._actors = actors
+        self._player_class_map = player_class_map
+        self._analyzer = CastAnalyzer()
+        self._series = CastSeriesBuilder(fight.id)
+        self._upserts = upserts
+        self.cast_events = 0
+
+    async def add(self, events: list[dict]) -> None:
+        if not events:
+            return
+        rows = parse_cast_events(events, self._fight.id, self._actors)
+        self._series.add_rows(rows)
+        self._analyzer.add_rows(rows)
+        self.cast_events += len(rows)
+
+    async def finish(self) -> int:
+        """Upsert the cast series and derived metrics; returns total rows stored."""
+        fight = self._fight
+        upserts = (
+            UpsertBatch(self._session) if self._upserts is None else self._upserts
+        )
+        upserts.add(
+            CastEventSeries, self._series.series(),
+            fight_id=fight.id, report_month=fight.report_month,
+        )
+        fight_duration_ms = fight.end_time - fight.start_time
+        analysis = (
+            self._analyzer.results(fight_duration_ms, self._player_class_map)
+            if self.cast_events else CastAnalysis({}, [], {})
         )
+        stage_cast_metrics_for_fight(upserts, fight.id, analysis)
+        if self._upserts is None:
+            await upserts.flush()
+        if not self.cast_events:
+            return 0
+
+        metrics = analysis.metrics
+        cd_usage = analysis.cooldowns
+        cancelled = analysis.cancelled
+        total_rows = self.cast_events + len(metrics) + len(cd_usage) + len(cancelled)
+
+        logger.info(
+            "Ingested cast data for fight %d (%s): %d events, %d metrics, "
+            "%d cooldowns, %d cancelled",
+            fight.fight_id, self._report_code,
+            self.cast_events, len(metrics),
+            len(cd_usage), len(cancelled),
+        )
+        return total_rows
 
-    return results
+
+async def persist_cast_events_for_fight(
+    session,
+    report_code: str,
+    fight,
+    events: list[dict],
+    actors: dict[int, str],
+    player_class_map: dict[str, str],
+) -> int:
+    """Parse already-fetched cast events and store them + derived metrics.
+
+    Assumes the fight's legacy cast_events rows were already deleted.
+
+    Returns:
+        Total count of rows stored across all tables.
+    """
+    stream = CastEventsStream(session, report_code, fight, actors, player_class_map)
+    await stream.add(events)
+    return await stream.finish()
 
 
 async def ingest_cast_events_for_fight(
@@ -289,6 +583,9 @@ async def ingest_cast_events_for_fight(
 ) -> int:
     """Fetch and ingest cast events + derived metrics for a single fight.
 
+    Pages are parsed as they arrive (see ``CastEventsStream``), so at most
+    one page of raw events is held in memory.
+
     Args:
         wcl: WCLClient instance.
         session: Async SQLAlchemy session.
@@ -298,61 +595,13 @@ async def ingest_cast_events_for_fight(
         player_class_map: Mapping of player_name -> class_name.
 
     Returns:
-        Total count of rows inserted across all tables.
+        Total count of rows stored across all tables.
     """
-    # Delete existing data for this fight (idempotent re-ingest)
-    for model in (CastEvent, CastMetric, CooldownUsage, CancelledCast):
-        await session.execute(
-            delete(model).where(model.fight_id == fight.id)
-        )
-
-    # Fetch cast events from WCL (async generator yields pages)
-    all_events: list[dict] = []
+    await delete_cast_events_for_fights(session, [fight.id])
+    stream = CastEventsStream(session, report_code, fight, actors, player_class_map)
     async for page in fetch_all_events(
         wcl, report_code, fight.start_time, fight.end_time,
-        data_type="Casts",
+        data_type="Casts", **CAST_EVENTS_FILTER,
     ):
-        all_events.extend(page)
-
-    if not all_events:
-        return 0
-
-    # Parse raw events into CastEvent ORM objects
-    cast_event_rows = parse_cast_events(all_events, fight.id, actors)
-    for row in cast_event_rows:
-        session.add(row)
-
-    total_rows = len(cast_event_rows)
-    fight_duration_ms = fight.end_time - fight.start_time
-
-    # Compute and insert derived metrics
-    metrics = compute_cast_metrics(cast_event_rows, fight_duration_ms)
-    for metric in metrics.values():
-        metric.fight_id = fight.id
-        session.add(metric)
-    total_rows += len(metrics)
-
-    cd_usage = compute_cooldown_usage(
-        cast_event_rows, fight_duration_ms, player_class_map,
-    )
-    for cu in cd_usage:
-        cu.fight_id = fight.id
-        session.add(cu)
-    total_rows += len(cd_usage)
-
-    cancelled = compute_cancelled_casts(cast_event_rows)
-    for cc in cancelled.values():
-        cc.fight_id = fight.id
-        session.add(cc)
-    total_rows += len(cancelled)
-
-    await session.flush()
-
-    logger.info(
-        "Ingested cast data for fight %d (%s): %d events, %d metrics, "
-        "%d cooldowns, %d cancelled",
-        fight.fight_id, report_code,
-        len(cast_event_rows), len(metrics),
-        len(cd_usage), len(cancelled),
-    )
-    return total_rows
+        await stream.add(page)
+    return await stream.finish()
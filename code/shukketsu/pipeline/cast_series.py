@@ -0,0 +1,157 @@
+"""Columnar cast-event storage: one ``cast_event_series`` row per (fight, player).
+
+A fight's casts used to be stored as one ``cast_events`` row each, repeating
+the player, ability and target names on every row. ``CastSeriesBuilder``
+instead folds a fight's parsed ``CastEventRow`` records into parallel columns
+per player (``bigint[]`` timestamps, ``int[]`` spell ids, a begincast bitmap
+and ``smallint[]`` target indexes) with each name stored once, and
+``expand_series`` rebuilds the row stream from them.
+
+``fetch_player_casts`` is the one read API for event tools and routes. A
+per-player timeline is a single-row fetch; fights whose casts are still in
+the legacy ``cast_events`` rows are read from there.
+"""
+
+import heapq
+import json
+from array import array
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from shukketsu.db import queries as q
+from shukketsu.db.models import CastEventSeries
+from shukketsu.pipeline.rows import CastEventRow
+
+# Bit value of each event type in begincast_bitmap
+EVENT_TYPE_BITS = {"cast": 0, "begincast": 1}
+
+
+class _PlayerColumns:
+    __slots__ = ("timestamps", "spell_ids", "bitmap", "target_idx", "targets")
+
+    def __init__(self) -> None:
+        self.timestamps = array("q")
+        self.spell_ids = array("i")
+        self.bitmap = bytearray()
+        self.target_idx = array("h")
+        # target_name -> 1-based index (0 = no target)
+        self.targets: dict[str, int] = {}
+
+
+class CastSeriesBuilder:
+    """Accumulates one fight's casts into per-player columns.
+
+    Rows must be added in timestamp order (as WCL pages deliver them); event
+    types other than "cast" and "begincast" are skipped. ``series()`` returns
+    the ``CastEventSeries`` rows to upsert.
+    """
+
+    def __init__(self, fight_id: int) -> None:
+        self.fight_id = fight_id
+        self._players: dict[str, _PlayerColumns] = {}
+        self._ability_names: dict[str, dict[int, str]] = {}
+
+    def add_rows(self, rows: Iterable[CastEventRow]) -> None:
+        players = self._players
+        for ce in rows:
+            bit = EVENT_TYPE_BITS.get(ce.event_type)
+            if bit is None:
+                continue
+            player = players.get(ce.player_name)
+            if player is None:
+                player = players[ce.player_name] = _PlayerColumns()
+                self._ability_names[ce.player_name] = {}
+            i = len(player.timestamps)
+            if i % 8 == 0:
+                player.bitmap.append(0)
+            if bit:
+                player.bitmap[i >> 3] |= 1 << (i & 7)
+            player.timestamps.append(ce.timestamp_ms)
+            player.spell_ids.append(ce.spell_id)
+            self._ability_names[ce.player_name][ce.spell_id] = ce.ability_name
+            target = 0
+            if ce.target_name is not None:
+                target = player.targets.get(ce.target_name, 0)
+                if not target:
+                    target = player.targets[ce.target_name] = len(player.targets) + 1
+            player.target_idx.append(target)
+
+    def series(self) -> list[CastEventSeries]:
+        return [
+            CastEventSeries(
+                fight_id=self.fight_id,
+                player_name=name,
+                event_count=len(player.timestamps),
+                timestamps_ms=player.timestamps.tolist(),
+                spell_ids=player.spell_ids.tolist(),
+                begincast_bitmap=bytes(player.bitmap),
+                target_idx=player.target_idx.tolist(),
+                ability_names_json=json.dumps(
+                    {str(k): v for k, v in self._ability_names[name].items()},
+                ),
+                target_names_json=json.dumps(list(player.targets)),
+            )
+            for name, player in self._players.items()
+        ]
+
+
+def expand_series(series: Any) -> Iterator[CastEventRow]:
+    """Rebuild one series' ``CastEventRow`` stream, in timestamp order.
+
+    ``series`` is a ``CastEventSeries`` or a result row with the same columns.
+    """
+    ability_names = {
+        int(k): v for k, v in json.loads(series.ability_names_json).items()
+    }
+    target_names = [None, *json.loads(series.target_names_json)]
+    bitmap = series.begincast_bitmap
+    fight_id = series.fight_id
+    player_name = series.player_name
+    for i, (ts, spell_id, target) in enumerate(zip(
+        series.timestamps_ms, series.spell_ids, series.target_idx, strict=True,
+    )):
+        yield CastEventRow(
+            fight_id,
+            player_name,
+            ts,
+            spell_id,
+            ability_names.get(spell_id, f"Spell-{spell_id}"),
+            "begincast" if bitmap[i >> 3] >> (i & 7) & 1 else "cast",
+            target_names[target],
+        )
+
+
+async def fetch_player_casts(
+    session, report_code: str, fight_id: int, player_name: str,
+    *, event_type: str | None = None,
+) -> list[CastEventRow]:
+    """A player's casts in one fight, in timestamp order.
+
+    ``player_name`` is an ILIKE pattern; when it matches several players
+    their streams are merged. ``event_type`` ("cast" / "begincast") keeps
+    only that type. Reads ``cast_event_series`` and falls back to legacy
+    ``cast_events`` rows for fights ingested before the columnar format.
+    """
+    params = {
+        "report_code": report_code, "fight_id": fight_id,
+        "player_name": player_name,
+    }
+    result = await session.execute(q.CAST_SERIES, params)
+    series = result.fetchall()
+    if series:
+        rows: Iterable[CastEventRow] = heapq.merge(
+            *(expand_series(s) for s in series),
+            key=lambda ce: ce.timestamp_ms,
+        )
+    else:
+        result = await session.execute(q.CAST_TIMELINE, params)
+        rows = (
+            CastEventRow(
+                r.fight_id, r.player_name, r.timestamp_ms, r.spell_id,
+                r.ability_name, r.event_type, r.target_name,
+            )
+            for r in result.fetchall()
+        )
+    if event_type is not None:
+        return [ce for ce in rows if ce.event_type == event_type]
+    return list(rows)
@@ -0,0 +1,272 @@
+"""Per-(fight, stage) enrichment checkpoints and resumable enrichment.
+
+``ingest_report`` records a ``fight_stage_status`` row for every fight and
+every enrichment stage it ran, marked "failed" when the stage produced an
+``enrichment_errors`` entry for that fight and "done" otherwise. The rows are
+written in the ingest's own transaction, so they commit with the data.
+
+``resume_report`` re-runs only the stages a report is missing or failed,
+committing each stage (data and checkpoints) in its own transaction. A resume
+interrupted by a crash or a burst of 429s keeps the stages it finished, and
+the next resume picks up from there. Fights that have no checkpoint rows —
+for example, fights ingested before checkpoints existed — count as missing.
+"""
+
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from shukketsu.db.models import Fight, FightStageStatus, MyCharacter, Report
+from shukketsu.db.partitions import ensure_partitions_committed
+from shukketsu.pipeline.report_events import EVENT_STAGES, EventStage
+
+logger = logging.getLogger(__name__)
+
+TABLE_STAGE = "table_data"
+# Stage names, in the order ingest_report runs them
+EVENT_STAGE_NAMES = [stage.error_prefix for stage in EVENT_STAGES]
+ENRICHMENT_STAGES = [TABLE_STAGE, *EVENT_STAGE_NAMES]
+
+_EVENT_STAGES_BY_NAME: dict[str, EventStage] = {
+    stage.error_prefix: stage for stage in EVENT_STAGES
+}
+
+
+def requested_stages(*, ingest_tables: bool, ingest_events: bool) -> list[str]:
+    """Enrichment stage names an ingest with these flags runs."""
+    stages = []
+    if ingest_tables:
+        stages.append(TABLE_STAGE)
+    if ingest_events:
+        stages.extend(EVENT_STAGE_NAMES)
+    return stages
+
+
+def stage_error(stage: str, fight) -> str:
+    """The ``enrichment_errors`` entry that marks ``stage`` failed for ``fight``."""
+    if stage == TABLE_STAGE:
+        return f"table_data_fight_{fight.fight_id}"
+    return _EVENT_STAGES_BY_NAME[stage].error_for(fight)
+
+
+def stage_statuses(
+    fights: list, stages: list[str], errors: list[str],
+) -> list[dict]:
+    """Checkpoint rows for ``stages`` x ``fights`` given the ingest's errors."""
+    failed = set(errors)
+    rows = []
+    for fight in fights:
+        for stage in stages:
+            error = stage_error(stage, fight)
+            ok = error not in failed
+            rows.append({
+                "fight_id": fight.id,
+                "stage": stage,
+                "status": "done" if ok else "failed",
+                "error": None if ok else error,
+            })
+    return rows
+
+
+async def record_stage_statuses(
+    session, fights: list, stages: list[str], errors: list[str],
+) -> None:
+    """Upsert checkpoint rows for ``stages`` of ``fights``. The caller commits."""
+    rows = stage_statuses(fights, stages, errors)
+    if not rows:
+        return
+    stmt = pg_insert(FightStageStatus).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[FightStageStatus.fight_id, FightStageStatus.stage],
+        set_={
+            "status": stmt.excluded.status,
+            "error": stmt.excluded.error,
+            "updated_at": func.now(),
+        },
+    )
+    await session.execute(stmt)
+
+
+async def pending_stages(
+    session, report_code: str, stages: list[str],
+) -> dict[str, list[int]]:
+    """WCL fight IDs per stage whose checkpoint is missing or failed.
+
+    Stages with nothing pending are omitted; the result keeps ``stages`` order.
+    """
+    fight_result = await session.execute(
+        select(Fight.id, Fight.fight_id)
+        .where(Fight.report_code == report_code)
+        .order_by(Fight.fight_id)
+    )
+    fights = fight_result.all()
+    if not fights:
+        return {}
+
+    done_result = await session.execute(
+        select(FightStageStatus.fight_id, FightStageStatus.stage)
+        .join(Fight, Fight.id == FightStageStatus.fight_id)
+        .where(
+            Fight.report_code == report_code,
+            FightStageStatus.status == "done",
+        )
+    )
+    done = {(row.fight_id, row.stage) for row in done_result}
+
+    pending: dict[str, list[int]] = defaultdict(list)
+    for stage in stages:
+        for fight in fights:
+            if (fight.id, stage) not in done:
+                pending[stage].append(fight.fight_id)
+    return {stage: pending[stage] for stage in stages if pending[stage]}
+
+
+async def stage_outcomes(
+    session, report_code: str, stages: list[str],
+) -> dict[str, dict[str, int]]:
+    """Fights per checkpoint status ("done", "failed", "missing") for each stage."""
+    fight_result = await session.execute(
+        select(func.count(Fight.id)).where(Fight.report_code == report_code)
+    )
+    total = fight_result.scalar() or 0
+    status_result = await session.execute(
+        select(FightStageStatus.stage, FightStageStatus.status, func.count())
+        .join(Fight, Fight.id == FightStageStatus.fight_id)
+        .where(
+            Fight.report_code == report_code,
+            FightStageStatus.stage.in_(stages),
+        )
+        .group_by(FightStageStatus.stage, FightStageStatus.status)
+    )
+    counts: dict[str, dict[str, int]] = {
+        stage: {"done": 0, "failed": 0} for stage in stages
+    }
+    for stage, status, n in status_result:
+        counts[stage][status] = n
+    for stage_counts in counts.values():
+        stage_counts["missing"] = total - stage_counts["done"] - stage_counts["failed"]
+    return counts
+
+
+@dataclass
+class ResumeResult:
+    # Stage name -> number of fights it was re-run for
+    resumed: dict[str, int] = field(default_factory=dict)
+    table_rows: int = 0
+    event_rows: int = 0
+    enrichment_errors: list[str] = field(default_factory=list)
+    # The report was not in the database, so it got a full ingest_report
+    full_ingest: bool = False
+
+
+async def _run_stage(
+    wcl, session, report_code: str, stage: str, fights: list,
+    actor_name_by_id: dict[int, str], player_class_map: dict[str, str],
+) -> tuple[int, list[str]]:
+    """Run one enrichment stage for ``fights``. Returns (rows, enrichment_errors)."""
+    if stage == TABLE_STAGE:
+        from shukketsu.pipeline.table_data import ingest_table_data_for_fights
+
+        return await ingest_table_data_for_fights(wcl, session, report_code, fights)
+
+    from shukketsu.pipeline.report_events import ingest_stage_for_fights
+
+    return await ingest_stage_for_fights(
+        wcl, session, report_code, _EVENT_STAGES_BY_NAME[stage], fights,
+        actor_name_by_id, player_class_map,
+    )
+
+
+async def resume_report(
+    wcl, session_factory, report_code: str,
+    *, ingest_tables: bool = False, ingest_events: bool = False,
+) -> ResumeResult:
+    """Re-run the requested enrichment stages that are missing or failed.
+
+    Each stage commits its rows and checkpoints on its own, so work done
+    before a crash is kept. A report not yet in the database gets a full
+    ``ingest_report`` (one transaction) instead.
+    """
+    from shukketsu.pipeline.ingest import (
+        _actor_maps,
+        _fetch_report_info,
+        ingest_report,
+    )
+
+    result = ResumeResult()
+    stages = requested_stages(
+        ingest_tables=ingest_tables, ingest_events=ingest_events,
+    )
+
+    async with session_factory() as session:
+        report = await session.get(Report, report_code)
+        if report is not None:
+            pending = await pending_stages(session, report_code, stages)
+
+    if report is None:
+        async with session_factory() as session, session.begin():
+            char_result = await session.execute(select(MyCharacter.name))
+            my_names = {row[0] for row in char_result}
+            ingest = await ingest_report(
+                wcl, session, report_code, my_names,
+                ingest_tables=ingest_tables, ingest_events=ingest_events,
+            )
+        result.full_ingest = True
+        result.table_rows = ingest.table_rows
+        result.event_rows = ingest.event_rows
+        result.enrichment_errors = ingest.enrichment_errors
+        return result
+
+    if not pending:
+        logger.info("Nothing to resume for %s", report_code)
+        return result
+
+    # masterData for the actor maps the event stages need
+    report_info = await _fetch_report_info(wcl, report_code)
+    actor_name_by_id, player_class_map = _actor_maps(report_info)
+
+    for stage, fight_ids in pending.items():
+        async with session_factory() as session, session.begin():
+            fight_result = await session.execute(
+                select(Fight)
+                .where(Fight.report_code == report_code, Fight.fight_id.in_(fight_ids))
+                .order_by(Fight.fight_id)
+            )
+            fights = list(fight_result.scalars().all())
+            # Retention may have dropped the months' partitions since ingest
+            await ensure_partitions_committed(
+                session, {fight.report_month for fight in fights},
+            )
+            rows, errors = await _run_stage(
+                wcl, session, report_code, stage, fights,
+                actor_name_by_id, player_class_map,
+            )
+            await record_stage_statuses(session, fights, [stage], errors)
+
+        result.resumed[stage] = len(fights)
+        if stage == TABLE_STAGE:
+            result.table_rows += rows
+        else:
+            result.event_rows += rows
+        result.enrichment_errors.extend(errors)
+        logger.info(
+            "Resumed %s for %s: %d fights, %d rows, %d errors",
+            stage, report_code, len(fights), rows, len(errors),
+        )
+
+    return result
+
+
+async def reports_with_failed_stages(session) -> list[str]:
+    """Report codes with at least one failed checkpoint, oldest first."""
+    result = await session.execute(
+        select(Fight.report_code)
+        .join(FightStageStatus, FightStageStatus.fight_id == Fight.id)
+        .where(FightStageStatus.status == "failed")
+        .group_by(Fight.report_code)
+        .order_by(func.min(FightStageStatus.updated_at))
+    )
+    return [row[0] for row in result]
@@ -6,14 +6,19 @@ import logging
 from sqlalchemy import delete, select
 
 from shukketsu.db.models import Fight, FightConsumable, GearSnapshot
+from shukketsu.db.upsert import UpsertBatch
 from shukketsu.pipeline.constants import CONSUMABLE_CATEGORIES
+from shukketsu.pipeline.rows import ConsumableRow, GearRow
 
 logger = logging.getLogger(__name__)
 
+# CombatantInfo is only emitted for raid members
+COMBATANT_INFO_FILTER = {"hostility_type": "Friendlies"}
+
 
 def parse_consumables(
     auras: list[dict], fight_id: int, player_name: str
-) -> list[FightConsumable]:
+) -> list[ConsumableRow]:
     """Extract consumable buffs from CombatantInfo auras.
 
     Only auras whose spell ID appears in CONSUMABLE_CATEGORIES are included.
@@ -24,7 +29,7 @@ def parse_consumables(
         spell_id = aura.get("ability", 0)
         if spell_id in CONSUMABLE_CATEGORIES:
             category, display_name = CONSUMABLE_CATEGORIES[spell_id]
-            result.append(FightConsumable(
+            result.append(ConsumableRow(
                 fight_id=fight_id,
                 player_name=player_name,
                 category=category,
@@ -37,7 +42,7 @@ def parse_consumables(
 
 def parse_gear(
     gear_list: list[dict], fight_id: int, player_name: str
-) -> list[GearSnapshot]:
+) -> list[GearRow]:
     """Extract gear from CombatantInfo gear array.
 
     Items with id=0 (empty slots) are skipped.
@@ -49,7 +54,7 @@ def parse_gear(
             continue
         gems = item.get("gems")
         gems_json = json.dumps(gems) if gems else None
-        result.append(GearSnapshot(
+        result.append(GearRow(
             fight_id=fight_id,
             player_name=player_name,
             slot=item.get("slot", 0),
@@ -62,18 +67,108 @@ def parse_gear(
     return result
 
 
+async def delete_combatant_info_for_fights(session, fight_ids: list[int]) -> None:
+    """Delete the consumables and gear of several fights, one statement per table."""
+    await session.execute(
+        delete(FightConsumable).where(FightConsumable.fight_id.in_(fight_ids))
+    )
+    await session.execute(
+        delete(GearSnapshot).where(GearSnapshot.fight_id.in_(fight_ids))
+    )
+
+
+def add_combatant_info_for_fight(
+    consumables: list[ConsumableRow], gear: list[GearRow],
+    fight, events: list[dict],
+) -> int:
+    """Parse already-fetched CombatantInfo events into the given row lists.
+
+    Returns count of rows added (consumables + gear items).
+    """
+    total_rows = 0
+    for event in events:
+        # CombatantInfo events include a "name" field for the player
+        player_name = event.get(
+            "name", f"Unknown-{event.get('sourceID', 0)}"
+        )
+
+        # Parse auras for consumables
+        auras = event.get("auras", [])
+        found = parse_consumables(auras, fight.id, player_name)
+        consumables.extend(found)
+        total_rows += len(found)
+
+        # Parse gear
+        gear_list = event.get("gear", [])
+        gear_items = parse_gear(gear_list, fight.id, player_name)
+        gear.extend(gear_items)
+        total_rows += len(gear_items)
+    return total_rows
+
+
+def stage_combatant_info_for_fight(
+    upserts: UpsertBatch, fight,
+    consumables: list[ConsumableRow], gear: list[GearRow],
+) -> None:
+    """Stage a fight's complete consumables and gear in ``upserts``."""
+    upserts.add(FightConsumable, consumables, fight_id=fight.id)
+    upserts.add(
+        GearSnapshot, gear, fight_id=fight.id, report_month=fight.report_month,
+    )
+
+
+class CombatantInfoStream:
+    """Collects one fight's CombatantInfo rows page by page.
+
+    ``finish()`` upserts them, so unchanged gear and consumables are not
+    rewritten on re-ingest; with ``upserts`` it only stages them there for
+    the caller to flush.
+    """
+
+    def __init__(
+        self, session, report_code: str, fight,
+        *, upserts: UpsertBatch | None = None,
+    ) -> None:
+        self._session = session
+        self._report_code = report_code
+        self._fight = fight
+        self._upserts = upserts
+        self._consumables: list[ConsumableRow] = []
+        self._gear: list[GearRow] = []
+        self.rows = 0
+
+    async def add(self, events: list[dict]) -> None:
+        self.rows += add_combatant_info_for_fight(
+            self._consumables, self._gear, self._fight, events,
+        )
+
+    async def finish(self) -> int:
+        upserts = (
+            UpsertBatch(self._session) if self._upserts is None else self._upserts
+        )
+        stage_combatant_info_for_fight(
+            upserts, self._fight, self._consumables, self._gear,
+        )
+        if self._upserts is None:
+            await upserts.flush()
+        return self.rows
+
+
 async def ingest_combatant_info_for_report(
     wcl, session, report_code: str,
 ) -> int:
     """Fetch CombatantInfo events for all fights in a report and store consumables + gear.
 
-    Uses the same paginated fetch_all_events function as other event types.
+    The events are fetched in one report-level stream (see
+    ``wcl.events.stream_events_by_fight``), like every other event type.
     CombatantInfo events contain auras (buffs including consumables) and gear
     arrays per player at the start of each fight.
 
-    Returns total rows inserted (consumables + gear items).
+    Returns total rows stored (consumables + gear items). Every fight is
+    written by one upsert per table at the end; if the fetch fails, every
+    fight keeps its existing rows.
     """
-    from shukketsu.wcl.events import fetch_all_events
+    from shukketsu.wcl.events import stream_events_by_fight
 
     # Get all fights for this report
     result = await session.execute(
@@ -83,53 +178,31 @@ async def ingest_combatant_info_for_report(
     if not fights:
         return 0
 
+    by_fight_id = {fight.fight_id: fight for fight in fights}
+    consumables: dict[int, list[ConsumableRow]] = {f.fight_id: [] for f in fights}
+    gear: dict[int, list[GearRow]] = {f.fight_id: [] for f in fights}
     total_rows = 0
+    try:
+        async for page in stream_events_by_fight(
+            wcl, report_code, fights, "CombatantInfo", **COMBATANT_INFO_FILTER,
+        ):
+            for fight_id, events in page.items():
+                total_rows += add_combatant_info_for_fight(
+                    consumables[fight_id], gear[fight_id],
+                    by_fight_id[fight_id], events,
+                )
+    except Exception:
+        logger.exception(
+            "Failed to fetch CombatantInfo events for %s", report_code,
+        )
+        return 0
 
+    upserts = UpsertBatch(session)
     for fight in fights:
-        # Delete existing data for idempotency
-        await session.execute(
-            delete(FightConsumable).where(FightConsumable.fight_id == fight.id)
+        stage_combatant_info_for_fight(
+            upserts, fight, consumables[fight.fight_id], gear[fight.fight_id],
         )
-        await session.execute(
-            delete(GearSnapshot).where(GearSnapshot.fight_id == fight.id)
-        )
-
-        # Fetch CombatantInfo events (async generator yields pages)
-        try:
-            all_events: list[dict] = []
-            async for page in fetch_all_events(
-                wcl, report_code, fight.start_time, fight.end_time,
-                data_type="CombatantInfo",
-            ):
-                all_events.extend(page)
-        except Exception:
-            logger.exception(
-                "Failed to fetch CombatantInfo events for fight %d in %s",
-                fight.fight_id, report_code,
-            )
-            continue
-
-        for event in all_events:
-            # CombatantInfo events include a "name" field for the player
-            player_name = event.get(
-                "name", f"Unknown-{event.get('sourceID', 0)}"
-            )
-
-            # Parse auras for consumables
-            auras = event.get("auras", [])
-            consumables = parse_consumables(auras, fight.id, player_name)
-            for c in consumables:
-                session.add(c)
-                total_rows += 1
-
-            # Parse gear
-            gear = event.get("gear", [])
-            gear_items = parse_gear(gear, fight.id, player_name)
-            for g in gear_items:
-                session.add(g)
-                total_rows += 1
-
-    await session.flush()
+    await upserts.flush()
 
     logger.info(
         "Ingested combatant info for report %s: %d total rows across %d fights",
@@ -0,0 +1,364 @@
+"""Retention and compaction of raw per-fight event data.
+
+Raw cast rows and archived event pages are only read while a report is
+fresh; once its derived tables (``cast_metrics``, cooldowns, ...) exist the
+agent tools never touch them again. ``CompactionService`` runs next to
+``AutoIngestService`` and applies the ``COMPACTION__POLICIES`` from config,
+each one a table, an age and a set of reports (all, non-guild or benchmark):
+
+* ``delete`` removes the table's rows for matching fights.
+* ``fold`` (``cast_events`` only) rebuilds the legacy per-cast rows of a
+  fight into its ``cast_event_series`` rows, then deletes them.
+
+Work is done a few fights at a time (``COMPACTION__BATCH_FIGHTS``), one short
+transaction per batch with a ``lock_timeout``, so ingest is never blocked for
+long. Reclaimed bytes are the summed ``pg_column_size`` of the deleted rows
+(space vacuum makes reusable); a policy covering all reports of a
+month-partitioned table first drops the months entirely past its cutoff,
+counted at their partition size.
+"""
+
+import asyncio
+import contextlib
+import logging
+from dataclasses import asdict, dataclass
+from datetime import UTC, date, datetime, timedelta
+
+from sqlalchemy import delete, exists, func, literal_column, select, text, true
+
+from shukketsu.db.models import (
+    BenchmarkReport,
+    CastEvent,
+    CastEventSeries,
+    EventArchive,
+    Fight,
+    Report,
+)
+from shukketsu.db.partitions import (
+    PARTITIONED_TABLES,
+    drop_partitions_before,
+    ensure_partitions_committed,
+)
+from shukketsu.db.upsert import UpsertBatch
+from shukketsu.pipeline.cast_series import CastSeriesBuilder
+from shukketsu.pipeline.rows import CastEventRow
+
+logger = logging.getLogger(__name__)
+
+COMPACTABLE_MODELS = {
+    "cast_events": CastEvent,
+    "cast_event_series": CastEventSeries,
+    "event_archives": EventArchive,
+}
+
+
+@dataclass
+class PolicyResult:
+    """What one policy removed in one run."""
+
+    table: str
+    action: str
+    fights: int = 0
+    rows_deleted: int = 0
+    series_written: int = 0
+    partitions_dropped: int = 0
+    bytes_reclaimed: int = 0
+
+
+def _report_filter(reports: str, guild_id: int):
+    if reports == "non_guild":
+        return Report.guild_id.is_distinct_from(guild_id)
+    if reports == "benchmark":
+        return exists().where(BenchmarkReport.report_code == Report.code)
+    return true()
+
+
+def _row_size(model):
+    # Whole-row reference: the size of each deleted row as stored
+    return func.pg_column_size(literal_column(model.__tablename__))
+
+
+async def select_batch(
+    session, policy, cutoff_ms: int, guild_id: int, limit: int,
+) -> list[tuple[int, date]]:
+    """(fight id, report_month) of up to ``limit`` fights the policy still covers."""
+    model = COMPACTABLE_MODELS[policy.table]
+    has_rows = exists().where(model.fight_id == Fight.id)
+    if policy.table in PARTITIONED_TABLES:
+        has_rows = has_rows.where(model.report_month == Fight.report_month)
+    result = await session.execute(
+        select(Fight.id, Fight.report_month)
+        .join(Report, Report.code == Fight.report_code)
+        .where(
+            Report.start_time < cutoff_ms,
+            _report_filter(policy.reports, guild_id),
+            has_rows,
+        )
+        .order_by(Fight.id)
+        .limit(limit)
+    )
+    return [tuple(row) for row in result.all()]
+
+
+async def delete_rows(session, model, fights: list[tuple[int, date]]) -> tuple[int, int]:
+    """Delete ``model``'s rows of ``fights``; returns (rows, bytes)."""
+    fight_ids = [fight_id for fight_id, _ in fights]
+    stmt = delete(model).where(model.fight_id.in_(fight_ids))
+    if model.__tablename__ in PARTITIONED_TABLES:
+        # Prunes the DELETE to the batch's month partitions
+        stmt = stmt.where(model.report_month.in_(sorted({m for _, m in fights})))
+    result = await session.execute(
+        stmt.returning(_row_size(model)).execution_options(synchronize_session=False)
+    )
+    sizes = result.scalars().all()
+    return len(sizes), sum(size or 0 for size in sizes)
+
+
+async def fold_cast_events(
+    session, fights: list[tuple[int, date]],
+) -> tuple[int, int, int]:
+    """Rebuild legacy ``cast_events`` rows into ``cast_event_series``, then delete them.
+
+    Fights that already have series rows keep them; their leftover legacy
+    rows are only deleted. Returns (rows deleted, series written, bytes).
+    """
+    # A delete policy may have dropped the series partitions of these months.
+    # Created before this transaction touches cast_event_series, whose lock
+    # would otherwise block the CREATE on the separate connection.
+    await ensure_partitions_committed(
+        session, {month for _, month in fights}, ["cast_event_series"],
+    )
+    fight_ids = [fight_id for fight_id, _ in fights]
+    result = await session.execute(
+        select(CastEventSeries.fight_id)
+        .where(CastEventSeries.fight_id.in_(fight_ids))
+        .distinct()
+    )
+    have_series = set(result.scalars().all())
+    to_fold = {
+        fight_id: month for fight_id, month in fights if fight_id not in have_series
+    }
+
+    written = 0
+    series_bytes = 0
+    if to_fold:
+        result = await session.execute(
+            select(
+                CastEvent.fight_id, CastEvent.player_name, CastEvent.timestamp_ms,
+                CastEvent.spell_id, CastEvent.ability_name, CastEvent.event_type,
+                CastEvent.target_name,
+            )
+            .where(
+                CastEvent.fight_id.in_(list(to_fold)),
+                CastEvent.report_month.in_(sorted(set(to_fold.values()))),
+            )
+            .order_by(CastEvent.fight_id, CastEvent.timestamp_ms, CastEvent.id)
+        )
+        builders: dict[int, CastSeriesBuilder] = {}
+        for ce in (CastEventRow(*row) for row in result.all()):
+            builder = builders.get(ce.fight_id)
+            if builder is None:
+                builder = builders[ce.fight_id] = CastSeriesBuilder(ce.fight_id)
+            builder.add_rows([ce])
+
+        upserts = UpsertBatch(session)
+        for fight_id, builder in builders.items():
+            series = builder.series()
+            written += len(series)
+            upserts.add(
+                CastEventSeries, series,
+                fight_id=fight_id, report_month=to_fold[fight_id],
+            )
+        await upserts.flush()
+        if written:
+            result = await session.execute(
+                select(func.coalesce(func.sum(_row_size(CastEventSeries)), 0))
+                .where(CastEventSeries.fight_id.in_(list(builders)))
+            )
+            series_bytes = result.scalar() or 0
+
+    rows, deleted_bytes = await delete_rows(session, CastEvent, fights)
+    return rows, written, max(deleted_bytes - series_bytes, 0)
+
+
+class CompactionService:
+    """Background loop applying the retention policies in small batches."""
+
+    def __init__(self, settings, session_factory):
+        self.settings = settings
+        self._session_factory = session_factory
+        self._task: asyncio.Task | None = None
+        self._trigger_task: asyncio.Task | None = None
+        self._run_lock = asyncio.Lock()
+        self._status = "idle"
+        self._last_run: datetime | None = None
+        self._last_error: str | None = None
+        self._last_results: list[dict] = []
+        self._stats = {
+            "runs": 0,
+            "fights": 0,
+            "rows_deleted": 0,
+            "series_written": 0,
+            "partitions_dropped": 0,
+            "bytes_reclaimed": 0,
+            "errors": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.settings.compaction.enabled
+
+    async def start(self):
+        if not self.enabled:
+            logger.info("Compaction disabled")
+            return
+        self._task = asyncio.create_task(self._loop())
+        logger.info(
+            "Compaction started (interval=%dm, %d policies)",
+            self.settings.compaction.interval_minutes,
+            len(self.settings.compaction.policies),
+        )
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+            logger.info("Compaction stopped")
+
+    async def _loop(self):
+        interval = self.settings.compaction.interval_minutes * 60
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.exception("Error in compaction loop")
+                self._status = "error"
+                self._last_error = str(exc)
+                self._stats["errors"] += 1
+            await asyncio.sleep(interval)
+
+    async def run_once(self) -> list[PolicyResult]:
+        """Apply every policy once (mutex-protected)."""
+        async with self._run_lock:
+            self._status = "running"
+            results = []
+            try:
+                for policy in self.settings.compaction.policies:
+                    results.append(await self._apply_policy(policy))
+            except asyncio.CancelledError:
+                self._status = "idle"
+                raise
+            except Exception:
+                self._status = "error"
+                raise
+            self._last_run = datetime.now(UTC)
+            self._last_results = [asdict(r) for r in results]
+            self._stats["runs"] += 1
+            for result in results:
+                for key in (
+                    "fights", "rows_deleted", "series_written",
+                    "partitions_dropped", "bytes_reclaimed",
+                ):
+                    self._stats[key] += getattr(result, key)
+            self._status = "idle"
+            logger.info(
+                "Compaction run: %d rows deleted, %d bytes reclaimed",
+                sum(r.rows_deleted for r in results),
+                sum(r.bytes_reclaimed for r in results),
+            )
+            return results
+
+    async def _apply_policy(self, policy) -> PolicyResult:
+        cfg = self.settings.compaction
+        model = COMPACTABLE_MODELS[policy.table]
+        cutoff = datetime.now(UTC) - timedelta(days=policy.max_age_days)
+        cutoff_ms = int(cutoff.timestamp() * 1000)
+        result = PolicyResult(policy.table, policy.action)
+
+        if (
+            policy.action == "delete" and policy.reports == "all"
+            and policy.table in PARTITIONED_TABLES
+        ):
+            try:
+                async with self._session_factory() as session, session.begin():
+                    await self._set_lock_timeout(session)
+                    dropped = await drop_partitions_before(
+                        session, cutoff.date(), [policy.table],
+                    )
+            except Exception as exc:
+                # The row batches below still cover the old months
+                logger.warning(
+                    "Dropping old %s partitions failed: %s", policy.table, exc,
+                )
+                self._last_error = str(exc)
+                self._stats["errors"] += 1
+            else:
+                result.partitions_dropped = len(dropped)
+                result.bytes_reclaimed += sum(p.size_bytes for p in dropped)
+
+        for batch in range(cfg.max_batches_per_run):
+            if batch:
+                await asyncio.sleep(cfg.batch_pause_seconds)
+            try:
+                async with self._session_factory() as session, session.begin():
+                    await self._set_lock_timeout(session)
+                    fights = await select_batch(
+                        session, policy, cutoff_ms, self.settings.guild.id,
+                        cfg.batch_fights,
+                    )
+                    if not fights:
+                        break
+                    if policy.action == "fold":
+                        rows, written, size = await fold_cast_events(session, fights)
+                        result.series_written += written
+                    else:
+                        rows, size = await delete_rows(session, model, fights)
+            except Exception as exc:
+                # e.g. lock_timeout behind an ingest; the next run resumes here
+                logger.warning(
+                    "Compaction of %s stopped after %d batches: %s",
+                    policy.table, batch, exc,
+                )
+                self._last_error = str(exc)
+                self._stats["errors"] += 1
+                break
+            result.fights += len(fights)
+            result.rows_deleted += rows
+            result.bytes_reclaimed += size
+
+        if result.rows_deleted or result.partitions_dropped:
+            logger.info(
+                "Compacted %s (%s): %d fights, %d rows, %d partitions, %d bytes",
+                policy.table, policy.action, result.fights, result.rows_deleted,
+                result.partitions_dropped, result.bytes_reclaimed,
+            )
+        return result
+
+    async def _set_lock_timeout(self, session):
+        await session.execute(text(
+            f"SET LOCAL lock_timeout = {int(self.settings.compaction.lock_timeout_ms)}"
+        ))
+
+    async def trigger_now(self) -> dict:
+        """Manual trigger, runs the policies in background."""
+        if self._run_lock.locked():
+            return {"status": "already_running", "message": "Compaction in progress"}
+        self._trigger_task = asyncio.create_task(self.run_once())
+        return {"status": "triggered", "message": "Compaction started in background"}
+
+    def get_status(self) -> dict:
+        cfg = self.settings.compaction
+        return {
+            "enabled": self.enabled,
+            "status": self._status,
+            "last_run": self._last_run.isoformat() if self._last_run else None,
+            "last_error": self._last_error,
+            "interval_minutes": cfg.interval_minutes,
+            "policies": [policy.model_dump() for policy in cfg.policies],
+            "last_results": list(self._last_results),
+            "stats": dict(self._stats),
+        }
@@ -7,26 +7,38 @@ from collections import defaultdict
 from sqlalchemy import delete
 
 from shukketsu.db.models import DeathDetail
+from shukketsu.db.upsert import UpsertBatch
+from shukketsu.pipeline.rows import DeathDetailRow
 from shukketsu.wcl.events import fetch_all_events
 
 logger = logging.getLogger(__name__)
 
+# Raid members and their pets; enemy deaths are never stored
+DEATH_EVENTS_FILTER = {"hostility_type": "Friendlies"}
 
-def parse_death_events(events: list[dict], fight_id: int) -> list[DeathDetail]:
-    """Parse raw WCL death events into DeathDetail ORM objects.
+
+def parse_death_events(
+    events: list[dict],
+    fight_id: int,
+    death_index_by_player: dict[str, int] | None = None,
+) -> list[DeathDetailRow]:
+    """Parse raw WCL death events into DeathDetailRow records.
 
     Args:
         events: List of raw death event dicts from WCL events API (dataType="Deaths").
         fight_id: Internal DB fight ID (fights.id, not the WCL fight_id).
+        death_index_by_player: Running per-player death counts, updated in
+            place; pass the same dict for every page of one fight.
 
     Returns:
-        List of DeathDetail ORM objects ready for insertion.
+        List of DeathDetailRow records (``to_model()`` for insertion).
     """
     if not events:
         return []
 
-    death_index_by_player: dict[str, int] = defaultdict(int)
-    results: list[DeathDetail] = []
+    if death_index_by_player is None:
+        death_index_by_player = defaultdict(int)
+    results: list[DeathDetailRow] = []
 
     for event in events:
         # Extract player name from target
@@ -67,10 +79,10 @@ def parse_death_events(events: list[dict], fight_id: int) -> list[DeathDetail]:
         events_json = json.dumps(events_summary)
 
         # Death index per player (0-based, sequential)
-        idx = death_index_by_player[player_name]
-        death_index_by_player[player_name] += 1
+        idx = death_index_by_player.get(player_name, 0)
+        death_index_by_player[player_name] = idx + 1
 
-        results.append(DeathDetail(
+        results.append(DeathDetailRow(
             fight_id=fight_id,
             player_name=player_name,
             death_index=idx,
@@ -84,6 +96,60 @@ def parse_death_events(events: list[dict], fight_id: int) -> list[DeathDetail]:
     return results
 
 
+async def delete_death_details_for_fights(session, fight_ids: list[int]) -> None:
+    """Delete the death_details of several fights in one statement."""
+    await session.execute(
+        delete(DeathDetail).where(DeathDetail.fight_id.in_(fight_ids))
+    )
+
+
+class DeathEventsStream:
+    """Collects one fight's death details page by page.
+
+    Death indexes carry over between pages. ``finish()`` upserts the fight's
+    rows, so unchanged deaths are not rewritten on re-ingest; with
+    ``upserts`` it only stages them there for the caller to flush.
+    """
+
+    def __init__(
+        self, session, report_code: str, fight,
+        *, upserts: UpsertBatch | None = None,
+    ) -> None:
+        self._session = session
+        self._report_code = report_code
+        self._fight = fight
+        self._upserts = upserts
+        self._death_index_by_player: dict[str, int] = {}
+        self._details: list[DeathDetailRow] = []
+
+    @property
+    def rows(self) -> int:
+        return len(self._details)
+
+    async def add(self, events: list[dict]) -> None:
+        self._details.extend(parse_death_events(
+            events, self._fight.id, self._death_index_by_player,
+        ))
+
+    async def finish(self) -> int:
+        """Store the fight's death_details and return how many it has."""
+        upserts = (
+            UpsertBatch(self._session) if self._upserts is None else self._upserts
+        )
+        upserts.add(
+            DeathDetail, self._details,
+            fight_id=self._fight.id, report_month=self._fight.report_month,
+        )
+        if self._upserts is None:
+            await upserts.flush()
+        if self.rows:
+            logger.info(
+                "Ingested %d death details for fight %d (%s)",
+                self.rows, self._fight.fight_id, self._report_code,
+            )
+        return self.rows
+
+
 async def ingest_death_events_for_fight(
     wcl, session, report_code: str, fight,
 ) -> int:
@@ -96,32 +162,12 @@ async def ingest_death_events_for_fight(
         fight: Fight ORM object with .id, .start_time, .end_time, .fight_id.
 
     Returns:
-        Count of death_details rows inserted.
+        Count of death_details rows stored.
     """
-    # Delete existing death_details for this fight (idempotent)
-    await session.execute(
-        delete(DeathDetail).where(DeathDetail.fight_id == fight.id)
-    )
-
-    # Fetch death events from WCL (async generator yields pages)
-    all_events: list[dict] = []
+    stream = DeathEventsStream(session, report_code, fight)
     async for page in fetch_all_events(
         wcl, report_code, fight.start_time, fight.end_time,
-        data_type="Deaths",
+        data_type="Deaths", **DEATH_EVENTS_FILTER,
     ):
-        all_events.extend(page)
-
-    if not all_events:
-        return 0
-
-    # Parse and insert
-    details = parse_death_events(all_events, fight.id)
-    for detail in details:
-        session.add(detail)
-    await session.flush()
-
-    logger.info(
-        "Ingested %d death details for fight %d (%s)",
-        len(details), fight.fight_id, report_code,
-    )
-    return len(details)
+        await stream.add(page)
+    return await stream.finish()
@@ -0,0 +1,247 @@
+"""Concurrent enrichment for ingest_report: parallel WCL fetches, single DB writer.
+
+The sequential path in ``ingest_report`` fetches and writes each enrichment
+stage (table data, combatant info, deaths, casts, resources) one after the
+other. Here every fetch (one per table chunk, one page stream per event data
+type for the whole report) runs in a bounded pool of tasks, and payloads are
+handed through a queue to one writer coroutine — the only code that touches the
+AsyncSession, so the transaction stays consistent.
+"""
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENRICHMENT_CONCURRENCY = 4
+
+
+@dataclass
+class EnrichmentResult:
+    table_rows: int = 0
+    event_rows: int = 0
+    errors: list[str] = field(default_factory=list)
+
+
+@dataclass
+class _Job:
+    """One WCL fetch stream plus the DB writes that consume its payloads."""
+
+    order: int  # position in the sequential path, keeps error order stable
+    kind: str  # "table" or "event"
+    label: str
+    fight_ids: list[int]
+    # Yields payloads (a table batch, or one page of events split by fight)
+    fetch: Callable[[], AsyncIterator[Any]]
+    persist: Callable[[Any], Awaitable[int]]
+    # enrichment_errors entries when persist raises; empty = log-and-skip
+    persist_errors: list[str] = field(default_factory=list)
+    # After the last payload: (rows, enrichment_errors)
+    finish: Callable[[], Awaitable[tuple[int, list[str]]]] | None = None
+    # When the fetch fails: clean up, return enrichment_errors (None = log-and-skip)
+    abort: Callable[[], Awaitable[list[str]]] | None = None
+
+
+_DONE = object()
+
+
+async def _single(fetch: Callable[[], Awaitable[Any]]) -> AsyncIterator[Any]:
+    yield await fetch()
+
+
+async def _errors(errors: list[str]) -> list[str]:
+    return list(errors)
+
+
+def _build_jobs(
+    wcl, session, report_code: str, fights: list,
+    actor_name_by_id: dict[int, str], player_class_map: dict[str, str],
+    *, ingest_tables: bool, ingest_events: bool,
+) -> list[_Job]:
+    """Enumerate jobs in the same order the sequential path runs them.
+
+    Table data is fetched in batched ReportTables queries, one job per chunk
+    of fights; each event data type is one report-level page stream written
+    through a ``report_events.StageWriter``. Error labels mirror
+    ``ingest_report``: ``table_data_fight_<id>`` for every fight of a table
+    chunk whose fetch or write fails, and ``report_events.EventStage``'s
+    labels for event stages. Fights of a chunk with a table that failed
+    to fetch or parse are reported by the chunk's ``finish``.
+    """
+    jobs: list[_Job] = []
+
+    def add(kind, label, fights, fetch, persist, **kwargs):
+        jobs.append(_Job(
+            order=len(jobs), kind=kind, label=label,
+            fight_ids=[f.fight_id for f in fights],
+            fetch=fetch, persist=persist, **kwargs,
+        ))
+
+    if ingest_tables:
+        from shukketsu.pipeline.table_data import (
+            TABLE_DATA_TYPES,
+            fetch_tables_for_fights,
+            persist_tables_for_fights,
+            table_error,
+        )
+        from shukketsu.wcl.queries import MAX_TABLES_PER_QUERY
+
+        async def persist_tables(chunk, tables, missing):
+            rows, errors = await persist_tables_for_fights(
+                session, report_code, chunk, tables,
+            )
+            missing.extend(errors)
+            return rows
+
+        async def tables_done(missing):
+            return 0, list(missing)
+
+        # One batched ReportTables query per chunk of fights
+        per_query = max(1, MAX_TABLES_PER_QUERY // len(TABLE_DATA_TYPES))
+        for i in range(0, len(fights), per_query):
+            chunk = fights[i:i + per_query]
+            chunk_errors = [table_error(f) for f in chunk]
+            missing: list[str] = []
+            add(
+                "table", "table data", chunk,
+                lambda c=chunk: _single(
+                    lambda: fetch_tables_for_fights(wcl, report_code, c),
+                ),
+                lambda tables, c=chunk, m=missing: persist_tables(c, tables, m),
+                persist_errors=chunk_errors,
+                finish=lambda m=missing: tables_done(m),
+                abort=lambda e=chunk_errors: _errors(e),
+            )
+
+    if ingest_events:
+        from shukketsu.pipeline.report_events import (
+            EVENT_STAGES,
+            StageWriter,
+            stream_stage_events,
+        )
+
+        async def write_page(writer, by_fight):
+            await writer.add(by_fight)
+            return 0
+
+        # One report-level page stream per event data type
+        for stage in EVENT_STAGES:
+            writer = StageWriter(
+                session, report_code, stage, fights,
+                actor_name_by_id, player_class_map,
+            )
+            add(
+                "event", stage.label, fights,
+                lambda s=stage: stream_stage_events(wcl, report_code, fights, s),
+                lambda by_fight, w=writer: write_page(w, by_fight),
+                finish=writer.finish, abort=writer.abort,
+            )
+
+    return jobs
+
+
+async def run_concurrent_enrichment(
+    wcl,
+    session,
+    report_code: str,
+    fights: list,
+    actor_name_by_id: dict[int, str],
+    player_class_map: dict[str, str],
+    *,
+    ingest_tables: bool = False,
+    ingest_events: bool = False,
+    max_concurrency: int = DEFAULT_ENRICHMENT_CONCURRENCY,
+) -> EnrichmentResult:
+    """Run enrichment stages with up to ``max_concurrency`` WCL fetches in flight.
+
+    Produces the same rows and the same ``enrichment_errors`` labels as the
+    sequential path in ``ingest_report``. Fetched payloads (table batches and
+    single event pages) wait in a queue bounded by ``max_concurrency``, so
+    raw events in memory are bounded by a few pages, not whole fights.
+    """
+    result = EnrichmentResult()
+    jobs = _build_jobs(
+        wcl, session, report_code, fights,
+        actor_name_by_id, player_class_map,
+        ingest_tables=ingest_tables, ingest_events=ingest_events,
+    )
+    if not jobs:
+        return result
+
+    max_concurrency = max(1, max_concurrency)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max_concurrency)
+
+    async def fetch_one(job: _Job) -> None:
+        # Queue slots are taken while still holding the semaphore, so a
+        # slow writer applies backpressure to the fetchers.
+        async with semaphore:
+            try:
+                async for payload in job.fetch():
+                    await queue.put((job, payload, None))
+            except Exception as exc:
+                await queue.put((job, None, exc))
+            else:
+                await queue.put((job, _DONE, None))
+
+    def count(job: _Job, rows: int) -> None:
+        if job.kind == "table":
+            result.table_rows += rows
+        else:
+            result.event_rows += rows
+
+    errors: list[tuple[int, str]] = []
+    tasks = [asyncio.create_task(fetch_one(job)) for job in jobs]
+    try:
+        remaining = len(jobs)
+        while remaining:
+            job, payload, exc = await queue.get()
+            fight_ids = ", ".join(str(fid) for fid in job.fight_ids)
+            if exc is not None:
+                remaining -= 1
+                logger.error(
+                    "Failed to fetch %s for fight(s) %s in %s",
+                    job.label, fight_ids, report_code, exc_info=exc,
+                )
+                if job.abort is not None:
+                    errors.extend((job.order, e) for e in await job.abort())
+                continue
+            if payload is _DONE:
+                remaining -= 1
+                if job.finish is not None:
+                    rows, job_errors = await job.finish()
+                    count(job, rows)
+                    errors.extend((job.order, e) for e in job_errors)
+                continue
+            try:
+                rows = await job.persist(payload)
+            except Exception:
+                logger.exception(
+                    "Failed to ingest %s for fight(s) %s in %s",
+                    job.label, fight_ids, report_code,
+                )
+                errors.extend((job.order, e) for e in job.persist_errors)
+                continue
+            count(job, rows)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    # Same order as the sequential path (stable within a job)
+    seen: set[str] = set()
+    for _, error in sorted(errors, key=lambda e: e[0]):
+        if error not in seen:
+            seen.add(error)
+            result.errors.append(error)
+
+    logger.info(
+        "Concurrent enrichment for %s: %d jobs (concurrency=%d), "
+        "%d table rows, %d event rows, %d errors",
+        report_code, len(jobs), max_concurrency,
+        result.table_rows, result.event_rows, len(result.errors),
+    )
+    return result
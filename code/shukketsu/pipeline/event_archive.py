@@ -0,0 +1,128 @@
+"""Compressed archive of the raw WCL event pages each fight was built from.
+
+Derived tables (cast metrics, cooldowns, cancels, resources, deaths, ...) are
+computed from event pages that are otherwise dropped once folded in, so fixing
+a formula used to mean fetching every report from WCL again. ``StageWriter``
+therefore also feeds each fight's pages to an ``ArchiveWriter``, which
+compresses them as they arrive (one JSON line per page) into one
+``event_archives`` row per (fight, data type), together with the actor and
+class maps the pipeline needs. ``scripts/recompute_derived.py`` replays the
+archive through the same streams without touching the network.
+
+Blobs are zstd-compressed when ``zstandard`` is installed
+(``pip install shukketsu[zstd]``) and gzip-compressed otherwise; the codec is
+stored per row, so archives written either way stay readable.
+"""
+
+import gzip
+import json
+import zlib
+from collections.abc import Iterator
+from typing import Any
+
+from shukketsu.db.models import EventArchive
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - exercised when zstandard is absent
+    zstandard = None
+
+CODECS = ("zstd", "gzip")
+DEFAULT_CODEC = "zstd" if zstandard is not None else "gzip"
+ZSTD_LEVEL = 9
+GZIP_LEVEL = 6
+
+
+def _require_zstd() -> None:
+    if zstandard is None:
+        raise RuntimeError(
+            "zstd event archive requested but zstandard is not installed. "
+            "Install with: pip install shukketsu[zstd]"
+        )
+
+
+def _compressor(codec: str):
+    if codec == "zstd":
+        _require_zstd()
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+    if codec == "gzip":
+        # wbits=31 writes a gzip container; its mtime is 0, so equal pages
+        # compress to equal bytes and an unchanged re-ingest rewrites nothing
+        return zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    raise ValueError(f"Unknown archive codec: {codec}")
+
+
+def decompress(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        _require_zstd()
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    if codec == "gzip":
+        return gzip.decompress(data)
+    raise ValueError(f"Unknown archive codec: {codec}")
+
+
+class ArchiveWriter:
+    """Compresses one fight's pages of one data type as they arrive."""
+
+    def __init__(
+        self, fight_id: int, data_type: str, context: dict[str, Any] | None = None,
+        *, codec: str = DEFAULT_CODEC,
+    ) -> None:
+        self.fight_id = fight_id
+        self.data_type = data_type
+        self.codec = codec
+        self._context = context
+        self._compressor = _compressor(codec)
+        self._chunks: list[bytes] = []
+        self.pages = 0
+        self.events = 0
+        self.raw_bytes = 0
+
+    def add(self, events: list[dict]) -> None:
+        line = json.dumps(events, separators=(",", ":")).encode() + b"\n"
+        self._chunks.append(self._compressor.compress(line))
+        self.pages += 1
+        self.events += len(events)
+        self.raw_bytes += len(line)
+
+    def finish(self) -> EventArchive:
+        self._chunks.append(self._compressor.flush())
+        return EventArchive(
+            fight_id=self.fight_id,
+            data_type=self.data_type,
+            codec=self.codec,
+            page_count=self.pages,
+            event_count=self.events,
+            raw_bytes=self.raw_bytes,
+            data=b"".join(self._chunks),
+            context_json=(
+                json.dumps(self._context, sort_keys=True)
+                if self._context is not None else None
+            ),
+        )
+
+
+def read_pages(archive: Any) -> Iterator[list[dict]]:
+    """The archived event pages, in the order they were fetched.
+
+    ``archive`` is an ``EventArchive`` or a result row with its columns.
+    """
+    for line in decompress(archive.codec, archive.data).splitlines():
+        yield json.loads(line)
+
+
+def read_context(archive: Any) -> tuple[dict[int, str], dict[str, str]]:
+    """(actor_name_by_id, player_class_map) stored with the archive."""
+    context = json.loads(archive.context_json) if archive.context_json else {}
+    actors = {int(k): v for k, v in context.get("actors", {}).items()}
+    return actors, context.get("player_classes", {})
+
+
+def archive_context(
+    actor_name_by_id: dict[int, str], player_class_map: dict[str, str],
+) -> dict[str, Any]:
+    """What ``ArchiveWriter`` stores for ``read_context`` to hand back."""
+    return {
+        "actors": {str(k): v for k, v in actor_name_by_id.items()},
+        "player_classes": player_class_map,
+    }
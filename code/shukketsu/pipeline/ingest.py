@@ -1,13 +1,21 @@
+import hashlib
 import json
 import logging
+import time
+from collections.abc import Awaitable, Callable
 from dataclasses import dataclass, field
 from typing import Any
 
-from sqlalchemy import delete, select
+from sqlalchemy import Integer, any_, bindparam, delete, func, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from shukketsu.db.models import Encounter, Fight, FightPerformance, Report
+from shukketsu.db.partitions import ensure_partitions_committed, report_month
+from shukketsu.db.upsert import UpsertStats, collect_upsert_stats, upsert_rows
 from shukketsu.pipeline.constants import ROLE_BY_SPEC
 from shukketsu.pipeline.normalize import is_boss_fight
+from shukketsu.pipeline.rows import PerformanceRow
 
 logger = logging.getLogger(__name__)
 
@@ -21,10 +29,41 @@ def parse_report(data: dict[str, Any], code: str) -> Report:
         guild_id=guild["id"] if guild else None,
         start_time=data["startTime"],
         end_time=data["endTime"],
+        last_fight_id=max((f["id"] for f in data.get("fights") or []), default=None),
     )
 
 
-def parse_fights(fights_data: list[dict[str, Any]], report_code: str) -> list[Fight]:
+# WCL fight fields stored on Fight; a change in any of them rewrites the fight
+FINGERPRINT_FIELDS = (
+    "startTime", "endTime", "kill", "fightPercentage", "encounterID", "difficulty",
+)
+
+
+def _digest(payload: Any) -> str:
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()
+    ).hexdigest()
+
+
+def fight_fingerprint(fight_data: dict[str, Any]) -> str:
+    """Hash of the WCL fight fields a ``Fight`` row is built from."""
+    return _digest({k: fight_data.get(k) for k in FINGERPRINT_FIELDS})
+
+
+def rankings_fingerprint(
+    fight_rankings: dict[str, Any], my_character_names: set[str],
+) -> str:
+    """Hash of one fight's rankings payload and the names flagged as mine."""
+    return _digest({
+        "rankings": fight_rankings,
+        "mine": sorted(n.lower() for n in my_character_names),
+    })
+
+
+def parse_fights(
+    fights_data: list[dict[str, Any]], report_code: str, report_start_time: int,
+) -> list[Fight]:
+    month = report_month(report_start_time)
     result = []
     for f in fights_data:
         if not is_boss_fight(f):
@@ -38,6 +77,8 @@ def parse_fights(fights_data: list[dict[str, Any]], report_code: str) -> list[Fi
             kill=f["kill"],
             difficulty=f.get("difficulty", 0),
             fight_percentage=f.get("fightPercentage"),
+            report_month=month,
+            fingerprint=fight_fingerprint(f),
         ))
     return result
 
@@ -60,7 +101,7 @@ def parse_rankings_to_performances(
     rankings_data: list[dict[str, Any]],
     fight_id: int,
     my_character_names: set[str],
-) -> list[FightPerformance]:
+) -> list[PerformanceRow]:
     my_names_lower = {n.lower() for n in my_character_names}
     result = []
     for r in rankings_data:
@@ -68,7 +109,7 @@ def parse_rankings_to_performances(
         server_name = server.get("name", "") if isinstance(server, dict) else ""
         is_healer = ROLE_BY_SPEC.get(r["spec"]) == "healer"
         amount = r.get("amount", 0.0)
-        result.append(FightPerformance(
+        result.append(PerformanceRow(
             fight_id=fight_id,
             player_name=r["name"],
             player_class=r["class"],
@@ -97,206 +138,488 @@ class IngestResult:
     event_rows: int = 0
     snapshots: int = 0
     enrichment_errors: list[str] = field(default_factory=list)
+    report_end_time: int | None = None
+    # Fights whose stored row matched on re-ingest and was left in place
+    fights_unchanged: int = 0
+    # WCL fight IDs of kills that came back without rankings
+    rankings_missing: list[int] = field(default_factory=list)
+    # What the natural-key upserts (performances, enrichment) actually wrote
+    rows: UpsertStats = field(default_factory=UpsertStats)
+    # Wall-clock seconds per phase: report, fights, rankings, enrichment
+    phase_seconds: dict[str, float] = field(default_factory=dict)
 
 
-async def ingest_report(
-    wcl, session, report_code: str, my_character_names: set[str] | None = None,
-    *, ingest_tables: bool = False, ingest_events: bool = False,
-) -> IngestResult:
-    """Fetch a report from WCL and persist it to the database."""
-    from shukketsu.wcl.queries import REPORT_FIGHTS, REPORT_RANKINGS
+RATE_LIMIT_FRAG = "rateLimitData { pointsSpentThisHour limitPerHour pointsResetIn }"
 
-    if my_character_names is None:
-        my_character_names = set()
 
-    # Fetch report data
+async def _fetch_report_info(wcl, report_code: str) -> dict[str, Any]:
+    from shukketsu.wcl.queries import REPORT_FIGHTS
+
     report_data = await wcl.query(
-        REPORT_FIGHTS.replace(
-            "RATE_LIMIT",
-            "rateLimitData { pointsSpentThisHour limitPerHour pointsResetIn }",
-        ),
+        REPORT_FIGHTS.replace("RATE_LIMIT", RATE_LIMIT_FRAG),
         variables={"code": report_code},
     )
-    report_info = report_data["reportData"]["report"]
+    return report_data["reportData"]["report"]
 
-    # Parse and merge report (idempotent upsert by PK=code)
-    report = parse_report(report_info, report_code)
-    await session.merge(report)
 
-    # Delete existing fights + performances for this report (delete-then-insert)
-    existing_fight_ids = await session.execute(
-        select(Fight.id).where(Fight.report_code == report_code)
-    )
-    fight_id_list = [r[0] for r in existing_fight_ids]
-    if fight_id_list:
-        await session.execute(
-            delete(FightPerformance).where(FightPerformance.fight_id.in_(fight_id_list))
-        )
-        await session.execute(
-            delete(Fight).where(Fight.report_code == report_code)
-        )
+async def _add_fights(session, report_info: dict[str, Any], fights: list[Fight]) -> None:
+    """Insert fights, first adding stub encounters for any unknown encounter IDs.
 
-    # Parse fights
-    fights = parse_fights(report_info["fights"], report_code)
-
-    # Auto-insert any unknown encounters as stubs (skip if already seeded)
-    encounter_ids = {f.encounter_id for f in fights}
-    for eid in encounter_ids:
-        existing = await session.get(Encounter, eid)
-        if existing is not None:
-            continue
-        fight_data = next(
-            fd for fd in report_info["fights"] if fd.get("encounterID") == eid
-        )
-        await session.merge(Encounter(
-            id=eid,
-            name=fight_data.get("name", f"Unknown ({eid})"),
-            zone_id=0,
-            zone_name="Unknown",
-            difficulty=fight_data.get("difficulty", 0),
-        ))
+    Known encounters are looked up with one ``= ANY`` query and the missing
+    ones inserted with one multi-row ``ON CONFLICT DO NOTHING``.
+    """
+    encounter_ids = sorted({f.encounter_id for f in fights})
+    if encounter_ids:
+        known = set((await session.execute(
+            select(Encounter.id).where(Encounter.id == any_(
+                bindparam("ids", encounter_ids, type_=ARRAY(Integer)),
+            ))
+        )).scalars())
+        stubs = []
+        for eid in encounter_ids:
+            if eid in known:
+                continue
+            fight_data = next(
+                fd for fd in report_info["fights"] if fd.get("encounterID") == eid
+            )
+            stubs.append({
+                "id": eid,
+                "name": fight_data.get("name", f"Unknown ({eid})"),
+                "zone_id": 0,
+                "zone_name": "Unknown",
+                "difficulty": fight_data.get("difficulty", 0),
+            })
+        if stubs:
+            await session.execute(
+                pg_insert(Encounter).values(stubs)
+                .on_conflict_do_nothing(index_elements=[Encounter.id])
+            )
 
     for fight in fights:
         session.add(fight)
 
     await session.flush()
 
-    # Fetch rankings for each fight
-    total_performances = 0
-    fight_ids = [f.fight_id for f in fights]
-    if fight_ids:
-        rankings_data = await wcl.query(
-            REPORT_RANKINGS.replace(
-                "RATE_LIMIT",
-                "rateLimitData { pointsSpentThisHour limitPerHour pointsResetIn }",
-            ),
-            variables={"code": report_code, "fightIDs": fight_ids},
-        )
-        rankings = rankings_data["reportData"]["report"]["rankings"]
 
-        # WCL may return rankings as a JSON string (GraphQL JSON scalar)
-        if isinstance(rankings, str):
-            rankings = json.loads(rankings)
+async def _fetch_rankings(
+    wcl, report_code: str, fight_ids: list[int],
+) -> dict[int, dict[str, Any]]:
+    """Fetch rankings for ``fight_ids``, indexed by WCL fight ID."""
+    from shukketsu.wcl.queries import REPORT_RANKINGS
 
-        # Rankings come back as {"data": [{"fightID": N, "roles": {...}}, ...]}
-        rankings_list = []
-        if isinstance(rankings, dict):
-            rankings_list = rankings.get("data", [])
-        elif isinstance(rankings, list):
-            rankings_list = rankings
+    if not fight_ids:
+        return {}
 
-        # Index by fightID for lookup
-        rankings_by_fight = {r["fightID"]: r for r in rankings_list if "fightID" in r}
+    rankings_data = await wcl.query(
+        REPORT_RANKINGS.replace("RATE_LIMIT", RATE_LIMIT_FRAG),
+        variables={"code": report_code, "fightIDs": fight_ids},
+        # Parse percentiles keep moving after a report is finished
+        use_cache=False,
+    )
+    rankings = rankings_data["reportData"]["report"]["rankings"]
 
-        for fight in fights:
-            fight_rankings = rankings_by_fight.get(fight.fight_id, {})
-            roles = fight_rankings.get("roles", {})
-            for role_data in roles.values():
-                characters = role_data.get("characters", [])
-                perfs = parse_rankings_to_performances(
-                    characters, fight.id, my_character_names,
-                )
-                for perf in perfs:
-                    session.add(perf)
-                total_performances += len(perfs)
+    # WCL may return rankings as a JSON string (GraphQL JSON scalar)
+    if isinstance(rankings, str):
+        rankings = json.loads(rankings)
 
-    # Build actor maps from masterData (needed by table_data and event pipelines)
+    # Rankings come back as {"data": [{"fightID": N, "roles": {...}}, ...]}
+    rankings_list = []
+    if isinstance(rankings, dict):
+        rankings_list = rankings.get("data", [])
+    elif isinstance(rankings, list):
+        rankings_list = rankings
+
+    # Index by fightID for lookup
+    return {r["fightID"]: r for r in rankings_list if "fightID" in r}
+
+
+def _missing_rankings(
+    fights: list[Fight], rankings_by_fight: dict[int, dict[str, Any]],
+) -> list[int]:
+    """Kills absent from the rankings payload (WCL only ranks kills)."""
+    return [f.fight_id for f in fights if f.kill and f.fight_id not in rankings_by_fight]
+
+
+def _add_performances(
+    session, fight: Fight, fight_rankings: dict[str, Any],
+    my_character_names: set[str],
+) -> int:
+    """Add one fight's FightPerformance rows. Returns rows added."""
+    perfs = _performance_rows(fight, fight_rankings, my_character_names)
+    for perf in perfs:
+        session.add(perf.to_model())
+    return len(perfs)
+
+
+def _performance_rows(
+    fight: Fight, fight_rankings: dict[str, Any], my_character_names: set[str],
+) -> list[PerformanceRow]:
+    rows = []
+    for role_data in fight_rankings.get("roles", {}).values():
+        rows.extend(parse_rankings_to_performances(
+            role_data.get("characters", []), fight.id, my_character_names,
+        ))
+    return rows
+
+
+async def _ingest_rankings(
+    wcl, session, report_code: str, fights: list[Fight],
+    my_character_names: set[str],
+) -> tuple[int, list[int]]:
+    """Fetch rankings for newly added ``fights`` and add their performances.
+
+    Returns (performances added, kills missing from the rankings).
+    """
+    rankings_by_fight = await _fetch_rankings(
+        wcl, report_code, [f.fight_id for f in fights],
+    )
+    total_performances = 0
+    for fight in fights:
+        fight_rankings = rankings_by_fight.get(fight.fight_id, {})
+        fight.rankings_fingerprint = rankings_fingerprint(
+            fight_rankings, my_character_names,
+        )
+        total_performances += _add_performances(
+            session, fight, fight_rankings, my_character_names,
+        )
+    return total_performances, _missing_rankings(fights, rankings_by_fight)
+
+
+def _actor_maps(report_info: dict[str, Any]) -> tuple[dict[int, str], dict[str, str]]:
+    """Build actor maps from masterData (needed by table_data and event pipelines)."""
     actor_name_by_id: dict[int, str] = {}
     player_class_map: dict[str, str] = {}
-    if (ingest_tables or ingest_events) and fights:
-        master_data = report_info.get("masterData", {})
-        for actor in master_data.get("actors", []):
-            actor_name_by_id[actor["id"]] = actor["name"]
-            if "type" in actor:
-                player_class_map[actor["name"]] = actor["type"]
-
-    # Optionally ingest table data (ability breakdowns, buff uptimes)
+    master_data = report_info.get("masterData", {})
+    for actor in master_data.get("actors", []):
+        actor_name_by_id[actor["id"]] = actor["name"]
+        if "type" in actor:
+            player_class_map[actor["name"]] = actor["type"]
+    return actor_name_by_id, player_class_map
+
+
+async def _enrich_fights(
+    wcl, session, report_code: str, fights: list[Fight],
+    report_info: dict[str, Any],
+    *, ingest_tables: bool, ingest_events: bool, enrichment_concurrency: int,
+) -> tuple[int, int, list[str]]:
+    """Run table/event enrichment for ``fights`` and checkpoint each stage.
+
+    Every requested stage gets a ``fight_stage_status`` row per fight (see
+    pipeline.checkpoints), so a later ``resume_report`` re-runs only what
+    failed. Returns (table_rows, event_rows, enrichment_errors).
+    """
     table_rows = 0
+    event_rows = 0
     enrichment_errors: list[str] = []
-    if ingest_tables and fights:
-        from shukketsu.pipeline.table_data import ingest_table_data_for_fight
+    if not (ingest_tables or ingest_events) or not fights:
+        return table_rows, event_rows, enrichment_errors
 
-        for fight in fights:
-            try:
-                rows = await ingest_table_data_for_fight(
-                    wcl, session, report_code, fight,
-                )
-                table_rows += rows
-            except Exception:
-                logger.exception(
-                    "Failed to ingest table data for fight %d in %s",
-                    fight.fight_id, report_code,
-                )
-                enrichment_errors.append(f"table_data_fight_{fight.fight_id}")
+    actor_name_by_id, player_class_map = _actor_maps(report_info)
 
-    # Optionally ingest event data (combatant info, deaths, casts, resources)
-    event_rows = 0
-    if ingest_events and fights:
-        from shukketsu.pipeline.cast_events import ingest_cast_events_for_fight
-        from shukketsu.pipeline.combatant_info import ingest_combatant_info_for_report
-        from shukketsu.pipeline.death_events import ingest_death_events_for_fight
-        from shukketsu.pipeline.resource_events import ingest_resource_data_for_fight
-
-        try:
-            event_rows += await ingest_combatant_info_for_report(
-                wcl, session, report_code,
-            )
-        except Exception:
-            logger.exception(
-                "Failed to ingest combatant info for %s", report_code,
+    if enrichment_concurrency > 1:
+        from shukketsu.pipeline.enrichment import run_concurrent_enrichment
+
+        enrichment = await run_concurrent_enrichment(
+            wcl, session, report_code, fights,
+            actor_name_by_id, player_class_map,
+            ingest_tables=ingest_tables, ingest_events=ingest_events,
+            max_concurrency=enrichment_concurrency,
+        )
+        await _record_checkpoints(
+            session, fights, enrichment.errors,
+            ingest_tables=ingest_tables, ingest_events=ingest_events,
+        )
+        return enrichment.table_rows, enrichment.event_rows, enrichment.errors
+
+    # Optionally ingest table data (ability breakdowns, buff uptimes),
+    # fetched for all fights in batched aliased queries
+    if ingest_tables:
+        from shukketsu.pipeline.table_data import ingest_table_data_for_fights
+
+        rows, errors = await ingest_table_data_for_fights(
+            wcl, session, report_code, fights,
+        )
+        table_rows += rows
+        enrichment_errors.extend(errors)
+
+    # Optionally ingest event data (combatant info, deaths, casts, resources):
+    # each data type is fetched once for the whole report, then split by fight
+    if ingest_events:
+        from shukketsu.pipeline.report_events import (
+            EVENT_STAGES,
+            ingest_stage_for_fights,
+        )
+
+        for stage in EVENT_STAGES:
+            rows, errors = await ingest_stage_for_fights(
+                wcl, session, report_code, stage, fights,
+                actor_name_by_id, player_class_map,
             )
-            enrichment_errors.append("combatant_info")
+            event_rows += rows
+            enrichment_errors.extend(errors)
+
+    await _record_checkpoints(
+        session, fights, enrichment_errors,
+        ingest_tables=ingest_tables, ingest_events=ingest_events,
+    )
+    return table_rows, event_rows, enrichment_errors
 
+
+async def _record_checkpoints(
+    session, fights: list[Fight], enrichment_errors: list[str],
+    *, ingest_tables: bool, ingest_events: bool,
+) -> None:
+    from shukketsu.pipeline.checkpoints import (
+        record_stage_statuses,
+        requested_stages,
+    )
+
+    stages = requested_stages(
+        ingest_tables=ingest_tables, ingest_events=ingest_events,
+    )
+    await record_stage_statuses(session, fights, stages, enrichment_errors)
+
+
+async def ingest_report(
+    wcl, session, report_code: str, my_character_names: set[str] | None = None,
+    *, ingest_tables: bool = False, ingest_events: bool = False,
+    enrichment_concurrency: int = 1,
+    progress: Callable[[str], Awaitable[None]] | None = None,
+) -> IngestResult:
+    """Fetch a report from WCL and persist it to the database.
+
+    On re-ingest, fights are diffed against the stored rows by fingerprint
+    (``fight_fingerprint`` / ``rankings_fingerprint``). A fight whose WCL
+    fields changed, or that is gone from the report, is deleted with
+    everything that cascades from it; new and changed fights are inserted.
+    Unchanged fights keep their row and ``fights.id``. Their performances are
+    upserted only if the rankings changed, and they are re-enriched only for
+    stages whose checkpoint is missing or failed (see pipeline.checkpoints).
+    ``IngestResult.performances`` counts the performance rows written;
+    ``IngestResult.rows`` sums what the upserts inserted, updated, left
+    unchanged and deleted.
+
+    With ``enrichment_concurrency > 1``, table and event enrichment fetches
+    run concurrently across fights and stages (see pipeline.enrichment);
+    the default of 1 runs them sequentially, fight by fight. ``progress`` is
+    awaited with "report", "rankings" and "enrichment" as each stage starts.
+    ``IngestResult.phase_seconds`` times those stages plus "fights" (the
+    fight diff and inserts).
+    """
+    if my_character_names is None:
+        my_character_names = set()
+
+    phase_seconds: dict[str, float] = {}
+    phase: list = []  # [name, start] of the phase being timed
+
+    def mark(name: str | None) -> None:
+        now = time.perf_counter()
+        if phase:
+            phase_seconds[phase[0]] = now - phase[1]
+        phase[:] = [name, now] if name is not None else []
+
+    async def stage(name: str) -> None:
+        mark(name)
+        if progress is not None:
+            await progress(name)
+
+    # Fetch report data
+    await stage("report")
+    report_info = await _fetch_report_info(wcl, report_code)
+
+    # Parse and merge report (idempotent upsert by PK=code)
+    report = parse_report(report_info, report_code)
+    await session.merge(report)
+
+    # Parse fights and diff them against the stored ones
+    mark("fights")
+    fights = parse_fights(report_info["fights"], report_code, report.start_time)
+    if fights:
+        await ensure_partitions_committed(session, {fights[0].report_month})
+    stored_result = await session.execute(
+        select(
+            Fight.id, Fight.fight_id, Fight.fingerprint, Fight.rankings_fingerprint,
+        ).where(Fight.report_code == report_code)
+    )
+    stored = {row.fight_id: row for row in stored_result}
+
+    # Unchanged fights stand in for their stored row (same id, not re-added)
+    unchanged_rankings: dict[int, str | None] = {}
+    new_fights: list[Fight] = []
+    for fight in fights:
+        row = stored.pop(fight.fight_id, None)
+        if row is not None and row.fingerprint == fight.fingerprint:
+            fight.id = row.id
+            unchanged_rankings[fight.fight_id] = row.rankings_fingerprint
+        else:
+            new_fights.append(fight)
+            if row is not None:
+                stored[fight.fight_id] = row
+
+    # Delete changed and vanished fights (delete-then-insert)
+    stale_ids = [row.id for row in stored.values()]
+    if stale_ids:
+        await session.execute(
+            delete(FightPerformance).where(FightPerformance.fight_id.in_(stale_ids))
+        )
+        await session.execute(delete(Fight).where(Fight.id.in_(stale_ids)))
+
+    await _add_fights(session, report_info, new_fights)
+
+    # Fetch rankings for each fight; unchanged payloads are not rewritten
+    await stage("rankings")
+    rankings_by_fight = await _fetch_rankings(
+        wcl, report_code, [f.fight_id for f in fights],
+    )
+    rankings_missing = _missing_rankings(fights, rankings_by_fight)
+    total_performances = 0
+    with collect_upsert_stats() as rows:
         for fight in fights:
-            try:
-                event_rows += await ingest_death_events_for_fight(
-                    wcl, session, report_code, fight,
-                )
-            except Exception:
-                logger.exception(
-                    "Failed to ingest death events for fight %d in %s",
-                    fight.fight_id, report_code,
-                )
-                enrichment_errors.append(
-                    f"death_events_fight_{fight.fight_id}"
+            fight_rankings = rankings_by_fight.get(fight.fight_id, {})
+            fingerprint = rankings_fingerprint(fight_rankings, my_character_names)
+            if fight.fight_id not in unchanged_rankings:
+                fight.rankings_fingerprint = fingerprint
+                total_performances += _add_performances(
+                    session, fight, fight_rankings, my_character_names,
                 )
+                continue
+            if unchanged_rankings[fight.fight_id] == fingerprint:
+                continue
+            perfs = _performance_rows(fight, fight_rankings, my_character_names)
+            await upsert_rows(session, FightPerformance, perfs, scope=[
+                FightPerformance.fight_id == fight.id,
+            ])
+            await session.execute(
+                update(Fight).where(Fight.id == fight.id)
+                .values(rankings_fingerprint=fingerprint)
+            )
+            total_performances += len(perfs)
 
-            try:
-                event_rows += await ingest_cast_events_for_fight(
-                    wcl, session, report_code, fight,
-                    actor_name_by_id, player_class_map,
-                )
-            except Exception:
-                logger.exception(
-                    "Failed to ingest cast events for fight %d in %s",
-                    fight.fight_id, report_code,
-                )
-                enrichment_errors.append(
-                    f"cast_events_fight_{fight.fight_id}"
-                )
+        await stage("enrichment")
+        enrich_fights = await _fights_to_enrich(
+            session, report_code, fights, set(unchanged_rankings),
+            ingest_tables=ingest_tables, ingest_events=ingest_events,
+        )
+        table_rows, event_rows, enrichment_errors = await _enrich_fights(
+            wcl, session, report_code, enrich_fights, report_info,
+            ingest_tables=ingest_tables, ingest_events=ingest_events,
+            enrichment_concurrency=enrichment_concurrency,
+        )
+    mark(None)
 
-            try:
-                event_rows += await ingest_resource_data_for_fight(
-                    wcl, session, report_code, fight, actor_name_by_id,
-                )
-            except Exception:
-                logger.exception(
-                    "Failed to ingest resource data for fight %d in %s",
-                    fight.fight_id, report_code,
-                )
-                enrichment_errors.append(
-                    f"resource_events_fight_{fight.fight_id}"
-                )
+    logger.info(
+        "Ingested report %s: %d fights (%d unchanged), %d performances, "
+        "%d table rows, %d event rows, %d enrichment errors, %d rows changed "
+        "(%s)",
+        report_code, len(fights), len(unchanged_rankings), total_performances,
+        table_rows, event_rows, len(enrichment_errors), rows.changed,
+        ", ".join(f"{name} {secs:.2f}s" for name, secs in phase_seconds.items()),
+    )
+    return IngestResult(
+        fights=len(fights), performances=total_performances,
+        table_rows=table_rows,
+        event_rows=event_rows,
+        enrichment_errors=enrichment_errors,
+        report_end_time=report.end_time,
+        fights_unchanged=len(unchanged_rankings),
+        rankings_missing=rankings_missing,
+        rows=rows,
+        phase_seconds=phase_seconds,
+    )
+
+
+async def _fights_to_enrich(
+    session, report_code: str, fights: list[Fight], unchanged: set[int],
+    *, ingest_tables: bool, ingest_events: bool,
+) -> list[Fight]:
+    """New/changed fights, plus unchanged ones with a pending enrichment stage."""
+    from shukketsu.pipeline.checkpoints import pending_stages, requested_stages
+
+    stages = requested_stages(
+        ingest_tables=ingest_tables, ingest_events=ingest_events,
+    )
+    if not unchanged or not stages:
+        return fights
+    pending = await pending_stages(session, report_code, stages)
+    pending_ids = {fid for fight_ids in pending.values() for fid in fight_ids}
+    return [
+        f for f in fights
+        if f.fight_id not in unchanged or f.fight_id in pending_ids
+    ]
+
+
+async def ingest_report_incremental(
+    wcl, session, report_code: str, my_character_names: set[str] | None = None,
+    *, ingest_tables: bool = False, ingest_events: bool = False,
+    enrichment_concurrency: int = 1,
+) -> IngestResult:
+    """Append fights added to a report since the last ingest.
+
+    For live logs that grow fight by fight during a raid. Only fights with a
+    WCL fight ID above ``Report.last_fight_id`` are fetched (rankings, tables
+    and events); rows for earlier fights are left untouched. A report not
+    yet in the database gets a full ``ingest_report``. ``IngestResult``
+    counts cover the new fights only.
+    """
+    if my_character_names is None:
+        my_character_names = set()
+
+    report = await session.get(Report, report_code)
+    if report is None:
+        return await ingest_report(
+            wcl, session, report_code, my_character_names,
+            ingest_tables=ingest_tables, ingest_events=ingest_events,
+            enrichment_concurrency=enrichment_concurrency,
+        )
+
+    last_fight_id = report.last_fight_id
+    if last_fight_id is None:
+        # Ingested before last_fight_id was tracked: fall back to stored fights
+        result = await session.execute(
+            select(func.max(Fight.fight_id)).where(Fight.report_code == report_code)
+        )
+        last_fight_id = result.scalar() or 0
+
+    report_info = await _fetch_report_info(wcl, report_code)
+    new_fights_data = [
+        f for f in report_info["fights"] if f["id"] > last_fight_id
+    ]
+
+    report.title = report_info["title"]
+    report.end_time = report_info["endTime"]
+    if new_fights_data:
+        report.last_fight_id = max(f["id"] for f in new_fights_data)
+
+    fights = parse_fights(new_fights_data, report_code, report.start_time)
+    if not fights:
+        await session.flush()
+        logger.info(
+            "No new boss fights in %s (last fight %d)", report_code, last_fight_id,
+        )
+        return IngestResult(fights=0, performances=0, report_end_time=report.end_time)
+
+    await ensure_partitions_committed(session, {fights[0].report_month})
+    await _add_fights(session, report_info, fights)
+    total_performances, rankings_missing = await _ingest_rankings(
+        wcl, session, report_code, fights, my_character_names,
+    )
+    table_rows, event_rows, enrichment_errors = await _enrich_fights(
+        wcl, session, report_code, fights, report_info,
+        ingest_tables=ingest_tables, ingest_events=ingest_events,
+        enrichment_concurrency=enrichment_concurrency,
+    )
 
     logger.info(
-        "Ingested report %s: %d fights, %d performances, %d table rows, "
-        "%d event rows, %d enrichment errors",
-        report_code, len(fights), total_performances, table_rows,
-        event_rows, len(enrichment_errors),
+        "Incrementally ingested report %s: %d new fights (after fight %d), "
+        "%d performances, %d table rows, %d event rows, %d enrichment errors",
+        report_code, len(fights), last_fight_id, total_performances,
+        table_rows, event_rows, len(enrichment_errors),
     )
     return IngestResult(
         fights=len(fights), performances=total_performances,
         table_rows=table_rows,
         event_rows=event_rows,
         enrichment_errors=enrichment_errors,
+        report_end_time=report.end_time,
+        rankings_missing=rankings_missing,
     )
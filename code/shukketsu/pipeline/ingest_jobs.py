@@ -0,0 +1,444 @@
+"""Durable ingest queue: ``ingest_jobs`` rows claimed by a pool of async workers.
+
+Jobs are enqueued by the API, the CLI (``pull-my-logs --enqueue``) and the
+auto-ingest poll loop. Workers claim the most urgent runnable job with
+``SELECT ... FOR UPDATE SKIP LOCKED``, so any number of workers — in the API
+process or in separate ``run-ingest-workers`` processes — can share one queue
+without double-claiming. Each job runs ``ingest_report`` in its own
+transaction; failures are retried with exponential backoff up to
+``max_attempts``, and a job whose worker died is re-claimed once its lease
+expires. A running job's worker renews the lease (``locked_at``) on every
+stage change and from a heartbeat, and only writes the job's outcome while it
+still holds it.
+"""
+
+import asyncio
+import contextlib
+import logging
+import os
+import socket
+from dataclasses import dataclass
+from datetime import timedelta
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from shukketsu.db.models import IngestJob, MyCharacter
+from shukketsu.pipeline.checkpoints import requested_stages, stage_outcomes
+from shukketsu.pipeline.ingest import ingest_report
+from shukketsu.wcl.factory import WCLClientFactory
+from shukketsu.wcl.scheduler import Priority
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+@dataclass(frozen=True, slots=True)
+class ClaimedJob:
+    id: int
+    report_code: str
+    priority: int
+    with_tables: bool
+    with_events: bool
+    attempts: int
+    max_attempts: int
+    locked_by: str
+
+
+async def enqueue_ingest_job(
+    session,
+    report_code: str,
+    *,
+    source: str,
+    priority: Priority = Priority.AUTO_INGEST,
+    with_tables: bool = False,
+    with_events: bool = False,
+    max_attempts: int = 3,
+) -> int:
+    """Queue ``report_code`` for ingestion and return the job ID.
+
+    A report already queued or running is not queued twice; the existing
+    job's ID is returned instead. The caller commits.
+    """
+    stmt = (
+        pg_insert(IngestJob)
+        .values(
+            report_code=report_code,
+            status="queued",
+            priority=int(priority),
+            source=source,
+            with_tables=with_tables,
+            with_events=with_events,
+            attempts=0,
+            max_attempts=max_attempts,
+        )
+        .on_conflict_do_nothing(
+            index_elements=[IngestJob.report_code],
+            index_where=IngestJob.status.in_(ACTIVE_STATUSES),
+        )
+        .returning(IngestJob.id)
+    )
+    job_id = (await session.execute(stmt)).scalar()
+    if job_id is None:
+        job_id = (await session.execute(
+            select(IngestJob.id).where(
+                IngestJob.report_code == report_code,
+                IngestJob.status.in_(ACTIVE_STATUSES),
+            )
+        )).scalar()
+    return job_id
+
+
+async def claim_next_job(
+    session, worker_id: str, *, lease: timedelta,
+) -> ClaimedJob | None:
+    """Atomically mark the most urgent runnable job as running by ``worker_id``.
+
+    Runnable means queued with ``run_after`` passed, or running with a lease
+    older than ``lease`` (its worker died) and attempts left. The caller
+    commits.
+    """
+    now = func.now()
+    runnable = (
+        select(IngestJob.id)
+        .where(or_(
+            and_(IngestJob.status == "queued", IngestJob.run_after <= now),
+            and_(
+                IngestJob.status == "running",
+                IngestJob.locked_at < now - lease,
+                IngestJob.attempts < IngestJob.max_attempts,
+            ),
+        ))
+        .order_by(IngestJob.priority, IngestJob.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    stmt = (
+        update(IngestJob)
+        .where(IngestJob.id == runnable)
+        .values(
+            status="running",
+            attempts=IngestJob.attempts + 1,
+            locked_by=worker_id,
+            locked_at=now,
+            stage="claimed",
+        )
+        .returning(
+            IngestJob.id, IngestJob.report_code, IngestJob.priority,
+            IngestJob.with_tables, IngestJob.with_events,
+            IngestJob.attempts, IngestJob.max_attempts, IngestJob.locked_by,
+        )
+    )
+    row = (await session.execute(stmt)).first()
+    return ClaimedJob(*row) if row else None
+
+
+async def fail_expired_jobs(session, *, lease: timedelta) -> int:
+    """Fail running jobs whose lease expired with no attempts left."""
+    result = await session.execute(
+        update(IngestJob)
+        .where(
+            IngestJob.status == "running",
+            IngestJob.locked_at < func.now() - lease,
+            IngestJob.attempts >= IngestJob.max_attempts,
+        )
+        .values(
+            status="failed",
+            last_error="worker lease expired",
+            locked_by=None,
+            finished_at=func.now(),
+        )
+    )
+    return result.rowcount
+
+
+def _owned(job: ClaimedJob):
+    # Rows of a job still leased to the worker that claimed it
+    return and_(
+        IngestJob.id == job.id,
+        IngestJob.status == "running",
+        IngestJob.locked_by == job.locked_by,
+    )
+
+
+async def renew_lease(session, job: ClaimedJob, **values) -> bool:
+    """Push the job's lease forward; False when another worker took it over."""
+    result = await session.execute(
+        update(IngestJob).where(_owned(job)).values(locked_at=func.now(), **values)
+    )
+    return result.rowcount > 0
+
+
+async def set_job_stage(session, job: ClaimedJob, stage: str) -> bool:
+    return await renew_lease(session, job, stage=stage)
+
+
+async def complete_job(session, job: ClaimedJob, stages: dict) -> bool:
+    """Mark the job done; False (nothing written) when its lease was lost."""
+    result = await session.execute(
+        update(IngestJob)
+        .where(_owned(job))
+        .values(
+            status="done", stage="done", stages=stages, last_error=None,
+            locked_by=None, finished_at=func.now(),
+        )
+    )
+    return result.rowcount > 0
+
+
+async def fail_job(
+    session, job: ClaimedJob, error: str, *, backoff_seconds: int,
+) -> bool | None:
+    """Record a failed attempt; requeue with backoff while attempts remain.
+
+    Returns True when the job was requeued, False when it is now failed and
+    None (nothing written) when its lease was lost to another worker.
+    """
+    values: dict = {"last_error": error[:2000], "locked_by": None}
+    retry = job.attempts < job.max_attempts
+    if retry:
+        delay = timedelta(seconds=backoff_seconds * 2 ** (job.attempts - 1))
+        values.update(status="queued", run_after=func.now() + delay)
+    else:
+        values.update(status="failed", finished_at=func.now())
+    result = await session.execute(
+        update(IngestJob).where(_owned(job)).values(**values)
+    )
+    return retry if result.rowcount else None
+
+
+def _rollup(outcomes: dict[str, dict[str, int]]) -> str:
+    """One status for the enrichment stages' checkpoint counts."""
+    if not outcomes:
+        return "skipped"
+    counts = outcomes.values()
+    if all(c["failed"] == 0 and c["missing"] == 0 for c in counts):
+        return "done"
+    return "partial" if any(c["done"] for c in counts) else "failed"
+
+
+async def _stage_summary(session, job: ClaimedJob, result) -> dict:
+    """Per-stage outcome of a finished ingest, stored on the job.
+
+    "report" and "rankings" are "unchanged" when a re-ingest kept every fight
+    and performance as stored, and "rankings" is "partial" when kills came
+    back without rankings. "enrichment" rolls up the report's
+    ``fight_stage_status`` checkpoints for the job's stages.
+    """
+    unchanged = bool(result.fights) and result.fights_unchanged == result.fights
+    if result.rankings_missing:
+        rankings = "partial"
+    elif unchanged and not result.performances:
+        rankings = "unchanged"
+    else:
+        rankings = "done"
+    stages = requested_stages(
+        ingest_tables=job.with_tables, ingest_events=job.with_events,
+    )
+    outcomes = await stage_outcomes(session, job.report_code, stages) if stages else {}
+    return {
+        "report": "unchanged" if unchanged else "done",
+        "rankings": rankings,
+        "enrichment": _rollup(outcomes),
+        "enrichment_stages": outcomes,
+        "fights": result.fights,
+        "fights_unchanged": result.fights_unchanged,
+        "rankings_missing": list(result.rankings_missing),
+        "rows_changed": result.rows.changed,
+        "performances": result.performances,
+        "table_rows": result.table_rows,
+        "event_rows": result.event_rows,
+        "enrichment_errors": list(result.enrichment_errors),
+    }
+
+
+class IngestWorkerPool:
+    """N async workers draining ``ingest_jobs``.
+
+    Throughput scales with ``workers`` up to what the shared WCL scheduler
+    lets through; each worker's client uses the job's priority class.
+    """
+
+    def __init__(
+        self, settings, session_factory, wcl_factory: WCLClientFactory,
+        *, workers: int | None = None,
+    ):
+        self.settings = settings
+        self._session_factory = session_factory
+        self._wcl_factory = wcl_factory
+        cfg = settings.ingest_queue
+        self.workers = cfg.workers if workers is None else workers
+        self._lease = timedelta(minutes=cfg.lease_minutes)
+        self._tasks: list[asyncio.Task] = []
+        self._worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self._stats: dict = {
+            "claimed": 0, "done": 0, "retried": 0, "failed": 0, "lease_lost": 0,
+        }
+        self._running: dict[str, str] = {}  # worker_id -> report_code
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._worker(self.worker_id(i)))
+            for i in range(self.workers)
+        ]
+        logger.info("Ingest worker pool started (%d workers)", self.workers)
+
+    def worker_id(self, index: int) -> str:
+        """Lock owner recorded on claimed jobs: host:pid:index."""
+        return f"{self._worker_prefix}:{index}"
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._tasks = []
+        logger.info("Ingest worker pool stopped")
+
+    async def _worker(self, worker_id: str) -> None:
+        idle = self.settings.ingest_queue.idle_poll_seconds
+        while True:
+            try:
+                ran = await self.run_once(worker_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Ingest worker %s failed to claim a job", worker_id)
+                ran = False
+            if not ran:
+                await asyncio.sleep(idle)
+
+    async def run_once(self, worker_id: str) -> bool:
+        """Claim and run one job; False when nothing was runnable."""
+        async with self._session_factory() as session, session.begin():
+            await fail_expired_jobs(session, lease=self._lease)
+            job = await claim_next_job(session, worker_id, lease=self._lease)
+        if job is None:
+            return False
+        self._stats["claimed"] += 1
+        self._running[worker_id] = job.report_code
+        try:
+            await self._run_job(job)
+        finally:
+            del self._running[worker_id]
+        return True
+
+    async def _set_stage(self, job: ClaimedJob, stage: str) -> None:
+        async with self._session_factory() as session, session.begin():
+            await set_job_stage(session, job, stage)
+
+    async def _heartbeat(self, job: ClaimedJob) -> None:
+        """Renew the job's lease every third of it while the job runs.
+
+        Progress callbacks only fire between stages; a single long stage
+        (a big report's events) must not let the lease lapse mid-ingest.
+        """
+        interval = self._lease.total_seconds() / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with self._session_factory() as session, session.begin():
+                    owned = await renew_lease(session, job)
+            except Exception:
+                logger.warning("Failed to renew lease of ingest job %d", job.id)
+                continue
+            if not owned:
+                logger.warning(
+                    "Ingest job %d (%s) lease taken over by another worker",
+                    job.id, job.report_code,
+                )
+                return
+
+    async def _run_job(self, job: ClaimedJob) -> None:
+        logger.info(
+            "Ingesting %s (job %d, attempt %d/%d)",
+            job.report_code, job.id, job.attempts, job.max_attempts,
+        )
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            await self._ingest_job(job)
+        finally:
+            heartbeat.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await heartbeat
+
+    async def _ingest_job(self, job: ClaimedJob) -> None:
+        cfg = self.settings
+        try:
+            async with self._session_factory() as session:
+                char_result = await session.execute(select(MyCharacter.name))
+                my_names = {row[0] for row in char_result}
+
+            async with (
+                self._wcl_factory(priority=Priority(job.priority)) as wcl,
+                self._session_factory() as session,
+                session.begin(),
+            ):
+                result = await ingest_report(
+                    wcl, session, job.report_code,
+                    my_character_names=my_names,
+                    ingest_tables=job.with_tables,
+                    ingest_events=job.with_events,
+                    enrichment_concurrency=cfg.auto_ingest.enrichment_concurrency,
+                    progress=lambda stage: self._set_stage(job, stage),
+                )
+        except Exception as exc:
+            logger.exception("Ingest job %d (%s) failed", job.id, job.report_code)
+            async with self._session_factory() as session, session.begin():
+                retried = await fail_job(
+                    session, job, f"{type(exc).__name__}: {exc}",
+                    backoff_seconds=cfg.ingest_queue.retry_backoff_seconds,
+                )
+            if retried is None:
+                self._lease_lost(job)
+            else:
+                self._stats["retried" if retried else "failed"] += 1
+            return
+
+        # Snapshot in separate transaction after commit
+        try:
+            await self._set_stage(job, "snapshot")
+            async with self._session_factory() as session, session.begin():
+                from shukketsu.pipeline.progression import snapshot_all_characters
+
+                await snapshot_all_characters(session)
+            snapshot = "done"
+        except Exception:
+            logger.exception(
+                "Failed to snapshot progression after ingest of %s", job.report_code,
+            )
+            snapshot = "failed"
+
+        async with self._session_factory() as session, session.begin():
+            stages = await _stage_summary(session, job, result)
+            stages["snapshot"] = snapshot
+            completed = await complete_job(session, job, stages)
+        if not completed:
+            self._lease_lost(job)
+            return
+        self._stats["done"] += 1
+        logger.info(
+            "Ingest job %d done: %s (%d fights, %d enrichment errors)",
+            job.id, job.report_code, result.fights, len(result.enrichment_errors),
+        )
+
+    def _lease_lost(self, job: ClaimedJob) -> None:
+        # Another worker re-claimed the job after its lease expired; its
+        # outcome is that worker's to record
+        logger.warning(
+            "Ingest job %d (%s) no longer leased to %s; outcome not recorded",
+            job.id, job.report_code, job.locked_by,
+        )
+        self._stats["lease_lost"] += 1
+
+    def get_status(self) -> dict:
+        return {
+            "workers": self.workers,
+            "running": dict(self._running),
+            "stats": dict(self._stats),
+        }
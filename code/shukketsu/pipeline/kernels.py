@@ -0,0 +1,261 @@
+"""Array kernels behind the cast and resource metrics.
+
+Cast timestamps and resource readings are kept as int64 ``array("q")``
+columns; these functions reduce them to the numbers the pipelines store.
+Each kernel has a pure-Python implementation and, when NumPy is installed
+(``pip install shukketsu[numpy]``), a vectorized one that works on the same
+buffers without copying. Both produce identical integers; the NumPy path is
+only taken for series long enough to amortize the array setup.
+"""
+
+from array import array
+from dataclasses import dataclass
+from itertools import islice
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised when numpy is absent
+    np = None
+
+# "auto" uses NumPy when available for series of at least _NUMPY_MIN_LEN
+# points; "python" / "numpy" force one implementation (parity tests, benches).
+BACKENDS = ("auto", "python", "numpy")
+_backend = "auto"
+_NUMPY_MIN_LEN = 64
+
+
+def set_backend(name: str) -> None:
+    """Select the kernel implementation for subsequent calls."""
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown kernel backend {name!r}; expected one of {BACKENDS}")
+    if name == "numpy" and np is None:
+        raise RuntimeError(
+            "numpy kernel backend requested but numpy is not installed. "
+            "Install with: pip install shukketsu[numpy]"
+        )
+    _backend = name
+
+
+def get_backend() -> str:
+    return _backend
+
+
+def _vectorize(n: int) -> bool:
+    if _backend == "python" or np is None:
+        return False
+    return _backend == "numpy" or n >= _NUMPY_MIN_LEN
+
+
+def _as_int64(values: array):
+    return np.frombuffer(values, dtype=np.int64)
+
+
+@dataclass(frozen=True, slots=True)
+class GcdStats:
+    """GCD accounting over one player's ordered cast timestamps."""
+
+    active_time_ms: int
+    gap_count: int
+    gap_total_ms: int
+    longest_gap_ms: int
+    longest_gap_at_ms: int
+
+
+def gcd_stats(timestamps: array, gcd_ms: int, gap_threshold_ms: int) -> GcdStats:
+    """Credit ``min(gcd_ms, gap_to_next)`` to every cast but the last.
+
+    Gaps longer than ``gap_threshold_ms`` are counted and summed; the longest
+    one (first on ties) is reported with the timestamp of the cast opening it.
+    """
+    if len(timestamps) < 2:
+        return GcdStats(0, 0, 0, 0, 0)
+    if _vectorize(len(timestamps)):
+        return _gcd_stats_numpy(timestamps, gcd_ms, gap_threshold_ms)
+    return _gcd_stats_python(timestamps, gcd_ms, gap_threshold_ms)
+
+
+def _gcd_stats_python(
+    timestamps: array, gcd_ms: int, gap_threshold_ms: int,
+) -> GcdStats:
+    active = gap_count = gap_total = longest = longest_at = 0
+    prev = timestamps[0]
+    for ts in islice(timestamps, 1, None):
+        gap = ts - prev
+        active += gap if gap < gcd_ms else gcd_ms
+        if gap > gap_threshold_ms:
+            gap_count += 1
+            gap_total += gap
+            if gap > longest:
+                longest = gap
+                longest_at = prev
+        prev = ts
+    return GcdStats(active, gap_count, gap_total, longest, longest_at)
+
+
+def _gcd_stats_numpy(
+    timestamps: array, gcd_ms: int, gap_threshold_ms: int,
+) -> GcdStats:
+    ts = _as_int64(timestamps)
+    gaps = np.diff(ts)
+    active = int(np.minimum(gaps, gcd_ms).sum())
+    long_gaps = gaps[gaps > gap_threshold_ms]
+    if not long_gaps.size:
+        return GcdStats(active, 0, 0, 0, 0)
+    # argmax returns the first maximum, matching the strict ">" scan
+    i = int(np.argmax(gaps))
+    return GcdStats(
+        active, int(long_gaps.size), int(long_gaps.sum()),
+        int(gaps[i]), int(ts[i]),
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class ResourceStats:
+    """Summary of one resource series (before the trailing-zero adjustment)."""
+
+    min_value: int
+    max_value: int
+    total: int
+    time_at_zero_ms: int
+
+
+def resource_stats(timestamps: array, amounts: array) -> ResourceStats:
+    """Min/max/sum of ``amounts`` and time spent at zero between readings.
+
+    Zero time runs from a zero reading until the next reading; a trailing
+    zero is left to the caller, which knows where the fight ends. Series
+    must be non-empty.
+    """
+    if _vectorize(len(amounts)):
+        return _resource_stats_numpy(timestamps, amounts)
+    return _resource_stats_python(timestamps, amounts)
+
+
+def _resource_stats_python(timestamps: array, amounts: array) -> ResourceStats:
+    zero_ms = 0
+    for i in range(len(amounts) - 1):
+        if amounts[i] == 0:
+            zero_ms += max(0, timestamps[i + 1] - timestamps[i])
+    return ResourceStats(min(amounts), max(amounts), sum(amounts), zero_ms)
+
+
+def _resource_stats_numpy(timestamps: array, amounts: array) -> ResourceStats:
+    ts = _as_int64(timestamps)
+    values = _as_int64(amounts)
+    durations = np.diff(ts)[values[:-1] == 0]
+    zero_ms = int(np.maximum(durations, 0).sum())
+    return ResourceStats(
+        int(values.min()), int(values.max()), int(values.sum()), zero_ms,
+    )
+
+
+DOWNSAMPLE_METHODS = ("lttb", "minmax")
+
+
+def downsample_indices(
+    timestamps: array, amounts: array, target: int, method: str = "lttb",
+) -> list[int]:
+    """Indices (ascending) of at most ``target`` readings that keep the series' shape.
+
+    ``"lttb"`` is Largest-Triangle-Three-Buckets: first and last reading plus,
+    per bucket in between, the reading spanning the largest triangle with the
+    previous pick and the next bucket's mean. ``"minmax"`` keeps the lowest and
+    highest reading of ``target // 2`` buckets, so no dip or spike is lost.
+    Both run in linear time and use integer arithmetic only, so the NumPy and
+    Python paths pick the same readings.
+    """
+    n = len(amounts)
+    if n <= target:
+        return list(range(n))
+    if method == "lttb":
+        if target < 3:
+            return [0, n - 1][:target]
+        if _vectorize(n):
+            return _lttb_numpy(_as_int64(timestamps), _as_int64(amounts), target)
+        return _lttb_python(timestamps, amounts, target)
+    if method == "minmax":
+        if _vectorize(n):
+            return _minmax_numpy(_as_int64(amounts), target)
+        return _minmax_python(amounts, target)
+    raise ValueError(
+        f"Unknown downsample method {method!r}; expected one of {DOWNSAMPLE_METHODS}"
+    )
+
+
+def _lttb_bounds(n: int, target: int, bucket: int) -> int:
+    # Start of an inner bucket; buckets split readings 1..n-2 evenly
+    return bucket * (n - 2) // (target - 2) + 1
+
+
+def _lttb_python(timestamps: array, amounts: array, target: int) -> list[int]:
+    n = len(amounts)
+    picks = [0]
+    a = 0
+    for bucket in range(target - 2):
+        start = _lttb_bounds(n, target, bucket)
+        end = _lttb_bounds(n, target, bucket + 1)
+        next_end = _lttb_bounds(n, target, bucket + 2) if bucket < target - 3 else n
+        # Next bucket's mean, kept as (count, sum_t, sum_v) to stay integral
+        count = next_end - end
+        sum_t = sum(timestamps[end:next_end])
+        sum_v = sum(amounts[end:next_end])
+        at, av = timestamps[a], amounts[a]
+        dx = at * count - sum_t
+        dy = sum_v - av * count
+        best, best_area = start, -1
+        for j in range(start, end):
+            area = abs(dx * (amounts[j] - av) - (at - timestamps[j]) * dy)
+            if area > best_area:
+                best, best_area = j, area
+        picks.append(best)
+        a = best
+    picks.append(n - 1)
+    return picks
+
+
+def _lttb_numpy(ts, values, target: int) -> list[int]:
+    n = len(values)
+    picks = [0]
+    a = 0
+    for bucket in range(target - 2):
+        start = _lttb_bounds(n, target, bucket)
+        end = _lttb_bounds(n, target, bucket + 1)
+        next_end = _lttb_bounds(n, target, bucket + 2) if bucket < target - 3 else n
+        count = next_end - end
+        sum_t = int(ts[end:next_end].sum())
+        sum_v = int(values[end:next_end].sum())
+        at, av = int(ts[a]), int(values[a])
+        dx = at * count - sum_t
+        dy = sum_v - av * count
+        areas = np.abs(dx * (values[start:end] - av) - (at - ts[start:end]) * dy)
+        a = start + int(np.argmax(areas))
+        picks.append(a)
+    picks.append(n - 1)
+    return picks
+
+
+def _minmax_python(amounts: array, target: int) -> list[int]:
+    n = len(amounts)
+    buckets = max(1, target // 2)
+    picks: list[int] = []
+    for bucket in range(buckets):
+        span = range(bucket * n // buckets, (bucket + 1) * n // buckets)
+        lo = min(span, key=amounts.__getitem__)
+        hi = max(span, key=amounts.__getitem__)
+        picks.extend(sorted({lo, hi}))
+    return picks
+
+
+def _minmax_numpy(values, target: int) -> list[int]:
+    n = len(values)
+    buckets = max(1, target // 2)
+    picks: list[int] = []
+    for bucket in range(buckets):
+        start = bucket * n // buckets
+        chunk = values[start:(bucket + 1) * n // buckets]
+        lo = start + int(np.argmin(chunk))
+        hi = start + int(np.argmax(chunk))
+        picks.extend(sorted({lo, hi}))
+    return picks
+
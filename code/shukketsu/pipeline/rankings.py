@@ -9,9 +9,11 @@ import logging
 from dataclasses import dataclass, field
 from datetime import UTC, datetime, timedelta
 
-from sqlalchemy import delete, func, select
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
-from shukketsu.db.models import TopRanking
+from shukketsu.db.models import RankingFetch, TopRanking
+from shukketsu.db.upsert import UpsertStats, collect_upsert_stats, upsert_rows
 from shukketsu.utils import ensure_utc
 
 logger = logging.getLogger(__name__)
@@ -72,6 +74,43 @@ class RankingsResult:
     fetched: int = 0
     skipped: int = 0
     errors: list[str] = field(default_factory=list)
+    # What the fetches actually changed in top_rankings
+    rows: UpsertStats = field(default_factory=UpsertStats)
+
+
+async def last_fetched(
+    session, kind: str, encounter_id: int,
+    class_name: str = "", spec_name: str = "", metric: str = "",
+) -> datetime | None:
+    """When a rankings combo was last fetched (``RankingFetch``), or None."""
+    result = await session.execute(
+        select(RankingFetch.fetched_at).where(
+            RankingFetch.kind == kind,
+            RankingFetch.encounter_id == encounter_id,
+            RankingFetch.class_ == class_name,
+            RankingFetch.spec == spec_name,
+            RankingFetch.metric == metric,
+        )
+    )
+    return result.scalar_one_or_none()
+
+
+async def mark_fetched(
+    session, kind: str, encounter_id: int,
+    class_name: str = "", spec_name: str = "", metric: str = "",
+) -> None:
+    """Record that a rankings combo was just fetched."""
+    stmt = pg_insert(RankingFetch).values(
+        kind=kind, encounter_id=encounter_id,
+        class_=class_name, spec=spec_name, metric=metric,
+    )
+    await session.execute(stmt.on_conflict_do_update(
+        index_elements=[
+            RankingFetch.kind, RankingFetch.encounter_id, RankingFetch.class_,
+            RankingFetch.spec, RankingFetch.metric,
+        ],
+        set_={"fetched_at": func.now()},
+    ))
 
 
 async def fetch_rankings_for_spec(
@@ -84,8 +123,9 @@ async def fetch_rankings_for_spec(
 ) -> int:
     """Fetch rankings for one encounter/class/spec combo.
 
-    Deletes existing rows for this combo, inserts fresh data.
-    Returns count of rankings inserted.
+    Upserts the combo's rows by rank position (rows past the new list are
+    removed) and records the fetch in ``ranking_fetches``.
+    Returns count of rankings fetched.
     """
     from shukketsu.wcl.queries import ZONE_RANKINGS
 
@@ -108,19 +148,15 @@ async def fetch_rankings_for_spec(
         raw_rankings, encounter_id, class_name, spec_name, metric
     )
 
-    # Delete existing rows for this combo
-    await session.execute(
-        delete(TopRanking).where(
-            TopRanking.encounter_id == encounter_id,
-            TopRanking.class_ == class_name,
-            TopRanking.spec == spec_name,
-            TopRanking.metric == metric,
-        )
+    await upsert_rows(session, TopRanking, rankings, scope=[
+        TopRanking.encounter_id == encounter_id,
+        TopRanking.class_ == class_name,
+        TopRanking.spec == spec_name,
+        TopRanking.metric == metric,
+    ])
+    await mark_fetched(
+        session, "top", encounter_id, class_name, spec_name, metric,
     )
-
-    for r in rankings:
-        session.add(r)
-
     return len(rankings)
 
 
@@ -156,17 +192,12 @@ async def ingest_all_rankings(
                 try:
                     # Check staleness (unless force)
                     if not force:
-                        existing = await session.execute(
-                            select(func.max(TopRanking.fetched_at)).where(
-                                TopRanking.encounter_id == enc_id,
-                                TopRanking.class_ == spec.class_name,
-                                TopRanking.spec == spec.spec_name,
-                                TopRanking.metric == metric,
-                            )
+                        fetched_at = await last_fetched(
+                            session, "top", enc_id,
+                            spec.class_name, spec.spec_name, metric,
                         )
-                        last_fetched = existing.scalar_one_or_none()
-                        if last_fetched:
-                            aware = ensure_utc(last_fetched)
+                        if fetched_at:
+                            aware = ensure_utc(fetched_at)
                             if aware > cutoff:
                                 result.skipped += 1
                                 logger.debug(
@@ -180,15 +211,17 @@ async def ingest_all_rankings(
                                 )
                                 continue
 
-                    count = await fetch_rankings_for_spec(
-                        wcl,
-                        session,
-                        enc_id,
-                        spec.class_name,
-                        spec.spec_name,
-                        metric,
-                    )
+                    with collect_upsert_stats() as rows:
+                        count = await fetch_rankings_for_spec(
+                            wcl,
+                            session,
+                            enc_id,
+                            spec.class_name,
+                            spec.spec_name,
+                            metric,
+                        )
                     result.fetched += 1
+                    result.rows.add(rows)
                     logger.info(
                         "[%d/%d] Fetched %d rankings: %s %s on %d (%s)",
                         progress,
@@ -0,0 +1,315 @@
+"""Event enrichment stages fetched once per report and demultiplexed by fight.
+
+Each event data type (CombatantInfo, Deaths, Casts, Resources) is paginated
+once over the whole report span (``stream_events_by_fight``) instead of once
+per fight. Every page is split by fight and fed straight into the per-fight
+streams the pipelines provide (``CastEventsStream`` etc.), which parse it and
+update running aggregates, so raw events never accumulate beyond one page.
+Derived rows are staged when a fight's stream finishes and upserted by natural
+key once per table for the whole report, so a re-ingest only writes what
+changed and a stage costs a handful of statements rather than a few per
+fight. Used by both the sequential path in ``ingest_report`` and
+``pipeline.enrichment``. Each fight's raw pages are also kept, compressed, in
+``event_archives`` (see ``pipeline.event_archive``) so derived rows can be
+recomputed without refetching.
+"""
+
+import logging
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Any
+
+from shukketsu.db.models import EventArchive
+from shukketsu.db.upsert import UpsertBatch
+from shukketsu.pipeline import (
+    cast_events,
+    combatant_info,
+    death_events,
+    resource_events,
+)
+from shukketsu.pipeline.event_archive import ArchiveWriter, archive_context
+from shukketsu.wcl.events import stream_events_by_fight
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class EventStage:
+    data_type: str  # WCL EventDataType
+    label: str  # for log messages
+    error_prefix: str
+    # True: enrichment_errors get one "<prefix>_fight_<id>" entry per failed
+    # fight. False: one "<prefix>" entry that marks every fight failed.
+    per_fight_errors: bool = True
+    # Server-side narrowing (filter_expression / hostility_type) the stage needs
+    filters: Mapping[str, str] = field(default_factory=dict)
+
+    def error_for(self, fight) -> str:
+        if self.per_fight_errors:
+            return f"{self.error_prefix}_fight_{fight.fight_id}"
+        return self.error_prefix
+
+    def fetch_errors(self, fights: list) -> list[str]:
+        """enrichment_errors entries when the report-level fetch fails."""
+        return list(dict.fromkeys(self.error_for(fight) for fight in fights))
+
+
+EVENT_STAGES = [
+    EventStage(
+        "CombatantInfo", "combatant info", "combatant_info",
+        per_fight_errors=False, filters=combatant_info.COMBATANT_INFO_FILTER,
+    ),
+    EventStage(
+        "Deaths", "death events", "death_events",
+        filters=death_events.DEATH_EVENTS_FILTER,
+    ),
+    EventStage(
+        "Casts", "cast events", "cast_events",
+        filters=cast_events.CAST_EVENTS_FILTER,
+    ),
+    EventStage(
+        "Resources", "resource data", "resource_events",
+        filters=resource_events.RESOURCE_EVENTS_FILTER,
+    ),
+]
+
+
+def stream_stage_events(wcl, report_code: str, fights: list, stage: EventStage):
+    """Async iterator of per-page fight_id -> events for one stage."""
+    return stream_events_by_fight(
+        wcl, report_code, fights, stage.data_type, **stage.filters,
+    )
+
+
+async def prepare_stage_for_fights(session, stage: EventStage, fights: list) -> None:
+    """Clear what a stage's streams cannot upsert before they write ``fights``.
+
+    Only legacy per-cast ``cast_events`` rows lack a natural key; every
+    stage's rows are upserted (and stale ones removed) when the streams
+    finish.
+    """
+    if stage.data_type == "Casts" and fights:
+        await cast_events.delete_cast_events_for_fights(
+            session, [fight.id for fight in fights],
+        )
+
+
+async def delete_stage_for_fights(session, stage: EventStage, fights: list) -> None:
+    """Delete all of ``fights``' rows for ``stage`` (drops failed writes)."""
+    fight_ids = [fight.id for fight in fights]
+    if not fight_ids:
+        return
+    if stage.data_type == "CombatantInfo":
+        await combatant_info.delete_combatant_info_for_fights(session, fight_ids)
+    elif stage.data_type == "Deaths":
+        await death_events.delete_death_details_for_fights(session, fight_ids)
+    elif stage.data_type == "Casts":
+        await cast_events.delete_cast_data_for_fights(session, fight_ids)
+    elif stage.data_type == "Resources":
+        await resource_events.delete_resource_snapshots_for_fights(session, fight_ids)
+    else:
+        raise ValueError(f"Unknown event stage: {stage.data_type}")
+
+
+def open_stage_stream(
+    session,
+    report_code: str,
+    stage: EventStage,
+    fight,
+    actor_name_by_id: dict[int, str],
+    player_class_map: dict[str, str],
+    *,
+    upserts: UpsertBatch | None = None,
+):
+    """Per-fight stream with ``add(events)`` and ``finish() -> rows``.
+
+    With a shared ``upserts`` batch the stream only stages its rows there;
+    the caller flushes it once all streams have finished.
+    """
+    if stage.data_type == "CombatantInfo":
+        return combatant_info.CombatantInfoStream(
+            session, report_code, fight, upserts=upserts,
+        )
+    if stage.data_type == "Deaths":
+        return death_events.DeathEventsStream(
+            session, report_code, fight, upserts=upserts,
+        )
+    if stage.data_type == "Casts":
+        return cast_events.CastEventsStream(
+            session, report_code, fight, actor_name_by_id, player_class_map,
+            upserts=upserts,
+        )
+    if stage.data_type == "Resources":
+        return resource_events.ResourceEventsStream(
+            session, report_code, fight, actor_name_by_id, upserts=upserts,
+        )
+    raise ValueError(f"Unknown event stage: {stage.data_type}")
+
+
+class StageWriter:
+    """Writes one stage's demultiplexed pages into per-fight streams.
+
+    Rows without a natural key are cleared for every fight on the first call
+    (see ``prepare_stage_for_fights``); each page is handed to the fights'
+    streams and then dropped. The streams share one ``UpsertBatch``, flushed
+    by ``finish()``, so each table is written with a few statements for the
+    whole report. Pages are also compressed into each fight's
+    ``event_archives`` row, written with the same flush. A fight whose write
+    fails is recorded in ``errors``, its partial rows are removed (and its
+    archive dropped), and later pages skip it. All methods touch the
+    session, so only one coroutine may drive a writer.
+    """
+
+    def __init__(
+        self,
+        session,
+        report_code: str,
+        stage: EventStage,
+        fights: list,
+        actor_name_by_id: dict[int, str],
+        player_class_map: dict[str, str],
+    ) -> None:
+        self._session = session
+        self._report_code = report_code
+        self.stage = stage
+        self._fights = fights
+        self._actor_name_by_id = actor_name_by_id
+        self._player_class_map = player_class_map
+        self._streams: dict[int, Any] | None = None
+        self._archives: dict[int, ArchiveWriter] = {}
+        self._failed: set[int] = set()
+        self._upserts = UpsertBatch(session)
+        self.errors: list[str] = []
+
+    async def _start(self) -> dict[int, Any]:
+        if self._streams is None:
+            self._streams = {}
+            try:
+                await prepare_stage_for_fights(self._session, self.stage, self._fights)
+            except Exception:
+                for fight in self._fights:
+                    await self._fail(fight, cleanup=False)
+                return self._streams
+            context = archive_context(self._actor_name_by_id, self._player_class_map)
+            for fight in self._fights:
+                self._streams[fight.fight_id] = open_stage_stream(
+                    self._session, self._report_code, self.stage, fight,
+                    self._actor_name_by_id, self._player_class_map,
+                    upserts=self._upserts,
+                )
+                self._archives[fight.fight_id] = ArchiveWriter(
+                    fight.id, self.stage.data_type, context,
+                )
+        return self._streams
+
+    async def _fail(self, fight, *, cleanup: bool = True) -> None:
+        logger.exception(
+            "Failed to ingest %s for fight %d in %s",
+            self.stage.label, fight.fight_id, self._report_code,
+        )
+        self._failed.add(fight.fight_id)
+        if self._streams is not None:
+            self._streams.pop(fight.fight_id, None)
+        self._archives.pop(fight.fight_id, None)
+        error = self.stage.error_for(fight)
+        if error not in self.errors:
+            self.errors.append(error)
+        if cleanup:
+            try:
+                await delete_stage_for_fights(self._session, self.stage, [fight])
+            except Exception:
+                logger.exception(
+                    "Failed to remove partial %s for fight %d in %s",
+                    self.stage.label, fight.fight_id, self._report_code,
+                )
+
+    async def add(self, by_fight: dict[int, list[dict]]) -> None:
+        """Write one page of events, already split by fight."""
+        streams = await self._start()
+        for fight in self._fights:
+            events = by_fight.get(fight.fight_id)
+            stream = streams.get(fight.fight_id)
+            if not events or stream is None:
+                continue
+            try:
+                self._archives[fight.fight_id].add(events)
+                await stream.add(events)
+            except Exception:
+                await self._fail(fight)
+
+    async def finish(self) -> tuple[int, list[str]]:
+        """Finish every fight's stream and write the batched rows.
+
+        Returns (rows, enrichment_errors).
+        """
+        streams = await self._start()
+        rows: dict[int, int] = {}
+        for fight in self._fights:
+            stream = streams.get(fight.fight_id)
+            if stream is None:
+                continue
+            try:
+                rows[fight.fight_id] = await stream.finish()
+                self._upserts.add(
+                    EventArchive, [self._archives.pop(fight.fight_id).finish()],
+                    fight_id=fight.id, data_type=self.stage.data_type,
+                )
+            except Exception:
+                await self._fail(fight)
+        try:
+            await self._upserts.flush()
+        except Exception:
+            # One statement covers every fight, so they all failed
+            for fight in self._fights:
+                if fight.fight_id not in self._failed:
+                    await self._fail(fight, cleanup=False)
+            return 0, self.errors
+        return sum(rows.values()), self.errors
+
+    async def abort(self) -> list[str]:
+        """The fetch failed mid-stream: drop partial rows, report the stage."""
+        if self._streams is not None:
+            written = [f for f in self._fights if f.fight_id not in self._failed]
+            try:
+                await delete_stage_for_fights(self._session, self.stage, written)
+            except Exception:
+                logger.exception(
+                    "Failed to remove partial %s for %s",
+                    self.stage.label, self._report_code,
+                )
+        errors = list(self.errors)
+        for error in self.stage.fetch_errors(self._fights):
+            if error not in errors:
+                errors.append(error)
+        return errors
+
+
+async def ingest_stage_for_fights(
+    wcl,
+    session,
+    report_code: str,
+    stage: EventStage,
+    fights: list,
+    actor_name_by_id: dict[int, str],
+    player_class_map: dict[str, str],
+) -> tuple[int, list[str]]:
+    """Stream one stage for the whole report, writing each page as it arrives.
+
+    At most one page of raw events is held at a time.
+
+    Returns:
+        (rows stored, enrichment_errors entries).
+    """
+    writer = StageWriter(
+        session, report_code, stage, fights, actor_name_by_id, player_class_map,
+    )
+    try:
+        async for by_fight in stream_stage_events(wcl, report_code, fights, stage):
+            await writer.add(by_fight)
+    except Exception:
+        logger.exception(
+            "Failed to fetch %s for %s", stage.label, report_code,
+        )
+        return 0, await writer.abort()
+
+    return await writer.finish()
@@ -2,20 +2,184 @@
 
 import json
 import logging
-from collections import defaultdict
+from array import array
+from itertools import accumulate, pairwise
 
 from sqlalchemy import delete
 
 from shukketsu.db.models import ResourceSnapshot
-from shukketsu.wcl.events import fetch_all_events
+from shukketsu.db.upsert import UpsertBatch
+from shukketsu.pipeline.kernels import downsample_indices, resource_stats
+from shukketsu.wcl.events import PLAYER_SOURCE_FILTER, fetch_all_events
 
 logger = logging.getLogger(__name__)
 
 RESOURCE_TYPE_NAMES = {0: "Mana", 1: "Rage", 3: "Energy"}
 
-# Target number of samples for charting
+# Target number of samples for charting (the samples_json resolution)
 _TARGET_SAMPLES = 50
 
+# Resolutions kept in sample_levels_json so /resources can serve a denser
+# chart without recomputation
+SAMPLE_RESOLUTIONS = (_TARGET_SAMPLES, 500)
+
+# Downsampler per resource type (see kernels.downsample_indices). Rage and
+# energy swing in short bursts, so each bucket keeps its extremes; mana moves
+# in longer curves that LTTB follows with fewer points.
+DOWNSAMPLE_METHODS = {"Mana": "lttb", "Rage": "minmax", "Energy": "minmax"}
+
+# Only player resource changes are kept (compute_resource_snapshots skips the rest)
+RESOURCE_EVENTS_FILTER = {"filter_expression": PLAYER_SOURCE_FILTER}
+
+
+class _ResourceSeries:
+    """Compact (timestamp, amount) columns for one player's resource series."""
+
+    __slots__ = ("timestamps", "amounts")
+
+    def __init__(self) -> None:
+        self.timestamps = array("q")
+        self.amounts = array("q")
+
+
+class ResourceSnapshotAccumulator:
+    """Incremental per-player per-resource-type snapshots for one fight.
+
+    Events must be added in timestamp order (as WCL pages deliver them). Raw
+    event dicts are not retained: each series keeps int64 timestamp/amount
+    columns, reduced to min/max/avg, time-at-zero and chart samples by the
+    kernels in ``results()``.
+    """
+
+    def __init__(
+        self,
+        fight_id: int,
+        fight_duration_ms: int,
+        actors: dict[int, str],
+        fight_start_time: int = 0,
+    ) -> None:
+        self.fight_id = fight_id
+        self.fight_duration_ms = fight_duration_ms
+        self.fight_start_time = fight_start_time
+        self._actors = actors
+        self._series: dict[tuple[str, int], _ResourceSeries] = {}
+
+    def add(self, events: list[dict]) -> None:
+        for event in events:
+            source_id = event.get("sourceID")
+            player_name = self._actors.get(source_id)
+            if player_name is None:
+                continue
+
+            class_resources = event.get("classResources")
+            if not class_resources:
+                continue
+
+            resource_type_id = class_resources[0].get("type")
+            if resource_type_id is None:
+                continue
+
+            key = (player_name, resource_type_id)
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _ResourceSeries()
+            series.timestamps.append(event.get("timestamp", 0))
+            series.amounts.append(class_resources[0].get("amount", 0))
+
+    def results(self) -> list[ResourceSnapshot]:
+        """ResourceSnapshot rows ready for insertion."""
+        fight_duration_ms = self.fight_duration_ms
+        if fight_duration_ms <= 0:
+            return []
+
+        results: list[ResourceSnapshot] = []
+        for (player_name, resource_type_id), series in self._series.items():
+            resource_name = RESOURCE_TYPE_NAMES.get(resource_type_id)
+            if resource_name is None:
+                continue
+
+            amounts = series.amounts
+            timestamps = series.timestamps
+            stats = resource_stats(timestamps, amounts)
+            avg_val = stats.total / len(amounts)
+
+            # A trailing zero reading counts until the end of the fight
+            time_at_zero_ms = stats.time_at_zero_ms
+            if amounts[-1] == 0:
+                fight_end = (
+                    self.fight_start_time + fight_duration_ms
+                    if self.fight_start_time
+                    else timestamps[0] + fight_duration_ms
+                )
+                time_at_zero_ms += max(0, fight_end - timestamps[-1])
+
+            time_at_zero_pct = min(
+                round(time_at_zero_ms / fight_duration_ms * 100, 1), 100.0,
+            )
+
+            levels = _sample_levels(
+                timestamps, amounts, DOWNSAMPLE_METHODS.get(resource_name, "lttb"),
+            )
+            chart = levels[str(_TARGET_SAMPLES)]
+            samples = [
+                {"t": t, "v": v}
+                for t, v in zip(accumulate(chart["t"]), chart["v"], strict=True)
+            ]
+
+            results.append(ResourceSnapshot(
+                fight_id=self.fight_id,
+                player_name=player_name,
+                resource_type=resource_name,
+                min_value=stats.min_value,
+                max_value=stats.max_value,
+                avg_value=round(avg_val, 1),
+                time_at_zero_ms=time_at_zero_ms,
+                time_at_zero_pct=time_at_zero_pct,
+                samples_json=json.dumps(samples),
+                sample_levels_json=json.dumps(levels, separators=(",", ":")),
+            ))
+
+        return results
+
+
+def _sample_levels(timestamps: array, amounts: array, method: str) -> dict[str, dict]:
+    """Downsampled series per resolution, as columns with delta-coded timestamps.
+
+    A resolution is only stored when the series is longer than the previous
+    one (otherwise both would hold every reading).
+    """
+    levels: dict[str, dict] = {}
+    previous = 0
+    for resolution in SAMPLE_RESOLUTIONS:
+        if previous and len(amounts) <= previous:
+            break
+        indices = downsample_indices(timestamps, amounts, resolution, method)
+        picked = [timestamps[i] for i in indices]
+        levels[str(resolution)] = {
+            "t": picked[:1] + [b - a for a, b in pairwise(picked)],
+            "v": [amounts[i] for i in indices],
+        }
+        previous = resolution
+    return levels
+
+
+def decode_sample_level(
+    sample_levels_json: str, resolution: int,
+) -> tuple[int, list[dict[str, int]]]:
+    """Pick the stored level closest to ``resolution`` and expand it to points.
+
+    Uses the smallest stored resolution at or above the request, falling back
+    to the densest one. Returns ``(resolution, [{"t", "v"}, ...])``.
+    """
+    levels = json.loads(sample_levels_json)
+    stored = sorted(int(r) for r in levels)
+    chosen = next((r for r in stored if r >= resolution), stored[-1])
+    level = levels[str(chosen)]
+    return chosen, [
+        {"t": t, "v": v}
+        for t, v in zip(accumulate(level["t"]), level["v"], strict=True)
+    ]
+
 
 def compute_resource_snapshots(
     events: list[dict],
@@ -38,98 +202,63 @@ def compute_resource_snapshots(
     if not events or fight_duration_ms <= 0:
         return []
 
-    # Group events by (player_name, resource_type_id)
-    grouped: dict[tuple[str, int], list[dict]] = defaultdict(list)
-
-    for event in events:
-        source_id = event.get("sourceID")
-        player_name = actors.get(source_id)
-        if player_name is None:
-            continue
-
-        class_resources = event.get("classResources")
-        if not class_resources:
-            continue
-
-        resource_type_id = class_resources[0].get("type")
-        if resource_type_id is None:
-            continue
-
-        grouped[(player_name, resource_type_id)].append(event)
-
-    results: list[ResourceSnapshot] = []
-
-    for (player_name, resource_type_id), player_events in grouped.items():
-        resource_name = RESOURCE_TYPE_NAMES.get(resource_type_id)
-        if resource_name is None:
-            continue
-
-        # Sort events by timestamp
-        player_events.sort(key=lambda e: e.get("timestamp", 0))
-
-        # Extract resource amounts from classResources[0].amount
-        amounts: list[int] = []
-        timestamps: list[int] = []
-        for ev in player_events:
-            cr = ev["classResources"][0]
-            amount = cr.get("amount", 0)
-            amounts.append(amount)
-            timestamps.append(ev.get("timestamp", 0))
-
-        if not amounts:
-            continue
-
-        min_val = min(amounts)
-        max_val = max(amounts)
-        avg_val = sum(amounts) / len(amounts)
-
-        # Compute time_at_zero: walk events in order, accumulate time where
-        # resource == 0. For each event where amount == 0, the "zero time"
-        # extends from this event's timestamp until the next event's timestamp
-        # (or end of fight for the last event).
-        time_at_zero_ms = 0
-        for i, amount in enumerate(amounts):
-            if amount == 0:
-                if i < len(amounts) - 1:
-                    delta = timestamps[i + 1] - timestamps[i]
-                else:
-                    # Last event: count from this timestamp to end of fight.
-                    fight_end = (
-                        fight_start_time + fight_duration_ms
-                        if fight_start_time
-                        else timestamps[0] + fight_duration_ms
-                    )
-                    delta = fight_end - timestamps[i]
-                time_at_zero_ms += max(0, delta)
-
-        time_at_zero_pct = min(round(time_at_zero_ms / fight_duration_ms * 100, 1), 100.0)
-
-        # Build samples_json: downsample to ~_TARGET_SAMPLES data points
-        if len(amounts) <= _TARGET_SAMPLES:
-            samples = [
-                {"t": timestamps[i], "v": amounts[i]}
-                for i in range(len(amounts))
-            ]
-        else:
-            step = len(amounts) / _TARGET_SAMPLES
-            samples = []
-            for s in range(_TARGET_SAMPLES):
-                idx = int(s * step)
-                samples.append({"t": timestamps[idx], "v": amounts[idx]})
-
-        results.append(ResourceSnapshot(
-            fight_id=fight_id,
-            player_name=player_name,
-            resource_type=resource_name,
-            min_value=min_val,
-            max_value=max_val,
-            avg_value=round(avg_val, 1),
-            time_at_zero_ms=time_at_zero_ms,
-            time_at_zero_pct=time_at_zero_pct,
-            samples_json=json.dumps(samples),
-        ))
-
-    return results
+    acc = ResourceSnapshotAccumulator(
+        fight_id, fight_duration_ms, actors, fight_start_time,
+    )
+    acc.add(sorted(events, key=lambda e: e.get("timestamp", 0)))
+    return acc.results()
+
+
+async def delete_resource_snapshots_for_fights(session, fight_ids: list[int]) -> None:
+    """Delete the resource_snapshots of several fights in one statement."""
+    await session.execute(
+        delete(ResourceSnapshot).where(ResourceSnapshot.fight_id.in_(fight_ids))
+    )
+
+
+class ResourceEventsStream:
+    """Streams one fight's resource events into snapshot accumulators page by page.
+
+    Raw pages are dropped once folded in; ``finish()`` upserts the snapshots
+    (or, with ``upserts``, stages them there for the caller to flush).
+    """
+
+    def __init__(
+        self, session, report_code: str, fight, actors: dict[int, str],
+        *, upserts: UpsertBatch | None = None,
+    ) -> None:
+        self._session = session
+        self._report_code = report_code
+        self._fight = fight
+        self._upserts = upserts
+        self._saw_events = False
+        self._acc = ResourceSnapshotAccumulator(
+            fight.id, fight.end_time - fight.start_time, actors,
+            fight_start_time=fight.start_time,
+        )
+
+    async def add(self, events: list[dict]) -> None:
+        if events:
+            self._saw_events = True
+            self._acc.add(events)
+
+    async def finish(self) -> int:
+        """Store the snapshots and return how many the fight has."""
+        snapshots = self._acc.results() if self._saw_events else []
+        upserts = (
+            UpsertBatch(self._session) if self._upserts is None else self._upserts
+        )
+        upserts.add(ResourceSnapshot, snapshots, fight_id=self._fight.id)
+        if self._upserts is None:
+            await upserts.flush()
+        if not snapshots:
+            return 0
+
+        logger.info(
+            "Ingested %d resource snapshots for fight %d (%s)",
+            len(snapshots), self._fight.fight_id, self._report_code,
+        )
+        return len(snapshots)
 
 
 async def ingest_resource_data_for_fight(
@@ -141,6 +270,9 @@ async def ingest_resource_data_for_fight(
 ) -> int:
     """Fetch and ingest resource events for a single fight.
 
+    Pages are folded into running snapshots as they arrive (see
+    ``ResourceEventsStream``), so at most one page of raw events is held.
+
     Args:
         wcl: WCLClient instance.
         session: Async SQLAlchemy session.
@@ -149,37 +281,12 @@ async def ingest_resource_data_for_fight(
         actors: Mapping of WCL sourceID -> player_name.
 
     Returns:
-        Count of resource_snapshots rows inserted.
+        Count of resource_snapshots rows stored.
     """
-    # Delete existing resource_snapshots for this fight (idempotent)
-    await session.execute(
-        delete(ResourceSnapshot).where(ResourceSnapshot.fight_id == fight.id)
-    )
-
-    # Fetch resource events from WCL (async generator yields pages)
-    all_events: list[dict] = []
+    stream = ResourceEventsStream(session, report_code, fight, actors)
     async for page in fetch_all_events(
         wcl, report_code, fight.start_time, fight.end_time,
-        data_type="Resources",
+        data_type="Resources", **RESOURCE_EVENTS_FILTER,
     ):
-        all_events.extend(page)
-
-    if not all_events:
-        return 0
-
-    fight_duration_ms = fight.end_time - fight.start_time
-
-    # Compute snapshots and insert
-    snapshots = compute_resource_snapshots(
-        all_events, fight.id, fight_duration_ms, actors,
-        fight_start_time=fight.start_time,
-    )
-    for snapshot in snapshots:
-        session.add(snapshot)
-    await session.flush()
-
-    logger.info(
-        "Ingested %d resource snapshots for fight %d (%s)",
-        len(snapshots), fight.fight_id, report_code,
-    )
-    return len(snapshots)
+        await stream.add(page)
+    return await stream.finish()
@@ -0,0 +1,150 @@
+"""Lightweight row records emitted by the pipeline parse functions.
+
+Parsing builds plain ``__slots__`` dataclasses rather than SQLAlchemy ORM
+instances, so the hot loops (``parse_*``, the ``compute_*`` accumulators in
+``cast_events``) avoid instrumented attribute access and per-instance
+``InstanceState``. Fields mirror the model's columns (minus the autoincrement
+``id`` and server-defaulted columns) in table order. Rows convert at the
+persistence boundary: either directly through ``upsert_rows`` /
+``UpsertBatch`` (which read the column attributes) or to an ORM instance with
+``to_model()``. ``report_month`` (the partition key, see db.partitions) is
+left unset by the parsers and filled from the fight by ``UpsertBatch``.
+"""
+
+from dataclasses import dataclass, fields
+from datetime import date
+from typing import ClassVar
+
+from shukketsu.db.models import (
+    AbilityMetric,
+    BuffUptime,
+    CastEvent,
+    DeathDetail,
+    FightConsumable,
+    FightPerformance,
+    GearSnapshot,
+)
+
+
+class _Row:
+    __slots__ = ()
+    model: ClassVar[type]
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        # The model's table, for code that walks a row's columns
+        cls.__table__ = cls.model.__table__
+
+    def to_model(self):
+        """Build the (transient) ORM instance for ``session.add()``."""
+        return self.model(**{f.name: getattr(self, f.name) for f in fields(self)})
+
+
+@dataclass(slots=True)
+class CastEventRow(_Row):
+    model: ClassVar[type] = CastEvent
+
+    fight_id: int
+    player_name: str
+    timestamp_ms: int
+    spell_id: int
+    ability_name: str
+    event_type: str
+    target_name: str | None = None
+    report_month: date | None = None
+
+
+@dataclass(slots=True)
+class DeathDetailRow(_Row):
+    model: ClassVar[type] = DeathDetail
+
+    fight_id: int
+    player_name: str
+    death_index: int
+    timestamp_ms: int
+    killing_blow_ability: str
+    killing_blow_source: str
+    damage_taken_total: int
+    events_json: str
+    report_month: date | None = None
+
+
+@dataclass(slots=True)
+class AbilityMetricRow(_Row):
+    model: ClassVar[type] = AbilityMetric
+
+    fight_id: int
+    player_name: str
+    metric_type: str
+    ability_name: str
+    spell_id: int
+    total: int = 0
+    hit_count: int = 0
+    crit_count: int = 0
+    crit_pct: float = 0.0
+    pct_of_total: float = 0.0
+    overheal_total: int | None = None
+    report_month: date | None = None
+
+
+@dataclass(slots=True)
+class BuffUptimeRow(_Row):
+    model: ClassVar[type] = BuffUptime
+
+    fight_id: int
+    player_name: str
+    metric_type: str
+    ability_name: str
+    spell_id: int
+    uptime_pct: float = 0.0
+    stack_count: float = 0.0
+    report_month: date | None = None
+
+
+@dataclass(slots=True)
+class ConsumableRow(_Row):
+    model: ClassVar[type] = FightConsumable
+
+    fight_id: int
+    player_name: str
+    category: str
+    spell_id: int
+    ability_name: str
+    active: bool = True
+
+
+@dataclass(slots=True)
+class GearRow(_Row):
+    model: ClassVar[type] = GearSnapshot
+
+    fight_id: int
+    player_name: str
+    slot: int
+    item_id: int
+    item_level: int = 0
+    permanent_enchant: int | None = None
+    temporary_enchant: int | None = None
+    gems_json: str | None = None
+    report_month: date | None = None
+
+
+@dataclass(slots=True)
+class PerformanceRow(_Row):
+    model: ClassVar[type] = FightPerformance
+
+    fight_id: int
+    player_name: str
+    player_class: str
+    player_spec: str
+    player_server: str
+    total_damage: int = 0
+    dps: float = 0.0
+    total_healing: int = 0
+    hps: float = 0.0
+    parse_percentile: float | None = None
+    ilvl_parse_percentile: float | None = None
+    deaths: int = 0
+    interrupts: int = 0
+    dispels: int = 0
+    item_level: float | None = None
+    is_my_character: bool = False
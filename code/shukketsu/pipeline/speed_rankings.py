@@ -9,9 +9,9 @@ import logging
 from dataclasses import dataclass, field
 from datetime import UTC, datetime, timedelta
 
-from sqlalchemy import delete, func, select
-
 from shukketsu.db.models import SpeedRanking
+from shukketsu.db.upsert import UpsertStats, collect_upsert_stats, upsert_rows
+from shukketsu.pipeline.rankings import last_fetched, mark_fetched
 from shukketsu.utils import ensure_utc
 
 logger = logging.getLogger(__name__)
@@ -59,6 +59,8 @@ class SpeedRankingsResult:
     fetched: int = 0
     skipped: int = 0
     errors: list[str] = field(default_factory=list)
+    # What the fetches actually changed in speed_rankings
+    rows: UpsertStats = field(default_factory=UpsertStats)
 
 
 async def fetch_speed_rankings_for_encounter(
@@ -68,8 +70,9 @@ async def fetch_speed_rankings_for_encounter(
 ) -> int:
     """Fetch speed rankings for one encounter.
 
-    Deletes existing rows for this encounter, inserts fresh data.
-    Returns count of rankings inserted.
+    Upserts the encounter's rows by rank position (rows past the new list
+    are removed) and records the fetch in ``ranking_fetches``.
+    Returns count of rankings fetched.
     """
     from shukketsu.wcl.queries import SPEED_RANKINGS
 
@@ -87,16 +90,10 @@ async def fetch_speed_rankings_for_encounter(
     raw_rankings = data["worldData"]["encounter"]["fightRankings"]
     rankings = parse_speed_rankings(raw_rankings, encounter_id)
 
-    # Delete existing rows for this encounter
-    await session.execute(
-        delete(SpeedRanking).where(
-            SpeedRanking.encounter_id == encounter_id,
-        )
-    )
-
-    for r in rankings:
-        session.add(r)
-
+    await upsert_rows(session, SpeedRanking, rankings, scope=[
+        SpeedRanking.encounter_id == encounter_id,
+    ])
+    await mark_fetched(session, "speed", encounter_id)
     return len(rankings)
 
 
@@ -121,14 +118,9 @@ async def ingest_all_speed_rankings(
         try:
             # Check staleness (unless force)
             if not force:
-                existing = await session.execute(
-                    select(func.max(SpeedRanking.fetched_at)).where(
-                        SpeedRanking.encounter_id == enc_id,
-                    )
-                )
-                last_fetched = existing.scalar_one_or_none()
-                if last_fetched:
-                    aware = ensure_utc(last_fetched)
+                fetched_at = await last_fetched(session, "speed", enc_id)
+                if fetched_at:
+                    aware = ensure_utc(fetched_at)
                     if aware > cutoff:
                         result.skipped += 1
                         logger.debug(
@@ -137,8 +129,10 @@ async def ingest_all_speed_rankings(
                         )
                         continue
 
-            count = await fetch_speed_rankings_for_encounter(wcl, session, enc_id)
+            with collect_upsert_stats() as rows:
+                count = await fetch_speed_rankings_for_encounter(wcl, session, enc_id)
             result.fetched += 1
+            result.rows.add(rows)
             logger.info(
                 "[%d/%d] Fetched %d speed rankings for encounter %d",
                 i, total, count, enc_id,
@@ -4,9 +4,12 @@ import json
 import logging
 from typing import Any
 
-from sqlalchemy import delete, select
+from sqlalchemy import select
 
 from shukketsu.db.models import AbilityMetric, BuffUptime, Fight
+from shukketsu.db.partitions import ensure_partitions_committed
+from shukketsu.db.upsert import UpsertBatch
+from shukketsu.pipeline.rows import AbilityMetricRow, BuffUptimeRow
 
 logger = logging.getLogger(__name__)
 
@@ -43,8 +46,8 @@ def parse_ability_metrics(
     fight_id: int,
     player_name: str,
     metric_type: str,
-) -> list[AbilityMetric]:
-    """Parse ability entries into AbilityMetric rows. Takes top 20 by total."""
+) -> list[AbilityMetricRow]:
+    """Parse ability entries into AbilityMetricRow records. Takes top 20 by total."""
     sorted_entries = sorted(entries, key=lambda e: e.get("total", 0), reverse=True)
     player_total = sum(e.get("total", 0) for e in sorted_entries)
 
@@ -68,7 +71,7 @@ def parse_ability_metrics(
             if overheal is not None:
                 overheal = int(overheal)
 
-        result.append(AbilityMetric(
+        result.append(AbilityMetricRow(
             fight_id=fight_id,
             player_name=player_name,
             metric_type=metric_type,
@@ -90,8 +93,8 @@ def parse_buff_uptimes(
     player_name: str,
     metric_type: str,
     fight_duration_ms: int,
-) -> list[BuffUptime]:
-    """Parse buff/debuff entries into BuffUptime rows. Takes top 30 by uptime."""
+) -> list[BuffUptimeRow]:
+    """Parse buff/debuff entries into BuffUptimeRow records. Takes top 30 by uptime."""
     result = []
     for entry in entries:
         uptime_ms = entry.get("uptime", 0) or 0
@@ -111,7 +114,7 @@ def parse_buff_uptimes(
     rows = []
     for item in result[:30]:
         entry = item["entry"]
-        rows.append(BuffUptime(
+        rows.append(BuffUptimeRow(
             fight_id=fight_id,
             player_name=player_name,
             metric_type=metric_type,
@@ -123,102 +126,244 @@ def parse_buff_uptimes(
     return rows
 
 
-async def ingest_table_data_for_fight(
-    wcl, session, report_code: str, fight: Fight,
-) -> int:
-    """Fetch and ingest table data for a single fight. Returns count of rows inserted."""
+# (WCL TableDataType, stored metric_type, parse kind) fetched per fight
+TABLE_DATA_TYPES: list[tuple[str, str, str]] = [
+    ("DamageDone", "damage", "ability"),
+    ("Healing", "healing", "ability"),
+    ("Buffs", "buff", "buff"),
+    ("Debuffs", "debuff", "buff"),
+]
+
+
+async def fetch_table_entries(
+    wcl, report_code: str, fight: Fight, wcl_type: str,
+) -> list[dict]:
+    """Fetch one WCL table for a fight and return its per-source entries."""
     from shukketsu.wcl.queries import REPORT_TABLE
 
     rate_limit_frag = "rateLimitData { pointsSpentThisHour limitPerHour pointsResetIn }"
-    query = REPORT_TABLE.replace("RATE_LIMIT", rate_limit_frag)
+    raw_data = await wcl.query(
+        REPORT_TABLE.replace("RATE_LIMIT", rate_limit_frag),
+        variables={
+            "code": report_code,
+            "fightIDs": [fight.fight_id],
+            "dataType": wcl_type,
+        },
+    )
+    table_raw = raw_data["reportData"]["report"]["table"]
+    return parse_table_response(table_raw)
+
+
+def parse_table_entries(
+    fight: Fight, metric_type: str, parse_kind: str, top_entries: list[dict],
+) -> list[AbilityMetricRow] | list[BuffUptimeRow]:
+    """Rows for one fetched table of a fight, across all of its sources."""
     fight_duration_ms = fight.end_time - fight.start_time
+    rows = []
 
-    total_rows = 0
+    # Without sourceID, WCL returns entries grouped by source
+    for source_entry in top_entries:
+        player_name = source_entry.get("name", "")
+        if not player_name:
+            continue
+
+        sub_entries = source_entry.get("entries", [])
+        if not sub_entries:
+            continue
+
+        if parse_kind == "ability":
+            rows.extend(parse_ability_metrics(
+                sub_entries, fight.id, player_name, metric_type,
+            ))
+        else:
+            rows.extend(parse_buff_uptimes(
+                sub_entries, fight.id, player_name, metric_type,
+                fight_duration_ms,
+            ))
+    return rows
+
+
+def demux_table_response(
+    report_data: dict[str, Any], aliases: list[str],
+) -> dict[str, list[dict]]:
+    """Split a batched ReportTables response into per-alias entry lists.
 
-    # Fetch 4 data types: DamageDone, Healing, Buffs, Debuffs
-    data_type_config = [
-        ("DamageDone", "damage", "ability"),
-        ("Healing", "healing", "ability"),
-        ("Buffs", "buff", "buff"),
-        ("Debuffs", "debuff", "buff"),
+    Each value is the same shape parse_table_response returns for a single
+    REPORT_TABLE call, ready for parse_ability_metrics / parse_buff_uptimes.
+    Aliases missing from the response are omitted.
+    """
+    return {
+        alias: parse_table_response(report_data[alias])
+        for alias in aliases
+        if alias in report_data
+    }
+
+
+async def fetch_tables_for_fights(
+    wcl, report_code: str, fights: list[Fight],
+    *, batch_size: int | None = None,
+) -> dict[tuple[int, str], list[dict]]:
+    """Fetch every TABLE_DATA_TYPES table for the given fights in batched queries.
+
+    Selections are merged into aliased ReportTables documents of up to
+    ``batch_size`` tables each. If a batch fails (one bad table fails the
+    whole GraphQL document), its tables are retried one query each, so a
+    single failure only drops that table. Failed tables are logged and left
+    out of the result.
+
+    Returns:
+        {(wcl fight_id, wcl_type): entries}
+    """
+    from shukketsu.wcl.queries import (
+        MAX_TABLES_PER_QUERY,
+        build_report_tables_query,
+        table_alias,
+    )
+
+    rate_limit_frag = "rateLimitData { pointsSpentThisHour limitPerHour pointsResetIn }"
+    batch_size = max(1, batch_size or MAX_TABLES_PER_QUERY)
+    wanted = [
+        (fight, wcl_type)
+        for fight in fights
+        for wcl_type, _, _ in TABLE_DATA_TYPES
     ]
 
-    for wcl_type, metric_type, parse_kind in data_type_config:
+    tables: dict[tuple[int, str], list[dict]] = {}
+    for i in range(0, len(wanted), batch_size):
+        batch = wanted[i:i + batch_size]
         try:
-            # API call OUTSIDE savepoint — if it fails, no data is deleted
+            query, aliases = build_report_tables_query(
+                [([fight.fight_id], wcl_type) for fight, wcl_type in batch]
+            )
             raw_data = await wcl.query(
-                query,
-                variables={
-                    "code": report_code,
-                    "fightIDs": [fight.fight_id],
-                    "dataType": wcl_type,
-                },
+                query.replace("RATE_LIMIT", rate_limit_frag),
+                variables={"code": report_code},
+            )
+            by_alias = demux_table_response(
+                raw_data["reportData"]["report"], aliases,
             )
-            table_raw = raw_data["reportData"]["report"]["table"]
-            top_entries = parse_table_response(table_raw)
-
-            # Savepoint wraps delete+insert — rolls back on error,
-            # preserving existing rows
-            async with session.begin_nested():
-                if parse_kind == "ability":
-                    await session.execute(
-                        delete(AbilityMetric).where(
-                            AbilityMetric.fight_id == fight.id,
-                            AbilityMetric.metric_type == metric_type,
-                        )
-                    )
-                else:
-                    await session.execute(
-                        delete(BuffUptime).where(
-                            BuffUptime.fight_id == fight.id,
-                            BuffUptime.metric_type == metric_type,
-                        )
-                    )
-
-                # Without sourceID, WCL returns entries grouped by source
-                for source_entry in top_entries:
-                    player_name = source_entry.get("name", "")
-                    if not player_name:
-                        continue
-
-                    sub_entries = source_entry.get("entries", [])
-                    if not sub_entries:
-                        continue
-
-                    if parse_kind == "ability":
-                        metrics = parse_ability_metrics(
-                            sub_entries, fight.id, player_name, metric_type,
-                        )
-                        for m in metrics:
-                            session.add(m)
-                        total_rows += len(metrics)
-                    else:
-                        uptimes = parse_buff_uptimes(
-                            sub_entries, fight.id, player_name, metric_type,
-                            fight_duration_ms,
-                        )
-                        for u in uptimes:
-                            session.add(u)
-                        total_rows += len(uptimes)
-
         except Exception:
-            logger.exception(
-                "Failed to fetch %s table data for fight %d in %s",
-                wcl_type, fight.fight_id, report_code,
+            logger.warning(
+                "Batched table query failed for %s (%d tables), "
+                "falling back to one query per table",
+                report_code, len(batch), exc_info=True,
             )
-            continue
+            by_alias = {}
+
+        for fight, wcl_type in batch:
+            alias = table_alias(fight.fight_id, wcl_type)
+            if alias in by_alias:
+                tables[(fight.fight_id, wcl_type)] = by_alias[alias]
+                continue
+            try:
+                tables[(fight.fight_id, wcl_type)] = await fetch_table_entries(
+                    wcl, report_code, fight, wcl_type,
+                )
+            except Exception:
+                logger.exception(
+                    "Failed to fetch %s table data for fight %d in %s",
+                    wcl_type, fight.fight_id, report_code,
+                )
+
+    return tables
+
+
+def table_error(fight: Fight) -> str:
+    """The ``enrichment_errors`` entry for a fight whose table data failed."""
+    return f"table_data_fight_{fight.fight_id}"
+
+
+async def persist_tables_for_fights(
+    session, report_code: str, fights: list[Fight],
+    tables: dict[tuple[int, str], list[dict]],
+) -> tuple[int, list[str]]:
+    """Persist the fetched tables of several fights.
+
+    Rows are upserted by (player, spell) per (fight, metric_type), one
+    statement pair per table for all of ``fights``, so a re-ingest of
+    unchanged data writes nothing. Tables missing from ``tables`` (failed
+    fetches) keep their stored rows, as do tables that fail to parse; their
+    fights are reported. A failed write rolls back the savepoint, stores
+    nothing and raises.
+
+    Returns:
+        (rows stored, enrichment_errors entries).
+    """
+    upserts = UpsertBatch(session)
+    staged = False
+    total_rows = 0
+    errors: list[str] = []
+    for fight in fights:
+        failed = False
+        for wcl_type, metric_type, parse_kind in TABLE_DATA_TYPES:
+            top_entries = tables.get((fight.fight_id, wcl_type))
+            if top_entries is None:
+                failed = True
+                continue
+            try:
+                rows = parse_table_entries(fight, metric_type, parse_kind, top_entries)
+            except Exception:
+                logger.exception(
+                    "Failed to parse %s table data for fight %d in %s",
+                    wcl_type, fight.fight_id, report_code,
+                )
+                failed = True
+                continue
+            model = AbilityMetric if parse_kind == "ability" else BuffUptime
+            upserts.add(
+                model, rows, fight_id=fight.id, metric_type=metric_type,
+                report_month=fight.report_month,
+            )
+            staged = True
+            total_rows += len(rows)
+        if failed:
+            errors.append(table_error(fight))
+
+    if not staged:
+        return 0, errors
+    try:
+        # Savepoint wraps the upserts — rolls back on error, preserving existing rows
+        async with session.begin_nested():
+            await upserts.flush()
+    except Exception:
+        logger.exception("Failed to store table data for %s", report_code)
+        raise
 
     logger.info(
-        "Ingested table data for fight %d (%s): %d rows",
-        fight.fight_id, report_code, total_rows,
+        "Ingested table data for %d fights (%s): %d rows",
+        len(fights), report_code, total_rows,
     )
-    return total_rows
+    return total_rows, errors
+
+
+async def ingest_table_data_for_fights(
+    wcl, session, report_code: str, fights: list[Fight],
+    *, batch_size: int | None = None,
+) -> tuple[int, list[str]]:
+    """Fetch (batched) and ingest table data for several fights.
+
+    Fights with a table that failed to fetch, parse or store are reported.
+
+    Returns:
+        (rows stored, enrichment_errors entries).
+    """
+    tables = await fetch_tables_for_fights(
+        wcl, report_code, fights, batch_size=batch_size,
+    )
+    try:
+        return await persist_tables_for_fights(session, report_code, fights, tables)
+    except Exception:
+        # One savepoint covers every fight, so they all failed
+        return 0, [table_error(fight) for fight in fights]
 
 
 async def ingest_table_data_for_report(
     wcl, session, report_code: str,
 ) -> int:
-    """Ingest table data for all fights in a report. Returns total rows inserted."""
+    """Ingest table data for all fights in a report. Returns total rows inserted.
+
+    A failed write raises; fights with tables that failed to fetch are logged.
+    """
     fights = await session.execute(
         select(Fight).where(Fight.report_code == report_code)
     )
@@ -228,12 +373,17 @@ async def ingest_table_data_for_report(
         logger.warning("No fights found for report %s", report_code)
         return 0
 
-    total_rows = 0
-    for fight in fight_list:
-        rows = await ingest_table_data_for_fight(
-            wcl, session, report_code, fight,
+    tables = await fetch_tables_for_fights(wcl, report_code, fight_list)
+    await ensure_partitions_committed(
+        session, {fight.report_month for fight in fight_list},
+    )
+    total_rows, errors = await persist_tables_for_fights(
+        session, report_code, fight_list, tables,
+    )
+    if errors:
+        logger.warning(
+            "Table data incomplete for report %s: %s", report_code, ", ".join(errors),
         )
-        total_rows += rows
 
     logger.info(
         "Ingested table data for report %s: %d total rows across %d fights",
@@ -0,0 +1,328 @@
+"""CLI script to record WCL traffic and benchmark ingest_report offline.
+
+``record`` ingests reports against the live API through a RecordingTransport
+and rolls the transaction back, leaving only a JSONL recording behind.
+``run`` replays that recording through a local ReplayTransport and reports
+reports/min, events/sec, SQL statements per report, time per ingest phase
+and peak RSS per enrichment mode. Each mode runs in a
+fresh process so the RSS high-water mark of one does not mask another.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+
+from sqlalchemy import event
+
+from shukketsu.config import get_settings
+from shukketsu.db.engine import create_db_engine, create_session_factory
+from shukketsu.pipeline.ingest import ingest_report
+from shukketsu.wcl.auth import WCLAuth
+from shukketsu.wcl.client import WCLClient
+from shukketsu.wcl.rate_limiter import RateLimiter
+from shukketsu.wcl.replay import (
+    RecordingTransport,
+    ReplayTransport,
+    load_recording,
+    recorded_report_codes,
+)
+
+logger = logging.getLogger(__name__)
+
+# mode -> (ingest_tables, ingest_events)
+MODES = {
+    "none": (False, False),
+    "tables": (True, False),
+    "events": (False, True),
+    "all": (True, True),
+}
+
+REPLAY_API_URL = "http://wcl-replay.local/api/v2/client"
+REPLAY_OAUTH_URL = "http://wcl-replay.local/oauth/token"
+
+
+@dataclass
+class IngestBenchResult:
+    mode: str
+    reports: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+    queries: int = 0
+    events: int = 0
+    event_rows: int = 0
+    table_rows: int = 0
+    injected_429: int = 0
+    injected_5xx: int = 0
+    # SQL statements executed, and seconds per ingest_report phase, over all runs
+    statements: int = 0
+    phase_seconds: dict[str, float] = field(default_factory=dict)
+    peak_rss_mb: float = 0.0
+
+    @property
+    def reports_per_min(self) -> float:
+        return self.reports / self.seconds * 60 if self.seconds else 0.0
+
+    @property
+    def events_per_sec(self) -> float:
+        return self.events / self.seconds if self.seconds else 0.0
+
+    @property
+    def statements_per_report(self) -> float:
+        return self.statements / self.reports if self.reports else 0.0
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Record WCL responses and benchmark ingestion offline"
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="Ingest live reports and record WCL traffic")
+    rec.add_argument("report_codes", nargs="+", help="WCL report codes")
+    rec.add_argument("--out", required=True, help="JSONL recording to append to")
+    rec.add_argument(
+        "--with-tables", action="store_true",
+        help="Also record table data queries",
+    )
+    rec.add_argument(
+        "--with-events", action="store_true",
+        help="Also record event queries",
+    )
+
+    run_p = sub.add_parser("run", help="Benchmark ingest_report against a recording")
+    run_p.add_argument("--recording", required=True, help="JSONL recording to replay")
+    run_p.add_argument(
+        "--report-code", action="append", dest="report_codes",
+        help="Report to ingest (repeatable, default: every report in the recording)",
+    )
+    run_p.add_argument(
+        "--modes", default="none,all",
+        help=f"Comma-separated enrichment modes from {sorted(MODES)} (default: none,all)",
+    )
+    run_p.add_argument(
+        "--iterations", type=int, default=1,
+        help="Times to ingest each report per mode (default: 1)",
+    )
+    run_p.add_argument(
+        "--concurrency", type=int, default=1,
+        help="enrichment_concurrency passed to ingest_report (default: 1)",
+    )
+    run_p.add_argument(
+        "--latency-ms", type=float, default=0.0,
+        help="Simulated per-request latency (default: 0)",
+    )
+    run_p.add_argument(
+        "--jitter-ms", type=float, default=0.0,
+        help="Extra uniform random latency (default: 0)",
+    )
+    run_p.add_argument(
+        "--error-rate-429", type=float, default=0.0,
+        help="Fraction of requests answered with 429 (default: 0)",
+    )
+    run_p.add_argument(
+        "--error-rate-5xx", type=float, default=0.0,
+        help="Fraction of requests answered with 503 (default: 0)",
+    )
+    run_p.add_argument("--seed", type=int, default=0, help="Error injection seed")
+    run_p.add_argument("--json", action="store_true", help="Print results as JSON")
+    return parser.parse_args(argv)
+
+
+def _peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+async def record(
+    report_codes: list[str], out: str, *,
+    with_tables: bool = False, with_events: bool = False,
+) -> int:
+    """Ingest reports against the live API, recording every exchange.
+
+    The DB transaction is rolled back, so recording leaves the database
+    untouched. Returns the number of exchanges recorded.
+    """
+    settings = get_settings()
+    engine = create_db_engine(settings)
+    session_factory = create_session_factory(engine)
+    auth = WCLAuth(
+        settings.wcl.client_id,
+        settings.wcl.client_secret.get_secret_value(),
+        settings.wcl.oauth_url,
+    )
+    transport = RecordingTransport(out)
+    async with WCLClient(
+        auth, RateLimiter(), api_url=settings.wcl.api_url, transport=transport,
+    ) as wcl:
+        for code in report_codes:
+            async with session_factory() as session:
+                await ingest_report(
+                    wcl, session, code,
+                    ingest_tables=with_tables, ingest_events=with_events,
+                )
+                await session.rollback()
+            logger.info("Recorded %s (%d exchanges so far)", code, transport.recorded)
+    await engine.dispose()
+    return transport.recorded
+
+
+async def bench_mode(
+    recording: str,
+    mode: str,
+    report_codes: list[str] | None = None,
+    *,
+    iterations: int = 1,
+    concurrency: int = 1,
+    latency_ms: float = 0.0,
+    jitter_ms: float = 0.0,
+    error_rate_429: float = 0.0,
+    error_rate_5xx: float = 0.0,
+    seed: int = 0,
+) -> IngestBenchResult:
+    """Ingest recorded reports through the replay stand-in and time it.
+
+    Every report is ingested in its own transaction and rolled back, so runs
+    are repeatable and the database is left as it was.
+    """
+    ingest_tables, ingest_events = MODES[mode]
+    exchanges = load_recording(recording)
+    codes = report_codes or recorded_report_codes(exchanges)
+    transport = ReplayTransport(
+        exchanges,
+        latency_ms=latency_ms, jitter_ms=jitter_ms,
+        error_rate_429=error_rate_429, error_rate_5xx=error_rate_5xx,
+        seed=seed,
+    )
+    del exchanges
+
+    settings = get_settings()
+    engine = create_db_engine(settings)
+    session_factory = create_session_factory(engine)
+    auth = WCLAuth("replay", "replay", REPLAY_OAUTH_URL)
+    result = IngestBenchResult(mode=mode)
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        result.statements += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count_statement)
+
+    async with WCLClient(
+        auth, RateLimiter(), api_url=REPLAY_API_URL, transport=transport,
+    ) as wcl:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            for code in codes:
+                async with session_factory() as session:
+                    try:
+                        ingest = await ingest_report(
+                            wcl, session, code,
+                            ingest_tables=ingest_tables, ingest_events=ingest_events,
+                            enrichment_concurrency=concurrency,
+                        )
+                    except Exception:
+                        logger.exception("Replay ingest of %s failed", code)
+                        result.failed += 1
+                    else:
+                        result.reports += 1
+                        result.table_rows += ingest.table_rows
+                        result.event_rows += ingest.event_rows
+                        for phase, secs in ingest.phase_seconds.items():
+                            result.phase_seconds[phase] = (
+                                result.phase_seconds.get(phase, 0.0) + secs
+                            )
+                    finally:
+                        await session.rollback()
+        result.seconds = time.perf_counter() - start
+    await engine.dispose()
+
+    result.queries = transport.served
+    result.events = transport.events_served
+    result.injected_429 = transport.injected_429
+    result.injected_5xx = transport.injected_5xx
+    result.peak_rss_mb = _peak_rss_mb()
+    return result
+
+
+def _bench_mode_worker(kwargs: dict) -> IngestBenchResult:
+    logging.basicConfig(level=logging.WARNING)
+    return asyncio.run(bench_mode(**kwargs))
+
+
+def format_results(results: list[IngestBenchResult]) -> str:
+    header = (
+        f"{'mode':<8} {'reports':>7} {'failed':>6} {'secs':>8} {'reports/min':>11} "
+        f"{'events/sec':>11} {'queries':>7} {'stmts/report':>12} {'429/5xx':>9} "
+        f"{'peak RSS MB':>11}"
+    )
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r.mode:<8} {r.reports:>7} {r.failed:>6} {r.seconds:>8.2f} "
+            f"{r.reports_per_min:>11.1f} {r.events_per_sec:>11.0f} {r.queries:>7} "
+            f"{r.statements_per_report:>12.1f} "
+            f"{f'{r.injected_429}/{r.injected_5xx}':>9} {r.peak_rss_mb:>11.1f}"
+        )
+    phases = [r for r in results if r.phase_seconds]
+    if phases:
+        lines.append("")
+        for r in phases:
+            lines.append(f"{r.mode:<8} " + "  ".join(
+                f"{phase} {secs:.2f}s" for phase, secs in r.phase_seconds.items()
+            ))
+    return "\n".join(lines)
+
+
+def run_benchmarks(args: argparse.Namespace) -> list[IngestBenchResult]:
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    unknown = [m for m in modes if m not in MODES]
+    if unknown:
+        raise SystemExit(f"Unknown mode(s): {', '.join(unknown)}")
+
+    results = []
+    ctx = multiprocessing.get_context("spawn")
+    for mode in modes:
+        kwargs = {
+            "recording": args.recording, "mode": mode,
+            "report_codes": args.report_codes, "iterations": args.iterations,
+            "concurrency": args.concurrency, "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms, "error_rate_429": args.error_rate_429,
+            "error_rate_5xx": args.error_rate_5xx, "seed": args.seed,
+        }
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            results.append(pool.submit(_bench_mode_worker, kwargs).result())
+    return results
+
+
+def main() -> None:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "record":
+        count = asyncio.run(record(
+            args.report_codes, args.out,
+            with_tables=args.with_tables, with_events=args.with_events,
+        ))
+        logger.info("Recorded %d exchanges to %s", count, args.out)
+        return
+
+    results = run_benchmarks(args)
+    if args.json:
+        print(json.dumps([
+            {**asdict(r), "reports_per_min": r.reports_per_min,
+             "events_per_sec": r.events_per_sec,
+             "statements_per_report": r.statements_per_report}
+            for r in results
+        ], indent=2))
+    else:
+        print(format_results(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ from shukketsu.config import get_settings
 from shukketsu.db.engine import create_db_engine, create_session_factory
 from shukketsu.pipeline.ingest import ingest_report
 from shukketsu.wcl.auth import WCLAuth
+from shukketsu.wcl.cache import create_response_cache
 from shukketsu.wcl.client import WCLClient
 from shukketsu.wcl.rate_limiter import RateLimiter
 
@@ -23,11 +24,40 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
         "--with-events", action="store_true",
         help="Also fetch event data (deaths, cast metrics, cooldowns)",
     )
+    parser.add_argument(
+        "--concurrency", type=int, default=1,
+        help="Max concurrent WCL fetches for table/event enrichment (default: 1)",
+    )
+    parser.add_argument(
+        "--enqueue", action="store_true",
+        help="Queue the report for ingest workers instead of ingesting now",
+    )
     return parser.parse_args(argv)
 
 
+async def enqueue(
+    report_code: str, *, with_tables: bool = False, with_events: bool = False,
+) -> int:
+    """Add an ingest_jobs row for the report and return its job ID."""
+    from shukketsu.pipeline.ingest_jobs import enqueue_ingest_job
+
+    settings = get_settings()
+    engine = create_db_engine(settings)
+    session_factory = create_session_factory(engine)
+    async with session_factory() as session, session.begin():
+        job_id = await enqueue_ingest_job(
+            session, report_code, source="cli",
+            with_tables=with_tables, with_events=with_events,
+            max_attempts=settings.ingest_queue.max_attempts,
+        )
+    await engine.dispose()
+    logger.info("Queued report %s as ingest job %d", report_code, job_id)
+    return job_id
+
+
 async def run(
     report_code: str, *, with_tables: bool = False, with_events: bool = False,
+    concurrency: int = 1,
 ) -> None:
     from shukketsu.pipeline.progression import snapshot_all_characters
 
@@ -39,12 +69,16 @@ async def run(
         settings.wcl.client_secret.get_secret_value(),
         settings.wcl.oauth_url,
     )
-    async with WCLClient(auth, RateLimiter(), api_url=settings.wcl.api_url) as wcl:
+    async with WCLClient(
+        auth, RateLimiter(), api_url=settings.wcl.api_url,
+        cache=create_response_cache(settings),
+    ) as wcl:
         # Ingest in an atomic transaction
         async with session_factory() as session, session.begin():
             result = await ingest_report(
                 wcl, session, report_code,
                 ingest_tables=with_tables, ingest_events=with_events,
+                enrichment_concurrency=concurrency,
             )
 
         # Snapshot progression in a separate transaction after successful commit
@@ -60,18 +94,25 @@ async def run(
 
     await engine.dispose()
     logger.info(
-        "Ingested report %s: %d fights, %d performances, %d table rows, "
-        "%d event rows",
-        report_code, result.fights, result.performances,
-        result.table_rows, result.event_rows,
+        "Ingested report %s: %d fights (%d unchanged), %d performances, "
+        "%d table rows, %d event rows, %d rows changed",
+        report_code, result.fights, result.fights_unchanged, result.performances,
+        result.table_rows, result.event_rows, result.rows.changed,
     )
 
 
 def main() -> None:
     args = parse_args()
     logging.basicConfig(level=logging.INFO)
+    if args.enqueue:
+        asyncio.run(enqueue(
+            args.report_code, with_tables=args.with_tables,
+            with_events=args.with_events,
+        ))
+        return
     asyncio.run(run(
         args.report_code, with_tables=args.with_tables, with_events=args.with_events,
+        concurrency=args.concurrency,
     ))
 
 
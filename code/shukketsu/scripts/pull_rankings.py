@@ -141,10 +141,12 @@ async def run(
 
     await engine.dispose()
     logger.info(
-        "Done: fetched=%d, skipped=%d, errors=%d",
+        "Done: fetched=%d, skipped=%d, errors=%d, rows changed=%d (%s)",
         result.fetched,
         result.skipped,
         len(result.errors),
+        result.rows.changed,
+        result.rows.as_dict(),
     )
     if result.errors:
         for err in result.errors:
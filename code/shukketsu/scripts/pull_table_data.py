@@ -8,6 +8,7 @@ from shukketsu.config import get_settings
 from shukketsu.db.engine import create_db_engine, create_session_factory
 from shukketsu.pipeline.table_data import ingest_table_data_for_report
 from shukketsu.wcl.auth import WCLAuth
+from shukketsu.wcl.cache import create_response_cache
 from shukketsu.wcl.client import WCLClient
 from shukketsu.wcl.rate_limiter import RateLimiter
 
@@ -32,7 +33,10 @@ async def run(report_code: str) -> None:
         settings.wcl.oauth_url,
     )
     async with (
-        WCLClient(auth, RateLimiter(), api_url=settings.wcl.api_url) as wcl,
+        WCLClient(
+            auth, RateLimiter(), api_url=settings.wcl.api_url,
+            cache=create_response_cache(settings),
+        ) as wcl,
         session_factory() as session,
     ):
         total = await ingest_table_data_for_report(wcl, session, report_code)
@@ -0,0 +1,209 @@
+"""CLI script that rebuilds derived event rows from the archived raw event pages.
+
+Each fight's ``event_archives`` row is replayed through the same per-fight
+stream ingest uses (see ``pipeline.report_events``), so a formula fix can be
+applied to every stored fight without refetching anything from WCL. Fights
+are parsed in a process pool; the main process upserts their rows by natural
+key, one report at a time, so unchanged rows are not rewritten.
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+
+from sqlalchemy import select
+
+from shukketsu.config import get_settings
+from shukketsu.db.engine import create_db_engine, create_session_factory
+from shukketsu.db.models import EventArchive, Fight
+from shukketsu.db.partitions import ensure_partitions_committed
+from shukketsu.db.upsert import UpsertBatch, UpsertStats
+from shukketsu.pipeline.event_archive import read_context, read_pages
+from shukketsu.pipeline.report_events import (
+    EVENT_STAGES,
+    open_stage_stream,
+    prepare_stage_for_fights,
+)
+
+logger = logging.getLogger(__name__)
+
+STAGES_BY_DATA_TYPE = {stage.data_type: stage for stage in EVENT_STAGES}
+
+
+@dataclass(frozen=True)
+class ArchivedFight:
+    """One archive plus the fight columns the streams read (picklable)."""
+
+    report_code: str
+    data_type: str
+    id: int
+    fight_id: int
+    start_time: int
+    end_time: int
+    report_month: date
+    codec: str
+    data: bytes
+    context_json: str | None
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Recompute derived event rows from archived raw events",
+    )
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument(
+        "--report-code", action="append", dest="report_codes",
+        help="WCL report code (repeatable)",
+    )
+    target.add_argument(
+        "--all", action="store_true",
+        help="Recompute every report with archived events",
+    )
+    parser.add_argument(
+        "--data-type", action="append", dest="data_types",
+        choices=sorted(STAGES_BY_DATA_TYPE),
+        help="Event data type to recompute (repeatable, default: all)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="Worker processes (default: CPU count)",
+    )
+    return parser.parse_args(argv)
+
+
+async def _replay(archive: ArchivedFight) -> list[tuple]:
+    stage = STAGES_BY_DATA_TYPE[archive.data_type]
+    actors, player_classes = read_context(archive)
+    upserts = UpsertBatch(None)
+    stream = open_stage_stream(
+        None, archive.report_code, stage, archive, actors, player_classes,
+        upserts=upserts,
+    )
+    for page in read_pages(archive):
+        await stream.add(page)
+    await stream.finish()
+    return upserts.export()
+
+
+def recompute_fight(archive: ArchivedFight) -> list[tuple]:
+    """Worker: the rows one archived fight derives, as ``UpsertBatch.export()``."""
+    return asyncio.run(_replay(archive))
+
+
+async def _archives_for_report(
+    session, report_code: str, data_types: list[str] | None,
+) -> list[ArchivedFight]:
+    stmt = (
+        select(
+            Fight.report_code, EventArchive.data_type, Fight.id, Fight.fight_id,
+            Fight.start_time, Fight.end_time, Fight.report_month, EventArchive.codec,
+            EventArchive.data, EventArchive.context_json,
+        )
+        .join(Fight, Fight.id == EventArchive.fight_id)
+        .where(Fight.report_code == report_code)
+        .order_by(Fight.fight_id, EventArchive.data_type)
+    )
+    if data_types:
+        stmt = stmt.where(EventArchive.data_type.in_(data_types))
+    result = await session.execute(stmt)
+    return [ArchivedFight(*row) for row in result.all()]
+
+
+async def recompute_report(
+    session, pool, report_code: str, data_types: list[str] | None = None,
+) -> tuple[int, UpsertStats]:
+    """Recompute one report's archived fights; returns (fights, upsert counts)."""
+    archives = await _archives_for_report(session, report_code, data_types)
+    if not archives:
+        return 0, UpsertStats()
+    loop = asyncio.get_running_loop()
+    exported = await asyncio.gather(*(
+        loop.run_in_executor(pool, recompute_fight, archive)
+        for archive in archives
+    ))
+
+    # Retention may have dropped the months' partitions since ingest
+    await ensure_partitions_committed(
+        session, {archive.report_month for archive in archives},
+    )
+    for data_type in {archive.data_type for archive in archives}:
+        await prepare_stage_for_fights(
+            session, STAGES_BY_DATA_TYPE[data_type],
+            [a for a in archives if a.data_type == data_type],
+        )
+    upserts = UpsertBatch(session)
+    for batch in exported:
+        upserts.merge(batch)
+    stats = await upserts.flush()
+    await session.commit()
+    return len(archives), stats
+
+
+async def run(
+    report_codes: list[str] | None = None, *, all_reports: bool = False,
+    data_types: list[str] | None = None, workers: int | None = None,
+) -> dict:
+    """Recompute each report in turn. Returns {"fights": N, "errors": N, ...}."""
+    settings = get_settings()
+    engine = create_db_engine(settings)
+    session_factory = create_session_factory(engine)
+    if all_reports:
+        async with session_factory() as session:
+            result = await session.execute(
+                select(Fight.report_code)
+                .join(EventArchive, EventArchive.fight_id == Fight.id)
+                .distinct()
+                .order_by(Fight.report_code)
+            )
+            report_codes = list(result.scalars().all())
+        logger.info("Found %d reports with archived events", len(report_codes))
+
+    fights = 0
+    errors = 0
+    total = UpsertStats()
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for code in report_codes or []:
+            async with session_factory() as session:
+                try:
+                    count, stats = await recompute_report(
+                        session, pool, code, data_types,
+                    )
+                except Exception:
+                    logger.exception("Failed to recompute report %s", code)
+                    await session.rollback()
+                    errors += 1
+                    continue
+            fights += count
+            total.add(stats)
+            logger.info(
+                "Recomputed %s: %d archived fights, %d rows changed",
+                code, count, stats.changed,
+            )
+
+    elapsed = time.perf_counter() - start
+    logger.info(
+        "Recomputed %d archived fights in %.1fs (%.1f fights/s): "
+        "%d inserted, %d updated, %d unchanged, %d deleted",
+        fights, elapsed, fights / elapsed if elapsed else 0.0,
+        total.inserted, total.updated, total.unchanged, total.deleted,
+    )
+    await engine.dispose()
+    return {"fights": fights, "errors": errors, **total.as_dict()}
+
+
+def main() -> None:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run(
+        args.report_codes, all_reports=args.all,
+        data_types=args.data_types, workers=args.workers,
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""CLI script that re-runs missing or failed enrichment stages of ingested reports."""
+
+import argparse
+import asyncio
+import logging
+
+from shukketsu.config import get_settings
+from shukketsu.db.engine import create_db_engine, create_session_factory
+from shukketsu.pipeline.checkpoints import reports_with_failed_stages, resume_report
+from shukketsu.wcl.auth import WCLAuth
+from shukketsu.wcl.cache import create_response_cache
+from shukketsu.wcl.client import WCLClient
+from shukketsu.wcl.rate_limiter import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Resume enrichment stages that are missing or failed",
+    )
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument(
+        "--report-code", action="append", dest="report_codes",
+        help="WCL report code (repeatable)",
+    )
+    target.add_argument(
+        "--failed", action="store_true",
+        help="Resume every report with a failed stage checkpoint",
+    )
+    parser.add_argument(
+        "--with-tables", action="store_true",
+        help="Resume ability breakdown and buff uptime tables",
+    )
+    parser.add_argument(
+        "--with-events", action="store_true",
+        help="Resume event data (combatant info, deaths, casts, resources)",
+    )
+    args = parser.parse_args(argv)
+    if not (args.with_tables or args.with_events):
+        parser.error("at least one of --with-tables or --with-events is required")
+    return args
+
+
+async def run(
+    report_codes: list[str] | None = None, *, failed: bool = False,
+    with_tables: bool = False, with_events: bool = False,
+) -> dict:
+    """Resume each report in turn. Returns {"resumed": N, "errors": N}."""
+    settings = get_settings()
+    engine = create_db_engine(settings)
+    session_factory = create_session_factory(engine)
+    if failed:
+        async with session_factory() as session:
+            report_codes = await reports_with_failed_stages(session)
+        logger.info("Found %d reports with failed stages", len(report_codes))
+
+    auth = WCLAuth(
+        settings.wcl.client_id,
+        settings.wcl.client_secret.get_secret_value(),
+        settings.wcl.oauth_url,
+    )
+    resumed = 0
+    errors = 0
+    async with WCLClient(
+        auth, RateLimiter(), api_url=settings.wcl.api_url,
+        cache=create_response_cache(settings),
+    ) as wcl:
+        for code in report_codes or []:
+            try:
+                result = await resume_report(
+                    wcl, session_factory, code,
+                    ingest_tables=with_tables, ingest_events=with_events,
+                )
+            except Exception:
+                logger.exception("Failed to resume report %s", code)
+                errors += 1
+                continue
+            resumed += 1
+            logger.info(
+                "Resumed %s: stages %s, %d table rows, %d event rows, "
+                "%d enrichment errors",
+                code, result.resumed or "none", result.table_rows,
+                result.event_rows, len(result.enrichment_errors),
+            )
+
+    await engine.dispose()
+    return {"resumed": resumed, "errors": errors}
+
+
+def main() -> None:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run(
+        args.report_codes, failed=args.failed,
+        with_tables=args.with_tables, with_events=args.with_events,
+    ))
+
+
+if __name__ == "__main__":
+    main()
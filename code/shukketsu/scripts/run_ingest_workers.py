@@ -0,0 +1,71 @@
+"""CLI script that runs ingest_jobs workers outside the API process."""
+
+import argparse
+import asyncio
+import logging
+
+from shukketsu.config import get_settings
+from shukketsu.db.engine import create_db_engine, create_session_factory
+from shukketsu.pipeline.ingest_jobs import IngestWorkerPool
+from shukketsu.wcl.factory import WCLFactory
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Run workers that drain the ingest_jobs queue"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="Concurrent workers (default: INGEST_QUEUE__WORKERS)",
+    )
+    parser.add_argument(
+        "--once", action="store_true",
+        help="Run queued jobs until none is runnable, then exit",
+    )
+    return parser.parse_args(argv)
+
+
+async def run(*, workers: int | None = None, once: bool = False) -> int:
+    """Run the pool until cancelled (or, with ``once``, until the queue drains).
+
+    Returns the number of jobs run when ``once`` is set, else 0.
+    """
+    settings = get_settings()
+    engine = create_db_engine(settings)
+    session_factory = create_session_factory(engine)
+    wcl_factory = WCLFactory(settings)
+    await wcl_factory.start()
+    pool = IngestWorkerPool(settings, session_factory, wcl_factory, workers=workers)
+    ran = 0
+    try:
+        if once:
+            async def drain(index: int) -> int:
+                count = 0
+                while await pool.run_once(pool.worker_id(index)):
+                    count += 1
+                return count
+
+            ran = sum(await asyncio.gather(
+                *(drain(i) for i in range(max(1, pool.workers)))
+            ))
+            logger.info("Ran %d ingest jobs: %s", ran, pool.get_status()["stats"])
+        else:
+            await pool.start()
+            await asyncio.Event().wait()
+    finally:
+        await pool.stop()
+        await wcl_factory.stop()
+        await engine.dispose()
+    return ran
+
+
+def main() -> None:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run(workers=args.workers, once=args.once))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Content-addressed on-disk cache for immutable WCL GraphQL responses.
+
+Once a report is finished, its fights, rankings, tables and event pages never
+change, so re-ingesting it does not need to spend rate-limit points. Entries
+are keyed by a SHA-256 of the query text and variables and stored as gzipped
+JSON files, sharded by key prefix. Total size is bounded with LRU eviction
+(recency is the file mtime, bumped on every hit).
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = "data/wcl_cache"
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024  # 1 GiB
+
+# A report whose endTime is newer than this may still be growing (live log)
+DEFAULT_LIVE_WINDOW_MS = 12 * 3600 * 1000
+
+
+def cache_key(query: str, variables: dict[str, Any] | None) -> str:
+    """Stable content hash of a GraphQL request."""
+    payload = json.dumps(
+        {"query": query, "variables": variables or {}},
+        sort_keys=True, separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResponseCache:
+    """Size-bounded LRU cache of WCL ``data`` payloads on local disk."""
+
+    def __init__(
+        self,
+        directory: str | Path = DEFAULT_CACHE_DIR,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        live_window_ms: int = DEFAULT_LIVE_WINDOW_MS,
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.live_window_ms = live_window_ms
+        # key -> size in bytes, least recently used first
+        self._index: OrderedDict[str, int] | None = None
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json.gz"
+
+    def _load_index(self) -> None:
+        """Build the in-memory LRU index from files already on disk."""
+        entries: list[tuple[float, str, int]] = []
+        if self.directory.is_dir():
+            for path in self.directory.glob("*/*.json.gz"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                key = path.name.removesuffix(".json.gz")
+                entries.append((stat.st_mtime, key, stat.st_size))
+        entries.sort()
+        self._index = OrderedDict((key, size) for _, key, size in entries)
+        self._total_bytes = sum(size for _, _, size in entries)
+
+    def _ensure_index(self) -> OrderedDict[str, int]:
+        if self._index is None:
+            self._load_index()
+        return self._index
+
+    def is_live(self, report_end_time_ms: int | float) -> bool:
+        """Whether a report ending at this time may still receive fights."""
+        now_ms = time.time() * 1000
+        return report_end_time_ms > now_ms - self.live_window_ms
+
+    def _read(self, key: str) -> dict[str, Any] | None:
+        path = self._path(key)
+        try:
+            with gzip.open(path, "rb") as fh:
+                data = json.loads(fh.read())
+            os.utime(path)  # LRU recency
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            logger.warning("Discarding corrupt WCL cache entry %s", path)
+            path.unlink(missing_ok=True)
+            return None
+        return data
+
+    def _write(self, key: str, data: dict[str, Any]) -> int:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".tmp{os.getpid()}")
+        with gzip.open(tmp, "wb", compresslevel=6) as fh:
+            fh.write(json.dumps(data, separators=(",", ":")).encode())
+        os.replace(tmp, path)  # atomic: readers never see partial files
+        return path.stat().st_size
+
+    def _delete(self, keys: list[str]) -> None:
+        for key in keys:
+            self._path(key).unlink(missing_ok=True)
+
+    async def get(self, key: str) -> dict[str, Any] | None:
+        """Return the cached payload for ``key``, or None on a miss."""
+        index = self._ensure_index()
+        data = await asyncio.to_thread(self._read, key)
+        if data is None:
+            self.misses += 1
+            if key in index:
+                self._total_bytes -= index.pop(key)
+            return None
+        self.hits += 1
+        if key in index:
+            index.move_to_end(key)
+        return data
+
+    async def put(self, key: str, data: dict[str, Any]) -> None:
+        """Store a payload, evicting least-recently-used entries if over budget."""
+        index = self._ensure_index()
+        try:
+            size = await asyncio.to_thread(self._write, key, data)
+        except OSError:
+            logger.warning("Failed to write WCL cache entry %s", key, exc_info=True)
+            return
+        self._total_bytes -= index.pop(key, 0)
+        index[key] = size
+        self._total_bytes += size
+
+        evicted: list[str] = []
+        while self._total_bytes > self.max_bytes and len(index) > 1:
+            old_key, old_size = index.popitem(last=False)
+            self._total_bytes -= old_size
+            evicted.append(old_key)
+        if evicted:
+            await asyncio.to_thread(self._delete, evicted)
+            logger.debug("Evicted %d WCL cache entries", len(evicted))
+
+    @property
+    def size_bytes(self) -> int:
+        self._ensure_index()
+        return self._total_bytes
+
+
+def create_response_cache(settings) -> ResponseCache | None:
+    """Build the response cache from settings, or None when disabled."""
+    wcl = settings.wcl
+    if not wcl.cache_enabled:
+        return None
+    return ResponseCache(
+        wcl.cache_dir,
+        max_bytes=wcl.cache_max_mb * 1024 * 1024,
+        live_window_ms=wcl.cache_live_window_hours * 3600 * 1000,
+    )
@@ -1,11 +1,15 @@
 import asyncio
+import contextlib
 import logging
 from typing import Any
 
 import httpx
 
 from shukketsu.wcl.auth import WCLAuth
-from shukketsu.wcl.rate_limiter import RateLimiter
+from shukketsu.wcl.cache import ResponseCache, cache_key
+from shukketsu.wcl.credentials import CredentialPool
+from shukketsu.wcl.rate_limiter import RateLimiter, query_shape
+from shukketsu.wcl.scheduler import Priority, WCLScheduler
 
 logger = logging.getLogger(__name__)
 
@@ -29,16 +33,31 @@ class WCLClient:
         *,
         api_url: str = DEFAULT_API_URL,
         http_client: httpx.AsyncClient | None = None,
+        cache: ResponseCache | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+        scheduler: WCLScheduler | None = None,
+        priority: Priority = Priority.INTERACTIVE,
+        credentials: CredentialPool | None = None,
     ) -> None:
         self._auth = auth
         self._rate_limiter = rate_limiter
         self._api_url = api_url
         self._http: httpx.AsyncClient | None = http_client
         self._owns_http = http_client is None
+        self._cache = cache
+        # Only used when the client owns its HTTP pool (see wcl/replay.py)
+        self._transport = transport
+        self._scheduler = scheduler
+        self.priority = priority
+        # When set, each request picks its auth + rate limiter from the pool
+        self._credentials = credentials
+        # Report codes classified from their endTime (see _is_final_report)
+        self._final_reports: set[str] = set()
+        self._live_reports: set[str] = set()
 
     async def __aenter__(self) -> "WCLClient":
         if self._owns_http:
-            self._http = httpx.AsyncClient(timeout=30.0)
+            self._http = httpx.AsyncClient(timeout=30.0, transport=self._transport)
         return self
 
     async def __aexit__(self, *exc: object) -> None:
@@ -46,39 +65,123 @@ class WCLClient:
             await self._http.aclose()
             self._http = None
 
+    def mark_report_live(self, report_code: str) -> None:
+        """Bypass the response cache for a report that is still in progress."""
+        self._final_reports.discard(report_code)
+        self._live_reports.add(report_code)
+
+    def _is_final_report(self, report_code: str, data: dict[str, Any]) -> bool:
+        """Whether responses for this report are immutable and safe to cache.
+
+        A report is classified the first time a response carries its
+        ``endTime`` (e.g. REPORT_FIGHTS, which every ingest fetches first).
+        Until then nothing is stored, so a live report is never cached.
+        """
+        if report_code in self._live_reports:
+            return False
+        if report_code in self._final_reports:
+            return True
+        report = (data.get("reportData") or {}).get("report") or {}
+        end_time = report.get("endTime")
+        if end_time is None:
+            return False
+        if self._cache.is_live(end_time):
+            self._live_reports.add(report_code)
+            return False
+        self._final_reports.add(report_code)
+        return True
+
     async def query(
         self,
         graphql_query: str,
         variables: dict[str, Any] | None = None,
+        *,
+        use_cache: bool = True,
+    ) -> dict[str, Any]:
+        """Execute a GraphQL query, serving finished reports from the cache.
+
+        Only report-scoped queries (those with a ``code`` variable) are
+        cached, and only once the report is known to be finished. Cache hits
+        cost no rate-limit points. ``use_cache=False`` forces a live fetch.
+        """
+        report_code = (variables or {}).get("code")
+        key = None
+        if (
+            self._cache is not None
+            and use_cache
+            and isinstance(report_code, str)
+            and report_code not in self._live_reports
+        ):
+            key = cache_key(graphql_query, variables)
+            cached = await self._cache.get(key)
+            if cached is not None:
+                # Only finished reports are ever stored
+                self._final_reports.add(report_code)
+                return cached
+
+        data = await self._execute(graphql_query, variables)
+
+        if key is not None and self._is_final_report(report_code, data):
+            await self._cache.put(key, data)
+        return data
+
+    def _pick_credential(
+        self, variables: dict[str, Any] | None,
+    ) -> tuple[WCLAuth, RateLimiter]:
+        if self._credentials is None:
+            return self._auth, self._rate_limiter
+        report_code = (variables or {}).get("code")
+        credential = self._credentials.pick(
+            report_code if isinstance(report_code, str) else None,
+        )
+        return credential.auth, credential.rate_limiter
+
+    async def _execute(
+        self,
+        graphql_query: str,
+        variables: dict[str, Any] | None = None,
     ) -> dict[str, Any]:
         """Execute a GraphQL query with rate-limit-aware retries.
 
         429 responses: sleep until the WCL rate limit resets (up to 1 hour),
         then retry.  502/503/504 and network errors: exponential backoff.
+        With a scheduler, each attempt waits for a slot at ``self.priority``;
+        backoff sleeps happen outside the slot.
         """
         if self._http is None:
             raise RuntimeError("Use WCLClient as an async context manager")
 
         last_exc: BaseException | None = None
+        shape = query_shape(graphql_query, variables)
 
         for attempt in range(1, MAX_RETRIES + 1):
-            await self._rate_limiter.wait_if_needed()
+            # Re-picked per attempt so a throttled credential is swapped out
+            auth, rate_limiter = self._pick_credential(variables)
+            await rate_limiter.wait_if_needed(
+                shape, paced=self.priority != Priority.INTERACTIVE,
+            )
 
-            token = await self._auth.get_token(self._http)
+            token = await auth.get_token(self._http)
 
             body: dict[str, Any] = {"query": graphql_query}
             if variables:
                 body["variables"] = variables
 
+            slot = (
+                self._scheduler.slot(self.priority) if self._scheduler
+                else contextlib.nullcontext()
+            )
             try:
-                response = await self._http.post(
-                    self._api_url,
-                    json=body,
-                    headers={
-                        "Authorization": f"Bearer {token}",
-                        "Content-Type": "application/json",
-                    },
-                )
+                async with slot:
+                    with rate_limiter.track_request() as window:
+                        response = await self._http.post(
+                            self._api_url,
+                            json=body,
+                            headers={
+                                "Authorization": f"Bearer {token}",
+                                "Content-Type": "application/json",
+                            },
+                        )
             except (httpx.ConnectError, httpx.ReadTimeout) as exc:
                 last_exc = exc
                 if attempt == MAX_RETRIES:
@@ -94,7 +197,7 @@ class WCLClient:
             # --- 429: rate-limited — sleep for the reset window, not backoff ---
             if response.status_code == 429:
                 retry_after = _parse_retry_after(response)
-                await self._rate_limiter.mark_throttled(retry_after)
+                await rate_limiter.mark_throttled(retry_after)
                 if attempt == MAX_RETRIES:
                     response.raise_for_status()
                 continue  # wait_if_needed() at top of loop will sleep
@@ -130,11 +233,14 @@ class WCLClient:
                     f"Response missing 'data' key, keys: {list(result.keys())}"
                 )
 
-            # Update rate limiter from response extensions
-            extensions = result.get("extensions", {})
-            rate_limit_data = extensions.get("rateLimitData")
+            # Every query template selects rateLimitData as a root field, so
+            # it comes back under data; older responses carried it in extensions
+            rate_limit_data = (
+                (result.get("data") or {}).get("rateLimitData")
+                or (result.get("extensions") or {}).get("rateLimitData")
+            )
             if rate_limit_data:
-                await self._rate_limiter.update(rate_limit_data)
+                await rate_limiter.update(rate_limit_data, shape=shape, window=window)
 
             # Check for GraphQL errors
             if "errors" in result and result["errors"]:
@@ -0,0 +1,130 @@
+"""Pool of WCL API credentials, each with its own auth and rate limiter.
+
+One client_id is capped at its hourly point budget. With several credential
+pairs configured, each request is sent on whichever credential has the most
+usable headroom. All requests for one report stick to the credential that
+served its first request (so its pages are fetched under one budget and hit
+the same WCL-side caches) until that credential is throttled or past its
+safety margin.
+"""
+
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any
+
+from shukketsu.wcl.auth import WCLAuth
+from shukketsu.wcl.rate_limiter import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Reports remembered for credential affinity
+MAX_AFFINITY_ENTRIES = 1024
+
+
+@dataclass
+class Credential:
+    label: str
+    auth: WCLAuth
+    rate_limiter: RateLimiter
+    requests: int = field(default=0)
+
+    @property
+    def headroom(self) -> float:
+        """Fraction of the hourly budget still usable (negative = exhausted)."""
+        limiter = self.rate_limiter
+        usable = limiter.limit_per_hour * (1 - limiter.safety_margin)
+        return (usable - limiter.points_spent) / limiter.limit_per_hour
+
+    @property
+    def available(self) -> bool:
+        return not self.rate_limiter.is_throttled and self.headroom > 0
+
+
+def credential_label(client_id: str) -> str:
+    """Identify a credential in logs and status without exposing the full id."""
+    return f"...{client_id[-4:]}" if len(client_id) > 4 else client_id or "default"
+
+
+class CredentialPool:
+    """Dispatches WCL requests across credentials by headroom, with report affinity.
+
+    Also presents the pool's combined budget (``limit_per_hour``,
+    ``points_spent``, ``points_reset_in``) so a ``WCLScheduler`` can reserve
+    points across all credentials at once.
+    """
+
+    def __init__(self, credentials: list[Credential]) -> None:
+        if not credentials:
+            raise ValueError("CredentialPool needs at least one credential")
+        self.credentials = credentials
+        self._affinity: OrderedDict[str, Credential] = OrderedDict()
+
+    def pick(self, report_code: str | None = None) -> Credential:
+        """Choose the credential for the next request."""
+        if report_code is not None:
+            pinned = self._affinity.get(report_code)
+            if pinned is not None and pinned.available:
+                self._affinity.move_to_end(report_code)
+                pinned.requests += 1
+                return pinned
+
+        chosen = max(
+            self.credentials, key=lambda c: (c.available, c.headroom),
+        )
+        if report_code is not None:
+            previous = self._affinity.get(report_code)
+            if previous is not None and previous is not chosen:
+                logger.info(
+                    "Moving report %s from credential %s to %s",
+                    report_code, previous.label, chosen.label,
+                )
+            self._affinity[report_code] = chosen
+            self._affinity.move_to_end(report_code)
+            while len(self._affinity) > MAX_AFFINITY_ENTRIES:
+                self._affinity.popitem(last=False)
+        chosen.requests += 1
+        return chosen
+
+    @property
+    def limit_per_hour(self) -> int:
+        return sum(c.rate_limiter.limit_per_hour for c in self.credentials)
+
+    @property
+    def points_spent(self) -> int:
+        return sum(c.rate_limiter.points_spent for c in self.credentials)
+
+    @property
+    def points_reset_in(self) -> int:
+        resets = [
+            c.rate_limiter.points_reset_in for c in self.credentials
+            if c.rate_limiter.points_reset_in > 0
+        ]
+        return min(resets) if resets else 0
+
+    @property
+    def query_costs(self) -> dict[str, float]:
+        # Point costs depend on the query, not the credential: average them
+        merged: dict[str, list[float]] = {}
+        for c in self.credentials:
+            for shape, cost in c.rate_limiter.query_costs.items():
+                merged.setdefault(shape, []).append(cost)
+        return {shape: sum(v) / len(v) for shape, v in merged.items()}
+
+    def status(self) -> list[dict[str, Any]]:
+        """Per-credential point usage for the status endpoint."""
+        assigned: dict[str, int] = {}
+        for cred in self._affinity.values():
+            assigned[cred.label] = assigned.get(cred.label, 0) + 1
+        return [
+            {
+                "label": c.label,
+                "points_spent": c.rate_limiter.points_spent,
+                "limit_per_hour": c.rate_limiter.limit_per_hour,
+                "points_reset_in": c.rate_limiter.points_reset_in,
+                "throttled": c.rate_limiter.is_throttled,
+                "requests": c.requests,
+                "reports_assigned": assigned.get(c.label, 0),
+            }
+            for c in self.credentials
+        ]
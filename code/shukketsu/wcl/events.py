@@ -1,13 +1,25 @@
 """Paginated WCL events API fetcher."""
 
 import logging
+from bisect import bisect_right
 
+from shukketsu.wcl.client import WCLAPIError
 from shukketsu.wcl.queries import REPORT_EVENTS
 
 logger = logging.getLogger(__name__)
 
 RATE_LIMIT_FRAG = "rateLimitData { pointsSpentThisHour limitPerHour pointsResetIn }"
-MAX_PAGES = 100
+MAX_PAGES = 100  # per fight; a report-level stream gets MAX_PAGES per fight
+# Events per page; WCL caps ``limit`` at 10000 (its default is far smaller)
+EVENTS_PAGE_LIMIT = 10000
+
+# Server-side filter keeping only events cast by players (drops NPC and pet
+# events that the pipelines would otherwise discard after decoding)
+PLAYER_SOURCE_FILTER = 'source.type = "player"'
+
+
+class EventPageLimitError(WCLAPIError):
+    """Pagination hit ``max_pages`` before reaching the end of the span."""
 
 
 async def fetch_all_events(
@@ -19,6 +31,10 @@ async def fetch_all_events(
     source_id: int | None = None,
     *,
     max_pages: int = MAX_PAGES,
+    filter_expression: str | None = None,
+    hostility_type: str | None = None,
+    limit: int | None = EVENTS_PAGE_LIMIT,
+    strict: bool = False,
 ):
     """Yield event pages as lists instead of accumulating all in memory.
 
@@ -30,6 +46,11 @@ async def fetch_all_events(
         data_type: WCL EventDataType (e.g. "Deaths", "Casts", "DamageDone").
         source_id: Optional actor source ID filter.
         max_pages: Maximum number of pages to fetch (safety limit).
+        filter_expression: Optional WCL filter expression applied server-side.
+        hostility_type: Optional "Friendlies" or "Enemies".
+        limit: Events per page (None = WCL default).
+        strict: Raise ``EventPageLimitError`` at ``max_pages`` instead of
+            logging a warning and stopping early.
 
     Yields:
         Lists of event dicts, one per API page.
@@ -48,6 +69,12 @@ async def fetch_all_events(
         }
         if source_id is not None:
             variables["sourceID"] = source_id
+        if filter_expression is not None:
+            variables["filterExpression"] = filter_expression
+        if hostility_type is not None:
+            variables["hostilityType"] = hostility_type
+        if limit is not None:
+            variables["limit"] = limit
 
         raw = await wcl.query(query, variables=variables)
         events_data = raw["reportData"]["report"]["events"]
@@ -73,6 +100,11 @@ async def fetch_all_events(
             break
 
         if page_count >= max_pages:
+            if strict:
+                raise EventPageLimitError(
+                    f"Max pages ({max_pages}) reached for {report_code} "
+                    f"{data_type} at {next_page}, before the span end {end_time}"
+                )
             logger.warning(
                 "Max pages (%d) reached for %s %s, stopping with %d events",
                 max_pages, report_code, data_type, total_fetched,
@@ -89,3 +121,72 @@ async def fetch_all_events(
         "Fetched %d %s events for %s in %d pages (%.0f-%.0f)",
         total_fetched, data_type, report_code, page_count, start_time, end_time,
     )
+
+
+async def stream_events_by_fight(
+    wcl,
+    report_code: str,
+    fights: list,
+    data_type: str,
+    *,
+    max_pages: int | None = None,
+    filter_expression: str | None = None,
+    hostility_type: str | None = None,
+    limit: int | None = EVENTS_PAGE_LIMIT,
+):
+    """Fetch one data type across all ``fights`` in a single paginated stream.
+
+    Instead of paginating each fight separately, pages are requested once
+    from the first fight's start to the last fight's end, and every event is
+    assigned to the fight whose [start_time, end_time] contains its
+    timestamp. Events between fights (trash, idle time) are dropped.
+
+    Args:
+        wcl: WCLClient instance.
+        report_code: WCL report code.
+        fights: Fight objects with .fight_id, .start_time, .end_time
+            (non-overlapping, as WCL reports them).
+        data_type: WCL EventDataType (e.g. "Deaths", "Casts").
+        max_pages: Maximum number of pages to fetch (default ``MAX_PAGES``
+            per fight). Reaching it raises ``EventPageLimitError``: the fights
+            past the cut-off would otherwise look like fights without events.
+        filter_expression, hostility_type, limit: As for ``fetch_all_events``.
+
+    Yields:
+        One dict per API page: WCL fight_id -> that page's events in the
+        fight, in timestamp order. Fights without events on the page are
+        omitted.
+    """
+    if not fights:
+        return
+
+    ordered = sorted(fights, key=lambda f: f.start_time)
+    starts = [f.start_time for f in ordered]
+    span_start = starts[0]
+    span_end = max(f.end_time for f in ordered)
+
+    if max_pages is None:
+        max_pages = MAX_PAGES * len(ordered)
+
+    dropped = 0
+    async for page in fetch_all_events(
+        wcl, report_code, span_start, span_end, data_type, max_pages=max_pages,
+        filter_expression=filter_expression, hostility_type=hostility_type,
+        limit=limit, strict=True,
+    ):
+        by_fight: dict[int, list[dict]] = {}
+        for event in page:
+            ts = event.get("timestamp", 0)
+            i = bisect_right(starts, ts) - 1
+            if i >= 0 and ts <= ordered[i].end_time:
+                by_fight.setdefault(ordered[i].fight_id, []).append(event)
+            else:
+                dropped += 1
+        if by_fight:
+            yield by_fight
+
+    logger.debug(
+        "Demultiplexed %s events for %s into %d fights (%d outside fights)",
+        data_type, report_code, len(fights), dropped,
+    )
+
@@ -1,28 +1,76 @@
-"""Shared WCL client factory — one Auth, one RateLimiter, one httpx pool."""
+"""Shared WCL client factory — credentials, scheduler, httpx pool and cache."""
+
+from contextlib import AbstractAsyncContextManager
+from typing import Any, Protocol
 
 import httpx
 
 from shukketsu.wcl.auth import WCLAuth
+from shukketsu.wcl.cache import create_response_cache
 from shukketsu.wcl.client import WCLClient
+from shukketsu.wcl.credentials import Credential, CredentialPool, credential_label
 from shukketsu.wcl.rate_limiter import RateLimiter
+from shukketsu.wcl.replay import create_recording_transport
+from shukketsu.wcl.scheduler import Priority, WCLScheduler
+
+
+class WCLClientFactory(Protocol):
+    """What the pipeline services take as ``wcl_factory``.
+
+    Calling it returns an async context manager yielding a client for
+    ``priority``; ``credential_status`` reports per-credential point usage
+    (empty when the factory has no credentials of its own).
+    """
+
+    def __call__(
+        self, priority: Priority = Priority.INTERACTIVE,
+    ) -> AbstractAsyncContextManager[Any]: ...
+
+    def credential_status(self) -> list[dict]: ...
 
 
 class WCLFactory:
-    """Creates WCLClient instances that share auth, rate limiter, and HTTP pool."""
+    """Creates WCLClient instances that share auth, rate limiter, HTTP pool and cache.
+
+    All clients go through one ``WCLScheduler``; pass ``priority=`` when
+    creating a client for background work so interactive requests go first.
+    With ``WCL__EXTRA_CREDENTIALS`` configured, each credential pair gets its
+    own auth and rate limiter and requests are spread across them.
+    """
 
     def __init__(self, settings) -> None:
-        self._auth = WCLAuth(
-            settings.wcl.client_id,
-            settings.wcl.client_secret.get_secret_value(),
-            settings.wcl.oauth_url,
+        wcl = settings.wcl
+        self.credentials = CredentialPool([
+            Credential(
+                label=credential_label(c.client_id),
+                auth=WCLAuth(
+                    c.client_id, c.client_secret.get_secret_value(), wcl.oauth_url,
+                ),
+                rate_limiter=RateLimiter(pacing=wcl.rate_limit_pacing),
+            )
+            for c in wcl.credentials()
+        ])
+        primary = self.credentials.credentials[0]
+        self._auth = primary.auth
+        self._rate_limiter = primary.rate_limiter
+        multi = len(self.credentials.credentials) > 1
+        self._client_credentials = self.credentials if multi else None
+        self.scheduler = WCLScheduler(
+            self.credentials if multi else self._rate_limiter,
+            max_in_flight=settings.wcl.scheduler_max_in_flight,
+            headroom={
+                Priority.AUTO_INGEST: settings.wcl.auto_ingest_headroom,
+                Priority.BACKFILL: settings.wcl.backfill_headroom,
+            },
         )
-        self._rate_limiter = RateLimiter()
         self._api_url = settings.wcl.api_url
+        self._cache = create_response_cache(settings)
+        self._transport = create_recording_transport(settings)
         self._pool: httpx.AsyncClient | None = None
 
     async def start(self) -> None:
         """Open the shared HTTP connection pool."""
-        self._pool = httpx.AsyncClient(timeout=30.0)
+        self._pool = httpx.AsyncClient(timeout=30.0, transport=self._transport)
 
     async def stop(self) -> None:
         """Close the shared HTTP connection pool."""
@@ -30,11 +78,19 @@ class WCLFactory:
             await self._pool.aclose()
             self._pool = None
 
-    def __call__(self) -> WCLClient:
+    def __call__(self, priority: Priority = Priority.INTERACTIVE) -> WCLClient:
         """Return a WCLClient sharing this factory's auth, limiter, and pool."""
         return WCLClient(
             self._auth,
             self._rate_limiter,
             api_url=self._api_url,
             http_client=self._pool,
+            cache=self._cache,
+            scheduler=self.scheduler,
+            priority=priority,
+            credentials=self._client_credentials,
         )
+
+    def credential_status(self) -> list[dict]:
+        """Per-credential point usage."""
+        return self.credentials.status()
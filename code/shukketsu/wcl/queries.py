@@ -84,13 +84,73 @@ query ReportTable($code: String!, $fightIDs: [Int]!, $dataType: TableDataType!)
 }
 """
 
+# Upper bound on aliased table() selections merged into one batched query.
+MAX_TABLES_PER_QUERY = 24
+
+
+def table_alias(fight_id: int, data_type: str) -> str:
+    """GraphQL alias for one fight's table of one TableDataType."""
+    return f"t{int(fight_id)}_{data_type}"
+
+
+def build_report_tables_query(
+    selections: list[tuple[list[int], str]],
+) -> tuple[str, list[str]]:
+    """Merge many table(...) selections into one aliased GraphQL document.
+
+    Each selection is (fight_ids, data_type). The returned query takes a
+    single ``$code`` variable and has one aliased ``table`` field per
+    selection; the aliases are returned in selection order so the response
+    can be demultiplexed with ``report[alias]``. Fight IDs and data types are
+    inlined as literals, so they are validated here.
+    """
+    if not selections:
+        raise ValueError("build_report_tables_query needs at least one selection")
+
+    aliases: list[str] = []
+    fields: list[str] = []
+    for fight_ids, data_type in selections:
+        if not data_type.isidentifier():
+            raise ValueError(f"Invalid TableDataType: {data_type!r}")
+        ids = [int(fid) for fid in fight_ids]
+        if not ids:
+            raise ValueError("Table selection needs at least one fight ID")
+        alias = table_alias(ids[0], data_type)
+        if len(ids) > 1:
+            alias += "_" + "_".join(str(fid) for fid in ids[1:])
+        if alias in aliases:
+            raise ValueError(f"Duplicate table selection: {alias}")
+        aliases.append(alias)
+        id_list = ", ".join(str(fid) for fid in ids)
+        fields.append(
+            f"            {alias}: table(fightIDs: [{id_list}], dataType: {data_type})"
+        )
+
+    body = "\n".join(fields)
+    query = (
+        "\nquery ReportTables($code: String!) {\n"
+        "    reportData {\n"
+        "        report(code: $code) {\n"
+        f"{body}\n"
+        "        }\n"
+        "    }\n"
+        "    RATE_LIMIT\n"
+        "}\n"
+    )
+    return query, aliases
+
+
 REPORT_EVENTS = """
 query ReportEvents($code: String!, $startTime: Float!, $endTime: Float!,
-                   $dataType: EventDataType!, $sourceID: Int) {
+                   $dataType: EventDataType!, $sourceID: Int,
+                   $filterExpression: String, $hostilityType: HostilityType,
+                   $limit: Int) {
     reportData {
         report(code: $code) {
             events(startTime: $startTime, endTime: $endTime,
-                   dataType: $dataType, sourceID: $sourceID) {
+                   dataType: $dataType, sourceID: $sourceID,
+                   filterExpression: $filterExpression,
+                   hostilityType: $hostilityType, limit: $limit) {
                 data
                 nextPageTimestamp
             }
@@ -1,38 +1,198 @@
 import asyncio
 import logging
+import re
 import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
 from typing import Any
 
 logger = logging.getLogger(__name__)
 
+_OPERATION_NAME_RE = re.compile(r"^\s*(?:query|mutation)\s+(\w+)")
+
+
+def query_shape(graphql_query: str, variables: dict[str, Any] | None = None) -> str:
+    """Key a request by operation name and ``dataType`` for cost learning.
+
+    Point cost depends mostly on what is asked for, not which report:
+    ``ReportEvents:Casts`` and ``ReportEvents:Resources`` cost differently,
+    but every ``ReportEvents:Casts`` page costs about the same.
+    """
+    match = _OPERATION_NAME_RE.match(graphql_query)
+    name = match.group(1) if match else "anonymous"
+    data_type = (variables or {}).get("dataType")
+    return f"{name}:{data_type}" if data_type else name
+
+
+@dataclass
+class RequestWindow:
+    """One request's view of the budget, from ``RateLimiter.track_request()``."""
+
+    spent: int | None  # pointsSpentThisHour when sent (None before any update)
+    overlapping: int = 1  # requests in flight alongside it, itself included
+
 
 class RateLimiter:
-    """Tracks WCL API rate limit points and pauses requests when near the limit."""
+    """Tracks WCL API rate limit points and paces requests across the hour.
+
+    Two mechanisms cooperate:
+
+    * Cost model: each ``update()`` attributes the ``pointsSpentThisHour``
+      delta since its request was sent to the query shape (EWMA per shape),
+      so the limiter knows what the next request will probably cost.
+      Concurrent requests are charged into the same delta, so it is split
+      evenly across every request in flight alongside this one.
+    * Token bucket: tokens refill at (remaining usable points / seconds until
+      reset), with a small burst allowance. A request takes its estimated
+      cost from the bucket and sleeps off any deficit, so long backfills
+      spread evenly over the hour instead of bursting into the safety
+      margin and then stalling until the reset. There is one bucket per
+      credential, shared by every request class, so together they never
+      outrun the fill rate. Unpaced (interactive) requests still take their
+      tokens but skip the sleep, so a backfill's deficit never delays them;
+      the paced classes then wait out what the interactive ones spent.
+
+    The hard stop (sleep until reset once past the safety margin) and 429
+    handling remain as backstops.
+    """
 
     MAX_SLEEP_SECONDS: int = 3600
+    DEFAULT_QUERY_COST: float = 1.0
+    COST_SMOOTHING: float = 0.3  # EWMA weight of the newest observation
 
-    def __init__(self, safety_margin: float = 0.1) -> None:
+    def __init__(
+        self,
+        safety_margin: float = 0.1,
+        *,
+        pacing: bool = True,
+        burst_fraction: float = 0.05,
+    ) -> None:
         self.safety_margin = safety_margin
         self.limit_per_hour: int = 3600
+        self.pacing = pacing
+        self.burst_fraction = burst_fraction
         self._points_spent: int = 0
         self._points_reset_in: int = 0
+        self._updated_at: float = 0.0  # monotonic time of last update()
+        self._sent: int = 0  # requests tracked so far
+        self._in_flight: int = 0
         self._throttled_until: float = 0.0  # monotonic time
+        self._costs: dict[str, float] = {}
+        self._tokens: float | None = None  # None until the first reservation
+        self._refilled_at: float = 0.0  # monotonic time of last refill
         self._lock = asyncio.Lock()
 
     @property
     def points_remaining(self) -> int:
         return self.limit_per_hour - self._points_spent
 
+    @property
+    def points_reset_in(self) -> int:
+        """Seconds until the hourly budget resets, counted down since the last update."""
+        elapsed = time.monotonic() - self._updated_at
+        return max(0, int(self._points_reset_in - elapsed))
+
+    @property
+    def points_spent(self) -> int:
+        """Points spent this hour, or 0 once the reported reset has passed."""
+        elapsed = time.monotonic() - self._updated_at
+        if self._points_reset_in and elapsed >= self._points_reset_in:
+            return 0
+        return self._points_spent
+
+    @property
+    def is_throttled(self) -> bool:
+        """Whether a 429 throttle window is still running."""
+        return self._throttled_until > time.monotonic()
+
     @property
     def is_safe(self) -> bool:
         threshold = self.limit_per_hour * (1 - self.safety_margin)
         return self._points_spent < threshold
 
-    async def update(self, rate_limit_data: dict[str, Any]) -> None:
+    @property
+    def query_costs(self) -> dict[str, float]:
+        """Learned average point cost per query shape."""
+        return dict(self._costs)
+
+    def estimated_cost(self, shape: str | None = None) -> float:
+        """Expected points for a query shape (mean of known shapes if unseen)."""
+        if shape in self._costs:
+            return self._costs[shape]
+        if self._costs:
+            return sum(self._costs.values()) / len(self._costs)
+        return self.DEFAULT_QUERY_COST
+
+    @contextmanager
+    def track_request(self) -> Iterator[RequestWindow]:
+        """Wrap sending one request; pass the window to its ``update()``."""
+        window = RequestWindow(
+            self.points_spent if self._updated_at else None,
+            overlapping=1 + self._in_flight,
+        )
+        sent = self._sent
+        self._sent += 1
+        self._in_flight += 1
+        try:
+            yield window
+        finally:
+            self._in_flight -= 1
+            window.overlapping += self._sent - sent - 1  # sent while it was in flight
+
+    def _record_cost(self, shape: str, new_spent: float, window: RequestWindow) -> None:
+        """Attribute ``shape``'s share of the pointsSpentThisHour delta to it."""
+        if window.spent is None:
+            return  # no baseline yet
+        delta = new_spent - window.spent
+        if delta < 0:
+            return  # hour rolled over while the request was in flight
+        delta /= window.overlapping
+        old = self._costs.get(shape)
+        self._costs[shape] = (
+            delta if old is None
+            else self.COST_SMOOTHING * delta + (1 - self.COST_SMOOTHING) * old
+        )
+
+    def _fill_rate(self) -> float:
+        """Tokens per second that spend the usable budget evenly until reset."""
+        usable = self.limit_per_hour * (1 - self.safety_margin)
+        remaining = max(0.0, usable - self.points_spent)
+        return remaining / max(1, self.points_reset_in or 3600)
+
+    def _take_tokens(self, cost: float) -> float:
+        """Reserve ``cost`` tokens from the bucket; returns the sleep."""
+        rate = self._fill_rate()
+        capacity = max(cost, self.limit_per_hour * self.burst_fraction)
+        now = time.monotonic()
+        if self._tokens is None:
+            self._tokens = capacity
+        else:
+            self._tokens = min(capacity, self._tokens + (now - self._refilled_at) * rate)
+        self._refilled_at = now
+        self._tokens -= cost
+        if self._tokens >= 0 or rate <= 0:
+            return 0.0
+        return min(-self._tokens / rate, self.MAX_SLEEP_SECONDS)
+
+    async def update(
+        self,
+        rate_limit_data: dict[str, Any],
+        shape: str | None = None,
+        window: RequestWindow | None = None,
+    ) -> None:
+        """Record WCL's ``rateLimitData``.
+
+        ``shape`` and ``window`` identify the request that spent it; its cost
+        is only learned with both.
+        """
         async with self._lock:
+            if shape is not None and window is not None:
+                self._record_cost(shape, rate_limit_data["pointsSpentThisHour"], window)
             self._points_spent = rate_limit_data["pointsSpentThisHour"]
             self.limit_per_hour = rate_limit_data["limitPerHour"]
             self._points_reset_in = rate_limit_data["pointsResetIn"]
+            self._updated_at = time.monotonic()
             logger.debug(
                 "Rate limit: %d/%d points used, resets in %ds",
                 self._points_spent,
@@ -55,7 +215,14 @@ class RateLimiter:
                 "Rate limited (429), will wait %ds before next request", wait,
             )
 
-    async def wait_if_needed(self) -> None:
+    async def wait_if_needed(
+        self, shape: str | None = None, *, paced: bool = True,
+    ) -> None:
+        """Sleep for a 429 throttle, an exhausted budget, or the pacing deficit.
+
+        Throttles and the budget stop apply to every request. An unpaced
+        request still takes its tokens but never sleeps off the deficit.
+        """
         # Read state under lock
         async with self._lock:
             throttled_until = self._throttled_until
@@ -88,3 +255,12 @@ class RateLimiter:
                 points_reset_in,
             )
             await asyncio.sleep(sleep_duration)
+            return
+
+        if not self.pacing or not self._updated_at:
+            return  # nothing to pace against before the first rateLimitData
+        async with self._lock:
+            pace = self._take_tokens(self.estimated_cost(shape))
+        if paced and pace > 0:
+            logger.debug("Pacing WCL request %s for %.1fs", shape, pace)
+            await asyncio.sleep(pace)
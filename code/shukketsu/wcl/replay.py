@@ -0,0 +1,234 @@
+"""Record/replay httpx transports for offline WCL ingestion benchmarks.
+
+``RecordingTransport`` wraps a real transport and appends every successful
+GraphQL exchange (query, variables and the full response body, including
+``extensions.rateLimitData`` and paginated ``nextPageTimestamp`` pages) to a
+JSONL file. OAuth traffic is never recorded.
+
+``ReplayTransport`` is a local stand-in for the WCL API: it answers OAuth
+requests with a dummy token and serves recorded responses by request content,
+with configurable latency and injected 429/5xx errors. Plug either into a
+``WCLClient`` (``transport=``) or a ``WCLFactory`` via ``WCL__RECORD_PATH``.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from shukketsu.wcl.cache import cache_key
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_graphql_request(request: httpx.Request) -> tuple[str, dict[str, Any]] | None:
+    """Return (query, variables) for a GraphQL POST, or None for other traffic."""
+    if request.method != "POST" or request.url.path.endswith("/oauth/token"):
+        return None
+    try:
+        body = json.loads(request.content)
+    except ValueError:
+        return None
+    if not isinstance(body, dict) or "query" not in body:
+        return None
+    return body["query"], body.get("variables") or {}
+
+
+def load_recording(path: str | Path) -> list[dict[str, Any]]:
+    """Read a JSONL recording into a list of exchanges."""
+    exchanges = []
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                exchanges.append(json.loads(line))
+    return exchanges
+
+
+def recorded_report_codes(exchanges: list[dict[str, Any]]) -> list[str]:
+    """Report codes present in a recording, in first-seen order."""
+    codes: dict[str, None] = {}
+    for exchange in exchanges:
+        code = exchange["variables"].get("code")
+        if isinstance(code, str):
+            codes.setdefault(code, None)
+    return list(codes)
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Transport that forwards requests and appends GraphQL exchanges to a file."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.path = Path(path)
+        self._transport = transport or httpx.AsyncHTTPTransport()
+        self.recorded = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self._transport.handle_async_request(request)
+        parsed = _parse_graphql_request(request)
+        if parsed is None or response.status_code != 200:
+            return response
+
+        await response.aread()
+        try:
+            body = json.loads(response.content)
+        except ValueError:
+            return response
+        if not isinstance(body, dict) or body.get("errors") or "data" not in body:
+            return response
+
+        query, variables = parsed
+        line = json.dumps(
+            {"query": query, "variables": variables, "response": body},
+            separators=(",", ":"),
+        )
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # One synchronous append per exchange; the event loop never interleaves it
+        with open(self.path, "a", encoding="utf-8") as fh:
+            fh.write(line + "\n")
+        self.recorded += 1
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Local WCL stand-in serving recorded responses.
+
+    Responses are matched on (query, variables); repeated identical requests
+    cycle through every recording of that request in order. The recorded
+    ``rateLimitData`` is replaced by a simulated budget where each served
+    query costs ``points_per_query`` (0 disables rate-limit pressure).
+    """
+
+    def __init__(
+        self,
+        exchanges: list[dict[str, Any]],
+        *,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate_429: float = 0.0,
+        error_rate_5xx: float = 0.0,
+        retry_after: int = 1,
+        points_per_query: float = 0.0,
+        limit_per_hour: int = 3600,
+        seed: int | None = None,
+    ) -> None:
+        self._responses: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        for exchange in exchanges:
+            key = cache_key(exchange["query"], exchange["variables"])
+            self._responses[key].append(exchange["response"])
+        self._served_per_key: dict[str, int] = defaultdict(int)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate_429 = error_rate_429
+        self.error_rate_5xx = error_rate_5xx
+        self.retry_after = retry_after
+        self.points_per_query = points_per_query
+        self.limit_per_hour = limit_per_hour
+        self._random = random.Random(seed)
+        self._started = time.monotonic()
+        self._points_spent = 0.0
+
+        self.requests = 0
+        self.served = 0
+        self.misses = 0
+        self.injected_429 = 0
+        self.injected_5xx = 0
+        self.events_served = 0
+        self.bytes_served = 0
+
+    @classmethod
+    def from_file(cls, path: str | Path, **kwargs: Any) -> "ReplayTransport":
+        return cls(load_recording(path), **kwargs)
+
+    def _rate_limit_data(self) -> dict[str, Any]:
+        elapsed = time.monotonic() - self._started
+        if elapsed >= 3600:
+            self._started += 3600 * (elapsed // 3600)
+            self._points_spent = 0.0
+            elapsed = time.monotonic() - self._started
+        return {
+            "limitPerHour": self.limit_per_hour,
+            "pointsSpentThisHour": int(self._points_spent),
+            "pointsResetIn": int(3600 - elapsed),
+        }
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/oauth/token"):
+            return httpx.Response(
+                200, json={"access_token": "replay", "expires_in": 86400},
+            )
+
+        self.requests += 1
+        delay = self.latency_ms + self._random.uniform(0, self.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+        roll = self._random.random()
+        if roll < self.error_rate_429:
+            self.injected_429 += 1
+            return httpx.Response(
+                429, headers={"Retry-After": str(self.retry_after)},
+                json={"error": "Too Many Requests (injected)"},
+            )
+        if roll < self.error_rate_429 + self.error_rate_5xx:
+            self.injected_5xx += 1
+            return httpx.Response(503, json={"error": "Service Unavailable (injected)"})
+
+        parsed = _parse_graphql_request(request)
+        if parsed is None:
+            return httpx.Response(400, json={"error": "Not a GraphQL request"})
+        key = cache_key(*parsed)
+        recorded = self._responses.get(key)
+        if not recorded:
+            self.misses += 1
+            logger.warning("No recorded response for variables %s", parsed[1])
+            return httpx.Response(200, json={
+                "data": None,
+                "errors": [{"message": f"No recorded response for {parsed[1]}"}],
+            })
+
+        body = recorded[self._served_per_key[key] % len(recorded)]
+        self._served_per_key[key] += 1
+        self._points_spent += self.points_per_query
+        body = {
+            **body,
+            "extensions": {
+                **body.get("extensions", {}),
+                "rateLimitData": self._rate_limit_data(),
+            },
+        }
+        content = json.dumps(body, separators=(",", ":")).encode()
+        self.served += 1
+        self.bytes_served += len(content)
+        self.events_served += _count_events(body.get("data"))
+        return httpx.Response(
+            200, content=content, headers={"Content-Type": "application/json"},
+        )
+
+
+def _count_events(data: dict[str, Any] | None) -> int:
+    report = ((data or {}).get("reportData") or {}).get("report") or {}
+    events = report.get("events")
+    if isinstance(events, dict):
+        return len(events.get("data") or [])
+    return 0
+
+
+def create_recording_transport(settings) -> RecordingTransport | None:
+    """Build a recording transport from settings, or None when not recording."""
+    path = settings.wcl.record_path
+    if not path:
+        return None
+    return RecordingTransport(path)
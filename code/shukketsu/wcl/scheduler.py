@@ -0,0 +1,160 @@
+"""Priority-aware admission control in front of WCLClient requests.
+
+Every client created by a ``WCLFactory`` shares one ``RateLimiter``, so a
+weekly benchmark backfill can spend the hourly budget and leave a user's
+"ingest" click sleeping in ``wait_if_needed``. The scheduler hands out
+request slots in priority order (interactive > auto-ingest > backfill) and
+keeps a share of the hourly budget in reserve for higher classes: a class
+may only send while points spent stay below ``limit * (1 - headroom)``.
+
+Preemption happens between requests: a backfill job never interrupts an
+HTTP call in flight, but every one of its queries queues behind waiting
+higher-priority work and pauses once it reaches its reservation.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Any
+
+from shukketsu.wcl.credentials import CredentialPool
+from shukketsu.wcl.rate_limiter import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Request classes, most urgent first."""
+
+    INTERACTIVE = 0
+    AUTO_INGEST = 1
+    BACKFILL = 2
+
+
+DEFAULT_MAX_IN_FLIGHT = 4
+
+# Fraction of the hourly point budget each class must leave unspent
+DEFAULT_HEADROOM = {
+    Priority.INTERACTIVE: 0.0,
+    Priority.AUTO_INGEST: 0.15,
+    Priority.BACKFILL: 0.35,
+}
+
+# Re-check a budget-blocked queue at least this often (seconds)
+BUDGET_RECHECK_SECONDS = 60
+
+
+class WCLScheduler:
+    """Grants WCL request slots by priority and per-class point reservations.
+
+    ``rate_limiter`` may be a ``CredentialPool``, whose combined budget is
+    then reserved across all credentials.
+    """
+
+    def __init__(
+        self,
+        rate_limiter: RateLimiter | CredentialPool,
+        *,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        headroom: dict[Priority, float] | None = None,
+    ) -> None:
+        self._rate_limiter = rate_limiter
+        self.max_in_flight = max(1, max_in_flight)
+        self.headroom = {**DEFAULT_HEADROOM, **(headroom or {})}
+        self._in_flight = 0
+        # (priority, arrival order, future) — lowest tuple is served first
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+        self._recheck: asyncio.TimerHandle | None = None
+        self.granted = {p: 0 for p in Priority}
+
+    def _within_budget(self, priority: Priority) -> bool:
+        limiter = self._rate_limiter
+        ceiling = limiter.limit_per_hour * (1 - self.headroom[priority])
+        return limiter.points_spent < ceiling
+
+    def _dispatch(self) -> None:
+        """Wake waiters in priority order while slots and budget allow."""
+        while self._waiters and self._in_flight < self.max_in_flight:
+            priority, _, future = self._waiters[0]
+            if future.done():  # cancelled while waiting
+                heapq.heappop(self._waiters)
+                continue
+            if not self._within_budget(Priority(priority)):
+                # Lower classes have more headroom, so nothing behind can run
+                self._schedule_recheck()
+                return
+            heapq.heappop(self._waiters)
+            self._in_flight += 1
+            self.granted[Priority(priority)] += 1
+            future.set_result(None)
+
+    def _schedule_recheck(self) -> None:
+        if self._recheck is not None:
+            return
+        delay = max(1, min(self._rate_limiter.points_reset_in, BUDGET_RECHECK_SECONDS))
+
+        def recheck() -> None:
+            self._recheck = None
+            self._dispatch()
+
+        self._recheck = asyncio.get_running_loop().call_later(delay, recheck)
+
+    async def acquire(self, priority: Priority) -> None:
+        """Wait for a request slot at ``priority``."""
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._counter), future))
+        self._dispatch()
+        if not future.done():
+            logger.debug(
+                "WCL request queued at %s (%d waiting, %d in flight)",
+                priority.name, len(self._waiters), self._in_flight,
+            )
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Slot was granted just as we were cancelled; hand it back
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """Return a slot and wake the next eligible waiter."""
+        self._in_flight -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority) -> AsyncIterator[None]:
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def queue_depth(self) -> dict[str, int]:
+        """Requests waiting per priority class."""
+        depth = {p.name.lower(): 0 for p in Priority}
+        for priority, _, future in self._waiters:
+            if not future.done():
+                depth[Priority(priority).name.lower()] += 1
+        return depth
+
+    def status(self) -> dict[str, Any]:
+        """Snapshot for the UI: queue depth, slot usage and budget state."""
+        limiter = self._rate_limiter
+        return {
+            "in_flight": self._in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queued": self.queue_depth(),
+            "budget_blocked": {
+                p.name.lower(): not self._within_budget(p) for p in Priority
+            },
+            "points_spent": limiter.points_spent,
+            "limit_per_hour": limiter.limit_per_hour,
+            "points_reset_in": limiter.points_reset_in,
+            "query_costs": limiter.query_costs,
+        }
@@ -56,6 +56,42 @@ class TestAutoIngestStatusRoute:
         assert response.status_code == 500
 
 
+class TestCompactionRoutes:
+    """Tests for /api/auto-ingest/compaction."""
+
+    def test_returns_status(self):
+        from shukketsu.api.routes.auto_ingest import set_compaction_service
+
+        mock_service = MagicMock()
+        mock_service.get_status.return_value = {
+            "enabled": True, "status": "idle",
+            "stats": {"bytes_reclaimed": 4096},
+        }
+        set_compaction_service(mock_service)
+        try:
+            response = TestClient(_make_app()).get("/api/auto-ingest/compaction")
+        finally:
+            set_compaction_service(None)
+
+        assert response.status_code == 200
+        assert response.json()["stats"]["bytes_reclaimed"] == 4096
+
+    def test_trigger(self):
+        from shukketsu.api.routes.auto_ingest import set_compaction_service
+
+        mock_service = MagicMock()
+        mock_service.trigger_now = AsyncMock(return_value={"status": "triggered"})
+        set_compaction_service(mock_service)
+        try:
+            response = TestClient(_make_app()).post(
+                "/api/auto-ingest/compaction/trigger",
+            )
+        finally:
+            set_compaction_service(None)
+
+        assert response.json()["status"] == "triggered"
+
+
 class TestAutoIngestTriggerRoute:
     """Tests for POST /api/auto-ingest/trigger."""
 
@@ -83,3 +119,97 @@ class TestAutoIngestTriggerRoute:
         response = client.post("/api/auto-ingest/trigger")
 
         assert response.status_code == 500
+
+
+class TestWCLQueueRoute:
+    """Tests for GET /api/auto-ingest/wcl-queue."""
+
+    def test_returns_scheduler_status(self):
+        from shukketsu.api.deps import set_wcl_factory
+        from shukketsu.wcl.rate_limiter import RateLimiter
+        from shukketsu.wcl.scheduler import WCLScheduler
+
+        factory = MagicMock()
+        factory.scheduler = WCLScheduler(RateLimiter(), max_in_flight=3)
+        set_wcl_factory(factory)
+        try:
+            client = TestClient(_make_app())
+            response = client.get("/api/auto-ingest/wcl-queue")
+        finally:
+            set_wcl_factory(None)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["max_in_flight"] == 3
+        assert data["queued"] == {"interactive": 0, "auto_ingest": 0, "backfill": 0}
+        assert data["budget_blocked"]["backfill"] is False
+
+
+class TestIngestJobRoutes:
+    """Tests for the /api/auto-ingest/jobs queue endpoints."""
+
+    def _client(self, session):
+        from shukketsu.api.deps import get_db
+
+        app = _make_app()
+
+        async def _override_db():
+            yield session
+
+        app.dependency_overrides[get_db] = _override_db
+        return TestClient(app)
+
+    def _job(self, **overrides):
+        from datetime import datetime
+
+        from shukketsu.db.models import IngestJob
+
+        fields = dict(
+            id=3, report_code="ABC", status="queued", priority=0, source="api",
+            with_tables=True, with_events=True, attempts=0, max_attempts=3,
+            stage=None, stages=None, last_error=None,
+            created_at=datetime(2026, 10, 16), run_after=datetime(2026, 10, 16),
+            finished_at=None,
+        )
+        fields.update(overrides)
+        return IngestJob(**fields)
+
+    def test_enqueue_job(self):
+        from unittest.mock import patch
+
+        session = AsyncMock()
+        session.get.return_value = self._job()
+        with patch(
+            "shukketsu.pipeline.ingest_jobs.enqueue_ingest_job",
+            new_callable=AsyncMock, return_value=3,
+        ) as mock_enqueue:
+            response = self._client(session).post(
+                "/api/auto-ingest/jobs",
+                json={"report_code": "ABC", "with_tables": True, "with_events": True},
+            )
+
+        assert response.status_code == 200
+        assert response.json()["id"] == 3
+        assert response.json()["status"] == "queued"
+        assert mock_enqueue.call_args.kwargs["source"] == "api"
+        assert mock_enqueue.call_args.kwargs["priority"] == 0
+        session.commit.assert_awaited_once()
+
+    def test_get_job_not_found(self):
+        session = AsyncMock()
+        session.get.return_value = None
+        response = self._client(session).get("/api/auto-ingest/jobs/99")
+        assert response.status_code == 404
+
+    def test_list_jobs(self):
+        session = AsyncMock()
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = [
+            self._job(status="done", stage="done", stages={"enrichment": "done"}),
+        ]
+        session.execute.return_value = result
+
+        response = self._client(session).get("/api/auto-ingest/jobs?status=done")
+
+        assert response.status_code == 200
+        assert response.json()[0]["stages"] == {"enrichment": "done"}
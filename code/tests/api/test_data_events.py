@@ -1,5 +1,6 @@
 """Tests for event-data endpoints: cast metrics, cooldowns, resources, etc."""
 
+import json
 from unittest.mock import AsyncMock, MagicMock
 
 from tests.api.conftest import make_row
@@ -123,26 +124,50 @@ async def test_cancelled_casts_null(client, mock_session):
 # ---------------------------------------------------------------------------
 
 async def test_cast_timeline_ok(client, mock_session):
-    """Returns cast event timeline for a player."""
+    """Returns cast event timeline for a player, decoded from its series."""
+    series = make_row(
+        fight_id=42, player_name="Lyro", timestamps_ms=[1000, 2000, 3000],
+        spell_ids=[12294, 12294, 12294], begincast_bitmap=b"\x00",
+        target_idx=[1, 1, 0], ability_names_json='{"12294": "Mortal Strike"}',
+        target_names_json='["Gruul"]',
+    )
+    mock_result = MagicMock()
+    mock_result.fetchall.return_value = [series]
+    mock_session.execute = AsyncMock(return_value=mock_result)
+
+    resp = await client.get(
+        "/api/data/reports/abc123/fights/1/cast-timeline/Lyro"
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert len(data) == 3
+    assert data[0]["ability_name"] == "Mortal Strike"
+    assert data[0]["target_name"] == "Gruul"
+    assert data[2]["target_name"] is None
+    mock_session.execute.assert_awaited_once()
+
+
+async def test_cast_timeline_legacy_rows(client, mock_session):
+    """Fights without a series are read from legacy cast_events rows."""
     rows = [
         make_row(
-            player_name="Lyro", timestamp_ms=1000 * i,
+            fight_id=42, player_name="Lyro", timestamp_ms=1000 * i,
             spell_id=12294, ability_name="Mortal Strike",
             event_type="cast", target_name="Gruul",
         )
         for i in range(1, 4)
     ]
-    mock_result = MagicMock()
-    mock_result.fetchall.return_value = rows
-    mock_session.execute = AsyncMock(return_value=mock_result)
+    no_series = MagicMock()
+    no_series.fetchall.return_value = []
+    legacy = MagicMock()
+    legacy.fetchall.return_value = rows
+    mock_session.execute = AsyncMock(side_effect=[no_series, legacy])
 
     resp = await client.get(
         "/api/data/reports/abc123/fights/1/cast-timeline/Lyro"
     )
     assert resp.status_code == 200
-    data = resp.json()
-    assert len(data) == 3
-    assert data[0]["ability_name"] == "Mortal Strike"
+    assert [r["timestamp_ms"] for r in resp.json()] == [1000, 2000, 3000]
 
 
 async def test_cast_timeline_empty(client, mock_session):
@@ -184,6 +209,35 @@ async def test_resources_ok(client, mock_session):
     assert data[0]["avg_value"] == 45.5
 
 
+async def test_resources_resolution(client, mock_session):
+    """?resolution= serves the closest stored sample level."""
+    levels = {
+        "50": {"t": [1000, 500], "v": [80, 20]},
+        "500": {"t": [1000, 100, 100, 300], "v": [80, 60, 40, 20]},
+    }
+    mock_row = make_row(
+        player_name="Lyro", resource_type="Rage",
+        min_value=0, max_value=100, avg_value=45.5,
+        time_at_zero_ms=5000, time_at_zero_pct=4.2,
+        samples_json='[{"t": 1000, "v": 80}, {"t": 1500, "v": 20}]',
+        sample_levels_json=json.dumps(levels),
+    )
+    mock_result = MagicMock()
+    mock_result.fetchall.return_value = [mock_row]
+    mock_session.execute = AsyncMock(return_value=mock_result)
+
+    resp = await client.get(
+        "/api/data/reports/abc123/fights/1/resources/Lyro?resolution=500"
+    )
+    assert resp.status_code == 200
+    data = resp.json()[0]
+    assert data["sample_resolution"] == 500
+    assert json.loads(data["samples_json"]) == [
+        {"t": 1000, "v": 80}, {"t": 1100, "v": 60},
+        {"t": 1200, "v": 40}, {"t": 1500, "v": 20},
+    ]
+
+
 async def test_resources_empty(client, mock_session):
     """Returns empty list when no resource data."""
     mock_result = MagicMock()
@@ -197,6 +251,54 @@ async def test_resources_empty(client, mock_session):
     assert resp.json() == []
 
 
+# ---------------------------------------------------------------------------
+# GET /api/data/reports/{code}/fights/{id}/dot-refreshes/{player}
+# ---------------------------------------------------------------------------
+
+async def test_dot_refreshes_ok(client, mock_session):
+    """Refreshes of the player's class DoTs, via DotRefreshExtension."""
+    info = MagicMock()
+    info.fetchone.return_value = make_row(player_class="Warlock")
+    no_series = MagicMock()
+    no_series.fetchall.return_value = []
+    legacy = MagicMock()
+    legacy.fetchall.return_value = [
+        make_row(
+            fight_id=1, player_name="Lock", timestamp_ms=t, spell_id=spell_id,
+            ability_name=name, event_type="cast", target_name="Gruul",
+        )
+        for spell_id, name, t in [
+            (27216, "Corruption", 0), (100, "Shadow Bolt", 5_000),
+            (27216, "Corruption", 27_000), (27216, "Corruption", 42_000),
+        ]
+    ]
+    mock_session.execute = AsyncMock(side_effect=[info, no_series, legacy])
+
+    resp = await client.get(
+        "/api/data/reports/abc123/fights/1/dot-refreshes/Lock"
+    )
+    assert resp.status_code == 200
+    [dot] = resp.json()
+    assert dot["ability_name"] == "Corruption"
+    assert dot["total_refreshes"] == 2
+    # 42s recast leaves 3s of 18s running; 27s leaves none
+    assert dot["early_refreshes"] == 0
+    assert dot["avg_remaining_ms"] == 3000.0
+    assert dot["clipped_ticks_est"] == 1.0
+
+
+async def test_dot_refreshes_404(client, mock_session):
+    """Unknown player in the fight is a 404."""
+    info = MagicMock()
+    info.fetchone.return_value = None
+    mock_session.execute = AsyncMock(return_value=info)
+
+    resp = await client.get(
+        "/api/data/reports/abc123/fights/1/dot-refreshes/NoSuch"
+    )
+    assert resp.status_code == 404
+
+
 # ---------------------------------------------------------------------------
 # GET /api/data/reports/{code}/fights/{id}/rotation/{player}
 # ---------------------------------------------------------------------------
@@ -7,7 +7,9 @@ from shukketsu.db.engine import create_db_engine
 from shukketsu.db.models import (
     Base,
     CastEvent,
+    CastEventSeries,
     Encounter,
+    EventArchive,
     Fight,
     FightPerformance,
     MyCharacter,
@@ -22,7 +24,7 @@ class TestModelsInheritBase:
     @pytest.mark.parametrize("model", [
         Encounter, MyCharacter, Report, Fight,
         FightPerformance, TopRanking, ProgressionSnapshot,
-        ResourceSnapshot, CastEvent,
+        ResourceSnapshot, CastEvent, CastEventSeries, EventArchive,
     ])
     def test_inherits_base(self, model):
         assert issubclass(model, Base)
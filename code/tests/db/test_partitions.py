@@ -0,0 +1,202 @@
+"""Tests for monthly partitions of the per-fight event tables (db.partitions)."""
+
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from shukketsu.db.models import Base
+from shukketsu.db.partitions import (
+    PARTITIONED_TABLES,
+    Partition,
+    drop_partitions_before,
+    ensure_partitions,
+    ensure_partitions_committed,
+    list_partitions,
+    next_month,
+    partition_ddl,
+    report_month,
+)
+from shukketsu.db.upsert import natural_key
+
+
+def _session(*results):
+    session = AsyncMock()
+    session.execute.side_effect = list(results) + [MagicMock()] * 20
+    return session
+
+
+def _sql(session) -> list[str]:
+    return [str(c.args[0]) for c in session.execute.await_args_list]
+
+
+class TestMonths:
+    def test_report_month_is_utc(self):
+        # 2023-11-30 23:30 UTC (already December in UTC+1)
+        assert report_month(1701387000000) == date(2023, 11, 1)
+        assert report_month(1701388800000) == date(2023, 12, 1)
+
+    def test_next_month_rolls_over_year(self):
+        assert next_month(date(2026, 10, 1)) == date(2026, 11, 1)
+        assert next_month(date(2026, 12, 1)) == date(2027, 1, 1)
+
+    def test_partition_ddl(self):
+        assert partition_ddl("death_details", date(2026, 12, 1)) == (
+            "CREATE TABLE IF NOT EXISTS death_details_p202612 "
+            "PARTITION OF death_details "
+            "FOR VALUES FROM ('2026-12-01') TO ('2027-01-01')"
+        )
+
+
+class TestModels:
+    @pytest.mark.parametrize("table", PARTITIONED_TABLES)
+    def test_partitioned_by_report_month(self, table):
+        t = Base.metadata.tables[table]
+        assert t.dialect_options["postgresql"]["partition_by"] == "RANGE (report_month)"
+        assert {c.key for c in t.primary_key.columns} == {"id", "report_month"}
+
+    @pytest.mark.parametrize(
+        "table", [t for t in PARTITIONED_TABLES if t != "cast_events"],
+    )
+    def test_natural_key_includes_partition_key(self, table):
+        key = natural_key(Base.metadata.tables[table])
+        assert key[-1].key == "report_month"
+
+
+class TestEnsurePartitions:
+    async def test_creates_only_missing(self):
+        existing = MagicMock()
+        existing.scalars.return_value = ["death_details_p202610"]
+        session = _session(existing)
+
+        created = await ensure_partitions(
+            session, [date(2026, 10, 1)], ["death_details", "gear_snapshots"],
+        )
+
+        assert created == ["gear_snapshots_p202610"]
+        lookup, create = _sql(session)
+        assert "pg_class" in lookup
+        assert create.startswith(
+            "CREATE TABLE IF NOT EXISTS gear_snapshots_p202610 PARTITION OF",
+        )
+
+    async def test_all_tables_by_default(self):
+        existing = MagicMock()
+        existing.scalars.return_value = []
+        session = _session(existing)
+
+        created = await ensure_partitions(session, {date(2026, 10, 1)})
+
+        assert created == sorted(f"{t}_p202610" for t in PARTITIONED_TABLES)
+
+    async def test_no_months_no_queries(self):
+        session = _session()
+        assert await ensure_partitions(session, []) == []
+        session.execute.assert_not_awaited()
+
+
+class _AsyncCM:
+    def __init__(self, val=None, exc=None):
+        self._val = val
+        self._exc = exc
+
+    async def __aenter__(self):
+        if self._exc is not None:
+            raise self._exc
+        return self._val
+
+    async def __aexit__(self, *exc):
+        pass
+
+
+def _missing(*names):
+    existing = MagicMock()
+    existing.scalars.return_value = list(names)
+    return existing
+
+
+class TestEnsurePartitionsCommitted:
+    def _bind(self, conn=None, exc=None):
+        bind = MagicMock()
+        bind.connect.return_value = _AsyncCM(conn, exc)
+        return bind
+
+    async def test_creates_in_own_transaction(self):
+        conn = AsyncMock()
+        conn.begin = MagicMock(return_value=_AsyncCM())
+        session = _session(_missing())
+        session.bind = self._bind(conn)
+
+        created = await ensure_partitions_committed(
+            session, [date(2026, 10, 1)], ["death_details"], lock_timeout_ms=2000,
+        )
+
+        assert created == ["death_details_p202610"]
+        # Only the catalog lookup runs in the caller's transaction
+        assert len(_sql(session)) == 1
+        set_timeout, create = _sql(conn)
+        assert set_timeout == "SET LOCAL lock_timeout = 2000"
+        assert create.startswith("CREATE TABLE IF NOT EXISTS death_details_p202610")
+
+    async def test_existing_partitions_need_no_connection(self):
+        session = _session(_missing("death_details_p202610"))
+        session.bind = self._bind()
+
+        assert await ensure_partitions_committed(
+            session, [date(2026, 10, 1)], ["death_details"],
+        ) == []
+        session.bind.connect.assert_not_called()
+
+    async def test_falls_back_to_callers_transaction(self):
+        session = _session(_missing())
+        session.bind = self._bind(exc=RuntimeError("lock timeout"))
+
+        created = await ensure_partitions_committed(
+            session, [date(2026, 10, 1)], ["death_details"],
+        )
+
+        assert created == ["death_details_p202610"]
+        assert _sql(session)[1].startswith("CREATE TABLE IF NOT EXISTS")
+
+
+def _listing(*rows):
+    result = MagicMock()
+    result.__iter__ = MagicMock(return_value=iter([
+        SimpleNamespace(table_name=table, name=name, size_bytes=size)
+        for table, name, size in rows
+    ]))
+    return result
+
+
+class TestRetention:
+    async def test_list_partitions_parses_months(self):
+        session = _session(_listing(
+            ("death_details", "death_details_p202611", 100),
+            ("death_details", "death_details_p202609", 50),
+            ("death_details", "death_details_old", 10),
+        ))
+
+        partitions = await list_partitions(session, ["death_details"])
+
+        assert partitions == [
+            Partition("death_details", "death_details_p202609", date(2026, 9, 1), 50),
+            Partition("death_details", "death_details_p202611", date(2026, 11, 1), 100),
+        ]
+
+    async def test_drops_months_before_cutoff(self):
+        session = _session(_listing(
+            ("death_details", "death_details_p202608", 300),
+            ("death_details", "death_details_p202609", 50),
+            ("death_details", "death_details_p202610", 100),
+        ))
+
+        dropped = await drop_partitions_before(
+            session, date(2026, 9, 15), ["death_details"],
+        )
+
+        assert [p.name for p in dropped] == ["death_details_p202608"]
+        assert _sql(session)[1:] == [
+            "ALTER TABLE death_details DETACH PARTITION death_details_p202608",
+            "DROP TABLE death_details_p202608",
+        ]
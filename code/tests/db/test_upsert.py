@@ -0,0 +1,283 @@
+"""Verify natural-key upserts: generated SQL, stats, dedupe and scoping."""
+
+import pickle
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from shukketsu.db.models import (
+    AbilityMetric,
+    Base,
+    CastEvent,
+    CastMetric,
+    DeathDetail,
+    TopRanking,
+)
+from shukketsu.db.upsert import (
+    UpsertBatch,
+    UpsertStats,
+    collect_upsert_stats,
+    natural_key,
+    upsert_rows,
+)
+from shukketsu.pipeline.rows import DeathDetailRow
+
+
+def _sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def _session(*written, deleted=0):
+    """Session whose upsert INSERTs report ``written`` (inserted flags)."""
+    insert_result = MagicMock()
+    insert_result.all.return_value = [SimpleNamespace(inserted=i) for i in written]
+    delete_result = MagicMock(rowcount=deleted)
+
+    async def execute(stmt):
+        return insert_result if stmt.is_insert else delete_result
+
+    return AsyncMock(execute=AsyncMock(side_effect=execute))
+
+
+def _death(player, index, damage=100):
+    return DeathDetailRow(
+        fight_id=7, player_name=player, death_index=index, timestamp_ms=1000,
+        killing_blow_ability="Melee", killing_blow_source="Gruul",
+        damage_taken_total=damage, events_json="[]",
+    )
+
+
+class TestNaturalKey:
+    def test_reads_named_constraint(self):
+        assert [c.name for c in natural_key(TopRanking.__table__)] == [
+            "encounter_id", "class", "spec", "metric", "rank_position",
+        ]
+
+    def test_table_without_key(self):
+        with pytest.raises(ValueError, match="cast_events"):
+            natural_key(CastEvent.__table__)
+
+    def test_every_key_is_unique_constraint(self):
+        keyed = {
+            t.name for t in Base.metadata.tables.values()
+            if any(c.name == f"uq_{t.name}_key" for c in t.constraints)
+        }
+        assert {
+            "fight_performances", "top_rankings", "speed_rankings",
+            "ability_metrics", "buff_uptimes", "death_details", "cast_metrics",
+            "cooldown_usage", "cancelled_casts", "fight_consumables",
+            "gear_snapshots", "resource_snapshots",
+        } <= keyed
+
+
+class TestUpsertRows:
+    async def test_insert_on_conflict_only_updates_changed_rows(self):
+        session = _session(True)
+        await upsert_rows(session, CastMetric, [CastMetric(
+            fight_id=7, player_name="Lyro", total_casts=10, casts_per_minute=5.0,
+            gcd_uptime_pct=80.0, active_time_ms=1000, downtime_ms=0,
+            longest_gap_ms=0, longest_gap_at_ms=0, avg_gap_ms=0.0, gap_count=0,
+        )])
+
+        sql = _sql(session.execute.await_args.args[0])
+        assert sql.startswith("INSERT INTO cast_metrics")
+        assert "ON CONFLICT (fight_id, player_name) DO UPDATE" in sql
+        assert "IS DISTINCT FROM excluded.total_casts" in sql
+        assert "RETURNING xmax = 0 AS inserted" in sql
+
+    async def test_counts_inserted_updated_unchanged_deleted(self):
+        # 3 rows in: 1 inserted, 1 updated, 1 unchanged (not returned)
+        session = _session(True, False, deleted=2)
+        rows = [_death("Lyro", 0), _death("Lyro", 1), _death("Healer", 0)]
+
+        stats = await upsert_rows(
+            session, DeathDetail, rows,
+            scope=[DeathDetail.fight_id == 7],
+        )
+
+        assert stats == UpsertStats(inserted=1, updated=1, unchanged=1, deleted=2)
+        assert stats.changed == 4
+
+    async def test_scope_deletes_keys_not_in_rows(self):
+        session = _session(True)
+        model = DeathDetail
+        await upsert_rows(
+            session, model, [_death("Lyro", 0)], scope=[model.fight_id == 7],
+        )
+
+        delete_sql = _sql(session.execute.await_args_list[-1].args[0])
+        assert delete_sql.startswith("DELETE FROM death_details")
+        assert "death_details.fight_id = " in delete_sql
+        assert "NOT IN" in delete_sql
+
+    async def test_empty_rows_clear_scope(self):
+        session = _session(deleted=3)
+        model = DeathDetail
+        stats = await upsert_rows(session, model, [], scope=[model.fight_id == 7])
+
+        session.execute.assert_awaited_once()
+        assert "NOT IN" not in _sql(session.execute.await_args.args[0])
+        assert stats.deleted == 3
+
+    async def test_duplicate_keys_collapse_to_last(self):
+        session = _session(True)
+        model = DeathDetail
+        await upsert_rows(
+            session, model, [_death("Lyro", 0, damage=1), _death("Lyro", 0, damage=2)],
+        )
+
+        stmt = session.execute.await_args.args[0]
+        params = stmt.compile(dialect=postgresql.dialect()).params
+        assert [v for k, v in params.items() if k.startswith("damage_taken_total")] == [2]
+
+    async def test_orm_attribute_names(self):
+        """TopRanking maps the "class" column to the ``class_`` attribute."""
+        session = _session(True)
+        await upsert_rows(session, TopRanking, [TopRanking(
+            encounter_id=1, class_="Rogue", spec="Combat", metric="dps",
+            rank_position=1, player_name="A", player_server="S",
+            amount=1.0, duration_ms=1,
+        )])
+
+        params = session.execute.await_args.args[0].compile(
+            dialect=postgresql.dialect(),
+        ).params
+        assert "Rogue" in params.values()
+
+    async def test_report_sized_delete_stays_under_param_limit(self):
+        """A whole report's ability metrics: 5-column keys, 20k rows."""
+        month = date(2026, 10, 1)
+        fights = range(1, 21)
+        rows = [
+            {"fight_id": f, "player_name": f"P{p}", "metric_type": m,
+             "ability_name": f"A{a}", "spell_id": a, "report_month": month}
+            for f in fights for p in range(25) for m in ("damage", "healing")
+            for a in range(20)
+        ]
+        stored = [
+            (r["fight_id"], r["player_name"], r["metric_type"], r["spell_id"], month)
+            for r in rows[:-2]
+        ] + [(1, "Gone", "damage", 99, month), (2, "Gone", "damage", 99, month)]
+        statements = []
+
+        async def execute(stmt):
+            statements.append(stmt)
+            if stmt.is_insert:
+                return MagicMock(all=MagicMock(return_value=[]))
+            if stmt.is_delete:
+                return MagicMock(rowcount=1)
+            return MagicMock(all=MagicMock(return_value=stored))
+
+        session = AsyncMock(execute=AsyncMock(side_effect=execute))
+        batch = UpsertBatch(session)
+        for f in fights:
+            for m in ("damage", "healing"):
+                batch.add(
+                    AbilityMetric,
+                    [r for r in rows if r["fight_id"] == f and r["metric_type"] == m],
+                    fight_id=f, metric_type=m, report_month=month,
+                )
+
+        stats = await batch.flush()
+
+        def params(stmt):
+            # Expanding IN lists rendered as the bind parameters Postgres sees
+            return stmt.compile(
+                dialect=postgresql.dialect(),
+                compile_kwargs={"render_postcompile": True},
+            ).params
+
+        for stmt in statements:
+            assert len(params(stmt)) <= 32767
+        deletes = [stmt for stmt in statements if stmt.is_delete]
+        assert len(deletes) == 1
+        assert sum(1 for v in params(deletes[0]).values() if v == "Gone") == 2
+        assert stats.deleted == 1
+
+    async def test_collector_sums_calls(self):
+        session = _session(True)
+        model = DeathDetail
+        with collect_upsert_stats() as total:
+            await upsert_rows(session, model, [_death("Lyro", 0)])
+            await upsert_rows(session, model, [_death("Lyro", 1)])
+        await upsert_rows(session, model, [_death("Lyro", 2)])
+
+        assert total.inserted == 2
+
+
+class TestUpsertBatch:
+    async def test_one_upsert_per_model_over_all_scopes(self):
+        session = _session(True, True)
+        batch = UpsertBatch(session)
+        batch.add(DeathDetail, [_death("Lyro", 0)], fight_id=7)
+        batch.add(DeathDetail, [_death("Healer", 0)], fight_id=8)
+
+        stats = await batch.flush()
+
+        insert, stale = session.execute.await_args_list
+        assert _sql(insert.args[0]).startswith("INSERT INTO death_details")
+        delete_sql = _sql(stale.args[0])
+        assert "death_details.fight_id IN" in delete_sql
+        params = stale.args[0].compile(dialect=postgresql.dialect()).params
+        assert sorted(next(v for k, v in params.items() if k.startswith("fight_id"))) == [
+            7, 8,
+        ]
+        assert stats.inserted == 2
+
+    async def test_multi_column_scope(self):
+        session = _session()
+        batch = UpsertBatch(session)
+        batch.add(AbilityMetric, [], fight_id=7, metric_type="damage")
+
+        await batch.flush()
+
+        sql = _sql(session.execute.await_args.args[0])
+        assert "(ability_metrics.fight_id, ability_metrics.metric_type) IN" in sql
+
+    async def test_empty_scope_still_clears_and_flush_resets(self):
+        session = _session(deleted=4)
+        batch = UpsertBatch(session)
+        batch.add(DeathDetail, [], fight_id=7)
+
+        assert (await batch.flush()).deleted == 4
+        assert (await batch.flush()) == UpsertStats()
+        session.execute.assert_awaited_once()
+
+    async def test_export_merge_round_trip(self):
+        worker = UpsertBatch(None)
+        worker.add(DeathDetail, [_death("Lyro", 0)], fight_id=7)
+        exported = pickle.loads(pickle.dumps(worker.export()))
+
+        session = _session(True)
+        batch = UpsertBatch(session)
+        batch.merge(exported)
+        stats = await batch.flush()
+
+        (model, names, scopes, rows), = exported
+        assert (model, names, scopes) == (DeathDetail, ("fight_id",), {(7,)})
+        assert rows[0]["player_name"] == "Lyro"
+        assert stats.inserted == 1
+        assert session.execute.await_count == 2
+
+    async def test_scope_values_fill_unset_columns(self):
+        session = _session(True)
+        batch = UpsertBatch(session)
+        month = date(2026, 10, 1)
+        row = _death("Lyro", 0)
+        batch.add(
+            DeathDetail, [row, {"fight_id": 7, "player_name": "Healer"}],
+            fight_id=7, report_month=month,
+        )
+
+        await batch.flush()
+
+        assert row.report_month == month
+        insert, stale = session.execute.await_args_list
+        params = insert.args[0].compile(dialect=postgresql.dialect()).params
+        assert sum(1 for v in params.values() if v == month) == 2
+        assert "(death_details.fight_id, death_details.report_month) IN" in _sql(
+            stale.args[0],
+        )
@@ -1,10 +1,15 @@
 """Test CASCADE DELETE behavior with real PostgreSQL."""
 
+from datetime import date
+
 import pytest
 from sqlalchemy import text
 
 from shukketsu.db.models import Encounter, Fight, FightPerformance, Report
 
+# reports.start_time=1000 (ms) falls in January 1970
+EPOCH_MONTH = date(1970, 1, 1)
+
 
 @pytest.mark.integration
 async def test_delete_report_cascades_to_fights(session):
@@ -20,7 +25,7 @@ async def test_delete_report_cascades_to_fights(session):
     # Insert fight
     session.add(Fight(
         report_code="test1", fight_id=1, encounter_id=99999,
-        start_time=1000, end_time=1500, kill=True,
+        start_time=1000, end_time=1500, kill=True, report_month=EPOCH_MONTH,
     ))
     await session.flush()
 
@@ -43,7 +48,7 @@ async def test_delete_fight_cascades_to_performances(session):
 
     fight = Fight(
         report_code="test2", fight_id=1, encounter_id=99998,
-        start_time=1000, end_time=1500, kill=True,
+        start_time=1000, end_time=1500, kill=True, report_month=EPOCH_MONTH,
     )
     session.add(fight)
     await session.flush()
@@ -73,7 +78,7 @@ async def test_delete_report_cascades_through_fights_to_performances(session):
 
     fight = Fight(
         report_code="test3", fight_id=1, encounter_id=99997,
-        start_time=1000, end_time=1500, kill=True,
+        start_time=1000, end_time=1500, kill=True, report_month=EPOCH_MONTH,
     )
     session.add(fight)
     await session.flush()
@@ -105,7 +110,7 @@ async def test_delete_encounter_cascades_to_fights(session):
 
     session.add(Fight(
         report_code="test4", fight_id=1, encounter_id=99996,
-        start_time=1000, end_time=1500, kill=True,
+        start_time=1000, end_time=1500, kill=True, report_month=EPOCH_MONTH,
     ))
     await session.flush()
 
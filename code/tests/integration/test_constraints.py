@@ -1,5 +1,7 @@
 """Test CHECK constraints with real PostgreSQL."""
 
+from datetime import date
+
 import pytest
 from sqlalchemy.exc import IntegrityError
 
@@ -14,6 +16,10 @@ from shukketsu.db.models import (
     Report,
     ResourceSnapshot,
 )
+from shukketsu.db.partitions import ensure_partitions
+
+# reports.start_time=1000 (ms) falls in January 1970
+EPOCH_MONTH = date(1970, 1, 1)
 
 
 @pytest.mark.integration
@@ -25,7 +31,7 @@ async def test_parse_percentile_rejects_over_100(session):
 
     fight = Fight(
         report_code="cktest1", fight_id=1, encounter_id=99990,
-        start_time=1000, end_time=1500, kill=True,
+        start_time=1000, end_time=1500, kill=True, report_month=EPOCH_MONTH,
     )
     session.add(fight)
     await session.flush()
@@ -48,7 +54,7 @@ async def test_parse_percentile_rejects_negative(session):
 
     fight = Fight(
         report_code="cktest1n", fight_id=1, encounter_id=99991,
-        start_time=1000, end_time=1500, kill=True,
+        start_time=1000, end_time=1500, kill=True, report_month=EPOCH_MONTH,
     )
     session.add(fight)
     await session.flush()
@@ -71,7 +77,7 @@ async def test_dps_rejects_negative(session):
 
     fight = Fight(
         report_code="cktest2", fight_id=1, encounter_id=99989,
-        start_time=1000, end_time=1500, kill=True,
+        start_time=1000, end_time=1500, kill=True, report_month=EPOCH_MONTH,
     )
     session.add(fight)
     await session.flush()
@@ -94,7 +100,7 @@ async def test_valid_data_accepted(session):
 
     fight = Fight(
         report_code="cktest3", fight_id=1, encounter_id=99988,
-        start_time=1000, end_time=1500, kill=True,
+        start_time=1000, end_time=1500, kill=True, report_month=EPOCH_MONTH,
     )
     session.add(fight)
     await session.flush()
@@ -116,15 +122,17 @@ async def test_buff_uptime_rejects_over_100(session):
 
     fight = Fight(
         report_code="cktest4", fight_id=1, encounter_id=99987,
-        start_time=1000, end_time=1500, kill=True,
+        start_time=1000, end_time=1500, kill=True, report_month=EPOCH_MONTH,
     )
     session.add(fight)
     await session.flush()
 
+    await ensure_partitions(session, {EPOCH_MONTH}, ["buff_uptimes"])
+
     with pytest.raises(IntegrityError):
         session.add(BuffUptime(
-            fight_id=fight.id, player_name="Bad", metric_type="buff",
-            ability_name="Test Buff", spell_id=1,
+            fight_id=fight.id, report_month=EPOCH_MONTH, player_name="Bad",
+            metric_type="buff", ability_name="Test Buff", spell_id=1,
             uptime_pct=110.0,  # Invalid!
         ))
         await session.flush()
@@ -139,7 +147,7 @@ async def test_gcd_uptime_rejects_over_100(session):
 
     fight = Fight(
         report_code="cktest5", fight_id=1, encounter_id=99986,
-        start_time=1000, end_time=1500, kill=True,
+        start_time=1000, end_time=1500, kill=True, report_month=EPOCH_MONTH,
     )
     session.add(fight)
     await session.flush()
@@ -162,7 +170,7 @@ async def test_cooldown_efficiency_rejects_over_100(session):
 
     fight = Fight(
         report_code="cktest6", fight_id=1, encounter_id=99985,
-        start_time=1000, end_time=1500, kill=True,
+        start_time=1000, end_time=1500, kill=True, report_month=EPOCH_MONTH,
     )
     session.add(fight)
     await session.flush()
@@ -186,7 +194,7 @@ async def test_cancel_pct_rejects_negative(session):
 
     fight = Fight(
         report_code="cktest7", fight_id=1, encounter_id=99984,
-        start_time=1000, end_time=1500, kill=True,
+        start_time=1000, end_time=1500, kill=True, report_month=EPOCH_MONTH,
     )
     session.add(fight)
     await session.flush()
@@ -209,7 +217,7 @@ async def test_resource_time_at_zero_pct_rejects_over_100(session):
 
     fight = Fight(
         report_code="cktest8", fight_id=1, encounter_id=99983,
-        start_time=1000, end_time=1500, kill=True,
+        start_time=1000, end_time=1500, kill=True, report_month=EPOCH_MONTH,
     )
     session.add(fight)
     await session.flush()
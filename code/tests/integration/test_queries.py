@@ -407,10 +407,10 @@ async def test_fight_buffs_player_query(session):
 
 
 @pytest.mark.integration
-async def test_cast_events_for_dot_analysis_query(session):
-    """CAST_EVENTS_FOR_DOT_ANALYSIS query executes without syntax error."""
+async def test_cast_series_query(session):
+    """CAST_SERIES query executes without syntax error."""
     await session.execute(
-        q.CAST_EVENTS_FOR_DOT_ANALYSIS,
+        q.CAST_SERIES,
         {"report_code": "test", "fight_id": 0, "player_name": "%test%"},
     )
 
@@ -424,15 +424,6 @@ async def test_player_fight_info_query(session):
     )
 
 
-@pytest.mark.integration
-async def test_cast_events_for_phases_query(session):
-    """CAST_EVENTS_FOR_PHASES query executes without syntax error."""
-    await session.execute(
-        q.CAST_EVENTS_FOR_PHASES,
-        {"report_code": "test", "fight_id": 0, "player_name": "%test%"},
-    )
-
-
 @pytest.mark.integration
 async def test_raid_ability_summary_query(session):
     """RAID_ABILITY_SUMMARY query executes without syntax error."""
@@ -17,6 +17,10 @@ def _make_settings(
     benchmark_enabled=False,
     benchmark_refresh_interval_days=7,
     benchmark_max_reports=10,
+    live_enabled=False,
+    live_poll_seconds=90,
+    live_idle_minutes=30,
+    ingest_queue_enabled=False,
 ):
     """Build a mock settings object."""
     settings = MagicMock()
@@ -29,6 +33,12 @@ def _make_settings(
     settings.auto_ingest.zone_ids = zone_ids or []
     settings.auto_ingest.with_tables = with_tables
     settings.auto_ingest.with_events = with_events
+    settings.auto_ingest.enrichment_concurrency = 1
+    settings.auto_ingest.live_enabled = live_enabled
+    settings.auto_ingest.live_poll_seconds = live_poll_seconds
+    settings.auto_ingest.live_idle_minutes = live_idle_minutes
+    settings.ingest_queue.enabled = ingest_queue_enabled
+    settings.ingest_queue.max_attempts = 3
     settings.wcl.client_id = "test-id"
     settings.wcl.client_secret.get_secret_value.return_value = "test-secret"
     settings.wcl.oauth_url = "https://example.com/oauth"
@@ -39,11 +49,22 @@ def _make_settings(
     return settings
 
 
+class _WCLFactory:
+    """WCLClientFactory yielding ``wcl_mock``, with no credentials of its own."""
+
+    def __init__(self, wcl_mock):
+        self._wcl = wcl_mock
+
+    def __call__(self, priority=None):
+        return _AsyncCM(self._wcl)
+
+    def credential_status(self):
+        return []
+
+
 def _make_wcl_factory(wcl_mock):
     """Build a sync factory returning an async context manager (mirrors WCLClient)."""
-    def factory():
-        return _AsyncCM(wcl_mock)
-    return factory
+    return _WCLFactory(wcl_mock)
 
 
 class _AsyncCM:
@@ -91,12 +112,23 @@ def _make_transactional_session_factory(mock_session):
     return session_factory
 
 
+def _live_session(*appendable):
+    """Session for a live poll: no registered characters, ``appendable`` ready."""
+    session = _make_transactional_session()
+    names = MagicMock()
+    names.__iter__ = MagicMock(return_value=iter([]))
+    ready = MagicMock()
+    ready.__iter__ = MagicMock(return_value=iter([(code,) for code in appendable]))
+    session.execute.side_effect = [names, ready]
+    return session
+
+
 class TestAutoIngestServiceStatus:
     """Tests for status reporting."""
 
     def test_get_status_idle(self):
         settings = _make_settings()
-        svc = AutoIngestService(settings, MagicMock(), MagicMock())
+        svc = AutoIngestService(settings, MagicMock(), _make_wcl_factory(AsyncMock()))
         status = svc.get_status()
 
         assert status["enabled"] is True
@@ -108,6 +140,7 @@ class TestAutoIngestServiceStatus:
         assert status["stats"]["polls"] == 0
         assert status["stats"]["reports_ingested"] == 0
         assert status["stats"]["errors"] == 0
+        assert status["wcl_credentials"] == []
 
     def test_enabled_returns_false_when_disabled(self):
         settings = _make_settings(enabled=False)
@@ -196,6 +229,47 @@ class TestAutoIngestPollOnce:
         assert svc._stats["reports_ingested"] == 2
         assert svc._stats["polls"] == 1
 
+    @patch(
+        "shukketsu.pipeline.ingest_jobs.enqueue_ingest_job",
+        new_callable=AsyncMock, return_value=1,
+    )
+    @patch("shukketsu.pipeline.auto_ingest.ingest_report")
+    async def test_queue_mode_enqueues_instead_of_ingesting(
+        self, mock_ingest, mock_enqueue,
+    ):
+        """With INGEST_QUEUE__ENABLED, new reports without a job are queued."""
+        settings = _make_settings(ingest_queue_enabled=True)
+        wcl = AsyncMock()
+        wcl.query.return_value = {
+            "reportData": {
+                "reports": {
+                    "data": [
+                        {"code": "AAA", "title": "Raid Night 1"},
+                        {"code": "BBB", "title": "Raid Night 2"},
+                        {"code": "CCC", "title": "Raid Night 3"},
+                    ]
+                }
+            }
+        }
+
+        mock_session = _make_transactional_session()
+        in_db, has_job = MagicMock(), MagicMock()
+        in_db.__iter__ = MagicMock(return_value=iter([("BBB",)]))
+        has_job.__iter__ = MagicMock(return_value=iter([("CCC",)]))
+        mock_session.execute.side_effect = [in_db, has_job]
+
+        svc = AutoIngestService(
+            settings, _make_transactional_session_factory(mock_session),
+            _make_wcl_factory(wcl),
+        )
+        await svc._poll_once()
+
+        mock_ingest.assert_not_called()
+        assert [c.args[1] for c in mock_enqueue.call_args_list] == ["AAA"]
+        assert mock_enqueue.call_args.kwargs["source"] == "poll"
+        assert svc._stats["reports_queued"] == 1
+        assert svc._status == "idle"
+
     @patch("shukketsu.pipeline.auto_ingest.ingest_report")
     async def test_skips_all_existing_reports(self, mock_ingest):
         """All reports already in DB -> nothing ingested."""
@@ -475,7 +549,7 @@ class TestBenchmarkAutoRefresh:
         service = AutoIngestService(
             settings=settings,
             session_factory=AsyncMock(),
-            wcl_factory=AsyncMock(),
+            wcl_factory=_make_wcl_factory(AsyncMock()),
         )
         status = service.get_status()
         assert status["benchmark_enabled"] is True
@@ -591,3 +665,128 @@ class TestSpeedRankingsAutoRefresh:
         # There should be a try/except around _refresh_speed_rankings
         # that's separate from the main try/except
         assert "Speed rankings refresh failed" in source
+
+
+class TestCredentialStatus:
+    def test_status_includes_per_credential_usage(self):
+        from pydantic import SecretStr
+
+        from shukketsu.config import WCLConfig
+        from shukketsu.wcl.factory import WCLFactory
+
+        settings = _make_settings()
+        settings.wcl = WCLConfig(client_id="test-id", client_secret=SecretStr("s"))
+        svc = AutoIngestService(settings, MagicMock(), WCLFactory(settings))
+
+        creds = svc.get_status()["wcl_credentials"]
+        assert len(creds) == 1
+        assert creds[0]["limit_per_hour"] == 3600
+        assert creds[0]["points_spent"] == 0
+
+
+class TestLiveReports:
+    """Tests for following in-progress (live-logged) reports."""
+
+    def _now_ms(self):
+        from datetime import UTC, datetime
+        return int(datetime.now(UTC).timestamp() * 1000)
+
+    def test_tracks_only_recent_reports_when_enabled(self):
+        settings = _make_settings(live_enabled=True, live_idle_minutes=30)
+        svc = AutoIngestService(settings, MagicMock(), MagicMock())
+        now = self._now_ms()
+
+        svc._track_live_reports([
+            {"code": "LIVE", "endTime": now - 60_000},
+            {"code": "OLD", "endTime": now - 3 * 3600_000},
+        ])
+
+        assert list(svc._live_reports) == ["LIVE"]
+        assert svc.get_status()["live_reports"][0]["code"] == "LIVE"
+
+    def test_no_tracking_when_disabled(self):
+        settings = _make_settings(live_enabled=False)
+        svc = AutoIngestService(settings, MagicMock(), MagicMock())
+
+        svc._track_live_reports([{"code": "LIVE", "endTime": self._now_ms()}])
+
+        assert svc._live_reports == {}
+
+    async def test_start_creates_live_task_when_enabled(self):
+        settings = _make_settings(enabled=True, guild_id=0, live_enabled=True)
+        svc = AutoIngestService(settings, MagicMock(), MagicMock())
+
+        await svc.start()
+        assert svc._live_task is not None
+
+        await svc.stop()
+        assert svc._live_task.done()
+
+    @patch(
+        "shukketsu.pipeline.progression.snapshot_all_characters",
+        new_callable=AsyncMock, return_value=0,
+    )
+    @patch("shukketsu.pipeline.auto_ingest.ingest_report_incremental")
+    async def test_live_poll_appends_and_records_growth(self, mock_incr, mock_snap):
+        from datetime import UTC, datetime, timedelta
+
+        settings = _make_settings(live_enabled=True)
+        session_factory = _make_transactional_session_factory(_live_session("LIVE"))
+        wcl = AsyncMock()
+        wcl.mark_report_live = MagicMock()
+        svc = AutoIngestService(settings, session_factory, _make_wcl_factory(wcl))
+        stale = datetime.now(UTC) - timedelta(minutes=10)
+        svc._live_reports["LIVE"] = {"end_time": 1000, "last_growth": stale}
+        mock_incr.return_value = MagicMock(fights=2, report_end_time=5000)
+
+        await svc._poll_live_once()
+
+        assert mock_incr.call_args.args[2] == "LIVE"
+        wcl.mark_report_live.assert_called_once_with("LIVE")
+        assert svc._live_reports["LIVE"]["end_time"] == 5000
+        assert svc._live_reports["LIVE"]["last_growth"] > stale
+        assert svc._stats["live_fights_ingested"] == 2
+        mock_snap.assert_awaited_once()
+
+    @patch("shukketsu.pipeline.auto_ingest.ingest_report_incremental")
+    async def test_live_poll_drops_idle_report(self, mock_incr):
+        from datetime import UTC, datetime, timedelta
+
+        settings = _make_settings(live_enabled=True, live_idle_minutes=30)
+        session_factory = _make_transactional_session_factory(_live_session("DONE"))
+        wcl = AsyncMock()
+        wcl.mark_report_live = MagicMock()
+        svc = AutoIngestService(settings, session_factory, _make_wcl_factory(wcl))
+        svc._live_reports["DONE"] = {
+            "end_time": 5000,
+            "last_growth": datetime.now(UTC) - timedelta(minutes=45),
+        }
+        mock_incr.return_value = MagicMock(fights=0, report_end_time=5000)
+
+        await svc._poll_live_once()
+
+        assert svc._live_reports == {}
+
+    @patch("shukketsu.pipeline.auto_ingest.ingest_report_incremental")
+    async def test_live_poll_skips_reports_owned_by_first_ingest(self, mock_incr):
+        from datetime import UTC, datetime
+
+        settings = _make_settings(live_enabled=True)
+        session = _live_session("OLD")
+        session_factory = _make_transactional_session_factory(session)
+        wcl = AsyncMock()
+        wcl.mark_report_live = MagicMock()
+        svc = AutoIngestService(settings, session_factory, _make_wcl_factory(wcl))
+        now = datetime.now(UTC)
+        svc._live_reports["OLD"] = {"end_time": 1000, "last_growth": now}
+        svc._live_reports["QUEUED"] = {"end_time": 1000, "last_growth": now}
+        mock_incr.return_value = MagicMock(fights=0, report_end_time=1000)
+
+        await svc._poll_live_once()
+
+        assert [c.args[2] for c in mock_incr.call_args_list] == ["OLD"]
+        # QUEUED is still followed, for when its ingest job is done
+        assert set(svc._live_reports) == {"OLD", "QUEUED"}
+        ready_sql = str(session.execute.await_args_list[1].args[0])
+        assert "NOT (EXISTS" in ready_sql
+        assert "ingest_jobs.status IN" in ready_sql
@@ -5,14 +5,18 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from shukketsu.db.models import CastEvent
 from shukketsu.pipeline.cast_events import (
+    CastAnalyzer,
+    CastExtension,
+    DotRefreshExtension,
     compute_cancelled_casts,
     compute_cast_metrics,
     compute_cooldown_usage,
+    delete_cast_data_for_fights,
     ingest_cast_events_for_fight,
     parse_cast_events,
 )
+from shukketsu.pipeline.rows import CastEventRow
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -46,9 +50,9 @@ def _make_cast_event(
     timestamp_ms: int,
     fight_id: int = 1,
     target_name: str | None = None,
-) -> CastEvent:
-    """Build a CastEvent ORM object for testing compute functions."""
-    return CastEvent(
+) -> CastEventRow:
+    """Build a CastEventRow record for testing compute functions."""
+    return CastEventRow(
         fight_id=fight_id,
         player_name=player_name,
         timestamp_ms=timestamp_ms,
@@ -295,7 +299,7 @@ class TestComputeCooldownUsage:
         """Cooldown with 0 uses shows 0% efficiency."""
         fight_duration_ms = 180_000
         player_class_map = {"Lyro": "Warrior"}
-        events: list[CastEvent] = []
+        events: list[CastEventRow] = []
 
         result = compute_cooldown_usage(events, fight_duration_ms, player_class_map)
 
@@ -462,25 +466,49 @@ class TestIngestCastEventsForFight:
         async def _fake_fetch(*args, **kwargs):
             yield raw_events
 
-        with patch(
-            "shukketsu.pipeline.cast_events.fetch_all_events",
-            side_effect=_fake_fetch,
+        with (
+            patch(
+                "shukketsu.pipeline.cast_events.fetch_all_events",
+                side_effect=_fake_fetch,
+            ),
+            patch(
+                "shukketsu.db.upsert.upsert_rows", new_callable=AsyncMock,
+            ) as mock_upsert,
         ):
             total = await ingest_cast_events_for_fight(
                 wcl, session, "ABC123", fight, actors, player_class_map,
             )
 
-        # Should have inserted rows:
-        #   4 CastEvent (begincast+cast for Lyro, cast for Healer; NPC skipped)
+        # Should have stored rows:
+        #   4 cast events (begincast+cast for Lyro, cast for Healer; NPC skipped)
         #   2 CastMetric (Lyro + Healer)
         #   N CooldownUsage (Warrior+Priest cooldowns)
         #   2 CancelledCast (Lyro + Healer)
         assert total > 0
-        assert session.add.call_count > 0
-        session.flush.assert_awaited_once()
-
-        # Verify 4 delete calls (one per table)
-        assert session.execute.await_count == 4
+        session.add.assert_not_called()
+
+        # Only the legacy cast_events rows are deleted; nothing is bulk inserted
+        session.execute.assert_awaited_once()
+        assert str(session.execute.await_args.args[0]).startswith(
+            "DELETE FROM cast_events"
+        )
+
+        # Series and derived metrics are upserted per table, scoped to the fight
+        upserted = {
+            c.args[1].__tablename__: list(c.args[2])
+            for c in mock_upsert.await_args_list
+        }
+        assert set(upserted) == {
+            "cast_event_series", "cast_metrics", "cooldown_usage", "cancelled_casts",
+        }
+        series = {s.player_name: s for s in upserted.pop("cast_event_series")}
+        assert series["Lyro"].event_count == 3
+        assert series["Healer"].spell_ids == [300]
+        assert len(upserted["cast_metrics"]) == 2
+        assert all(
+            row.fight_id == 42 for rows in upserted.values() for row in rows
+        )
+        assert total == 4 + sum(len(rows) for rows in upserted.values())
 
     @pytest.mark.asyncio
     async def test_ingest_cast_events_for_fight_empty(self):
@@ -510,6 +538,34 @@ class TestIngestCastEventsForFight:
 
         assert total == 0
 
+    @pytest.mark.asyncio
+    async def test_no_events_clears_stale_metrics(self):
+        """A fight without casts still replaces (empties) its derived rows."""
+        session = AsyncMock()
+        fight = MagicMock(id=1, fight_id=1, start_time=0, end_time=60_000)
+
+        async def _fake_fetch_empty(*args, **kwargs):
+            if False:
+                yield
+
+        with (
+            patch(
+                "shukketsu.pipeline.cast_events.fetch_all_events",
+                side_effect=_fake_fetch_empty,
+            ),
+            patch(
+                "shukketsu.db.upsert.upsert_rows", new_callable=AsyncMock,
+            ) as mock_upsert,
+        ):
+            await ingest_cast_events_for_fight(
+                AsyncMock(), session, "ABC", fight, {}, {},
+            )
+
+        assert mock_upsert.await_count == 4
+        for c in mock_upsert.await_args_list:
+            assert list(c.args[2]) == []
+            assert c.kwargs["scope"] is not None
+
     @pytest.mark.asyncio
     async def test_ingest_cast_events_for_fight_exception(self):
         """On exception, error propagates to caller (outer handler in ingest.py)."""
@@ -527,3 +583,199 @@ class TestIngestCastEventsForFight:
             await ingest_cast_events_for_fight(
                 wcl, session, "ABC", fight, {}, {},
             )
+
+
+class TestDeleteCastDataForFights:
+    async def test_one_delete_per_table_for_all_fights(self):
+        session = AsyncMock()
+        await delete_cast_data_for_fights(session, [7, 8, 9])
+
+        statements = [str(c.args[0]) for c in session.execute.await_args_list]
+        assert [s.split(" WHERE")[0] for s in statements] == [
+            "DELETE FROM cast_events", "DELETE FROM cast_event_series",
+            "DELETE FROM cast_metrics",
+            "DELETE FROM cooldown_usage", "DELETE FROM cancelled_casts",
+        ]
+        assert all(".fight_id IN" in s for s in statements)
+
+
+class TestCastEventsStream:
+    """Page-by-page streaming matches parsing the whole fight at once."""
+
+    def _events(self):
+        events = []
+        for i in range(40):
+            events.append(_make_event(1, "begincast", 100, "Slam", i * 1700))
+            if i % 3:
+                events.append(_make_event(1, "cast", 100, "Slam", i * 1700 + 900))
+            events.append(_make_event(2, "cast", 1719, "Recklessness", i * 4000))
+        events.append(_make_event(99, "cast", 400, "NPC Spell", 500))
+        return sorted(events, key=lambda e: e["timestamp"])
+
+    @staticmethod
+    def _row_keys(upsert):
+        rows = [
+            (type(r).__name__, {
+                col.key: getattr(r, col.key) for col in r.__table__.columns
+                if col.key != "id"
+            })
+            for c in upsert.await_args_list for r in c.args[2]
+        ]
+        return sorted(
+            (name, *sorted((k, repr(v)) for k, v in cols.items()))
+            for name, cols in rows
+        )
+
+    async def test_paged_stream_matches_single_batch(self):
+        from shukketsu.pipeline.cast_events import persist_cast_events_for_fight
+
+        fight = MagicMock(id=42, fight_id=7, start_time=0, end_time=180_000)
+        actors = {1: "Lyro", 2: "Healer"}
+        classes = {"Lyro": "Warrior", "Healer": "Priest"}
+        events = self._events()
+
+        whole = AsyncMock(add=MagicMock())
+        with patch(
+            "shukketsu.db.upsert.upsert_rows", new_callable=AsyncMock,
+        ) as whole_upsert:
+            whole_rows = await persist_cast_events_for_fight(
+                whole, "ABC", fight, events, actors, classes,
+            )
+
+        async def _pages(*args, **kwargs):
+            for i in range(0, len(events), 7):
+                yield events[i:i + 7]
+
+        paged = AsyncMock(add=MagicMock())
+        with (
+            patch(
+                "shukketsu.pipeline.cast_events.fetch_all_events", side_effect=_pages,
+            ),
+            patch(
+                "shukketsu.db.upsert.upsert_rows", new_callable=AsyncMock,
+            ) as paged_upsert,
+        ):
+            paged_rows = await ingest_cast_events_for_fight(
+                MagicMock(), paged, "ABC", fight, actors, classes,
+            )
+
+        assert paged_rows == whole_rows > 0
+        assert self._row_keys(paged_upsert) == self._row_keys(whole_upsert)
+        # One series row per player, whatever the page size
+        assert [
+            len(c.args[2]) for c in paged_upsert.await_args_list
+            if c.args[1].__tablename__ == "cast_event_series"
+        ] == [2]
+
+
+class TestCastAnalyzer:
+    def _casts(self):
+        casts = []
+        for i in range(30):
+            casts.append(_make_cast_event("Lyro", "begincast", 100, "Slam", i * 2000))
+            if i % 4:
+                casts.append(_make_cast_event("Lyro", "cast", 100, "Slam", i * 2000 + 500))
+            if i % 10 == 0:
+                casts.append(_make_cast_event("Lyro", "cast", 1719, "Recklessness", i * 2000))
+        casts.append(_make_cast_event("Healer", "begincast", 25235, "Flash Heal", 700))
+        return sorted(casts, key=lambda c: c.timestamp_ms)
+
+    def test_single_pass_matches_compute_functions(self):
+        casts = self._casts()
+        classes = {"Lyro": "Warrior", "Healer": "Priest"}
+        analyzer = CastAnalyzer()
+        analyzer.add_rows(casts)
+        analysis = analyzer.results(60_000, classes)
+
+        def cols(row):
+            return {c.key: getattr(row, c.key) for c in row.__table__.columns}
+
+        expected_metrics = compute_cast_metrics(casts, 60_000)
+        assert {k: cols(v) for k, v in analysis.metrics.items()} == {
+            k: cols(v) for k, v in expected_metrics.items()
+        }
+        # Healer only began a cast: cancel stats but no cast metrics
+        assert set(analysis.metrics) == {"Lyro"}
+        assert [cols(c) for c in analysis.cooldowns] == [
+            cols(c) for c in compute_cooldown_usage(casts, 60_000, classes)
+        ]
+        assert {k: cols(v) for k, v in analysis.cancelled.items()} == {
+            k: cols(v) for k, v in compute_cancelled_casts(casts).items()
+        }
+        reck = next(c for c in analysis.cooldowns if c.spell_id == 1719)
+        assert (reck.times_used, reck.first_use_ms, reck.last_use_ms) == (3, 0, 40_000)
+
+    def test_pages_equal_one_batch(self):
+        casts = self._casts()
+        whole = CastAnalyzer()
+        whole.add_rows(casts)
+        paged = CastAnalyzer()
+        for i in range(0, len(casts), 7):
+            paged.add_rows(casts[i:i + 7])
+        assert paged.cast_metrics(60_000)["Lyro"].gcd_uptime_pct == (
+            whole.cast_metrics(60_000)["Lyro"].gcd_uptime_pct
+        )
+        assert paged.cancelled_casts()["Lyro"].cancel_count == 30 - 25
+
+    def test_extension_sees_each_cast_once(self):
+        class SpellCounter(CastExtension):
+            name = "counts"
+
+            def __init__(self):
+                self.counts = {}
+
+            def add(self, ce):
+                self.counts[ce.spell_id] = self.counts.get(ce.spell_id, 0) + 1
+
+            def results(self, fight_duration_ms):
+                return dict(self.counts)
+
+        casts = self._casts()
+        analyzer = CastAnalyzer([SpellCounter()])
+        analyzer.add_rows(casts)
+        analyzer.add(_make_cast_event("Lyro", "damage", 100, "Slam", 99_000))
+
+        extra = analyzer.results(60_000, {}).extra
+        assert extra["counts"] == {100: 52, 1719: 3, 25235: 1}
+
+    def test_extension_must_implement_add_and_results(self):
+        class Incomplete(CastExtension):
+            name = "incomplete"
+
+            def add(self, ce):
+                pass
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+
+class TestDotRefreshExtension:
+    def test_early_refreshes_and_clipped_ticks(self):
+        # Corruption: 18s duration, 3s ticks
+        casts = [
+            _make_cast_event("Lock", "cast", 27216, "Corruption", t)
+            for t in (0, 18_000, 27_000, 42_000)
+        ]
+        casts.append(_make_cast_event("Lock", "begincast", 27216, "Corruption", 50_000))
+        casts.append(_make_cast_event("Lock", "cast", 100, "Shadow Bolt", 51_000))
+        analyzer = CastAnalyzer([DotRefreshExtension()])
+        analyzer.add_rows(casts)
+
+        [dot] = analyzer.results(60_000, {}).extra["dot_refreshes"]["Lock"]
+        assert (dot.spell_id, dot.name) == (27216, "Corruption")
+        assert dot.refreshes == 3
+        # 27s recast leaves 9s (50%) running, 42s recast leaves 3s (17%)
+        assert dot.early_refreshes == 1
+        assert dot.clipped_ticks == pytest.approx(3 + 1)
+        assert dot.early_pct == pytest.approx(100 / 3)
+        assert dot.avg_remaining_ms == pytest.approx((9_000 + 3_000) / 2)
+
+    def test_single_cast_and_other_players_separate(self):
+        ext = DotRefreshExtension()
+        ext.add(_make_cast_event("A", "cast", 27216, "Corruption", 0))
+        ext.add(_make_cast_event("B", "cast", 27216, "Corruption", 1_000))
+        ext.add(_make_cast_event("B", "cast", 27216, "Corruption", 2_000))
+
+        results = ext.results(60_000)
+        assert list(results) == ["B"]
+        assert results["B"][0].early_refreshes == 1
@@ -0,0 +1,114 @@
+"""Tests for columnar cast-event storage (pipeline.cast_series)."""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from shukketsu.pipeline.cast_series import (
+    CastSeriesBuilder,
+    expand_series,
+    fetch_player_casts,
+)
+from shukketsu.pipeline.rows import CastEventRow
+
+
+def _casts():
+    casts = []
+    for i in range(20):
+        casts.append(CastEventRow(
+            42, "Lyro", i * 1500, 100, "Slam", "begincast", "Gruul",
+        ))
+        if i % 3:
+            casts.append(CastEventRow(
+                42, "Lyro", i * 1500 + 700, 100, "Slam", "cast", "Gruul",
+            ))
+        casts.append(CastEventRow(
+            42, "Healer", i * 2000, 25235, "Flash Heal", "cast",
+            "Lyro" if i % 2 else None,
+        ))
+    return sorted(casts, key=lambda ce: ce.timestamp_ms)
+
+
+def _series_by_player(casts):
+    builder = CastSeriesBuilder(42)
+    builder.add_rows(casts)
+    return {s.player_name: s for s in builder.series()}
+
+
+class TestCastSeriesBuilder:
+    def test_round_trip(self):
+        casts = _casts()
+        series = _series_by_player(casts)
+
+        for name, s in series.items():
+            expected = [ce for ce in casts if ce.player_name == name]
+            assert list(expand_series(s)) == expected
+            assert s.event_count == len(expected)
+
+    def test_names_stored_once(self):
+        series = _series_by_player(_casts())
+
+        lyro = series["Lyro"]
+        assert lyro.ability_names_json == '{"100": "Slam"}'
+        assert lyro.target_names_json == '["Gruul"]'
+        assert set(lyro.target_idx) == {1}
+        assert set(series["Healer"].target_idx) == {0, 1}
+
+    def test_begincast_bitmap(self):
+        series = _series_by_player([
+            CastEventRow(42, "Lyro", t, 100, "Slam", event_type)
+            for t, event_type in enumerate(
+                ["begincast", "cast"] * 4 + ["begincast"],
+            )
+        ])
+
+        # 9 events: 2 bytes, bits 0, 2, 4, 6 and 8 set
+        assert series["Lyro"].begincast_bitmap == bytes([0b01010101, 0b1])
+
+    def test_other_event_types_skipped(self):
+        builder = CastSeriesBuilder(42)
+        builder.add_rows([CastEventRow(42, "Lyro", 0, 100, "Slam", "damage")])
+        assert builder.series() == []
+
+
+class TestFetchPlayerCasts:
+    @staticmethod
+    def _session(*results):
+        session = AsyncMock()
+        session.execute.side_effect = [
+            MagicMock(fetchall=MagicMock(return_value=rows)) for rows in results
+        ]
+        return session
+
+    async def test_merges_matching_players_by_timestamp(self):
+        series = _series_by_player(_casts())
+        session = self._session(list(series.values()))
+
+        casts = await fetch_player_casts(session, "ABC", 7, "%")
+
+        assert [ce.timestamp_ms for ce in casts] == sorted(
+            ce.timestamp_ms for ce in _casts()
+        )
+        session.execute.assert_awaited_once()
+
+    async def test_event_type_filter(self):
+        series = _series_by_player(_casts())
+        session = self._session([series["Lyro"]])
+
+        casts = await fetch_player_casts(
+            session, "ABC", 7, "Lyro", event_type="cast",
+        )
+
+        assert len(casts) == 13
+        assert {ce.event_type for ce in casts} == {"cast"}
+
+    async def test_falls_back_to_legacy_rows(self):
+        legacy = SimpleNamespace(
+            fight_id=42, player_name="Lyro", timestamp_ms=1000, spell_id=100,
+            ability_name="Slam", event_type="cast", target_name=None,
+        )
+        session = self._session([], [legacy])
+
+        casts = await fetch_player_casts(session, "ABC", 7, "Lyro")
+
+        assert casts == [CastEventRow(42, "Lyro", 1000, 100, "Slam", "cast")]
+        assert session.execute.await_count == 2
@@ -0,0 +1,292 @@
+"""Tests for per-(fight, stage) enrichment checkpoints and resume_report."""
+
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy.dialects import postgresql
+
+from shukketsu.db.models import Fight, Report
+from shukketsu.db.partitions import PARTITIONED_TABLES
+from shukketsu.pipeline.checkpoints import (
+    ENRICHMENT_STAGES,
+    pending_stages,
+    record_stage_statuses,
+    requested_stages,
+    resume_report,
+    stage_outcomes,
+    stage_statuses,
+)
+from shukketsu.pipeline.ingest import IngestResult
+
+
+def _fight(fight_id, db_id=None):
+    return Fight(
+        id=db_id or 100 + fight_id, report_code="ABC", fight_id=fight_id,
+        encounter_id=50650, start_time=0, end_time=60000, kill=True,
+    )
+
+
+class _AsyncCM:
+    def __init__(self, val):
+        self._val = val
+
+    async def __aenter__(self):
+        return self._val
+
+    async def __aexit__(self, *exc):
+        pass
+
+
+def _make_session_factory(sessions):
+    """Session factory handing out ``sessions`` in order."""
+    factory = MagicMock()
+    factory.side_effect = [_AsyncCM(s) for s in sessions]
+    return factory
+
+
+def _make_session():
+    session = AsyncMock()
+    session.begin = MagicMock(return_value=_AsyncCM(None))
+    return session
+
+
+class TestStageStatuses:
+    def test_requested_stages(self):
+        assert requested_stages(ingest_tables=False, ingest_events=False) == []
+        assert requested_stages(ingest_tables=True, ingest_events=False) == [
+            "table_data",
+        ]
+        assert requested_stages(
+            ingest_tables=True, ingest_events=True,
+        ) == ENRICHMENT_STAGES
+
+    def test_errors_mark_matching_fight_failed(self):
+        fights = [_fight(1), _fight(2)]
+        rows = stage_statuses(
+            fights, ["cast_events", "death_events"], ["cast_events_fight_2"],
+        )
+
+        status = {(r["fight_id"], r["stage"]): r["status"] for r in rows}
+        assert status == {
+            (101, "cast_events"): "done",
+            (101, "death_events"): "done",
+            (102, "cast_events"): "failed",
+            (102, "death_events"): "done",
+        }
+        failed = next(r for r in rows if r["status"] == "failed")
+        assert failed["error"] == "cast_events_fight_2"
+
+    def test_report_level_error_fails_every_fight(self):
+        rows = stage_statuses(
+            [_fight(1), _fight(2)], ["combatant_info"], ["combatant_info"],
+        )
+        assert [r["status"] for r in rows] == ["failed", "failed"]
+
+    def test_table_data_error_label(self):
+        rows = stage_statuses([_fight(3)], ["table_data"], ["table_data_fight_3"])
+        assert rows[0]["status"] == "failed"
+
+    async def test_record_upserts_rows(self):
+        session = AsyncMock()
+        await record_stage_statuses(session, [_fight(1)], ["cast_events"], [])
+
+        stmt = session.execute.await_args.args[0]
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        assert "INSERT INTO fight_stage_status" in sql
+        assert "ON CONFLICT (fight_id, stage) DO UPDATE" in sql
+
+    async def test_record_nothing_requested_is_noop(self):
+        session = AsyncMock()
+        await record_stage_statuses(session, [_fight(1)], [], [])
+        session.execute.assert_not_awaited()
+
+
+class TestPendingStages:
+    async def test_missing_and_failed_are_pending(self):
+        fights_result = MagicMock()
+        fights_result.all.return_value = [
+            SimpleNamespace(id=101, fight_id=1),
+            SimpleNamespace(id=102, fight_id=2),
+        ]
+        done_result = [
+            SimpleNamespace(fight_id=101, stage="table_data"),
+            SimpleNamespace(fight_id=102, stage="table_data"),
+            SimpleNamespace(fight_id=101, stage="cast_events"),
+        ]
+        session = AsyncMock()
+        session.execute.side_effect = [fights_result, done_result]
+
+        pending = await pending_stages(
+            session, "ABC", ["table_data", "cast_events", "death_events"],
+        )
+
+        assert pending == {"cast_events": [2], "death_events": [1, 2]}
+
+    async def test_no_fights(self):
+        fights_result = MagicMock()
+        fights_result.all.return_value = []
+        session = AsyncMock()
+        session.execute.return_value = fights_result
+
+        assert await pending_stages(session, "ABC", ["table_data"]) == {}
+
+
+class TestStageOutcomes:
+    async def test_counts_done_failed_and_missing(self):
+        fights_result = MagicMock()
+        fights_result.scalar.return_value = 3
+        session = AsyncMock()
+        session.execute.side_effect = [fights_result, [
+            ("table_data", "done", 3),
+            ("cast_events", "done", 1),
+            ("cast_events", "failed", 1),
+        ]]
+
+        outcomes = await stage_outcomes(
+            session, "ABC", ["table_data", "cast_events", "death_events"],
+        )
+
+        assert outcomes == {
+            "table_data": {"done": 3, "failed": 0, "missing": 0},
+            "cast_events": {"done": 1, "failed": 1, "missing": 1},
+            "death_events": {"done": 0, "failed": 0, "missing": 3},
+        }
+
+
+class TestResumeReport:
+    async def test_reruns_only_pending_stages_each_in_own_transaction(self):
+        lookup = _make_session()
+        lookup.get.return_value = Report(
+            code="ABC", title="Gruul", start_time=0, end_time=1,
+        )
+        stage_sessions = [_make_session(), _make_session()]
+        for session in stage_sessions:
+            result = MagicMock()
+            result.scalars.return_value.all.return_value = [_fight(2)]
+            session.execute.return_value = result
+        factory = _make_session_factory([lookup, *stage_sessions])
+
+        run_stage = AsyncMock(side_effect=[(5, []), (0, ["cast_events_fight_2"])])
+        record = AsyncMock()
+        with (
+            patch(
+                "shukketsu.pipeline.checkpoints.pending_stages",
+                AsyncMock(return_value={
+                    "death_events": [2], "cast_events": [2],
+                }),
+            ),
+            patch(
+                "shukketsu.pipeline.ingest._fetch_report_info",
+                AsyncMock(return_value={"masterData": {"actors": []}}),
+            ),
+            patch("shukketsu.pipeline.checkpoints._run_stage", run_stage),
+            patch("shukketsu.pipeline.checkpoints.record_stage_statuses", record),
+            patch(
+                "shukketsu.pipeline.checkpoints.ensure_partitions_committed",
+                new_callable=AsyncMock,
+            ),
+        ):
+            result = await resume_report(
+                MagicMock(), factory, "ABC", ingest_events=True,
+            )
+
+        assert [c.args[3] for c in run_stage.await_args_list] == [
+            "death_events", "cast_events",
+        ]
+        assert result.resumed == {"death_events": 1, "cast_events": 1}
+        assert result.event_rows == 5
+        assert result.enrichment_errors == ["cast_events_fight_2"]
+        # Each stage's checkpoints are written in that stage's session
+        assert [c.args[0] for c in record.await_args_list] == stage_sessions
+        assert record.await_args_list[1].args[2:] == (
+            ["cast_events"], ["cast_events_fight_2"],
+        )
+        for session in stage_sessions:
+            session.begin.assert_called_once()
+
+    async def test_recreates_dropped_partitions_before_stage(self):
+        lookup = _make_session()
+        lookup.get.return_value = Report(
+            code="ABC", title="Gruul", start_time=0, end_time=1,
+        )
+        fight = _fight(2)
+        fight.report_month = date(2025, 1, 1)
+        stage_session = _make_session()
+        stage_session.bind = None
+        fights_result = MagicMock()
+        fights_result.scalars.return_value.all.return_value = [fight]
+        no_partitions = MagicMock()
+        no_partitions.scalars.return_value = []  # retention dropped the month
+        stage_session.execute.side_effect = [fights_result, no_partitions] + [
+            MagicMock() for _ in range(10)
+        ]
+        factory = _make_session_factory([lookup, stage_session])
+
+        statements_at_run: list[str] = []
+
+        async def run_stage(*args):
+            statements_at_run.extend(
+                str(c.args[0]) for c in stage_session.execute.await_args_list
+            )
+            return 3, []
+
+        with (
+            patch(
+                "shukketsu.pipeline.checkpoints.pending_stages",
+                AsyncMock(return_value={"death_events": [2]}),
+            ),
+            patch(
+                "shukketsu.pipeline.ingest._fetch_report_info",
+                AsyncMock(return_value={"masterData": {"actors": []}}),
+            ),
+            patch("shukketsu.pipeline.checkpoints._run_stage", run_stage),
+            patch("shukketsu.pipeline.checkpoints.record_stage_statuses", AsyncMock()),
+        ):
+            result = await resume_report(
+                MagicMock(), factory, "ABC", ingest_events=True,
+            )
+
+        assert result.event_rows == 3
+        creates = [s for s in statements_at_run if s.startswith("CREATE TABLE")]
+        assert len(creates) == len(PARTITIONED_TABLES)
+        assert all("_p202501 PARTITION OF" in s for s in creates)
+
+    async def test_nothing_pending_skips_wcl(self):
+        lookup = _make_session()
+        lookup.get.return_value = Report(
+            code="ABC", title="Gruul", start_time=0, end_time=1,
+        )
+        wcl = MagicMock()
+        wcl.query = AsyncMock()
+        with patch(
+            "shukketsu.pipeline.checkpoints.pending_stages",
+            AsyncMock(return_value={}),
+        ):
+            result = await resume_report(
+                wcl, _make_session_factory([lookup]), "ABC", ingest_tables=True,
+            )
+
+        assert result.resumed == {}
+        wcl.query.assert_not_awaited()
+
+    async def test_unknown_report_gets_full_ingest(self):
+        lookup = _make_session()
+        lookup.get.return_value = None
+        ingest_session = _make_session()
+        ingest_session.execute.return_value = []
+        factory = _make_session_factory([lookup, ingest_session])
+
+        with patch(
+            "shukketsu.pipeline.ingest.ingest_report",
+            AsyncMock(return_value=IngestResult(
+                fights=2, performances=10, table_rows=7,
+            )),
+        ) as mock_ingest:
+            result = await resume_report(
+                MagicMock(), factory, "ABC", ingest_tables=True,
+            )
+
+        assert result.full_ingest is True
+        assert result.table_rows == 7
+        assert mock_ingest.await_args.kwargs["ingest_tables"] is True
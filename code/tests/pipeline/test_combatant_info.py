@@ -1,6 +1,6 @@
 """Tests for CombatantInfo parsing (consumables + gear snapshots)."""
 
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from shukketsu.pipeline.combatant_info import (
     ingest_combatant_info_for_report,
@@ -158,7 +158,7 @@ class TestIngestCombatantInfoForReport:
         # Mock execute to return fights on first call, then succeed on deletes
         call_count = 0
 
-        async def mock_execute(stmt):
+        async def mock_execute(stmt, params=None):
             nonlocal call_count
             call_count += 1
             if call_count == 1:
@@ -192,14 +192,23 @@ class TestIngestCombatantInfoForReport:
             }
         })
 
-        count = await ingest_combatant_info_for_report(
-            wcl, session, "ABC123",
-        )
+        with patch(
+            "shukketsu.db.upsert.upsert_rows", new_callable=AsyncMock,
+        ) as mock_upsert:
+            count = await ingest_combatant_info_for_report(
+                wcl, session, "ABC123",
+            )
 
         # 1 consumable + 2 gear items = 3 rows
         assert count == 3
-        assert session.add.call_count == 3
-        session.flush.assert_awaited_once()
+        # Rows are upserted per fight, not added to the session
+        session.add.assert_not_called()
+        upserts = {
+            c.args[1].__tablename__: c.args[2] for c in mock_upsert.await_args_list
+        }
+        assert len(upserts["fight_consumables"]) == 1
+        assert len(upserts["gear_snapshots"]) == 2
+        assert all(c.kwargs["scope"] for c in mock_upsert.await_args_list)
 
     async def test_no_fights_returns_zero(self):
         wcl = AsyncMock()
@@ -0,0 +1,303 @@
+"""Tests for raw event retention and compaction (pipeline.compaction)."""
+
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from shukketsu.config import RetentionPolicy
+from shukketsu.db.models import CastEvent, EventArchive
+from shukketsu.db.partitions import Partition
+from shukketsu.pipeline.compaction import (
+    CompactionService,
+    delete_rows,
+    fold_cast_events,
+    select_batch,
+)
+
+MONTH = date(2026, 1, 1)
+
+
+def _sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def _make_settings(policies, batch_fights=2, max_batches=10):
+    settings = MagicMock()
+    settings.guild.id = 42
+    settings.compaction.enabled = True
+    settings.compaction.interval_minutes = 60
+    settings.compaction.batch_fights = batch_fights
+    settings.compaction.batch_pause_seconds = 0
+    settings.compaction.max_batches_per_run = max_batches
+    settings.compaction.lock_timeout_ms = 5000
+    settings.compaction.policies = policies
+    return settings
+
+
+class _AsyncCM:
+    def __init__(self, val):
+        self._val = val
+
+    async def __aenter__(self):
+        return self._val
+
+    async def __aexit__(self, *exc):
+        pass
+
+
+def _make_session_factory(session):
+    session.begin = MagicMock(return_value=_AsyncCM(None))
+    factory = MagicMock()
+    factory.return_value.__aenter__ = AsyncMock(return_value=session)
+    factory.return_value.__aexit__ = AsyncMock(return_value=False)
+    return factory
+
+
+def _scalars(values):
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = values
+    return result
+
+
+class TestSelectBatch:
+    async def test_non_guild_partitioned_table(self):
+        session = AsyncMock()
+        session.execute.return_value = MagicMock(
+            all=MagicMock(return_value=[(1, MONTH), (2, MONTH)]),
+        )
+        policy = RetentionPolicy(table="cast_event_series", max_age_days=30)
+
+        fights = await select_batch(session, policy, 1000, 42, 50)
+
+        assert fights == [(1, MONTH), (2, MONTH)]
+        sql = _sql(session.execute.call_args[0][0])
+        assert "reports.guild_id IS DISTINCT FROM" in sql
+        assert "cast_event_series.report_month = fights.report_month" in sql
+        assert "LIMIT" in sql
+
+    async def test_benchmark_reports(self):
+        session = AsyncMock()
+        session.execute.return_value = MagicMock(all=MagicMock(return_value=[]))
+        policy = RetentionPolicy(
+            table="event_archives", max_age_days=30, reports="benchmark",
+        )
+
+        await select_batch(session, policy, 1000, 42, 50)
+
+        sql = _sql(session.execute.call_args[0][0])
+        assert "benchmark_reports.report_code = reports.code" in sql
+        assert "guild_id" not in sql
+
+
+class TestDeleteRows:
+    async def test_returns_rows_and_bytes(self):
+        session = AsyncMock()
+        session.execute.return_value = _scalars([100, 250])
+
+        rows, size = await delete_rows(session, CastEvent, [(1, MONTH), (2, MONTH)])
+
+        assert (rows, size) == (2, 350)
+        sql = _sql(session.execute.call_args[0][0])
+        assert "cast_events.report_month IN" in sql
+        assert "RETURNING pg_column_size(cast_events)" in sql
+
+    async def test_unpartitioned_table(self):
+        session = AsyncMock()
+        session.execute.return_value = _scalars([])
+
+        assert await delete_rows(session, EventArchive, [(1, MONTH)]) == (0, 0)
+        assert "report_month" not in _sql(session.execute.call_args[0][0])
+
+
+class TestFoldCastEvents:
+    async def test_folds_legacy_rows_into_series(self):
+        legacy = [(1, "Lyro", t, 100, "Slam", "cast", None) for t in (0, 1500)]
+        session = AsyncMock()
+        session.execute.side_effect = [
+            _scalars([2]),  # fight 2 already has series rows
+            MagicMock(all=MagicMock(return_value=legacy)),
+            MagicMock(scalar=MagicMock(return_value=40)),
+            _scalars([30, 30, 30]),
+        ]
+        upserts = MagicMock()
+        upserts.flush = AsyncMock()
+
+        with (
+            patch(
+                "shukketsu.pipeline.compaction.UpsertBatch", return_value=upserts,
+            ),
+            patch(
+                "shukketsu.pipeline.compaction.ensure_partitions_committed",
+                new_callable=AsyncMock,
+            ) as ensure,
+        ):
+            rows, written, size = await fold_cast_events(
+                session, [(1, MONTH), (2, MONTH)],
+            )
+
+        # Dropped series partitions are recreated before anything is read
+        ensure.assert_awaited_once_with(session, {MONTH}, ["cast_event_series"])
+
+        assert (rows, written, size) == (3, 1, 50)
+        model, series = upserts.add.call_args[0]
+        assert upserts.add.call_args[1] == {"fight_id": 1, "report_month": MONTH}
+        assert [s.player_name for s in series] == ["Lyro"]
+        assert series[0].timestamps_ms == [0, 1500]
+        # Legacy rows are read only for fight 1, deleted for both
+        read_sql = _sql(session.execute.call_args_list[1][0][0])
+        assert "ORDER BY cast_events.fight_id, cast_events.timestamp_ms" in read_sql
+
+
+class TestCompactionService:
+    async def test_runs_batches_until_exhausted(self):
+        session = AsyncMock()
+        policy = RetentionPolicy(table="event_archives", max_age_days=30)
+        service = CompactionService(
+            _make_settings([policy]), _make_session_factory(session),
+        )
+
+        with (
+            patch(
+                "shukketsu.pipeline.compaction.select_batch",
+                AsyncMock(side_effect=[[(1, MONTH), (2, MONTH)], [(3, MONTH)], []]),
+            ) as select_mock,
+            patch(
+                "shukketsu.pipeline.compaction.delete_rows",
+                AsyncMock(side_effect=[(2, 2000), (1, 500)]),
+            ),
+        ):
+            results = await service.run_once()
+
+        assert select_mock.await_count == 3
+        assert results[0].fights == 3
+        assert results[0].rows_deleted == 3
+        assert results[0].bytes_reclaimed == 2500
+        status = service.get_status()
+        assert status["stats"]["bytes_reclaimed"] == 2500
+        assert status["last_results"][0]["table"] == "event_archives"
+        # Every batch transaction sets a lock timeout first
+        first_sql = str(session.execute.call_args_list[0][0][0])
+        assert "lock_timeout" in first_sql
+
+    async def test_max_batches_per_run(self):
+        policy = RetentionPolicy(table="event_archives", max_age_days=30)
+        service = CompactionService(
+            _make_settings([policy], max_batches=2),
+            _make_session_factory(AsyncMock()),
+        )
+
+        with (
+            patch(
+                "shukketsu.pipeline.compaction.select_batch",
+                AsyncMock(return_value=[(1, MONTH)]),
+            ) as select_mock,
+            patch(
+                "shukketsu.pipeline.compaction.delete_rows",
+                AsyncMock(return_value=(1, 10)),
+            ),
+        ):
+            results = await service.run_once()
+
+        assert select_mock.await_count == 2
+        assert results[0].rows_deleted == 2
+
+    async def test_failed_batch_stops_policy(self):
+        policy = RetentionPolicy(table="event_archives", max_age_days=30)
+        service = CompactionService(
+            _make_settings([policy]), _make_session_factory(AsyncMock()),
+        )
+
+        with patch(
+            "shukketsu.pipeline.compaction.select_batch",
+            AsyncMock(side_effect=RuntimeError("lock timeout")),
+        ):
+            results = await service.run_once()
+
+        assert results[0].rows_deleted == 0
+        assert service.get_status()["stats"]["errors"] == 1
+        assert service.get_status()["last_error"] == "lock timeout"
+
+    async def test_all_reports_drops_old_partitions_first(self):
+        policy = RetentionPolicy(
+            table="cast_event_series", max_age_days=90, reports="all",
+        )
+        service = CompactionService(
+            _make_settings([policy]), _make_session_factory(AsyncMock()),
+        )
+        dropped = [Partition("cast_event_series", "cast_event_series_p202601", MONTH, 8192)]
+
+        with (
+            patch(
+                "shukketsu.pipeline.compaction.drop_partitions_before",
+                AsyncMock(return_value=dropped),
+            ) as drop_mock,
+            patch(
+                "shukketsu.pipeline.compaction.select_batch",
+                AsyncMock(return_value=[]),
+            ),
+        ):
+            results = await service.run_once()
+
+        assert drop_mock.call_args[0][2] == ["cast_event_series"]
+        assert results[0].partitions_dropped == 1
+        assert results[0].bytes_reclaimed == 8192
+
+    async def test_failed_partition_drop_does_not_stop_policies(self):
+        policies = [
+            RetentionPolicy(table="cast_event_series", max_age_days=90, reports="all"),
+            RetentionPolicy(table="event_archives", max_age_days=30),
+        ]
+        service = CompactionService(
+            _make_settings(policies), _make_session_factory(AsyncMock()),
+        )
+
+        with (
+            patch(
+                "shukketsu.pipeline.compaction.drop_partitions_before",
+                AsyncMock(side_effect=RuntimeError("lock timeout")),
+            ),
+            patch(
+                "shukketsu.pipeline.compaction.select_batch",
+                AsyncMock(side_effect=[[(1, MONTH)], [], [(2, MONTH)], []]),
+            ),
+            patch(
+                "shukketsu.pipeline.compaction.delete_rows",
+                AsyncMock(return_value=(1, 10)),
+            ),
+        ):
+            results = await service.run_once()
+
+        # Row batches still ran for the first policy, and the second ran
+        assert [r.rows_deleted for r in results] == [1, 1]
+        assert results[0].partitions_dropped == 0
+        status = service.get_status()
+        assert status["status"] == "idle"
+        assert status["stats"]["errors"] == 1
+        assert status["last_error"] == "lock timeout"
+
+    async def test_unexpected_error_does_not_leave_running(self):
+        policy = RetentionPolicy(table="event_archives", max_age_days=30)
+        service = CompactionService(
+            _make_settings([policy]), _make_session_factory(AsyncMock()),
+        )
+
+        with (
+            patch.object(
+                service, "_apply_policy", AsyncMock(side_effect=RuntimeError("bug")),
+            ),
+            pytest.raises(RuntimeError),
+        ):
+            await service.run_once()
+
+        assert service.get_status()["status"] == "error"
+
+    async def test_start_disabled_noop(self):
+        settings = _make_settings([])
+        settings.compaction.enabled = False
+        service = CompactionService(settings, MagicMock())
+
+        await service.start()
+
+        assert service._task is None
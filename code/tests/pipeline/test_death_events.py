@@ -304,17 +304,25 @@ class TestIngestDeathEventsForFight:
         async def _fake_fetch(*args, **kwargs):
             yield death_events
 
-        with patch(
-            "shukketsu.pipeline.death_events.fetch_all_events",
-            side_effect=_fake_fetch,
+        with (
+            patch(
+                "shukketsu.pipeline.death_events.fetch_all_events",
+                side_effect=_fake_fetch,
+            ),
+            patch(
+                "shukketsu.db.upsert.upsert_rows", new_callable=AsyncMock,
+            ) as mock_upsert,
         ):
             count = await ingest_death_events_for_fight(
                 wcl, session, "ABC123", fight,
             )
 
         assert count == 2
-        assert session.add.call_count == 2
-        session.flush.assert_awaited_once()
+        session.add.assert_not_called()
+        mock_upsert.assert_awaited_once()
+        details = mock_upsert.await_args.args[2]
+        assert [d.player_name for d in details] == ["Lyro", "Warrior"]
+        assert mock_upsert.await_args.kwargs["scope"] is not None
 
     async def test_empty_events_returns_zero(self):
         """When WCL returns no death events, returns 0 without adding anything."""
@@ -356,7 +364,37 @@ class TestIngestDeathEventsForFight:
         fight.start_time = 0
         fight.end_time = 60000
 
-        with pytest.raises(Exception, match="DB error"):
+        async def _fake_fetch(*args, **kwargs):
+            yield [{"timestamp": 1000, "target": {"name": "Lyro"}, "events": []}]
+
+        with (
+            patch(
+                "shukketsu.pipeline.death_events.fetch_all_events",
+                side_effect=_fake_fetch,
+            ),
+            pytest.raises(Exception, match="DB error"),
+        ):
             await ingest_death_events_for_fight(
                 wcl, session, "FAIL", fight,
             )
+
+
+class TestDeathEventsStream:
+    async def test_death_index_continues_across_pages(self):
+        from shukketsu.pipeline.death_events import DeathEventsStream
+
+        def death(ts):
+            return {"timestamp": ts, "target": {"name": "Lyro"}, "events": []}
+
+        session = MagicMock()
+        fight = MagicMock(id=9, fight_id=2)
+        stream = DeathEventsStream(session, "ABC", fight)
+        await stream.add([death(1000)])
+        await stream.add([death(5000), death(9000)])
+
+        with patch(
+            "shukketsu.db.upsert.upsert_rows", new_callable=AsyncMock,
+        ) as mock_upsert:
+            assert await stream.finish() == 3
+        indexes = [d.death_index for d in mock_upsert.await_args.args[2]]
+        assert indexes == [0, 1, 2]
@@ -0,0 +1,303 @@
+"""Tests for concurrent enrichment in ingest_report."""
+
+import asyncio
+import re
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy.dialects.postgresql import Insert
+
+from shukketsu.db.models import (
+    AbilityMetric,
+    Base,
+    BuffUptime,
+    CastEventSeries,
+    DeathDetail,
+    FightConsumable,
+    GearSnapshot,
+    ResourceSnapshot,
+)
+from shukketsu.pipeline.enrichment import run_concurrent_enrichment
+from shukketsu.pipeline.ingest import ingest_report
+
+ACTORS = {1: "Lyro", 2: "Healer"}
+CLASSES = {"Lyro": "Warrior", "Healer": "Priest"}
+
+FIGHTS = [
+    {"id": 1, "name": "Maulgar", "startTime": 0, "endTime": 60_000,
+     "kill": True, "encounterID": 50649, "difficulty": 0},
+    {"id": 2, "name": "Gruul", "startTime": 100_000, "endTime": 160_000,
+     "kill": True, "encounterID": 50650, "difficulty": 0},
+]
+
+
+def _events_for(data_type: str, start: float) -> list[dict]:
+    base = int(start)
+    if data_type == "Deaths":
+        return [{
+            "timestamp": base + 5000,
+            "target": {"name": "Lyro"},
+            "source": {"name": "Boss"},
+            "ability": {"name": "Melee"},
+            "events": [{"amount": 5000}],
+        }]
+    if data_type == "Casts":
+        return [
+            {"type": "begincast", "sourceID": 1, "timestamp": base + 1000,
+             "ability": {"guid": 1, "name": "Slam"}},
+            {"type": "cast", "sourceID": 1, "timestamp": base + 2500,
+             "ability": {"guid": 1, "name": "Slam"}},
+            {"type": "cast", "sourceID": 2, "timestamp": base + 3000,
+             "ability": {"guid": 2, "name": "Heal"}},
+            {"type": "cast", "sourceID": 99, "timestamp": base + 3000,
+             "ability": {"guid": 3, "name": "NPC"}},
+        ]
+    if data_type == "Resources":
+        return [
+            {"sourceID": 2, "timestamp": base + i * 1000,
+             "classResources": [{"type": 0, "amount": 1000 - i * 100}]}
+            for i in range(5)
+        ]
+    if data_type == "CombatantInfo":
+        return [{
+            "sourceID": 1, "name": "Lyro",
+            "auras": [{"ability": 17628}],
+            "gear": [{"id": 30000, "slot": 0, "itemLevel": 120}],
+        }]
+    return []
+
+
+def _table_for(data_type: str) -> dict:
+    if data_type in ("DamageDone", "Healing"):
+        entries = [{"name": "Lyro", "entries": [
+            {"name": "Slam", "guid": 1, "total": 1000, "hitCount": 10},
+        ]}]
+    else:
+        entries = [{"name": "Lyro", "entries": [
+            {"name": "Battle Shout", "guid": 2, "uptime": 30_000},
+        ]}]
+    return {"data": {"entries": entries}}
+
+
+def _make_wcl(*, fail_on=None, delay=0.0):
+    """WCL mock that answers report, rankings, table and events queries."""
+    state = {"in_flight": 0, "peak": 0}
+
+    async def query(q, variables=None, **kwargs):
+        variables = variables or {}
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        try:
+            if delay:
+                await asyncio.sleep(delay)
+            if "ReportFights" in q:
+                return {"reportData": {"report": {
+                    "title": "Gruul", "startTime": 0, "endTime": 200_000,
+                    "guild": None, "fights": FIGHTS,
+                    "masterData": {"actors": [
+                        {"id": 1, "name": "Lyro", "type": "Warrior"},
+                        {"id": 2, "name": "Healer", "type": "Priest"},
+                    ]},
+                }}}
+            if "ReportRankings" in q:
+                return {"reportData": {"report": {"rankings": {"data": []}}}}
+            if "ReportTables" in q:
+                # Batched aliased tables: any failing selection fails the document
+                selections = re.findall(r"(\w+): table\(fightIDs: \[(\d+)\], dataType: (\w+)\)", q)
+                if fail_on and any(
+                    fail_on({"dataType": t, "fightIDs": [int(f)]})
+                    for _, f, t in selections
+                ):
+                    raise RuntimeError("WCL error")
+                return {"reportData": {"report": {
+                    alias: _table_for(t) for alias, _, t in selections
+                }}}
+            if fail_on and fail_on(variables):
+                raise RuntimeError("WCL error")
+            if "ReportTable" in q:
+                return {"reportData": {"report": {
+                    "table": _table_for(variables["dataType"]),
+                }}}
+            # One report-level page covering every fight in the requested span
+            events = [
+                e
+                for f in FIGHTS
+                if variables["startTime"] <= f["startTime"] <= variables["endTime"]
+                for e in _events_for(variables["dataType"], f["startTime"])
+            ]
+            return {"reportData": {"report": {"events": {
+                "data": events, "nextPageTimestamp": None,
+            }}}}
+        finally:
+            state["in_flight"] -= 1
+
+    wcl = MagicMock()
+    wcl.query = AsyncMock(side_effect=query)
+    return wcl, state
+
+
+def _make_session():
+    """Session mock recording added rows; assigns DB ids to Fight rows."""
+    session = MagicMock()
+    added: list = []
+    session.added = added
+
+    def add(obj):
+        added.append(obj)
+        if type(obj).__name__ == "Fight":
+            obj.id = 100 + obj.fight_id
+
+    @asynccontextmanager
+    async def begin_nested():
+        yield
+
+    fights_result = MagicMock()
+    fights_result.scalars.return_value.all.side_effect = lambda: [
+        o for o in added if type(o).__name__ == "Fight"
+    ]
+    fights_result.__iter__ = MagicMock(side_effect=lambda: iter([]))
+    fights_result.all.return_value = []
+    fights_result.rowcount = 0
+
+    session.add = MagicMock(side_effect=add)
+    session.merge = AsyncMock()
+    session.get = AsyncMock(return_value=object())
+    session.flush = AsyncMock()
+    def model_for(table):
+        return next(
+            m.class_ for m in Base.registry.mappers if m.local_table.name == table.name
+        )
+
+    async def execute(stmt, params=None):
+        if isinstance(stmt, Insert) and stmt._multi_values:  # upsert_rows
+            model = model_for(stmt.table)
+            added.extend(
+                model(**{getattr(k, "key", k): v for k, v in row.items()})
+                for row in stmt._multi_values[0]
+            )
+        return fights_result
+
+    session.execute = AsyncMock(side_effect=execute)
+    session.begin_nested = begin_nested
+    session.bind = None  # no engine: partitions are created in the session
+    return session
+
+
+def _row_key(obj) -> tuple:
+    cols = [c.key for c in obj.__table__.columns if c.key != "id"]
+    return (type(obj).__name__, *(getattr(obj, c) for c in cols))
+
+
+class TestConcurrentMatchesSequential:
+    async def _ingest(self, concurrency, **wcl_kwargs):
+        wcl, state = _make_wcl(**wcl_kwargs)
+        session = _make_session()
+        result = await ingest_report(
+            wcl, session, "ABC", ingest_tables=True, ingest_events=True,
+            enrichment_concurrency=concurrency,
+        )
+        return result, session, state
+
+    async def test_same_rows_and_counts(self):
+        seq, seq_session, _ = await self._ingest(1)
+        conc, conc_session, _ = await self._ingest(4)
+
+        assert conc.table_rows == seq.table_rows > 0
+        assert conc.event_rows == seq.event_rows > 0
+        assert conc.enrichment_errors == seq.enrichment_errors == []
+        assert sorted(map(_row_key, conc_session.added)) == sorted(
+            map(_row_key, seq_session.added)
+        )
+        types = {type(o) for o in conc_session.added}
+        assert {
+            AbilityMetric, BuffUptime, CastEventSeries, DeathDetail,
+            FightConsumable, GearSnapshot, ResourceSnapshot,
+        } <= types
+
+    async def test_events_fetched_once_per_report(self):
+        wcl, _ = _make_wcl()
+        await ingest_report(
+            wcl, _make_session(), "ABC", ingest_events=True,
+        )
+        event_calls = [
+            c.kwargs["variables"] for c in wcl.query.await_args_list
+            if "dataType" in c.kwargs.get("variables", {})
+        ]
+        assert [v["dataType"] for v in event_calls] == [
+            "CombatantInfo", "Deaths", "Casts", "Resources",
+        ]
+        assert all(
+            (v["startTime"], v["endTime"]) == (0, 160_000) for v in event_calls
+        )
+
+    async def test_same_enrichment_errors(self):
+        def fail(variables):
+            return variables.get("dataType") in ("Casts", "Deaths")
+
+        seq, _, _ = await self._ingest(1, fail_on=fail)
+        conc, _, _ = await self._ingest(4, fail_on=fail)
+
+        assert seq.enrichment_errors == [
+            "death_events_fight_1", "death_events_fight_2",
+            "cast_events_fight_1", "cast_events_fight_2",
+        ]
+        assert conc.enrichment_errors == seq.enrichment_errors
+        assert conc.event_rows == seq.event_rows
+
+    async def test_table_fetch_failure_reported(self):
+        def fail(variables):
+            return variables.get("dataType") == "Healing"
+
+        seq, _, _ = await self._ingest(1, fail_on=fail)
+        conc, _, _ = await self._ingest(4, fail_on=fail)
+
+        assert seq.enrichment_errors == ["table_data_fight_1", "table_data_fight_2"]
+        assert conc.enrichment_errors == seq.enrichment_errors
+        assert conc.table_rows == seq.table_rows
+        # Other table types were still stored via per-table fallback
+        assert conc.table_rows > 0
+
+
+    async def test_table_write_failure_reported(self):
+        failing = AsyncMock(side_effect=RuntimeError("write failed"))
+        with patch(
+            "shukketsu.pipeline.table_data.persist_tables_for_fights", failing,
+        ):
+            seq, _, _ = await self._ingest(1)
+            conc, _, _ = await self._ingest(4)
+
+        assert seq.enrichment_errors == ["table_data_fight_1", "table_data_fight_2"]
+        assert conc.enrichment_errors == seq.enrichment_errors
+
+
+class TestConcurrencyBound:
+    async def test_never_exceeds_max_concurrency(self):
+        wcl, state = _make_wcl(delay=0.01)
+        session = _make_session()
+        fights = []
+        for f in FIGHTS:
+            fight = MagicMock()
+            fight.id = 100 + f["id"]
+            fight.fight_id = f["id"]
+            fight.start_time = f["startTime"]
+            fight.end_time = f["endTime"]
+            fights.append(fight)
+
+        result = await run_concurrent_enrichment(
+            wcl, session, "ABC", fights, ACTORS, CLASSES,
+            ingest_tables=True, ingest_events=True, max_concurrency=3,
+        )
+
+        # 1 batched table query + 1 report-level fetch per event type
+        assert wcl.query.await_count == 5
+        assert 1 < state["peak"] <= 3
+        assert result.errors == []
+
+    async def test_no_stages_is_noop(self):
+        wcl, _ = _make_wcl()
+        session = _make_session()
+        result = await run_concurrent_enrichment(
+            wcl, session, "ABC", [MagicMock()], ACTORS, CLASSES,
+        )
+        assert result.table_rows == result.event_rows == 0
+        wcl.query.assert_not_awaited()
@@ -0,0 +1,66 @@
+"""Tests for the compressed raw-event archive (pipeline.event_archive)."""
+
+import pytest
+
+from shukketsu.pipeline import event_archive
+from shukketsu.pipeline.event_archive import (
+    ArchiveWriter,
+    archive_context,
+    read_context,
+    read_pages,
+)
+
+PAGES = [
+    [{"timestamp": i, "type": "cast", "sourceID": 1, "abilityGameID": 100}
+     for i in range(start, start + 50)]
+    for start in (0, 50, 100)
+]
+
+
+def _archive(codec, context=None):
+    writer = ArchiveWriter(7, "Casts", context, codec=codec)
+    for page in PAGES:
+        writer.add(page)
+    return writer.finish()
+
+
+@pytest.mark.parametrize("codec", event_archive.CODECS)
+class TestArchiveWriter:
+    def test_round_trip(self, codec):
+        if codec == "zstd" and event_archive.zstandard is None:
+            pytest.skip("zstandard not installed")
+        archive = _archive(codec)
+
+        assert list(read_pages(archive)) == PAGES
+        assert (archive.fight_id, archive.data_type, archive.codec) == (
+            7, "Casts", codec,
+        )
+        assert archive.page_count == 3
+        assert archive.event_count == 150
+        assert len(archive.data) < archive.raw_bytes
+
+    def test_same_pages_same_bytes(self, codec):
+        if codec == "zstd" and event_archive.zstandard is None:
+            pytest.skip("zstandard not installed")
+        assert _archive(codec).data == _archive(codec).data
+
+
+class TestContext:
+    def test_round_trip(self):
+        archive = _archive("gzip", archive_context({3: "Lyro"}, {"Lyro": "Warrior"}))
+
+        assert read_context(archive) == ({3: "Lyro"}, {"Lyro": "Warrior"})
+
+    def test_missing(self):
+        assert read_context(_archive("gzip")) == ({}, {})
+
+
+class TestCodecs:
+    def test_unknown_codec(self):
+        with pytest.raises(ValueError, match="Unknown archive codec"):
+            ArchiveWriter(7, "Casts", codec="lz4")
+
+    def test_zstd_missing_hint(self, monkeypatch):
+        monkeypatch.setattr(event_archive, "zstandard", None)
+        with pytest.raises(RuntimeError, match=r"shukketsu\[zstd\]"):
+            ArchiveWriter(7, "Casts", codec="zstd")
@@ -1,17 +1,39 @@
+import contextlib
+from datetime import date
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from shukketsu.db.models import EventArchive
+from shukketsu.db.upsert import UpsertStats
+from shukketsu.pipeline.event_archive import read_context, read_pages
 from shukketsu.pipeline.ingest import (
     IngestResult,
     _safe_float,
+    fight_fingerprint,
     ingest_report,
+    ingest_report_incremental,
     parse_fights,
     parse_rankings_to_performances,
     parse_report,
+    rankings_fingerprint,
 )
 from shukketsu.pipeline.normalize import is_boss_fight
 
+# 2023-11-14 22:13 UTC
+REPORT_START = 1700000000000
+
+
+@pytest.fixture(autouse=True)
+def ensure_partitions():
+    """Partition DDL is covered by tests/db/test_partitions.py."""
+    with patch(
+        "shukketsu.pipeline.ingest.ensure_partitions_committed",
+        new_callable=AsyncMock,
+    ) as mock:
+        yield mock
+
 
 class TestNormalize:
     def test_is_boss_fight_true(self):
@@ -103,6 +125,17 @@ class TestParseReport:
         report = parse_report(data, "xyz789")
         assert report.guild_name is None
         assert report.guild_id is None
+        assert report.last_fight_id is None
+
+    def test_last_fight_id_includes_trash(self):
+        data = {
+            "title": "Kara", "startTime": 0, "endTime": 1, "guild": None,
+            "fights": [
+                {"id": 1, "encounterID": 50652},
+                {"id": 7, "encounterID": 0},
+            ],
+        }
+        assert parse_report(data, "abc").last_fight_id == 7
 
 
 class TestParseFights:
@@ -122,16 +155,16 @@ class TestParseFights:
     ]
 
     def test_skips_trash(self):
-        fights = parse_fights(self.FIGHTS_DATA, "abc123")
+        fights = parse_fights(self.FIGHTS_DATA, "abc123", REPORT_START)
         names = [f.encounter_id for f in fights]
         assert 0 not in names
 
     def test_parses_boss_fights(self):
-        fights = parse_fights(self.FIGHTS_DATA, "abc123")
+        fights = parse_fights(self.FIGHTS_DATA, "abc123", REPORT_START)
         assert len(fights) == 2
 
     def test_sets_fields(self):
-        fights = parse_fights(self.FIGHTS_DATA, "abc123")
+        fights = parse_fights(self.FIGHTS_DATA, "abc123", REPORT_START)
         gruul = [f for f in fights if f.encounter_id == 650][0]
         assert gruul.report_code == "abc123"
         assert gruul.fight_id == 3
@@ -139,16 +172,17 @@ class TestParseFights:
         assert gruul.end_time == 380000
         assert gruul.kill is False
         assert gruul.difficulty == 0
+        assert gruul.report_month == date(2023, 11, 1)
 
     def test_fight_percentage_stored_for_wipe(self):
         """Verify fightPercentage from WCL data appears in parsed Fight object."""
-        fights = parse_fights(self.FIGHTS_DATA, "abc123")
+        fights = parse_fights(self.FIGHTS_DATA, "abc123", REPORT_START)
         gruul = [f for f in fights if f.encounter_id == 650][0]
         assert gruul.fight_percentage == 35
 
     def test_fight_percentage_stored_for_kill(self):
         """Verify fightPercentage=0 is stored for kills."""
-        fights = parse_fights(self.FIGHTS_DATA, "abc123")
+        fights = parse_fights(self.FIGHTS_DATA, "abc123", REPORT_START)
         maulgar = [f for f in fights if f.encounter_id == 649][0]
         assert maulgar.fight_percentage == 0
 
@@ -160,7 +194,7 @@ class TestParseFights:
                 "kill": True, "encounterID": 50652, "difficulty": 0,
             },
         ]
-        fights = parse_fights(fights_data, "abc123")
+        fights = parse_fights(fights_data, "abc123", REPORT_START)
         assert len(fights) == 1
         assert fights[0].fight_percentage is None
 
@@ -356,31 +390,218 @@ class TestReingestionIdempotency:
 
         await ingest_report(mock_wcl, mock_session, "abc123")
 
-        # session.merge should have been called (for report + encounter)
+        # session.merge should have been called (for report)
         assert mock_session.merge.await_count >= 1
 
-    async def test_deletes_existing_before_reingest(self):
-        """Verify that existing fights are deleted before re-inserting."""
-        mock_wcl = AsyncMock()
-        mock_wcl.query.return_value = self.REPORT_DATA
+    FIGHT = REPORT_DATA["reportData"]["report"]["fights"][0]
 
+    def _make_session(self, stored_rows):
         mock_session = AsyncMock()
         mock_session.add = MagicMock()  # session.add() is sync in SQLAlchemy
-        # First execute returns existing fight IDs
-        existing_result = MagicMock()
-        existing_result.__iter__ = MagicMock(return_value=iter([(42,)]))
-
-        # Subsequent executes return empty results
+        stored_result = MagicMock()
+        stored_result.__iter__ = MagicMock(return_value=iter(stored_rows))
         empty_result = MagicMock()
         empty_result.__iter__ = MagicMock(return_value=iter([]))
-
-        mock_session.execute.side_effect = [existing_result, None, None, empty_result]
+        mock_session.execute.side_effect = [stored_result] + [empty_result] * 10
         mock_session.flush = AsyncMock()
+        return mock_session
+
+    @staticmethod
+    def _statements(mock_session) -> list[str]:
+        return [str(c.args[0]) for c in mock_session.execute.await_args_list[1:]]
+
+    async def test_report_month_partitions_ensured(self, ensure_partitions):
+        """Partitions for the report's month exist before its fights are written."""
+        mock_wcl = AsyncMock()
+        mock_wcl.query.return_value = self.REPORT_DATA
+        mock_session = self._make_session([])
+
+        await ingest_report(mock_wcl, mock_session, "abc123")
+
+        ensure_partitions.assert_awaited_once_with(mock_session, {date(2023, 11, 1)})
+        fight = mock_session.add.call_args_list[0].args[0]
+        assert fight.report_month == date(2023, 11, 1)
+
+    async def test_changed_fight_rewritten(self):
+        """A fight whose WCL fields changed is deleted and re-inserted."""
+        mock_wcl = AsyncMock()
+        mock_wcl.query.return_value = self.REPORT_DATA
+        mock_session = self._make_session([SimpleNamespace(
+            id=42, fight_id=1, fingerprint="stale", rankings_fingerprint=None,
+        )])
+
+        result = await ingest_report(mock_wcl, mock_session, "abc123")
+
+        statements = self._statements(mock_session)
+        assert statements[0].startswith("DELETE FROM fight_performances")
+        assert statements[1].startswith("DELETE FROM fights")
+        added = [c.args[0] for c in mock_session.add.call_args_list]
+        assert [f.fight_id for f in added] == [1]
+        assert result.fights_unchanged == 0
+        # The kill came back without rankings
+        assert result.rankings_missing == [1]
+
+    async def test_vanished_fight_deleted(self):
+        mock_wcl = AsyncMock()
+        mock_wcl.query.return_value = self.REPORT_DATA
+        mock_session = self._make_session([SimpleNamespace(
+            id=43, fight_id=9, fingerprint="x", rankings_fingerprint=None,
+        )])
 
         await ingest_report(mock_wcl, mock_session, "abc123")
 
-        # select existing + delete perfs + delete fights + select rankings
-        assert mock_session.execute.await_count >= 3
+        assert any(
+            s.startswith("DELETE FROM fights") for s in self._statements(mock_session)
+        )
+
+    async def test_unchanged_fight_kept(self):
+        """Matching fingerprints leave the stored fight and its id in place."""
+        mock_wcl = AsyncMock()
+        mock_wcl.query.return_value = self.REPORT_DATA
+        mock_session = self._make_session([SimpleNamespace(
+            id=42, fight_id=1, fingerprint=fight_fingerprint(self.FIGHT),
+            rankings_fingerprint=rankings_fingerprint({}, set()),
+        )])
+
+        result = await ingest_report(mock_wcl, mock_session, "abc123")
+
+        assert self._statements(mock_session) == []
+        mock_session.add.assert_not_called()
+        assert result.fights == 1
+        assert result.fights_unchanged == 1
+        assert result.performances == 0
+
+    async def test_unchanged_fight_with_new_rankings_upserts_performances(self):
+        mock_wcl = AsyncMock()
+        mock_wcl.query.return_value = self.REPORT_DATA
+        mock_session = self._make_session([SimpleNamespace(
+            id=42, fight_id=1, fingerprint=fight_fingerprint(self.FIGHT),
+            rankings_fingerprint="old",
+        )])
+
+        await ingest_report(mock_wcl, mock_session, "abc123")
+
+        statements = self._statements(mock_session)
+        # Upsert of the (now empty) performance set: only stale rows are deleted
+        assert statements[0].startswith("DELETE FROM fight_performances")
+        assert "fight_performances.fight_id = " in statements[0]
+        assert statements[1].startswith("UPDATE fights SET rankings_fingerprint")
+        # The fight row itself is not re-added
+        mock_session.add.assert_not_called()
+
+    async def test_unchanged_fight_enriched_only_when_stage_pending(self):
+        mock_wcl = AsyncMock()
+        mock_wcl.query.return_value = self.REPORT_DATA
+        mock_session = self._make_session([SimpleNamespace(
+            id=42, fight_id=1, fingerprint=fight_fingerprint(self.FIGHT),
+            rankings_fingerprint=rankings_fingerprint({}, set()),
+        )])
+
+        with (
+            patch(
+                "shukketsu.pipeline.checkpoints.pending_stages",
+                AsyncMock(return_value={}),
+            ),
+            patch(
+                "shukketsu.pipeline.table_data.ingest_table_data_for_fights",
+                new_callable=AsyncMock,
+            ) as mock_tables,
+        ):
+            await ingest_report(
+                mock_wcl, mock_session, "abc123", ingest_tables=True,
+            )
+
+        mock_tables.assert_not_awaited()
+
+
+class TestAddFights:
+    """Encounters are resolved for all fights at once, not per encounter."""
+
+    FIGHTS = [
+        {"id": 1, "name": "Maulgar", "startTime": 0, "endTime": 60000,
+         "kill": True, "encounterID": 50649, "difficulty": 0},
+        {"id": 2, "name": "Gruul", "startTime": 70000, "endTime": 130000,
+         "kill": True, "encounterID": 50650, "difficulty": 3},
+        {"id": 3, "name": "Gruul", "startTime": 140000, "endTime": 200000,
+         "kill": False, "encounterID": 50650, "difficulty": 3},
+    ]
+
+    async def _ingest(self, known_ids):
+        mock_wcl = AsyncMock()
+        mock_wcl.query.return_value = {"reportData": {"report": {
+            "title": "Gruul", "startTime": 0, "endTime": 200000, "guild": None,
+            "fights": self.FIGHTS, "rankings": {"data": []},
+        }}}
+        mock_session = AsyncMock()
+        mock_session.add = MagicMock()
+        result = MagicMock()
+        result.__iter__ = MagicMock(side_effect=lambda: iter([]))
+        result.scalars.return_value = known_ids
+        mock_session.execute.return_value = result
+
+        ingest_result = await ingest_report(mock_wcl, mock_session, "abc123")
+
+        mock_session.get.assert_not_awaited()
+        statements = [c.args[0] for c in mock_session.execute.await_args_list]
+        return ingest_result, statements
+
+    async def test_unknown_encounters_stubbed_in_one_insert(self):
+        from sqlalchemy.dialects import postgresql
+
+        _, statements = await self._ingest([])
+
+        lookup, stub = statements[1:3]
+        assert "encounters.id = ANY" in str(lookup)
+        sql = stub.compile(dialect=postgresql.dialect())
+        assert str(sql).startswith("INSERT INTO encounters")
+        assert "ON CONFLICT (id) DO NOTHING" in str(sql)
+        assert sorted(v for k, v in sql.params.items() if k.startswith("id_")) == [
+            50649, 50650,
+        ]
+        assert sql.params["difficulty_m1"] == 3
+
+    async def test_known_encounters_not_inserted(self):
+        _, statements = await self._ingest([50649, 50650])
+
+        assert not any("INSERT INTO encounters" in str(s) for s in statements)
+
+    async def test_phase_seconds(self):
+        result, _ = await self._ingest([50649, 50650])
+
+        assert list(result.phase_seconds) == [
+            "report", "fights", "rankings", "enrichment",
+        ]
+        assert all(secs >= 0 for secs in result.phase_seconds.values())
+
+
+class TestFingerprints:
+    FIGHT = {
+        "id": 1, "startTime": 0, "endTime": 180000, "kill": True,
+        "encounterID": 50652, "difficulty": 0, "fightPercentage": 0.0,
+    }
+
+    def test_fight_fingerprint_ignores_other_keys(self):
+        assert fight_fingerprint(self.FIGHT) == fight_fingerprint(
+            {**self.FIGHT, "name": "Renamed"},
+        )
+
+    def test_fight_fingerprint_changes_with_fields(self):
+        assert fight_fingerprint(self.FIGHT) != fight_fingerprint(
+            {**self.FIGHT, "kill": False},
+        )
+
+    def test_rankings_fingerprint_includes_my_characters(self):
+        rankings = {"fightID": 1, "roles": {}}
+        assert rankings_fingerprint(rankings, {"Lyro"}) == rankings_fingerprint(
+            rankings, {"lyro"},
+        )
+        assert rankings_fingerprint(rankings, set()) != rankings_fingerprint(
+            rankings, {"Lyro"},
+        )
+
+    def test_parse_fights_sets_fingerprint(self):
+        fights = parse_fights([{**self.FIGHT, "name": "Gruul"}], "abc", REPORT_START)
+        assert fights[0].fingerprint == fight_fingerprint(self.FIGHT)
 
 
 class TestIngestResultSnapshots:
@@ -497,112 +718,291 @@ class TestIngestEventsWiring:
 
         return mock_wcl, mock_session
 
-    @patch(
-        "shukketsu.pipeline.resource_events.ingest_resource_data_for_fight",
-        new_callable=AsyncMock, return_value=3,
-    )
-    @patch(
-        "shukketsu.pipeline.cast_events.ingest_cast_events_for_fight",
-        new_callable=AsyncMock, return_value=10,
-    )
-    @patch(
-        "shukketsu.pipeline.death_events.ingest_death_events_for_fight",
-        new_callable=AsyncMock, return_value=2,
-    )
-    @patch(
-        "shukketsu.pipeline.combatant_info.ingest_combatant_info_for_report",
-        new_callable=AsyncMock, return_value=5,
-    )
-    async def test_ingest_events_calls_all_pipelines(
-        self, mock_combatant, mock_death, mock_cast, mock_resource,
-    ):
-        """All 4 event pipelines are called when ingest_events=True."""
+    @staticmethod
+    def _stream_mock(rows):
+        """Stand-in for a per-fight stream class (CastEventsStream etc.)."""
+        stream = MagicMock()
+        stream.add = AsyncMock()
+        stream.finish = AsyncMock(return_value=rows)
+        return MagicMock(return_value=stream)
+
+    @staticmethod
+    def _fake_stream(pages, calls=None):
+        async def stream(wcl, code, fights, data_type, **kwargs):
+            if calls is not None:
+                calls.append((data_type, [f.fight_id for f in fights]))
+            for page in pages:
+                yield page
+        return stream
+
+    async def test_ingest_events_calls_all_pipelines(self):
+        """Each event type is streamed once per report and written per fight."""
         mock_wcl, mock_session = self._make_mocks()
+        calls = []
+        streams = {
+            "combatant_info.CombatantInfoStream": self._stream_mock(5),
+            "death_events.DeathEventsStream": self._stream_mock(2),
+            "cast_events.CastEventsStream": self._stream_mock(10),
+            "resource_events.ResourceEventsStream": self._stream_mock(3),
+        }
 
-        result = await ingest_report(
-            mock_wcl, mock_session, "abc123", ingest_events=True,
-        )
+        with contextlib.ExitStack() as stack:
+            stack.enter_context(patch(
+                "shukketsu.pipeline.report_events.stream_events_by_fight",
+                side_effect=self._fake_stream([{1: [{"timestamp": 0}]}], calls),
+            ))
+            for name, mock in streams.items():
+                stack.enter_context(patch(f"shukketsu.pipeline.{name}", mock))
+            result = await ingest_report(
+                mock_wcl, mock_session, "abc123", ingest_events=True,
+            )
 
-        mock_combatant.assert_awaited_once_with(
-            mock_wcl, mock_session, "abc123",
-        )
-        mock_death.assert_awaited_once()
-        mock_cast.assert_awaited_once()
-        mock_resource.assert_awaited_once()
+        assert calls == [
+            ("CombatantInfo", [1]), ("Deaths", [1]), ("Casts", [1]),
+            ("Resources", [1]),
+        ]
+        for mock in streams.values():
+            mock.return_value.add.assert_awaited_once_with([{"timestamp": 0}])
+            mock.return_value.finish.assert_awaited_once()
 
         # 5 (combatant) + 2 (death) + 10 (cast) + 3 (resource) = 20
         assert result.event_rows == 20
 
-    @patch(
-        "shukketsu.pipeline.resource_events.ingest_resource_data_for_fight",
-        new_callable=AsyncMock, return_value=3,
-    )
-    @patch(
-        "shukketsu.pipeline.cast_events.ingest_cast_events_for_fight",
-        new_callable=AsyncMock, return_value=10,
-    )
-    @patch(
-        "shukketsu.pipeline.death_events.ingest_death_events_for_fight",
-        new_callable=AsyncMock, return_value=2,
-    )
-    @patch(
-        "shukketsu.pipeline.combatant_info.ingest_combatant_info_for_report",
-        new_callable=AsyncMock, return_value=5,
-    )
-    async def test_ingest_events_builds_actor_maps(
-        self, mock_combatant, mock_death, mock_cast, mock_resource,
-    ):
+    async def test_ingest_events_archives_raw_pages(self):
+        """Each fight's raw pages are archived with the stage's upserts."""
+        mock_wcl, mock_session = self._make_mocks()
+        page = {1: [{"timestamp": 0, "type": "cast"}]}
+
+        upsert = AsyncMock(return_value=UpsertStats())
+
+        with contextlib.ExitStack() as stack:
+            stack.enter_context(patch(
+                "shukketsu.pipeline.report_events.stream_events_by_fight",
+                side_effect=self._fake_stream([page, page]),
+            ))
+            for name in (
+                "combatant_info.CombatantInfoStream", "death_events.DeathEventsStream",
+                "cast_events.CastEventsStream", "resource_events.ResourceEventsStream",
+            ):
+                stack.enter_context(
+                    patch(f"shukketsu.pipeline.{name}", self._stream_mock(0)),
+                )
+            stack.enter_context(patch("shukketsu.db.upsert.upsert_rows", upsert))
+            await ingest_report(
+                mock_wcl, mock_session, "abc123", ingest_events=True,
+            )
+
+        archives = {
+            archive.data_type: archive
+            for call in upsert.await_args_list if call.args[1] is EventArchive
+            for archive in call.args[2]
+        }
+        assert set(archives) == {"CombatantInfo", "Deaths", "Casts", "Resources"}
+        archive = archives["Casts"]
+        assert archive.page_count == 2
+        assert list(read_pages(archive)) == [page[1], page[1]]
+        assert read_context(archive)[0] == {5: "TestWarrior", 6: "TestMage"}
+
+    async def test_ingest_events_builds_actor_maps(self):
         """Actor maps are built from masterData and passed to pipelines."""
         mock_wcl, mock_session = self._make_mocks()
+        cast_stream = self._stream_mock(0)
+        resource_stream = self._stream_mock(0)
 
-        await ingest_report(
-            mock_wcl, mock_session, "abc123", ingest_events=True,
-        )
+        with (
+            patch(
+                "shukketsu.pipeline.report_events.stream_events_by_fight",
+                side_effect=self._fake_stream([]),
+            ),
+            patch("shukketsu.pipeline.cast_events.CastEventsStream", cast_stream),
+            patch(
+                "shukketsu.pipeline.resource_events.ResourceEventsStream",
+                resource_stream,
+            ),
+        ):
+            await ingest_report(
+                mock_wcl, mock_session, "abc123", ingest_events=True,
+            )
 
-        # Verify cast_events received correct actor_name_by_id and player_class_map
-        cast_call = mock_cast.call_args
-        actor_name_by_id = cast_call[0][4]  # 5th positional arg
-        player_class_map = cast_call[0][5]  # 6th positional arg
+        # CastEventsStream(session, report_code, fight, actors, player_class_map)
+        actor_name_by_id = cast_stream.call_args[0][3]
+        player_class_map = cast_stream.call_args[0][4]
 
         assert actor_name_by_id == {5: "TestWarrior", 6: "TestMage"}
         assert player_class_map == {
             "TestWarrior": "Warrior", "TestMage": "Mage",
         }
 
-        # Verify resource_events received correct actor_name_by_id
-        resource_call = mock_resource.call_args
-        resource_actors = resource_call[0][4]  # 5th positional arg
-        assert resource_actors == {5: "TestWarrior", 6: "TestMage"}
+        # ResourceEventsStream(session, report_code, fight, actors)
+        assert resource_stream.call_args[0][3] == {5: "TestWarrior", 6: "TestMage"}
 
-    async def test_ingest_events_false_skips_pipelines(self):
-        """No event pipelines are called when ingest_events=False."""
+    async def test_event_fetch_failure_reported_per_fight(self):
+        """A failed report-level fetch marks the stage failed for every fight."""
+        mock_wcl, mock_session = self._make_mocks()
+
+        async def failing(*args, **kwargs):
+            raise RuntimeError("WCL error")
+            yield  # pragma: no cover
+
+        with patch(
+            "shukketsu.pipeline.report_events.stream_events_by_fight",
+            side_effect=failing,
+        ):
+            result = await ingest_report(
+                mock_wcl, mock_session, "abc123", ingest_events=True,
+            )
+
+        assert result.enrichment_errors == [
+            "combatant_info", "death_events_fight_1", "cast_events_fight_1",
+            "resource_events_fight_1",
+        ]
+
+    async def test_stage_checkpoints_recorded(self):
+        """Each requested stage gets a done/failed checkpoint per fight."""
         mock_wcl, mock_session = self._make_mocks()
 
+        async def failing(*args, **kwargs):
+            raise RuntimeError("WCL error")
+            yield  # pragma: no cover
+
         with (
             patch(
-                "shukketsu.pipeline.combatant_info.ingest_combatant_info_for_report",
-                new_callable=AsyncMock,
-            ) as mock_combatant,
-            patch(
-                "shukketsu.pipeline.death_events.ingest_death_events_for_fight",
-                new_callable=AsyncMock,
-            ) as mock_death,
+                "shukketsu.pipeline.report_events.stream_events_by_fight",
+                side_effect=failing,
+            ),
             patch(
-                "shukketsu.pipeline.cast_events.ingest_cast_events_for_fight",
+                "shukketsu.pipeline.checkpoints.record_stage_statuses",
                 new_callable=AsyncMock,
-            ) as mock_cast,
-            patch(
-                "shukketsu.pipeline.resource_events.ingest_resource_data_for_fight",
-                new_callable=AsyncMock,
-            ) as mock_resource,
+            ) as mock_record,
         ):
             result = await ingest_report(
-                mock_wcl, mock_session, "abc123", ingest_events=False,
+                mock_wcl, mock_session, "abc123", ingest_events=True,
             )
 
-            mock_combatant.assert_not_awaited()
-            mock_death.assert_not_awaited()
-            mock_cast.assert_not_awaited()
-            mock_resource.assert_not_awaited()
+        _, fights, stages, errors = mock_record.await_args.args
+        assert [f.fight_id for f in fights] == [1]
+        assert stages == [
+            "combatant_info", "death_events", "cast_events", "resource_events",
+        ]
+        assert errors == result.enrichment_errors
+
+    async def test_ingest_events_false_skips_pipelines(self):
+        """No event pipelines are called when ingest_events=False."""
+        mock_wcl, mock_session = self._make_mocks()
+
+        with patch(
+            "shukketsu.pipeline.report_events.stream_events_by_fight",
+        ) as mock_stream:
+            result = await ingest_report(
+                mock_wcl, mock_session, "abc123", ingest_events=False,
+            )
 
+            mock_stream.assert_not_called()
             assert result.event_rows == 0
+
+
+class TestIncrementalIngest:
+    """ingest_report_incremental appends only fights after Report.last_fight_id."""
+
+    FIGHTS = [
+        {"id": 1, "name": "Attumen", "startTime": 0, "endTime": 60000,
+         "kill": True, "encounterID": 50652, "difficulty": 0},
+        {"id": 2, "name": "Trash", "startTime": 70000, "endTime": 80000,
+         "kill": True, "encounterID": 0},
+        {"id": 3, "name": "Moroes", "startTime": 90000, "endTime": 150000,
+         "kill": True, "encounterID": 50653, "difficulty": 0},
+        {"id": 4, "name": "Trash", "startTime": 160000, "endTime": 170000,
+         "kill": True, "encounterID": 0},
+    ]
+
+    def _make_mocks(self, report):
+        from shukketsu.db.models import Report
+
+        report_info = {
+            "title": "Kara Live", "startTime": 0, "endTime": 170000,
+            "guild": None, "fights": self.FIGHTS, "masterData": {"actors": []},
+        }
+
+        async def query(q, variables=None, **kwargs):
+            if "ReportRankings" in q:
+                return {"reportData": {"report": {"rankings": {"data": []}}}}
+            return {"reportData": {"report": report_info}}
+
+        mock_wcl = MagicMock()
+        mock_wcl.query = AsyncMock(side_effect=query)
+        mock_session = AsyncMock()
+        mock_session.add = MagicMock()
+        mock_session.get = AsyncMock(
+            side_effect=lambda model, key: report if model is Report else None
+        )
+        # Every encounter is already known
+        known = MagicMock()
+        known.scalars.return_value = [50652, 50653]
+        mock_session.execute.return_value = known
+        return mock_wcl, mock_session
+
+    async def test_appends_only_new_fights(self):
+        from shukketsu.db.models import Report
+
+        report = Report(code="abc", title="Kara", start_time=0, end_time=60000,
+                        last_fight_id=1)
+        mock_wcl, mock_session = self._make_mocks(report)
+
+        result = await ingest_report_incremental(mock_wcl, mock_session, "abc")
+
+        added = [c.args[0] for c in mock_session.add.call_args_list]
+        assert [f.fight_id for f in added] == [3]
+        assert result.fights == 1
+        assert result.report_end_time == 170000
+        assert report.last_fight_id == 4
+        assert report.end_time == 170000
+        # Nothing is deleted on the incremental path: only the encounter lookup
+        [lookup] = mock_session.execute.await_args_list
+        assert "FROM encounters" in str(lookup.args[0])
+        rankings_call = mock_wcl.query.await_args_list[1]
+        assert rankings_call.kwargs["variables"]["fightIDs"] == [3]
+
+    async def test_no_new_fights_skips_rankings(self):
+        from shukketsu.db.models import Report
+
+        report = Report(code="abc", title="Kara", start_time=0, end_time=170000,
+                        last_fight_id=4)
+        mock_wcl, mock_session = self._make_mocks(report)
+
+        result = await ingest_report_incremental(mock_wcl, mock_session, "abc")
+
+        assert result.fights == 0
+        assert mock_wcl.query.await_count == 1
+        mock_session.add.assert_not_called()
+
+    async def test_events_fetched_for_new_fights_only(self):
+        from shukketsu.db.models import Report
+
+        report = Report(code="abc", title="Kara", start_time=0, end_time=60000,
+                        last_fight_id=2)
+        mock_wcl, mock_session = self._make_mocks(report)
+        calls = []
+
+        async def stream(wcl, code, fights, data_type, **kwargs):
+            calls.append([f.fight_id for f in fights])
+            return
+            yield  # pragma: no cover
+
+        with patch(
+            "shukketsu.pipeline.report_events.stream_events_by_fight",
+            side_effect=stream,
+        ):
+            await ingest_report_incremental(
+                mock_wcl, mock_session, "abc", ingest_events=True,
+            )
+
+        assert calls == [[3]] * 4
+
+    @patch("shukketsu.pipeline.ingest.ingest_report", new_callable=AsyncMock)
+    async def test_unknown_report_falls_back_to_full_ingest(self, mock_full):
+        mock_wcl, mock_session = self._make_mocks(None)
+
+        await ingest_report_incremental(mock_wcl, mock_session, "abc")
+
+        mock_full.assert_awaited_once()
+        mock_wcl.query.assert_not_awaited()
@@ -0,0 +1,336 @@
+"""Tests for the durable ingest_jobs queue and its worker pool."""
+
+import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy.dialects import postgresql
+
+from shukketsu.pipeline.ingest import IngestResult
+from shukketsu.pipeline.ingest_jobs import (
+    ClaimedJob,
+    IngestWorkerPool,
+    _stage_summary,
+    claim_next_job,
+    complete_job,
+    enqueue_ingest_job,
+    fail_job,
+    renew_lease,
+)
+from shukketsu.wcl.scheduler import Priority
+
+
+def _sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def _params(stmt) -> dict:
+    return stmt.compile(dialect=postgresql.dialect()).params
+
+
+def _make_settings(workers=2, max_attempts=3, backoff=60):
+    settings = MagicMock()
+    settings.ingest_queue.workers = workers
+    settings.ingest_queue.idle_poll_seconds = 0.01
+    settings.ingest_queue.max_attempts = max_attempts
+    settings.ingest_queue.retry_backoff_seconds = backoff
+    settings.ingest_queue.lease_minutes = 60
+    settings.auto_ingest.enrichment_concurrency = 1
+    return settings
+
+
+class _AsyncCM:
+    def __init__(self, val):
+        self._val = val
+
+    async def __aenter__(self):
+        return self._val
+
+    async def __aexit__(self, *exc):
+        pass
+
+
+def _make_session():
+    session = AsyncMock()
+    session.add = MagicMock()
+    session.begin = MagicMock(return_value=_AsyncCM(None))
+    session.execute.return_value = MagicMock(rowcount=1)
+    return session
+
+
+def _make_session_factory(session):
+    factory = MagicMock()
+    factory.return_value.__aenter__ = AsyncMock(return_value=session)
+    factory.return_value.__aexit__ = AsyncMock(return_value=False)
+    return factory
+
+
+def _job(attempts=1, max_attempts=3, priority=Priority.AUTO_INGEST):
+    return ClaimedJob(
+        id=7, report_code="ABC", priority=int(priority),
+        with_tables=True, with_events=False,
+        attempts=attempts, max_attempts=max_attempts, locked_by="host:1:0",
+    )
+
+
+class TestEnqueue:
+    async def test_insert_skips_active_duplicates(self):
+        session = AsyncMock()
+        result = MagicMock()
+        result.scalar.return_value = 42
+        session.execute.return_value = result
+
+        job_id = await enqueue_ingest_job(
+            session, "ABC", source="api", priority=Priority.INTERACTIVE,
+            with_tables=True,
+        )
+
+        assert job_id == 42
+        stmt = session.execute.call_args.args[0]
+        sql = _sql(stmt)
+        assert "ON CONFLICT (report_code) WHERE" in sql
+        assert "DO NOTHING" in sql
+        assert _params(stmt)["priority"] == 0
+        assert session.execute.call_count == 1
+
+    async def test_returns_existing_active_job(self):
+        session = AsyncMock()
+        inserted, existing = MagicMock(), MagicMock()
+        inserted.scalar.return_value = None
+        existing.scalar.return_value = 5
+        session.execute.side_effect = [inserted, existing]
+
+        assert await enqueue_ingest_job(session, "ABC", source="poll") == 5
+        assert session.execute.call_count == 2
+
+
+class TestClaim:
+    async def test_claim_uses_skip_locked(self):
+        session = AsyncMock()
+        result = MagicMock()
+        result.first.return_value = (7, "ABC", 1, True, False, 1, 3, "host:1:0")
+        session.execute.return_value = result
+
+        job = await claim_next_job(session, "host:1:0", lease=timedelta(minutes=60))
+
+        assert job == _job()
+        sql = _sql(session.execute.call_args.args[0])
+        assert "FOR UPDATE SKIP LOCKED" in sql
+        assert "ORDER BY ingest_jobs.priority, ingest_jobs.id" in sql
+        assert "RETURNING" in sql
+
+    async def test_claim_returns_none_when_queue_empty(self):
+        session = AsyncMock()
+        result = MagicMock()
+        result.first.return_value = None
+        session.execute.return_value = result
+
+        assert await claim_next_job(session, "w", lease=timedelta(minutes=1)) is None
+
+
+class TestFailJob:
+    async def test_requeues_with_backoff_while_attempts_remain(self):
+        session = AsyncMock()
+        assert await fail_job(session, _job(attempts=2), "boom", backoff_seconds=60)
+        stmt = session.execute.call_args.args[0]
+        params = _params(stmt)
+        assert params["status"] == "queued"
+        # 60s doubled once for the second attempt
+        assert timedelta(seconds=120) in params.values()
+
+    async def test_fails_after_last_attempt(self):
+        session = AsyncMock()
+        assert not await fail_job(
+            session, _job(attempts=3), "boom", backoff_seconds=60,
+        )
+        assert _params(session.execute.call_args.args[0])["status"] == "failed"
+
+    async def test_lost_lease_writes_nothing(self):
+        session = AsyncMock()
+        session.execute.return_value = MagicMock(rowcount=0)
+        assert await fail_job(
+            session, _job(attempts=2), "boom", backoff_seconds=60,
+        ) is None
+        sql = _sql(session.execute.call_args.args[0])
+        assert "ingest_jobs.locked_by = %(locked_by_1)s" in sql
+
+
+class TestLease:
+    async def test_renew_only_while_owned(self):
+        session = AsyncMock()
+        session.execute.return_value = MagicMock(rowcount=1)
+
+        assert await renew_lease(session, _job())
+        stmt = session.execute.call_args.args[0]
+        sql = _sql(stmt)
+        assert "locked_at=now()" in sql
+        assert "ingest_jobs.status = %(status_1)s" in sql
+        assert _params(stmt)["locked_by_1"] == "host:1:0"
+
+        session.execute.return_value = MagicMock(rowcount=0)
+        assert not await renew_lease(session, _job())
+
+    async def test_complete_requires_lease(self):
+        session = AsyncMock()
+        session.execute.return_value = MagicMock(rowcount=0)
+        assert not await complete_job(session, _job(), {})
+        assert _params(session.execute.call_args.args[0])["locked_by_1"] == "host:1:0"
+
+
+class TestStageSummary:
+    async def test_unchanged_reingest(self):
+        result = IngestResult(fights=4, performances=0, fights_unchanged=4)
+        with patch(
+            "shukketsu.pipeline.ingest_jobs.stage_outcomes", new_callable=AsyncMock,
+        ) as outcomes:
+            outcomes.return_value = {
+                "table_data": {"done": 4, "failed": 0, "missing": 0},
+            }
+            stages = await _stage_summary(AsyncMock(), _job(), result)
+
+        assert stages["report"] == "unchanged"
+        assert stages["rankings"] == "unchanged"
+        assert stages["enrichment"] == "done"
+
+    async def test_unranked_kills_and_failed_enrichment(self):
+        result = IngestResult(fights=2, performances=10, rankings_missing=[3])
+        with patch(
+            "shukketsu.pipeline.ingest_jobs.stage_outcomes", new_callable=AsyncMock,
+        ) as outcomes:
+            outcomes.return_value = {
+                "table_data": {"done": 0, "failed": 1, "missing": 1},
+            }
+            stages = await _stage_summary(AsyncMock(), _job(), result)
+
+        assert stages["rankings"] == "partial"
+        assert stages["rankings_missing"] == [3]
+        assert stages["enrichment"] == "failed"
+
+    async def test_no_enrichment_requested(self):
+        job = ClaimedJob(
+            id=7, report_code="ABC", priority=1, with_tables=False, with_events=False,
+            attempts=1, max_attempts=3, locked_by="host:1:0",
+        )
+        session = AsyncMock()
+        stages = await _stage_summary(
+            session, job, IngestResult(fights=2, performances=10),
+        )
+
+        assert stages["enrichment"] == "skipped"
+        session.execute.assert_not_called()
+
+
+class TestWorkerPool:
+    @patch("shukketsu.pipeline.ingest_jobs.stage_outcomes", new_callable=AsyncMock)
+    @patch("shukketsu.pipeline.ingest_jobs.complete_job", new_callable=AsyncMock)
+    @patch("shukketsu.pipeline.ingest_jobs.claim_next_job", new_callable=AsyncMock)
+    @patch("shukketsu.pipeline.ingest_jobs.ingest_report", new_callable=AsyncMock)
+    async def test_run_once_ingests_and_completes(
+        self, mock_ingest, mock_claim, mock_complete, mock_outcomes,
+    ):
+        session = _make_session()
+        mock_claim.return_value = _job(priority=Priority.INTERACTIVE)
+        mock_ingest.return_value = IngestResult(
+            fights=3, performances=30, table_rows=12, event_rows=0,
+            enrichment_errors=["table_data_fight_2"],
+        )
+        mock_outcomes.return_value = {
+            "table_data": {"done": 2, "failed": 1, "missing": 0},
+        }
+        priorities = []
+
+        def wcl_factory(priority=None):
+            priorities.append(priority)
+            return _AsyncCM(AsyncMock())
+
+        pool = IngestWorkerPool(
+            _make_settings(), _make_session_factory(session), wcl_factory,
+        )
+        with patch(
+            "shukketsu.pipeline.progression.snapshot_all_characters",
+            new_callable=AsyncMock,
+        ):
+            assert await pool.run_once("w0") is True
+
+        assert priorities == [Priority.INTERACTIVE]
+        kwargs = mock_ingest.call_args.kwargs
+        assert kwargs["ingest_tables"] is True
+        assert kwargs["ingest_events"] is False
+        assert kwargs["progress"] is not None
+        job, stages = mock_complete.call_args.args[1:]
+        assert job.id == 7
+        mock_outcomes.assert_awaited_once_with(session, "ABC", ["table_data"])
+        assert stages["report"] == "done"
+        assert stages["rankings"] == "done"
+        assert stages["enrichment"] == "partial"
+        assert stages["enrichment_stages"] == mock_outcomes.return_value
+        assert stages["enrichment_errors"] == ["table_data_fight_2"]
+        assert stages["snapshot"] == "done"
+        assert pool.get_status()["stats"]["done"] == 1
+
+    @patch("shukketsu.pipeline.ingest_jobs.fail_job", new_callable=AsyncMock)
+    @patch("shukketsu.pipeline.ingest_jobs.claim_next_job", new_callable=AsyncMock)
+    @patch("shukketsu.pipeline.ingest_jobs.ingest_report", new_callable=AsyncMock)
+    async def test_failed_ingest_is_retried(self, mock_ingest, mock_claim, mock_fail):
+        session = _make_session()
+        mock_claim.return_value = _job()
+        mock_ingest.side_effect = RuntimeError("WCL down")
+        mock_fail.return_value = True
+
+        pool = IngestWorkerPool(
+            _make_settings(backoff=30), _make_session_factory(session),
+            lambda priority=None: _AsyncCM(AsyncMock()),
+        )
+        assert await pool.run_once("w0") is True
+
+        args, kwargs = mock_fail.call_args
+        assert args[1] == _job()
+        assert "WCL down" in args[2]
+        assert kwargs["backoff_seconds"] == 30
+        assert pool.get_status()["stats"]["retried"] == 1
+
+    @patch("shukketsu.pipeline.ingest_jobs.complete_job", new_callable=AsyncMock)
+    @patch("shukketsu.pipeline.ingest_jobs.renew_lease", new_callable=AsyncMock)
+    @patch("shukketsu.pipeline.ingest_jobs.claim_next_job", new_callable=AsyncMock)
+    @patch("shukketsu.pipeline.ingest_jobs.ingest_report", new_callable=AsyncMock)
+    async def test_heartbeat_renews_lease_during_long_stage(
+        self, mock_ingest, mock_claim, mock_renew, mock_complete,
+    ):
+        mock_claim.return_value = _job()
+        mock_renew.return_value = True
+        mock_complete.return_value = False
+
+        async def slow_ingest(*args, **kwargs):
+            await asyncio.sleep(0.1)
+            return IngestResult(fights=1, performances=10)
+
+        mock_ingest.side_effect = slow_ingest
+        settings = _make_settings()
+        settings.ingest_queue.lease_minutes = 0.001  # 20ms heartbeat
+        pool = IngestWorkerPool(
+            settings, _make_session_factory(_make_session()),
+            lambda priority=None: _AsyncCM(AsyncMock()),
+        )
+        with patch(
+            "shukketsu.pipeline.progression.snapshot_all_characters",
+            new_callable=AsyncMock,
+        ):
+            assert await pool.run_once("w0") is True
+
+        assert mock_renew.await_count >= 2
+        renewals = mock_renew.await_count
+        await asyncio.sleep(0.05)
+        # Heartbeat stops with the job; a lost lease is not counted as done
+        assert mock_renew.await_count == renewals
+        stats = pool.get_status()["stats"]
+        assert (stats["done"], stats["lease_lost"]) == (0, 1)
+
+    @patch("shukketsu.pipeline.ingest_jobs.claim_next_job", new_callable=AsyncMock)
+    @patch("shukketsu.pipeline.ingest_jobs.ingest_report", new_callable=AsyncMock)
+    async def test_run_once_returns_false_when_idle(self, mock_ingest, mock_claim):
+        mock_claim.return_value = None
+        pool = IngestWorkerPool(
+            _make_settings(), _make_session_factory(_make_session()), MagicMock(),
+        )
+        assert await pool.run_once("w0") is False
+        mock_ingest.assert_not_called()
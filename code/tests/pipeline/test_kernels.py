@@ -0,0 +1,193 @@
+"""Tests for the cast/resource metric kernels and NumPy/Python parity."""
+
+import json
+import random
+from array import array
+
+import pytest
+
+from shukketsu.pipeline import kernels
+from shukketsu.pipeline.cast_events import (
+    GAP_THRESHOLD_MS,
+    GCD_MS,
+    compute_cast_metrics,
+)
+from shukketsu.pipeline.kernels import (
+    GcdStats,
+    ResourceStats,
+    downsample_indices,
+    gcd_stats,
+    resource_stats,
+)
+from shukketsu.pipeline.resource_events import compute_resource_snapshots
+from shukketsu.pipeline.rows import CastEventRow
+
+
+@pytest.fixture
+def backend():
+    """Run the test body under a forced backend, restoring "auto" afterwards."""
+    yield kernels.set_backend
+    kernels.set_backend("auto")
+
+
+def _cast_times(rng: random.Random, n: int) -> array:
+    ts, out = 0, array("q")
+    for _ in range(n):
+        ts += rng.choice((0, 400, 1000, 1500, 1500, 2600, 4000, rng.randint(0, 20_000)))
+        out.append(ts)
+    return out
+
+
+def _resource_series(rng: random.Random, n: int) -> tuple[array, array]:
+    ts, timestamps, amounts = 0, array("q"), array("q")
+    for _ in range(n):
+        ts += rng.randint(0, 3000)
+        timestamps.append(ts)
+        amounts.append(rng.choice((0, 0, rng.randint(0, 10_000))))
+    return timestamps, amounts
+
+
+class TestPythonKernels:
+    def test_gcd_stats_basic(self, backend):
+        backend("python")
+        stats = gcd_stats(array("q", [0, 1000, 2500, 6500]), GCD_MS, GAP_THRESHOLD_MS)
+        assert stats == GcdStats(
+            active_time_ms=1000 + 1500 + 1500,
+            gap_count=1,
+            gap_total_ms=4000,
+            longest_gap_ms=4000,
+            longest_gap_at_ms=2500,
+        )
+
+    def test_gcd_stats_single_cast(self):
+        assert gcd_stats(array("q", [500]), GCD_MS, GAP_THRESHOLD_MS) == GcdStats(
+            0, 0, 0, 0, 0,
+        )
+
+    def test_gcd_stats_first_longest_gap_wins_ties(self, backend):
+        backend("python")
+        stats = gcd_stats(array("q", [0, 5000, 10000]), GCD_MS, GAP_THRESHOLD_MS)
+        assert stats.longest_gap_at_ms == 0
+
+    def test_resource_stats_zero_time(self, backend):
+        backend("python")
+        stats = resource_stats(array("q", [0, 1000, 3000]), array("q", [500, 0, 200]))
+        assert stats == ResourceStats(0, 500, 700, 2000)
+
+    def test_downsample_short_series_kept(self):
+        assert downsample_indices(array("q", [1, 2]), array("q", [10, 20]), 50) == [0, 1]
+
+    def test_lttb_keeps_endpoints_and_spike(self, backend):
+        backend("python")
+        n = 1000
+        timestamps = array("q", range(0, n * 100, 100))
+        amounts = array("q", [5000] * n)
+        amounts[437] = 0  # a single-reading mana dip
+        picks = downsample_indices(timestamps, amounts, 50, "lttb")
+        assert len(picks) == 50
+        assert picks[0] == 0 and picks[-1] == n - 1
+        assert 437 in picks
+        assert picks == sorted(picks)
+
+    def test_minmax_keeps_bucket_extremes(self, backend):
+        backend("python")
+        amounts = array("q", [50] * 400)
+        amounts[10], amounts[390] = 0, 100
+        picks = downsample_indices(array("q", range(400)), amounts, 20, "minmax")
+        assert 10 in picks and 390 in picks
+        assert len(picks) <= 20
+        assert picks == sorted(picks)
+
+    def test_unknown_downsample_method_rejected(self):
+        with pytest.raises(ValueError, match="Unknown downsample method"):
+            downsample_indices(array("q", range(10)), array("q", range(10)), 5, "stride")
+
+    def test_unknown_backend_rejected(self):
+        with pytest.raises(ValueError, match="Unknown kernel backend"):
+            kernels.set_backend("cuda")
+
+
+class TestNumpyParity:
+    @pytest.fixture(autouse=True)
+    def _require_numpy(self):
+        pytest.importorskip("numpy")
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_gcd_stats(self, backend, seed):
+        times = _cast_times(random.Random(seed), random.Random(seed).randint(2, 500))
+        backend("python")
+        expected = gcd_stats(times, GCD_MS, GAP_THRESHOLD_MS)
+        backend("numpy")
+        assert gcd_stats(times, GCD_MS, GAP_THRESHOLD_MS) == expected
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_resource_stats(self, backend, seed):
+        timestamps, amounts = _resource_series(
+            random.Random(seed), random.Random(seed).randint(1, 500),
+        )
+        backend("python")
+        expected = resource_stats(timestamps, amounts)
+        backend("numpy")
+        assert resource_stats(timestamps, amounts) == expected
+
+    @pytest.mark.parametrize("method", ["lttb", "minmax"])
+    @pytest.mark.parametrize("n", [51, 99, 100, 137, 1000, 4999])
+    def test_downsample_indices(self, backend, method, n):
+        timestamps, amounts = _resource_series(random.Random(n), n)
+        backend("python")
+        expected = downsample_indices(timestamps, amounts, 50, method)
+        backend("numpy")
+        assert downsample_indices(timestamps, amounts, 50, method) == expected
+
+    def test_compute_cast_metrics(self, backend):
+        rng = random.Random(7)
+        casts = [
+            CastEventRow(1, f"P{i % 5}", ts, 100 + i % 3, "Spell", "cast")
+            for i, ts in enumerate(_cast_times(rng, 2000))
+        ]
+        backend("python")
+        expected = compute_cast_metrics(casts, 600_000)
+        backend("numpy")
+        actual = compute_cast_metrics(casts, 600_000)
+
+        columns = [
+            "total_casts", "casts_per_minute", "gcd_uptime_pct", "active_time_ms",
+            "downtime_ms", "longest_gap_ms", "longest_gap_at_ms", "avg_gap_ms",
+            "gap_count",
+        ]
+        assert actual.keys() == expected.keys()
+        for name, metric in expected.items():
+            assert [getattr(actual[name], c) for c in columns] == [
+                getattr(metric, c) for c in columns
+            ]
+
+    def test_compute_resource_snapshots(self, backend):
+        rng = random.Random(11)
+        events = []
+        # Mana (LTTB) for one player, rage (min/max buckets) for the other
+        for source_id, resource_type in ((1, 0), (2, 1)):
+            timestamps, amounts = _resource_series(rng, 800)
+            events.extend(
+                {
+                    "sourceID": source_id,
+                    "timestamp": t,
+                    "classResources": [{"type": resource_type, "amount": a}],
+                }
+                for t, a in zip(timestamps, amounts, strict=True)
+            )
+        args = (events, 1, 300_000, {1: "A", 2: "B"})
+
+        backend("python")
+        expected = compute_resource_snapshots(*args)
+        backend("numpy")
+        actual = compute_resource_snapshots(*args)
+
+        columns = [
+            "player_name", "min_value", "max_value", "avg_value",
+            "time_at_zero_ms", "time_at_zero_pct",
+        ]
+        assert len(actual) == len(expected) == 2
+        for a, e in zip(actual, expected, strict=True):
+            assert [getattr(a, c) for c in columns] == [getattr(e, c) for c in columns]
+            assert json.loads(a.samples_json) == json.loads(e.samples_json)
+            assert a.sample_levels_json == e.sample_levels_json
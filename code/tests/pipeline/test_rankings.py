@@ -3,9 +3,10 @@
 import json
 from dataclasses import dataclass
 from datetime import UTC, datetime
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from sqlalchemy.dialects import postgresql
 
 from shukketsu.pipeline.rankings import (
     RankingsResult,
@@ -165,7 +166,7 @@ class TestFetchRankingsForSpec:
             }
         }
         session = AsyncMock()
-        session.add = MagicMock()  # session.add() is sync in SQLAlchemy
+        session.execute.return_value = MagicMock(rowcount=0)
 
         count = await fetch_rankings_for_spec(
             wcl, session, 650, "Rogue", "Combat", "dps"
@@ -180,7 +181,7 @@ class TestFetchRankingsForSpec:
         assert call_vars["metric"] == "dps"
         assert call_vars["page"] == 1
 
-    async def test_deletes_old_data(self):
+    async def test_replaces_combo_rows_and_marks_fetch(self):
         wcl = AsyncMock()
         wcl.query.return_value = {
             "worldData": {
@@ -190,14 +191,24 @@ class TestFetchRankingsForSpec:
             }
         }
         session = AsyncMock()
-        session.add = MagicMock()  # session.add() is sync in SQLAlchemy
 
-        await fetch_rankings_for_spec(
-            wcl, session, 650, "Rogue", "Combat", "dps"
-        )
-
-        # Should have called execute once for the DELETE
-        assert session.execute.call_count == 1
+        with patch(
+            "shukketsu.pipeline.rankings.upsert_rows", new_callable=AsyncMock,
+        ) as mock_upsert:
+            await fetch_rankings_for_spec(
+                wcl, session, 650, "Rogue", "Combat", "dps"
+            )
+
+        # Empty result still replaces the combo (scope = encounter/class/spec/metric)
+        assert mock_upsert.await_args.args[2] == []
+        assert len(mock_upsert.await_args.kwargs["scope"]) == 4
+        # The only direct statement records the fetch time
+        session.execute.assert_awaited_once()
+        sql = str(session.execute.await_args.args[0].compile(
+            dialect=postgresql.dialect(),
+        ))
+        assert "INSERT INTO ranking_fetches" in sql
+        assert "ON CONFLICT" in sql
 
     async def test_returns_zero_for_empty_rankings(self):
         wcl = AsyncMock()
@@ -216,7 +227,7 @@ class TestFetchRankingsForSpec:
 
         assert count == 0
 
-    async def test_adds_rankings_to_session(self):
+    async def test_upserts_rankings(self):
         wcl = AsyncMock()
         wcl.query.return_value = {
             "worldData": {
@@ -228,12 +239,16 @@ class TestFetchRankingsForSpec:
         session = AsyncMock()
         session.add = MagicMock()  # session.add() is sync in SQLAlchemy
 
-        await fetch_rankings_for_spec(
-            wcl, session, 650, "Rogue", "Combat", "dps"
-        )
+        with patch(
+            "shukketsu.pipeline.rankings.upsert_rows", new_callable=AsyncMock,
+        ) as mock_upsert:
+            await fetch_rankings_for_spec(
+                wcl, session, 650, "Rogue", "Combat", "dps"
+            )
 
-        # 2 rankings added via session.add
-        assert session.add.call_count == 2
+        # 2 rankings upserted by natural key, none added to the session
+        assert len(mock_upsert.await_args.args[2]) == 2
+        session.add.assert_not_called()
 
 
 class TestIngestAllRankings:
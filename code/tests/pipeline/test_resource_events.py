@@ -8,6 +8,7 @@ import pytest
 from shukketsu.pipeline.resource_events import (
     _TARGET_SAMPLES,
     compute_resource_snapshots,
+    decode_sample_level,
     ingest_resource_data_for_fight,
 )
 
@@ -224,6 +225,60 @@ class TestComputeResourceSnapshotsSamplesJson:
         samples = json.loads(result[0].samples_json)
         assert len(samples) == _TARGET_SAMPLES
 
+    def test_samples_json_keeps_mana_dip(self):
+        """A single-reading dip survives downsampling (it would fall between strides)."""
+        actors = {1: "Mage"}
+        events = [
+            _make_resource_event(1, i * 100, 0, 0 if i == 437 else 8000)
+            for i in range(1000)
+        ]
+
+        result = compute_resource_snapshots(
+            events, fight_id=1, fight_duration_ms=100_000, actors=actors,
+        )
+
+        samples = json.loads(result[0].samples_json)
+        assert {"t": 43700, "v": 0} in samples
+        assert samples[0]["t"] == 0
+        assert samples[-1]["t"] == 99900
+
+    def test_sample_levels_multi_resolution(self):
+        """Long series store 50- and 500-point levels; the 50 level matches samples_json."""
+        actors = {1: "Warrior"}
+        events = [
+            _make_resource_event(1, i * 100, 1, (i * 37) % 101)
+            for i in range(2000)
+        ]
+
+        result = compute_resource_snapshots(
+            events, fight_id=1, fight_duration_ms=200_000, actors=actors,
+        )
+
+        snapshot = result[0]
+        assert sorted(json.loads(snapshot.sample_levels_json)) == ["50", "500"]
+        chosen, coarse = decode_sample_level(snapshot.sample_levels_json, 50)
+        assert chosen == 50
+        assert coarse == json.loads(snapshot.samples_json)
+        chosen, fine = decode_sample_level(snapshot.sample_levels_json, 200)
+        assert chosen == 500
+        assert 250 < len(fine) <= 500
+        assert [p["t"] for p in fine] == sorted(p["t"] for p in fine)
+
+    def test_sample_levels_short_series_single_level(self):
+        """Series no longer than the chart resolution store only that level."""
+        actors = {1: "Mage"}
+        events = [_make_resource_event(1, i * 1000, 0, 5000) for i in range(10)]
+
+        result = compute_resource_snapshots(
+            events, fight_id=1, fight_duration_ms=10_000, actors=actors,
+        )
+
+        levels_json = result[0].sample_levels_json
+        assert list(json.loads(levels_json)) == ["50"]
+        chosen, samples = decode_sample_level(levels_json, 500)
+        assert chosen == 50
+        assert len(samples) == 10
+
 
 class TestComputeResourceSnapshotsNoClassResources:
 
@@ -342,20 +397,27 @@ class TestIngestResourceDataForFight:
         async def _fake_fetch(*args, **kwargs):
             yield raw_events
 
-        with patch(
-            "shukketsu.pipeline.resource_events.fetch_all_events",
-            side_effect=_fake_fetch,
+        with (
+            patch(
+                "shukketsu.pipeline.resource_events.fetch_all_events",
+                side_effect=_fake_fetch,
+            ),
+            patch(
+                "shukketsu.db.upsert.upsert_rows",
+                new_callable=AsyncMock,
+            ) as mock_upsert,
         ):
             count = await ingest_resource_data_for_fight(
                 wcl, session, "ABC123", fight, actors,
             )
 
         assert count == 2  # One snapshot per (player, resource_type)
-        assert session.add.call_count == 2
-        session.flush.assert_awaited_once()
-
-        # Verify delete was called
-        assert session.execute.await_count == 1
+        session.add.assert_not_called()
+        # Snapshots are upserted, scoped to the fight (no delete up front)
+        mock_upsert.assert_awaited_once()
+        assert len(mock_upsert.await_args.args[2]) == 2
+        assert mock_upsert.await_args.kwargs["scope"] is not None
+        session.execute.assert_not_awaited()
 
     async def test_ingest_resource_data_for_fight_empty(self):
         """No events from WCL results in 0 rows inserted."""
@@ -395,7 +457,55 @@ class TestIngestResourceDataForFight:
         fight.start_time = 0
         fight.end_time = 60_000
 
-        with pytest.raises(RuntimeError, match="DB error"):
+        async def _fake_fetch(*args, **kwargs):
+            yield [_make_resource_event(1, 1000, 0, 8000)]
+
+        with (
+            patch(
+                "shukketsu.pipeline.resource_events.fetch_all_events",
+                side_effect=_fake_fetch,
+            ),
+            pytest.raises(RuntimeError, match="DB error"),
+        ):
             await ingest_resource_data_for_fight(
-                wcl, session, "FAIL", fight, {},
+                wcl, session, "FAIL", fight, {1: "Mage"},
+            )
+
+
+class TestResourceEventsStream:
+    async def test_paged_stream_matches_single_batch(self):
+        from shukketsu.pipeline.resource_events import ResourceEventsStream
+
+        events = [
+            _make_resource_event(1, 1000 + i * 500, 0, 0 if i % 9 == 0 else 5000 - i)
+            for i in range(120)
+        ] + [_make_resource_event(2, 1000 + i * 700, 1, i % 100) for i in range(80)]
+        events.sort(key=lambda e: e["timestamp"])
+        fight = MagicMock(id=3, fight_id=1, start_time=1000, end_time=90_000)
+        actors = {1: "Healer", 2: "Warrior"}
+
+        expected = compute_resource_snapshots(
+            events, 3, 89_000, actors, fight_start_time=1000,
+        )
+
+        stream = ResourceEventsStream(MagicMock(), "ABC", fight, actors)
+        for i in range(0, len(events), 13):
+            await stream.add(events[i:i + 13])
+        with patch(
+            "shukketsu.db.upsert.upsert_rows", new_callable=AsyncMock,
+        ) as mock_upsert:
+            assert await stream.finish() == len(expected) == 2
+
+        got = mock_upsert.await_args.args[2]
+        for snap, exp in zip(
+            sorted(got, key=lambda s: s.player_name),
+            sorted(expected, key=lambda s: s.player_name),
+            strict=True,
+        ):
+            assert (
+                snap.min_value, snap.max_value, snap.avg_value,
+                snap.time_at_zero_ms, snap.time_at_zero_pct, snap.samples_json,
+            ) == (
+                exp.min_value, exp.max_value, exp.avg_value,
+                exp.time_at_zero_ms, exp.time_at_zero_pct, exp.samples_json,
             )
@@ -0,0 +1,46 @@
+"""Tests for the slotted row records emitted by pipeline parse functions."""
+
+from dataclasses import fields
+
+import pytest
+
+from shukketsu.db.models import FightPerformance
+from shukketsu.pipeline import rows
+from shukketsu.pipeline.ingest import parse_rankings_to_performances
+
+ROW_TYPES = [
+    rows.CastEventRow, rows.DeathDetailRow, rows.AbilityMetricRow,
+    rows.BuffUptimeRow, rows.ConsumableRow, rows.GearRow, rows.PerformanceRow,
+]
+
+
+@pytest.mark.parametrize("row_type", ROW_TYPES, ids=lambda t: t.__name__)
+def test_fields_mirror_model_columns(row_type):
+    columns = [
+        c.key for c in row_type.__table__.columns
+        if c.key != "id" and (c.default is None or c.default.is_scalar)
+    ]
+    assert [f.name for f in fields(row_type)] == columns
+    assert row_type.__table__ is row_type.model.__table__
+
+
+def test_rows_are_slotted():
+    row = rows.CastEventRow(7, "Lyro", 1000, 100, "Slam", "cast")
+    assert not hasattr(row, "__dict__")
+    with pytest.raises(AttributeError):
+        row.unknown = 1
+
+
+def test_to_model_builds_orm_instance():
+    perf = parse_rankings_to_performances(
+        [{"name": "Lyro", "class": "Warrior", "spec": "Arms", "amount": 1500.0}],
+        fight_id=3, my_character_names={"lyro"},
+    )[0]
+    assert isinstance(perf, rows.PerformanceRow)
+
+    model = perf.to_model()
+    assert isinstance(model, FightPerformance)
+    assert model.fight_id == 3
+    assert model.dps == 1500.0
+    assert model.is_my_character is True
+
@@ -2,7 +2,9 @@
 
 import json
 from datetime import UTC, datetime
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy.dialects import postgresql
 
 from shukketsu.pipeline.speed_rankings import (
     SpeedRankingsResult,
@@ -121,7 +123,7 @@ class TestFetchSpeedRankingsForEncounter:
             }
         }
         session = AsyncMock()
-        session.add = MagicMock()  # session.add() is sync in SQLAlchemy
+        session.execute.return_value = MagicMock(rowcount=0)
 
         count = await fetch_speed_rankings_for_encounter(wcl, session, 50650)
 
@@ -131,7 +133,7 @@ class TestFetchSpeedRankingsForEncounter:
         assert call_vars["encounterID"] == 50650
         assert call_vars["page"] == 1
 
-    async def test_deletes_old_data(self):
+    async def test_replaces_encounter_rows_and_marks_fetch(self):
         wcl = AsyncMock()
         wcl.query.return_value = {
             "worldData": {
@@ -141,14 +143,20 @@ class TestFetchSpeedRankingsForEncounter:
             }
         }
         session = AsyncMock()
-        session.add = MagicMock()  # session.add() is sync in SQLAlchemy
 
-        await fetch_speed_rankings_for_encounter(wcl, session, 50650)
+        with patch(
+            "shukketsu.pipeline.speed_rankings.upsert_rows", new_callable=AsyncMock,
+        ) as mock_upsert:
+            await fetch_speed_rankings_for_encounter(wcl, session, 50650)
 
-        # Should have called execute once for the DELETE
-        assert session.execute.call_count == 1
+        assert mock_upsert.await_args.args[2] == []
+        assert len(mock_upsert.await_args.kwargs["scope"]) == 1
+        session.execute.assert_awaited_once()
+        stmt = session.execute.await_args.args[0]
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        assert "INSERT INTO ranking_fetches" in sql
 
-    async def test_adds_rankings_to_session(self):
+    async def test_upserts_rankings(self):
         wcl = AsyncMock()
         wcl.query.return_value = {
             "worldData": {
@@ -160,9 +168,13 @@ class TestFetchSpeedRankingsForEncounter:
         session = AsyncMock()
         session.add = MagicMock()  # session.add() is sync in SQLAlchemy
 
-        await fetch_speed_rankings_for_encounter(wcl, session, 50650)
+        with patch(
+            "shukketsu.pipeline.speed_rankings.upsert_rows", new_callable=AsyncMock,
+        ) as mock_upsert:
+            await fetch_speed_rankings_for_encounter(wcl, session, 50650)
 
-        assert session.add.call_count == 2
+        assert len(mock_upsert.await_args.args[2]) == 2
+        session.add.assert_not_called()
 
 
 class TestIngestAllSpeedRankings:
@@ -1,11 +1,20 @@
 """Tests for table data pipeline (ability breakdowns, buff uptimes)."""
 
+from contextlib import asynccontextmanager
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
 import pytest
+from sqlalchemy.dialects import postgresql
 
 from shukketsu.pipeline.table_data import (
+    demux_table_response,
+    fetch_tables_for_fights,
     parse_ability_metrics,
     parse_buff_uptimes,
     parse_table_response,
+    persist_tables_for_fights,
 )
 
 
@@ -177,3 +186,169 @@ class TestParseBuffUptimes:
             metric_type="buff", fight_duration_ms=0,
         )
         assert result[0].uptime_pct == 0.0
+
+
+def _fight(fight_id):
+    fight = MagicMock()
+    fight.id = 100 + fight_id
+    fight.fight_id = fight_id
+    fight.start_time = 0
+    fight.end_time = 60000
+    fight.report_month = date(2026, 10, 1)
+    return fight
+
+
+class TestDemuxTableResponse:
+    def test_splits_aliases(self):
+        report = {
+            "t1_DamageDone": {"data": {"entries": [{"name": "A"}]}},
+            "t1_Buffs": '{"data": {"entries": [{"name": "B"}]}}',
+        }
+        result = demux_table_response(report, ["t1_DamageDone", "t1_Buffs"])
+        assert result == {
+            "t1_DamageDone": [{"name": "A"}],
+            "t1_Buffs": [{"name": "B"}],
+        }
+
+    def test_missing_alias_omitted(self):
+        result = demux_table_response({}, ["t1_Healing"])
+        assert result == {}
+
+
+class TestFetchTablesForFights:
+    async def test_one_query_for_all_fights_and_types(self):
+        wcl = AsyncMock()
+
+        async def query(q, variables=None):
+            assert variables == {"code": "ABC"}
+            aliases = [
+                line.split(":")[0].strip()
+                for line in q.splitlines() if ": table(" in line
+            ]
+            return {"reportData": {"report": {
+                alias: {"data": {"entries": [{"name": alias}]}}
+                for alias in aliases
+            }}}
+
+        wcl.query = AsyncMock(side_effect=query)
+        tables = await fetch_tables_for_fights(
+            wcl, "ABC", [_fight(1), _fight(2)],
+        )
+
+        assert wcl.query.await_count == 1
+        assert len(tables) == 8
+        assert tables[(2, "Debuffs")] == [{"name": "t2_Debuffs"}]
+
+    async def test_batch_size_splits_queries(self):
+        wcl = AsyncMock()
+
+        async def query(q, variables=None):
+            aliases = [
+                line.split(":")[0].strip()
+                for line in q.splitlines() if ": table(" in line
+            ]
+            return {"reportData": {"report": {a: [] for a in aliases}}}
+
+        wcl.query = AsyncMock(side_effect=query)
+        tables = await fetch_tables_for_fights(
+            wcl, "ABC", [_fight(1), _fight(2)], batch_size=3,
+        )
+        assert wcl.query.await_count == 3
+        assert len(tables) == 8
+
+    async def test_failed_batch_falls_back_per_table(self):
+        wcl = AsyncMock()
+
+        async def query(q, variables=None):
+            if "ReportTables" in q:
+                raise RuntimeError("one bad table")
+            if variables["dataType"] == "Healing":
+                raise RuntimeError("still bad")
+            return {"reportData": {"report": {"table": {"data": {"entries": []}}}}}
+
+        wcl.query = AsyncMock(side_effect=query)
+        tables = await fetch_tables_for_fights(wcl, "ABC", [_fight(1)])
+
+        # 1 failed batch + 4 single-table retries; Healing left out
+        assert wcl.query.await_count == 5
+        assert set(tables) == {
+            (1, "DamageDone"), (1, "Buffs"), (1, "Debuffs"),
+        }
+
+
+def _table_session():
+    """Session whose upserts report every row as inserted."""
+    session = AsyncMock()
+
+    @asynccontextmanager
+    async def begin_nested():
+        yield
+
+    async def execute(stmt):
+        result = MagicMock(rowcount=0)
+        result.all.return_value = [
+            SimpleNamespace(inserted=True) for _ in stmt._multi_values[0]
+        ] if stmt.is_insert else []
+        return result
+
+    session.execute = AsyncMock(side_effect=execute)
+    session.begin_nested = begin_nested
+    return session
+
+
+class TestPersistTablesForFights:
+    TABLES = {
+        (fight_id, wcl_type): [{"name": "Lyro", "entries": [
+            {"name": "Slam", "guid": 1, "total": 1000, "hitCount": 10,
+             "uptime": 30_000},
+        ]}]
+        for fight_id in (1, 2, 3)
+        for wcl_type in ("DamageDone", "Buffs")
+    }
+
+    async def test_one_insert_and_delete_per_table_for_all_fights(self):
+        session = _table_session()
+        fights = [_fight(1), _fight(2), _fight(3)]
+
+        rows, errors = await persist_tables_for_fights(
+            session, "ABC", fights, self.TABLES,
+        )
+
+        assert rows == 6
+        # Healing and Debuffs were not fetched
+        assert errors == [
+            "table_data_fight_1", "table_data_fight_2", "table_data_fight_3",
+        ]
+        sqls = [
+            str(c.args[0].compile(dialect=postgresql.dialect()))
+            for c in session.execute.await_args_list
+        ]
+        assert [sql.split(" (")[0] for sql in sqls] == [
+            "INSERT INTO ability_metrics",
+            "DELETE FROM ability_metrics WHERE",
+            "INSERT INTO buff_uptimes",
+            "DELETE FROM buff_uptimes WHERE",
+        ]
+        # Scoped to the fights' partition as well
+        assert (
+            "(ability_metrics.fight_id, ability_metrics.metric_type, "
+            "ability_metrics.report_month) IN"
+        ) in sqls[1]
+
+    async def test_nothing_fetched_writes_nothing(self):
+        session = _table_session()
+        rows, errors = await persist_tables_for_fights(
+            session, "ABC", [_fight(1)], {},
+        )
+
+        assert (rows, errors) == (0, ["table_data_fight_1"])
+        session.execute.assert_not_awaited()
+
+    async def test_failed_write_stores_nothing(self):
+        session = _table_session()
+        session.execute.side_effect = RuntimeError("db down")
+
+        with pytest.raises(RuntimeError):
+            await persist_tables_for_fights(
+                session, "ABC", [_fight(1)], self.TABLES,
+            )
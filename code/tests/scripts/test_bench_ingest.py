@@ -0,0 +1,77 @@
+"""Tests for the bench_ingest CLI script."""
+
+from shukketsu.scripts.bench_ingest import (
+    MODES,
+    IngestBenchResult,
+    format_results,
+    parse_args,
+)
+
+
+class TestParseArgs:
+    def test_record(self):
+        args = parse_args(["record", "ABC", "DEF", "--out", "rec.jsonl", "--with-events"])
+        assert args.command == "record"
+        assert args.report_codes == ["ABC", "DEF"]
+        assert args.out == "rec.jsonl"
+        assert args.with_events is True
+        assert args.with_tables is False
+
+    def test_run_defaults(self):
+        args = parse_args(["run", "--recording", "rec.jsonl"])
+        assert args.command == "run"
+        assert args.report_codes is None
+        assert args.modes == "none,all"
+        assert args.iterations == 1
+        assert args.concurrency == 1
+        assert args.latency_ms == 0.0
+        assert args.error_rate_429 == 0.0
+        assert args.error_rate_5xx == 0.0
+
+    def test_run_options(self):
+        args = parse_args([
+            "run", "--recording", "rec.jsonl", "--report-code", "ABC",
+            "--report-code", "DEF", "--modes", "events", "--latency-ms", "50",
+            "--error-rate-429", "0.05", "--concurrency", "4",
+        ])
+        assert args.report_codes == ["ABC", "DEF"]
+        assert args.modes == "events"
+        assert args.latency_ms == 50.0
+        assert args.error_rate_429 == 0.05
+        assert args.concurrency == 4
+
+
+class TestResults:
+    def test_modes_cover_with_and_without_enrichment(self):
+        assert MODES["none"] == (False, False)
+        assert MODES["all"] == (True, True)
+
+    def test_rates(self):
+        result = IngestBenchResult(mode="all", reports=10, seconds=30.0, events=6000)
+        assert result.reports_per_min == 20.0
+        assert result.events_per_sec == 200.0
+        assert IngestBenchResult(mode="none").reports_per_min == 0.0
+
+    def test_format_results(self):
+        table = format_results([
+            IngestBenchResult(mode="none", reports=4, seconds=2.0, peak_rss_mb=80.5),
+            IngestBenchResult(mode="all", reports=4, seconds=8.0, events=1000,
+                              injected_429=2, injected_5xx=1),
+        ])
+        lines = table.splitlines()
+        assert "reports/min" in lines[0]
+        assert lines[2].split()[:2] == ["none", "4"]
+        assert "120.0" in lines[2]
+        assert "2/1" in lines[3]
+
+    def test_statements_and_phases(self):
+        result = IngestBenchResult(
+            mode="all", reports=4, statements=48,
+            phase_seconds={"report": 0.5, "enrichment": 2.0},
+        )
+        assert result.statements_per_report == 12.0
+
+        lines = format_results([result]).splitlines()
+        assert "stmts/report" in lines[0]
+        assert "12.0" in lines[2]
+        assert lines[-1].split() == ["all", "report", "0.50s", "enrichment", "2.00s"]
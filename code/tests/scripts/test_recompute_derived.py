@@ -0,0 +1,88 @@
+"""Tests for the recompute_derived CLI script."""
+
+from datetime import date
+
+import pytest
+
+from shukketsu.db.models import CastEventSeries, CastMetric, DeathDetail
+from shukketsu.pipeline.event_archive import ArchiveWriter, archive_context
+from shukketsu.scripts.recompute_derived import (
+    ArchivedFight,
+    parse_args,
+    recompute_fight,
+)
+
+
+def _archived(data_type, pages, context=None):
+    writer = ArchiveWriter(11, data_type, context, codec="gzip")
+    for page in pages:
+        writer.add(page)
+    archive = writer.finish()
+    return ArchivedFight(
+        report_code="ABC", data_type=data_type, id=11, fight_id=4,
+        start_time=0, end_time=60000, report_month=date(2026, 10, 1),
+        codec=archive.codec, data=archive.data,
+        context_json=archive.context_json,
+    )
+
+
+def _rows_by_model(exported):
+    return {model: (scopes, rows) for model, _, scopes, rows in exported}
+
+
+class TestParseArgs:
+    def test_report_codes(self):
+        args = parse_args([
+            "--report-code", "ABC", "--report-code", "DEF",
+            "--data-type", "Casts", "--workers", "4",
+        ])
+        assert args.report_codes == ["ABC", "DEF"]
+        assert args.all is False
+        assert args.data_types == ["Casts"]
+        assert args.workers == 4
+
+    def test_all(self):
+        args = parse_args(["--all"])
+        assert args.all is True
+        assert args.data_types is None
+        assert args.workers is None
+
+    def test_requires_target(self):
+        with pytest.raises(SystemExit):
+            parse_args([])
+
+    def test_unknown_data_type(self):
+        with pytest.raises(SystemExit):
+            parse_args(["--all", "--data-type", "Healing"])
+
+
+class TestRecomputeFight:
+    def test_casts(self):
+        pages = [
+            [{"timestamp": t, "type": "cast", "sourceID": 1,
+              "abilityGameID": 100, "targetID": 2} for t in range(0, 30000, 1500)],
+            [{"timestamp": t, "type": "cast", "sourceID": 1,
+              "abilityGameID": 100, "targetID": 2} for t in range(30000, 60000, 1500)],
+        ]
+        archive = _archived(
+            "Casts", pages,
+            archive_context({1: "Lyro", 2: "Gruul"}, {"Lyro": "Warrior"}),
+        )
+
+        by_model = _rows_by_model(recompute_fight(archive))
+
+        scopes, series = by_model[CastEventSeries]
+        assert scopes == {(11, date(2026, 10, 1))}
+        assert series[0]["player_name"] == "Lyro"
+        assert series[0]["report_month"] == date(2026, 10, 1)
+        assert series[0]["event_count"] == 40
+        scopes, metrics = by_model[CastMetric]
+        assert scopes == {(11,)}
+        assert metrics[0]["total_casts"] == 40
+
+    def test_deaths_without_context(self):
+        archive = _archived("Deaths", [[]])
+
+        by_model = _rows_by_model(recompute_fight(archive))
+
+        assert by_model[DeathDetail] == ({(11, date(2026, 10, 1))}, [])
@@ -0,0 +1,35 @@
+"""Tests for the resume_ingest CLI script."""
+
+import pytest
+
+from shukketsu.scripts.resume_ingest import parse_args
+
+
+class TestParseArgs:
+    def test_report_codes(self):
+        args = parse_args([
+            "--report-code", "ABC", "--report-code", "DEF", "--with-events",
+        ])
+        assert args.report_codes == ["ABC", "DEF"]
+        assert args.failed is False
+        assert args.with_tables is False
+        assert args.with_events is True
+
+    def test_failed(self):
+        args = parse_args(["--failed", "--with-tables", "--with-events"])
+        assert args.failed is True
+        assert args.report_codes is None
+        assert args.with_tables is True
+        assert args.with_events is True
+
+    def test_requires_target(self):
+        with pytest.raises(SystemExit):
+            parse_args([])
+
+    def test_report_code_and_failed_exclusive(self):
+        with pytest.raises(SystemExit):
+            parse_args(["--report-code", "ABC", "--failed", "--with-tables"])
+
+    def test_requires_a_stage(self):
+        with pytest.raises(SystemExit):
+            parse_args(["--report-code", "ABC"])
@@ -1,7 +1,13 @@
 import pytest
 from pydantic import ValidationError
 
-from shukketsu.config import LangfuseConfig, LLMConfig, Settings, get_settings
+from shukketsu.config import (
+    LangfuseConfig,
+    LLMConfig,
+    RetentionPolicy,
+    Settings,
+    get_settings,
+)
 
 
 def test_default_settings_have_sane_defaults(monkeypatch):
@@ -98,6 +104,56 @@ class TestCrossFieldValidators:
         with pytest.raises(ValidationError, match="LANGFUSE__SECRET_KEY"):
             Settings(_env_file=None)
 
+    def test_enrichment_concurrency_below_one_raises(self, monkeypatch):
+        monkeypatch.setenv("AUTO_INGEST__ENRICHMENT_CONCURRENCY", "0")
+        with pytest.raises(ValidationError, match="ENRICHMENT_CONCURRENCY"):
+            Settings(_env_file=None)
+
+    def test_scheduler_max_in_flight_below_one_raises(self, monkeypatch):
+        monkeypatch.setenv("WCL__SCHEDULER_MAX_IN_FLIGHT", "0")
+        with pytest.raises(ValidationError, match="SCHEDULER_MAX_IN_FLIGHT"):
+            Settings(_env_file=None)
+
+    def test_backfill_headroom_below_auto_ingest_raises(self, monkeypatch):
+        monkeypatch.setenv("WCL__AUTO_INGEST_HEADROOM", "0.5")
+        monkeypatch.setenv("WCL__BACKFILL_HEADROOM", "0.2")
+        with pytest.raises(ValidationError, match="HEADROOM"):
+            Settings(_env_file=None)
+
+    def test_duplicate_extra_credential_raises(self, monkeypatch):
+        monkeypatch.setenv("WCL__CLIENT_ID", "abc")
+        monkeypatch.setenv(
+            "WCL__EXTRA_CREDENTIALS",
+            '[{"client_id": "abc", "client_secret": "x"}]',
+        )
+        with pytest.raises(ValidationError, match="EXTRA_CREDENTIALS"):
+            Settings(_env_file=None)
+
+    def test_extra_credentials_from_env(self, monkeypatch):
+        monkeypatch.setenv("WCL__CLIENT_ID", "abc")
+        monkeypatch.setenv(
+            "WCL__EXTRA_CREDENTIALS",
+            '[{"client_id": "def", "client_secret": "x"}]',
+        )
+        settings = Settings(_env_file=None)
+        assert [c.client_id for c in settings.wcl.credentials()] == ["abc", "def"]
+        assert settings.wcl.extra_credentials[0].client_secret.get_secret_value() == "x"
+
+    def test_compaction_batch_fights_below_one_raises(self, monkeypatch):
+        monkeypatch.setenv("COMPACTION__BATCH_FIGHTS", "0")
+        with pytest.raises(ValidationError, match="BATCH_FIGHTS"):
+            Settings(_env_file=None)
+
+    def test_compaction_fold_requires_cast_events(self, monkeypatch):
+        monkeypatch.setenv(
+            "COMPACTION__POLICIES",
+            '[{"table": "event_archives", "max_age_days": 30, "action": "fold"}]',
+        )
+        with pytest.raises(ValidationError, match="fold"):
+            Settings(_env_file=None)
+        with pytest.raises(ValidationError, match="fold"):
+            RetentionPolicy(table="cast_event_series", max_age_days=30, action="fold")
+
     def test_valid_minimal_config_passes(self):
         settings = Settings(_env_file=None)
         assert settings.auto_ingest.enabled is False
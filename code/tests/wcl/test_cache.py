@@ -0,0 +1,198 @@
+import gzip
+import os
+import time
+
+import httpx
+import respx
+
+from shukketsu.wcl.auth import WCLAuth
+from shukketsu.wcl.cache import ResponseCache, cache_key
+from shukketsu.wcl.client import WCLClient
+from shukketsu.wcl.rate_limiter import RateLimiter
+
+API_URL = "https://fresh.warcraftlogs.com/api/v2/client"
+OAUTH_URL = "https://fresh.warcraftlogs.com/oauth/token"
+
+OLD_END_MS = 1_600_000_000_000  # Sept 2020 — long finished
+
+
+class TestCacheKey:
+    def test_stable_across_variable_order(self):
+        a = cache_key("query { x }", {"code": "A", "fightIDs": [1]})
+        b = cache_key("query { x }", {"fightIDs": [1], "code": "A"})
+        assert a == b
+
+    def test_differs_by_variables_and_query(self):
+        base = cache_key("query { x }", {"code": "A"})
+        assert base != cache_key("query { x }", {"code": "B"})
+        assert base != cache_key("query { y }", {"code": "A"})
+        assert cache_key("q", None) == cache_key("q", {})
+
+
+class TestResponseCache:
+    async def test_roundtrip_compressed(self, tmp_path):
+        cache = ResponseCache(tmp_path)
+        await cache.put("ab" * 32, {"reportData": {"report": {"title": "T"}}})
+
+        assert await cache.get("ab" * 32) == {"reportData": {"report": {"title": "T"}}}
+        path = tmp_path / "ab" / f"{'ab' * 32}.json.gz"
+        assert path.is_file()
+        with gzip.open(path) as fh:
+            assert b"title" in fh.read()
+        assert cache.hits == 1
+
+    async def test_miss(self, tmp_path):
+        cache = ResponseCache(tmp_path)
+        assert await cache.get("cd" * 32) is None
+        assert cache.misses == 1
+
+    async def test_lru_eviction(self, tmp_path):
+        payload = {"data": "x" * 2000}
+        cache = ResponseCache(tmp_path, max_bytes=10_000)
+        await cache.put("a" * 64, payload)
+        one_entry = cache.size_bytes
+        cache.max_bytes = one_entry * 2 + one_entry // 2
+
+        await cache.put("b" * 64, payload)
+        await cache.get("a" * 64)  # "a" is now most recently used
+        await cache.put("c" * 64, payload)
+
+        assert await cache.get("b" * 64) is None
+        assert await cache.get("a" * 64) == payload
+        assert await cache.get("c" * 64) == payload
+        assert cache.size_bytes <= cache.max_bytes
+
+    async def test_index_rebuilt_from_disk_in_mtime_order(self, tmp_path):
+        payload = {"data": "y" * 2000}
+        first = ResponseCache(tmp_path)
+        await first.put("a" * 64, payload)
+        await first.put("b" * 64, payload)
+        old = time.time() - 3600
+        os.utime(first._path("b" * 64), (old, old))
+
+        second = ResponseCache(tmp_path, max_bytes=first.size_bytes)
+        await second.put("c" * 64, payload)
+
+        assert await second.get("b" * 64) is None  # oldest mtime evicted
+        assert await second.get("a" * 64) == payload
+
+    async def test_corrupt_entry_discarded(self, tmp_path):
+        cache = ResponseCache(tmp_path)
+        path = cache._path("e" * 64)
+        path.parent.mkdir(parents=True)
+        path.write_bytes(b"not gzip")
+
+        assert await cache.get("e" * 64) is None
+        assert not path.exists()
+
+    def test_is_live(self, tmp_path):
+        cache = ResponseCache(tmp_path, live_window_ms=3_600_000)
+        assert cache.is_live(time.time() * 1000 - 60_000)
+        assert not cache.is_live(OLD_END_MS)
+
+
+def _mock_oauth():
+    respx.post(OAUTH_URL).mock(return_value=httpx.Response(
+        200, json={"access_token": "tok", "expires_in": 3600},
+    ))
+
+
+def _client(cache):
+    auth = WCLAuth("id", "secret", OAUTH_URL)
+    return WCLClient(auth, RateLimiter(), api_url=API_URL, cache=cache)
+
+
+def _report_response(end_time):
+    return httpx.Response(200, json={"data": {"reportData": {"report": {
+        "title": "Kara", "startTime": end_time - 1000, "endTime": end_time,
+    }}}})
+
+
+class TestClientCaching:
+    @respx.mock
+    async def test_finished_report_served_from_cache(self, tmp_path):
+        _mock_oauth()
+        route = respx.post(API_URL).mock(return_value=_report_response(OLD_END_MS))
+        cache = ResponseCache(tmp_path)
+
+        async with _client(cache) as client:
+            first = await client.query("query R", variables={"code": "ABC"})
+        async with _client(cache) as client:
+            second = await client.query("query R", variables={"code": "ABC"})
+
+        assert first == second
+        assert route.call_count == 1
+
+    @respx.mock
+    async def test_other_queries_cached_once_report_is_final(self, tmp_path):
+        _mock_oauth()
+        events = httpx.Response(200, json={"data": {"reportData": {"report": {
+            "events": {"data": [], "nextPageTimestamp": None},
+        }}}})
+        route = respx.post(API_URL).mock(side_effect=[
+            _report_response(OLD_END_MS), events,
+        ])
+        cache = ResponseCache(tmp_path)
+
+        async with _client(cache) as client:
+            await client.query("query R", variables={"code": "ABC"})
+            await client.query("query E", variables={"code": "ABC", "startTime": 0})
+            await client.query("query E", variables={"code": "ABC", "startTime": 0})
+
+        assert route.call_count == 2
+
+    @respx.mock
+    async def test_live_report_bypasses_cache(self, tmp_path):
+        _mock_oauth()
+        now_ms = int(time.time() * 1000)
+        route = respx.post(API_URL).mock(return_value=_report_response(now_ms))
+        cache = ResponseCache(tmp_path)
+
+        async with _client(cache) as client:
+            await client.query("query R", variables={"code": "LIVE"})
+            await client.query("query R", variables={"code": "LIVE"})
+
+        assert route.call_count == 2
+        assert cache.size_bytes == 0
+
+    @respx.mock
+    async def test_marked_live_report_bypasses_cache(self, tmp_path):
+        _mock_oauth()
+        route = respx.post(API_URL).mock(return_value=_report_response(OLD_END_MS))
+        cache = ResponseCache(tmp_path)
+
+        async with _client(cache) as client:
+            client.mark_report_live("ABC")
+            await client.query("query R", variables={"code": "ABC"})
+            await client.query("query R", variables={"code": "ABC"})
+
+        assert route.call_count == 2
+        assert cache.size_bytes == 0
+
+    @respx.mock
+    async def test_unclassified_report_not_stored(self, tmp_path):
+        _mock_oauth()
+        route = respx.post(API_URL).mock(return_value=httpx.Response(
+            200, json={"data": {"reportData": {"report": {"table": {}}}}},
+        ))
+        cache = ResponseCache(tmp_path)
+
+        async with _client(cache) as client:
+            await client.query("query T", variables={"code": "ABC"})
+            await client.query("query T", variables={"code": "ABC"})
+
+        assert route.call_count == 2
+
+    @respx.mock
+    async def test_non_report_queries_and_opt_out_not_cached(self, tmp_path):
+        _mock_oauth()
+        route = respx.post(API_URL).mock(return_value=_report_response(OLD_END_MS))
+        cache = ResponseCache(tmp_path)
+
+        async with _client(cache) as client:
+            await client.query("query G", variables={"guildID": 1})
+            await client.query("query G", variables={"guildID": 1})
+            await client.query("query R", variables={"code": "A"}, use_cache=False)
+            await client.query("query R", variables={"code": "A"}, use_cache=False)
+
+        assert route.call_count == 4
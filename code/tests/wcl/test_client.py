@@ -72,6 +72,22 @@ async def test_query_updates_rate_limiter(auth, limiter):
     assert limiter.points_remaining == 3550
 
 
+@respx.mock
+async def test_query_reads_rate_limit_data_from_data(auth, limiter):
+    _mock_oauth()
+    respx.post(API_URL).mock(
+        return_value=httpx.Response(200, json={
+            "data": {"test": True, "rateLimitData": RATE_LIMIT_DATA},
+        })
+    )
+
+    async with WCLClient(auth, limiter, api_url=API_URL) as client:
+        await client.query("query { test }")
+
+    assert limiter.points_remaining == 3550
+    assert limiter._updated_at > 0
+
+
 @respx.mock
 async def test_query_parses_response(auth, limiter):
     _mock_oauth()
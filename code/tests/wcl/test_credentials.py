@@ -0,0 +1,181 @@
+import base64
+import time
+
+import httpx
+import pytest
+import respx
+
+from shukketsu.wcl.auth import WCLAuth
+from shukketsu.wcl.client import WCLClient
+from shukketsu.wcl.credentials import (
+    MAX_AFFINITY_ENTRIES,
+    Credential,
+    CredentialPool,
+    credential_label,
+)
+from shukketsu.wcl.rate_limiter import RateLimiter
+
+API_URL = "https://fresh.warcraftlogs.com/api/v2/client"
+OAUTH_URL = "https://fresh.warcraftlogs.com/oauth/token"
+
+
+def _cred(client_id):
+    return Credential(
+        label=credential_label(client_id),
+        auth=WCLAuth(client_id, "secret", OAUTH_URL),
+        rate_limiter=RateLimiter(),
+    )
+
+
+async def _spend(cred, spent, limit=3600, reset_in=3000):
+    await cred.rate_limiter.update({
+        "pointsSpentThisHour": spent, "limitPerHour": limit, "pointsResetIn": reset_in,
+    })
+
+
+class TestPick:
+    async def test_picks_most_headroom(self):
+        a, b = _cred("client-aaaa"), _cred("client-bbbb")
+        await _spend(a, 1000)
+        await _spend(b, 200)
+        pool = CredentialPool([a, b])
+        assert pool.pick() is b
+
+    async def test_report_affinity(self):
+        a, b = _cred("client-aaaa"), _cred("client-bbbb")
+        pool = CredentialPool([a, b])
+        first = pool.pick("ABC")
+        # The other credential now looks better, but the report stays put
+        await _spend(first, 500)
+        assert pool.pick("ABC") is first
+        assert pool.pick("XYZ") is not first
+
+    async def test_affinity_moves_off_throttled_credential(self):
+        a, b = _cred("client-aaaa"), _cred("client-bbbb")
+        pool = CredentialPool([a, b])
+        first = pool.pick("ABC")
+        await first.rate_limiter.mark_throttled(retry_after=60)
+        moved = pool.pick("ABC")
+        assert moved is not first
+        assert pool.pick("ABC") is moved
+
+    async def test_affinity_moves_off_exhausted_credential(self):
+        a, b = _cred("client-aaaa"), _cred("client-bbbb")
+        pool = CredentialPool([a, b])
+        first = pool.pick("ABC")
+        await _spend(first, 3500)
+        assert pool.pick("ABC") is not first
+
+    def test_affinity_is_bounded(self):
+        pool = CredentialPool([_cred("a"), _cred("b")])
+        for i in range(MAX_AFFINITY_ENTRIES + 10):
+            pool.pick(f"R{i}")
+        assert len(pool._affinity) == MAX_AFFINITY_ENTRIES
+        assert "R0" not in pool._affinity
+
+    def test_empty_pool_rejected(self):
+        with pytest.raises(ValueError):
+            CredentialPool([])
+
+
+class TestPoolBudget:
+    async def test_aggregate_budget(self):
+        a, b = _cred("client-aaaa"), _cred("client-bbbb")
+        await _spend(a, 100, reset_in=1200)
+        await _spend(b, 300, limit=7200, reset_in=600)
+        with b.rate_limiter.track_request() as window:
+            pass
+        await b.rate_limiter.update(
+            {"pointsSpentThisHour": 310, "limitPerHour": 7200, "pointsResetIn": 600},
+            shape="ReportFights",
+            window=window,
+        )
+        pool = CredentialPool([a, b])
+        assert pool.limit_per_hour == 10800
+        assert pool.points_spent == 410
+        assert 595 <= pool.points_reset_in <= 600
+        assert pool.query_costs == {"ReportFights": 10}
+
+    async def test_status(self):
+        a, b = _cred("client-aaaa"), _cred("client-bbbb")
+        await _spend(a, 100)
+        pool = CredentialPool([a, b])
+        pool.pick("ABC")
+        status = pool.status()
+        assert [s["label"] for s in status] == ["...aaaa", "...bbbb"]
+        assert status[0]["points_spent"] == 100
+        assert sum(s["requests"] for s in status) == 1
+        assert sum(s["reports_assigned"] for s in status) == 1
+        assert not any(s["throttled"] for s in status)
+
+    def test_label_hides_client_id(self):
+        assert credential_label("9a1b2c3d4e5f") == "...4e5f"
+        assert credential_label("") == "default"
+
+
+class TestClientWithPool:
+    @respx.mock
+    async def test_requests_spread_and_sticky_per_report(self):
+        basic_a = "Basic " + base64.b64encode(b"client-aaaa:secret").decode()
+
+        def oauth(request):
+            token = "tok-a" if request.headers["authorization"] == basic_a else "tok-b"
+            return httpx.Response(200, json={"access_token": token, "expires_in": 3600})
+
+        respx.post(OAUTH_URL).mock(side_effect=oauth)
+        seen = []
+
+        def api(request):
+            token = request.headers["authorization"].removeprefix("Bearer ")
+            seen.append(token)
+            spent = 10 * seen.count(token)
+            return httpx.Response(200, json={
+                "data": {"ok": True},
+                "extensions": {"rateLimitData": {
+                    "pointsSpentThisHour": spent, "limitPerHour": 3600,
+                    "pointsResetIn": 3000,
+                }},
+            })
+
+        respx.post(API_URL).mock(side_effect=api)
+        a, b = _cred("client-aaaa"), _cred("client-bbbb")
+        pool = CredentialPool([a, b])
+
+        async with WCLClient(
+            a.auth, a.rate_limiter, api_url=API_URL, credentials=pool,
+        ) as wcl:
+            for _ in range(3):
+                await wcl.query("query R", variables={"code": "ABC"})
+            await wcl.query("query R", variables={"code": "XYZ"})
+
+        # All of ABC on one credential; XYZ lands on the one with more headroom
+        assert seen[0] == seen[1] == seen[2]
+        assert seen[3] != seen[0]
+        assert a.requests + b.requests == 4
+
+    @respx.mock
+    async def test_429_retries_on_other_credential(self, monkeypatch):
+        async def no_sleep(_):
+            return None
+
+        monkeypatch.setattr("shukketsu.wcl.rate_limiter.asyncio.sleep", no_sleep)
+        respx.post(OAUTH_URL).mock(return_value=httpx.Response(
+            200, json={"access_token": "tok", "expires_in": 3600},
+        ))
+        respx.post(API_URL).mock(side_effect=[
+            httpx.Response(429, headers={"Retry-After": "600"}),
+            httpx.Response(200, json={"data": {"ok": True}}),
+        ])
+        a, b = _cred("client-aaaa"), _cred("client-bbbb")
+        pool = CredentialPool([a, b])
+
+        start = time.monotonic()
+        async with WCLClient(
+            a.auth, a.rate_limiter, api_url=API_URL, credentials=pool,
+        ) as wcl:
+            assert await wcl.query("query R", variables={"code": "ABC"}) == {"ok": True}
+
+        throttled = [c for c in (a, b) if c.rate_limiter.is_throttled]
+        assert len(throttled) == 1
+        assert pool._affinity["ABC"] is not throttled[0]
+        assert time.monotonic() - start < 5
@@ -1,10 +1,15 @@
 """Tests for paginated WCL events fetcher."""
 
+from types import SimpleNamespace
 from unittest.mock import AsyncMock
 
 import pytest
 
-from shukketsu.wcl.events import fetch_all_events
+from shukketsu.wcl.events import (
+    EventPageLimitError,
+    fetch_all_events,
+    stream_events_by_fight,
+)
 
 
 async def _collect(async_gen):
@@ -209,3 +214,118 @@ class TestFetchAllEvents:
         ))
         assert len(result) == 2
         assert wcl.query.call_count == 2
+
+
+def _page(events, next_page=None):
+    return {"reportData": {"report": {"events": {
+        "data": events, "nextPageTimestamp": next_page,
+    }}}}
+
+
+async def _by_fight(*args, **kwargs) -> dict[int, list[dict]]:
+    by_fight: dict[int, list[dict]] = {}
+    async for page in stream_events_by_fight(*args, **kwargs):
+        for fight_id, events in page.items():
+            by_fight.setdefault(fight_id, []).extend(events)
+    return by_fight
+
+
+class TestStreamEventsByFight:
+    FIGHTS = [
+        SimpleNamespace(fight_id=3, start_time=50_000, end_time=80_000),
+        SimpleNamespace(fight_id=1, start_time=0, end_time=20_000),
+    ]
+
+    async def test_single_stream_over_report_span(self):
+        wcl = AsyncMock()
+        wcl.query.side_effect = [
+            _page([{"timestamp": 0}, {"timestamp": 20_000}], next_page=30_000),
+            _page([{"timestamp": 30_000}, {"timestamp": 50_000},
+                   {"timestamp": 80_001}]),
+        ]
+
+        by_fight = await _by_fight(wcl, "ABC", self.FIGHTS, "Casts")
+
+        assert wcl.query.call_count == 2
+        first = wcl.query.call_args_list[0].kwargs["variables"]
+        assert (first["startTime"], first["endTime"]) == (0, 80_000)
+        # Boundaries are inclusive; events between or after fights are dropped
+        assert by_fight == {
+            1: [{"timestamp": 0}, {"timestamp": 20_000}],
+            3: [{"timestamp": 50_000}],
+        }
+
+    async def test_no_fights_skips_fetch(self):
+        wcl = AsyncMock()
+        assert await _by_fight(wcl, "ABC", [], "Casts") == {}
+        wcl.query.assert_not_called()
+
+    async def test_page_limit_raises(self):
+        """Hitting the cap must not leave later fights looking event-free."""
+        wcl = AsyncMock()
+        wcl.query.side_effect = [
+            _page([{"timestamp": t}], next_page=t + 1) for t in range(10)
+        ]
+
+        with pytest.raises(EventPageLimitError):
+            await _by_fight(wcl, "ABC", self.FIGHTS, "Casts", max_pages=3)
+        assert wcl.query.call_count == 3
+
+    async def test_default_page_limit_scales_with_fights(self):
+        wcl = AsyncMock()
+        wcl.query.side_effect = [
+            _page([{"timestamp": t}], next_page=t + 1) for t in range(150)
+        ] + [_page([{"timestamp": 150}])]
+
+        by_fight = await _by_fight(wcl, "ABC", self.FIGHTS, "Casts")
+
+        # 151 pages is past one fight's MAX_PAGES but within two fights'
+        assert len(by_fight[1]) == 151
+
+
+class TestServerSideFilters:
+    async def test_filters_and_limit_sent_as_variables(self):
+        wcl = AsyncMock()
+        wcl.query.return_value = _page([])
+
+        await _collect(fetch_all_events(
+            wcl, "ABC", 0, 100, "Casts",
+            filter_expression='source.type = "player"', hostility_type="Friendlies",
+        ))
+
+        variables = wcl.query.call_args.kwargs["variables"]
+        assert variables["filterExpression"] == 'source.type = "player"'
+        assert variables["hostilityType"] == "Friendlies"
+        assert variables["limit"] == 10000
+
+    async def test_unset_filters_omitted(self):
+        wcl = AsyncMock()
+        wcl.query.return_value = _page([])
+
+        await _collect(fetch_all_events(wcl, "ABC", 0, 100, "Deaths", limit=None))
+
+        variables = wcl.query.call_args.kwargs["variables"]
+        assert not {"filterExpression", "hostilityType", "limit"} & set(variables)
+
+    async def test_event_stages_declare_filters(self):
+        from shukketsu.pipeline.report_events import EVENT_STAGES, stream_stage_events
+
+        wcl = AsyncMock()
+        wcl.query.return_value = _page([])
+        fights = [SimpleNamespace(fight_id=1, start_time=0, end_time=100)]
+
+        sent = {}
+        for stage in EVENT_STAGES:
+            async for _ in stream_stage_events(wcl, "ABC", fights, stage):
+                pass
+            variables = wcl.query.call_args.kwargs["variables"]
+            sent[stage.data_type] = (
+                variables.get("filterExpression"), variables.get("hostilityType"),
+            )
+
+        assert sent == {
+            "CombatantInfo": (None, "Friendlies"),
+            "Deaths": (None, "Friendlies"),
+            "Casts": ('source.type = "player"', None),
+            "Resources": ('source.type = "player"', None),
+        }
@@ -1,14 +1,19 @@
 from unittest.mock import MagicMock
 
+from pydantic import SecretStr
+
+from shukketsu.config import WCLConfig
 from shukketsu.wcl.factory import WCLFactory
 
 
 def _mock_settings():
     settings = MagicMock()
-    settings.wcl.client_id = "test-id"
-    settings.wcl.client_secret.get_secret_value.return_value = "test-secret"
-    settings.wcl.oauth_url = "https://example.com/oauth/token"
-    settings.wcl.api_url = "https://example.com/api/v2/client"
+    settings.wcl = WCLConfig(
+        client_id="test-id",
+        client_secret=SecretStr("test-secret"),
+        oauth_url="https://example.com/oauth/token",
+        api_url="https://example.com/api/v2/client",
+    )
     return settings
 
 
@@ -51,3 +56,38 @@ class TestWCLFactory:
         client = factory()
         assert client._http is None
         assert client._owns_http
+
+    def test_factory_priority_and_shared_scheduler(self):
+        """Clients share one scheduler and carry the requested priority."""
+        from shukketsu.wcl.scheduler import Priority
+
+        factory = WCLFactory(_mock_settings())
+        interactive = factory()
+        backfill = factory(priority=Priority.BACKFILL)
+        assert interactive.priority == Priority.INTERACTIVE
+        assert backfill.priority == Priority.BACKFILL
+        assert interactive._scheduler is backfill._scheduler is factory.scheduler
+
+    def test_single_credential_has_no_client_pool(self):
+        factory = WCLFactory(_mock_settings())
+        assert factory()._credentials is None
+        assert [c["label"] for c in factory.credential_status()] == ["...t-id"]
+
+    def test_extra_credentials_build_a_pool(self):
+        """Each credential pair gets its own auth and rate limiter."""
+        from shukketsu.config import WCLCredential
+
+        settings = _mock_settings()
+        settings.wcl.extra_credentials = [
+            WCLCredential(client_id="second-client", client_secret=SecretStr("s2")),
+        ]
+        factory = WCLFactory(settings)
+        client = factory()
+
+        creds = factory.credentials.credentials
+        assert len(creds) == 2
+        assert creds[0].auth is not creds[1].auth
+        assert creds[0].rate_limiter is not creds[1].rate_limiter
+        assert client._credentials is factory.credentials
+        assert factory.scheduler._rate_limiter is factory.credentials
+        assert [c["label"] for c in factory.credential_status()] == ["...t-id", "...ient"]
@@ -0,0 +1,37 @@
+import pytest
+
+from shukketsu.wcl.queries import build_report_tables_query, table_alias
+
+
+class TestBuildReportTablesQuery:
+    def test_aliases_each_selection(self):
+        query, aliases = build_report_tables_query([
+            ([1], "DamageDone"),
+            ([1], "Healing"),
+            ([7], "Buffs"),
+        ])
+        assert aliases == ["t1_DamageDone", "t1_Healing", "t7_Buffs"]
+        assert "t1_DamageDone: table(fightIDs: [1], dataType: DamageDone)" in query
+        assert "t7_Buffs: table(fightIDs: [7], dataType: Buffs)" in query
+        assert "query ReportTables($code: String!)" in query
+        assert "RATE_LIMIT" in query
+
+    def test_multi_fight_selection_alias(self):
+        query, aliases = build_report_tables_query([([3, 4], "Debuffs")])
+        assert aliases == ["t3_Debuffs_4"]
+        assert "table(fightIDs: [3, 4], dataType: Debuffs)" in query
+
+    def test_table_alias(self):
+        assert table_alias(12, "DamageDone") == "t12_DamageDone"
+
+    def test_rejects_invalid_data_type(self):
+        with pytest.raises(ValueError, match="TableDataType"):
+            build_report_tables_query([([1], "Damage) { x }")])
+
+    def test_rejects_duplicates(self):
+        with pytest.raises(ValueError, match="Duplicate"):
+            build_report_tables_query([([1], "Buffs"), ([1], "Buffs")])
+
+    def test_rejects_empty(self):
+        with pytest.raises(ValueError):
+            build_report_tables_query([])
@@ -2,7 +2,9 @@ import asyncio
 import time
 from unittest.mock import AsyncMock, patch
 
-from shukketsu.wcl.rate_limiter import RateLimiter
+import pytest
+
+from shukketsu.wcl.rate_limiter import RateLimiter, query_shape
 
 
 def test_initial_state():
@@ -187,3 +189,186 @@ class TestMarkThrottled:
         })
         await rl.wait_if_needed()
         assert len(slept) == 0  # safe, no sleep
+
+
+async def test_points_reset_in_counts_down():
+    rl = RateLimiter()
+    await rl.update({"pointsSpentThisHour": 500, "limitPerHour": 3600, "pointsResetIn": 100})
+    with patch("shukketsu.wcl.rate_limiter.time.monotonic", return_value=rl._updated_at + 40):
+        assert rl.points_reset_in == 60
+        assert rl.points_spent == 500
+
+
+async def test_points_spent_zero_after_reset():
+    rl = RateLimiter()
+    await rl.update({"pointsSpentThisHour": 500, "limitPerHour": 3600, "pointsResetIn": 100})
+    with patch("shukketsu.wcl.rate_limiter.time.monotonic", return_value=rl._updated_at + 101):
+        assert rl.points_reset_in == 0
+        assert rl.points_spent == 0
+
+
+class TestQueryShape:
+    def test_operation_name_and_data_type(self):
+        q = "query ReportEvents($code: String!) { reportData { x } }"
+        assert query_shape(q, {"code": "A", "dataType": "Casts"}) == "ReportEvents:Casts"
+        assert query_shape(q, {"code": "A"}) == "ReportEvents"
+
+    def test_anonymous_query(self):
+        assert query_shape("{ rateLimitData { x } }") == "anonymous"
+
+
+def _data(spent, reset_in=3600, limit=3600):
+    return {"pointsSpentThisHour": spent, "limitPerHour": limit, "pointsResetIn": reset_in}
+
+
+async def _respond(rl, data, shape):
+    """One request sent and answered with no other in flight."""
+    with rl.track_request() as window:
+        pass
+    await rl.update(data, shape=shape, window=window)
+
+
+class TestCostModel:
+    async def test_learns_cost_from_deltas(self):
+        rl = RateLimiter()
+        await rl.update(_data(100))
+        await _respond(rl, _data(110), "ReportEvents:Casts")
+        await _respond(rl, _data(112), "ReportFights")
+        assert rl.estimated_cost("ReportEvents:Casts") == 10
+        assert rl.estimated_cost("ReportFights") == 2
+
+    async def test_ewma_smoothing(self):
+        rl = RateLimiter()
+        await rl.update(_data(0))
+        await _respond(rl, _data(10), "S")
+        await _respond(rl, _data(30), "S")  # delta 20
+        assert rl.estimated_cost("S") == pytest.approx(0.3 * 20 + 0.7 * 10)
+
+    async def test_first_update_and_hour_rollover_ignored(self):
+        rl = RateLimiter()
+        await _respond(rl, _data(500), "S")  # no baseline
+        assert rl.query_costs == {}
+        await _respond(rl, _data(5), "S")  # reset while in flight
+        assert rl.query_costs == {}
+
+    async def test_update_without_window_learns_nothing(self):
+        rl = RateLimiter()
+        await rl.update(_data(0))
+        await rl.update(_data(10), shape="S")
+        assert rl.query_costs == {}
+
+    async def test_concurrent_requests_share_the_delta(self):
+        rl = RateLimiter()
+        await rl.update(_data(100))
+        with rl.track_request() as casts:
+            with rl.track_request() as fights:
+                pass
+            await rl.update(_data(120), shape="ReportFights", window=fights)
+        # Both were charged before either response; neither takes all 20
+        await rl.update(_data(120), shape="ReportEvents:Casts", window=casts)
+        assert rl.query_costs == {"ReportFights": 10, "ReportEvents:Casts": 10}
+
+    async def test_sequential_requests_keep_full_delta(self):
+        rl = RateLimiter()
+        await rl.update(_data(100))
+        await _respond(rl, _data(120), "A")
+        await _respond(rl, _data(125), "B")
+        assert rl.query_costs == {"A": 20, "B": 5}
+
+    async def test_unknown_shape_uses_mean_or_default(self):
+        rl = RateLimiter()
+        assert rl.estimated_cost("X") == RateLimiter.DEFAULT_QUERY_COST
+        await rl.update(_data(0))
+        await _respond(rl, _data(4), "A")
+        await _respond(rl, _data(12), "B")
+        assert rl.estimated_cost("X") == 6
+
+
+class TestPacing:
+    async def test_no_pacing_before_rate_limit_data(self, monkeypatch):
+        sleep = AsyncMock()
+        monkeypatch.setattr(asyncio, "sleep", sleep)
+        rl = RateLimiter()
+        for _ in range(1000):
+            await rl.wait_if_needed()
+        sleep.assert_not_called()
+
+    async def test_burst_then_paced_at_fill_rate(self, monkeypatch):
+        slept = []
+
+        async def mock_sleep(duration):
+            slept.append(duration)
+
+        monkeypatch.setattr(asyncio, "sleep", mock_sleep)
+        rl = RateLimiter(safety_margin=0.1, burst_fraction=0.05)
+        await rl.update(_data(0, reset_in=3600))
+        with patch("shukketsu.wcl.rate_limiter.time.monotonic", return_value=rl._updated_at):
+            for _ in range(180):  # burst capacity: 5% of 3600
+                await rl.wait_if_needed("S")
+            assert slept == []
+            await rl.wait_if_needed("S")
+            await rl.wait_if_needed("S")
+
+        # Usable 3240 points over 3600s => 0.9 points/s; reservations queue up
+        assert slept == [pytest.approx(1 / 0.9), pytest.approx(2 / 0.9)]
+
+    async def test_tokens_refill_over_time(self, monkeypatch):
+        slept = []
+
+        async def mock_sleep(duration):
+            slept.append(duration)
+
+        monkeypatch.setattr(asyncio, "sleep", mock_sleep)
+        rl = RateLimiter(burst_fraction=0.001)  # capacity 3.6 points
+        await rl.update(_data(0))
+        t0 = rl._updated_at
+        with patch("shukketsu.wcl.rate_limiter.time.monotonic", return_value=t0):
+            for _ in range(3):
+                await rl.wait_if_needed()
+        with patch("shukketsu.wcl.rate_limiter.time.monotonic", return_value=t0 + 10):
+            await rl.wait_if_needed()  # 9 points refilled, capped at 3.6
+        assert slept == []
+
+    async def test_expensive_shape_paces_sooner(self, monkeypatch):
+        slept = []
+
+        async def mock_sleep(duration):
+            slept.append(duration)
+
+        monkeypatch.setattr(asyncio, "sleep", mock_sleep)
+        rl = RateLimiter(burst_fraction=0.01)  # capacity 36 points
+        await rl.update(_data(0))
+        await _respond(rl, _data(20), "ReportEvents:Casts")
+        with patch("shukketsu.wcl.rate_limiter.time.monotonic", return_value=rl._updated_at):
+            await rl.wait_if_needed("ReportEvents:Casts")
+            assert slept == []
+            await rl.wait_if_needed("ReportEvents:Casts")
+        assert len(slept) == 1
+
+    async def test_unpaced_requests_skip_sleep_but_spend_tokens(self, monkeypatch):
+        slept = []
+
+        async def mock_sleep(duration):
+            slept.append(duration)
+
+        monkeypatch.setattr(asyncio, "sleep", mock_sleep)
+        rl = RateLimiter(burst_fraction=0.001)  # capacity 3.6 points
+        await rl.update(_data(0))
+        with patch("shukketsu.wcl.rate_limiter.time.monotonic", return_value=rl._updated_at):
+            for _ in range(10):
+                await rl.wait_if_needed(paced=False)
+            assert slept == []
+            await rl.wait_if_needed()
+
+        # The paced request waits out what the unpaced ones overspent:
+        # 11 points taken from 3.6 at 0.9 points/s
+        assert slept == [pytest.approx((11 - 3.6) / 0.9)]
+
+    async def test_pacing_disabled(self, monkeypatch):
+        sleep = AsyncMock()
+        monkeypatch.setattr(asyncio, "sleep", sleep)
+        rl = RateLimiter(pacing=False)
+        await rl.update(_data(0))
+        for _ in range(500):
+            await rl.wait_if_needed()
+        sleep.assert_not_called()
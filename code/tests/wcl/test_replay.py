@@ -0,0 +1,169 @@
+import json
+import time
+
+import httpx
+import pytest
+
+from shukketsu.wcl.auth import WCLAuth
+from shukketsu.wcl.client import WCLAPIError, WCLClient
+from shukketsu.wcl.events import fetch_all_events
+from shukketsu.wcl.rate_limiter import RateLimiter
+from shukketsu.wcl.replay import (
+    RecordingTransport,
+    ReplayTransport,
+    load_recording,
+    recorded_report_codes,
+)
+
+API_URL = "https://wcl.test/api/v2/client"
+OAUTH_URL = "https://wcl.test/oauth/token"
+RATE_LIMIT = {"limitPerHour": 3600, "pointsSpentThisHour": 120, "pointsResetIn": 900}
+
+
+def _fake_wcl(request: httpx.Request) -> httpx.Response:
+    """Live-API stand-in: two event pages, then a report query."""
+    if request.url.path.endswith("/oauth/token"):
+        return httpx.Response(200, json={"access_token": "secret", "expires_in": 3600})
+    variables = json.loads(request.content).get("variables", {})
+    if "startTime" in variables:
+        if variables["startTime"] == 0:
+            page = {"data": [{"timestamp": 10}, {"timestamp": 20}], "nextPageTimestamp": 30}
+        else:
+            page = {"data": [{"timestamp": 30}], "nextPageTimestamp": None}
+        data = {"reportData": {"report": {"events": page}}}
+    else:
+        data = {"reportData": {"report": {"title": "Kara", "endTime": 1}}}
+    return httpx.Response(200, json={
+        "data": data, "extensions": {"rateLimitData": RATE_LIMIT},
+    })
+
+
+def _client(transport):
+    auth = WCLAuth("id", "secret", OAUTH_URL)
+    return WCLClient(auth, RateLimiter(), api_url=API_URL, transport=transport)
+
+
+async def _drain(wcl, code="ABC"):
+    events = []
+    async for page in fetch_all_events(wcl, code, 0, 100, "Casts"):
+        events.extend(page)
+    return events
+
+
+async def _record(path):
+    transport = RecordingTransport(path, httpx.MockTransport(_fake_wcl))
+    async with _client(transport) as wcl:
+        await wcl.query("query R", variables={"code": "ABC"})
+        events = await _drain(wcl)
+    return transport, events
+
+
+class TestRecordingTransport:
+    async def test_records_graphql_exchanges_with_pagination(self, tmp_path):
+        path = tmp_path / "rec.jsonl"
+        transport, events = await _record(path)
+
+        exchanges = load_recording(path)
+        assert transport.recorded == len(exchanges) == 3
+        assert [e["variables"].get("startTime") for e in exchanges] == [None, 0, 30]
+        assert exchanges[1]["response"]["data"]["reportData"]["report"]["events"][
+            "nextPageTimestamp"
+        ] == 30
+        assert exchanges[0]["response"]["extensions"]["rateLimitData"] == RATE_LIMIT
+        assert len(events) == 3
+
+    async def test_oauth_and_errors_not_recorded(self, tmp_path):
+        path = tmp_path / "rec.jsonl"
+
+        def handler(request):
+            if request.url.path.endswith("/oauth/token"):
+                return _fake_wcl(request)
+            return httpx.Response(200, json={"data": None, "errors": [{"message": "x"}]})
+
+        async with _client(RecordingTransport(path, httpx.MockTransport(handler))) as wcl:
+            with pytest.raises(WCLAPIError):
+                await wcl.query("query R", variables={"code": "ABC"})
+
+        assert not path.exists()
+        assert "secret" not in (path.read_text() if path.exists() else "")
+
+    async def test_recorded_report_codes(self, tmp_path):
+        path = tmp_path / "rec.jsonl"
+        await _record(path)
+        assert recorded_report_codes(load_recording(path)) == ["ABC"]
+
+
+class TestReplayTransport:
+    async def test_replays_pagination_offline(self, tmp_path):
+        path = tmp_path / "rec.jsonl"
+        _, live_events = await _record(path)
+
+        replay = ReplayTransport.from_file(path)
+        async with _client(replay) as wcl:
+            report = await wcl.query("query R", variables={"code": "ABC"})
+            events = await _drain(wcl)
+
+        assert report["reportData"]["report"]["title"] == "Kara"
+        assert events == live_events
+        assert replay.served == 3
+        assert replay.events_served == 3
+        assert replay.misses == 0
+
+    async def test_rate_limit_data_is_simulated(self, tmp_path):
+        path = tmp_path / "rec.jsonl"
+        await _record(path)
+
+        limiter = RateLimiter()
+        replay = ReplayTransport.from_file(path, points_per_query=2, limit_per_hour=100)
+        async with WCLClient(
+            WCLAuth("id", "secret", OAUTH_URL), limiter,
+            api_url=API_URL, transport=replay,
+        ) as wcl:
+            await wcl.query("query R", variables={"code": "ABC"})
+            await wcl.query("query R", variables={"code": "ABC"})
+
+        # Recorded 120/3600 is not replayed; the simulated budget is
+        assert limiter.limit_per_hour == 100
+        assert limiter.points_remaining == 96
+
+    async def test_unrecorded_request_raises(self, tmp_path):
+        path = tmp_path / "rec.jsonl"
+        await _record(path)
+
+        replay = ReplayTransport.from_file(path)
+        async with _client(replay) as wcl:
+            with pytest.raises(WCLAPIError, match="No recorded response"):
+                await wcl.query("query R", variables={"code": "OTHER"})
+        assert replay.misses == 1
+
+    async def test_injected_errors_are_retried(self, tmp_path, monkeypatch):
+        path = tmp_path / "rec.jsonl"
+        await _record(path)
+
+        async def no_sleep(_):
+            return None
+
+        monkeypatch.setattr("shukketsu.wcl.client.asyncio.sleep", no_sleep)
+        monkeypatch.setattr("shukketsu.wcl.rate_limiter.asyncio.sleep", no_sleep)
+
+        replay = ReplayTransport.from_file(
+            path, error_rate_429=0.2, error_rate_5xx=0.2, seed=3,
+        )
+        async with _client(replay) as wcl:
+            for _ in range(10):
+                await wcl.query("query R", variables={"code": "ABC"})
+
+        assert replay.served == 10
+        assert replay.injected_429 > 0
+        assert replay.injected_5xx > 0
+        assert replay.requests == 10 + replay.injected_429 + replay.injected_5xx
+
+    async def test_latency(self, tmp_path):
+        path = tmp_path / "rec.jsonl"
+        await _record(path)
+
+        replay = ReplayTransport.from_file(path, latency_ms=20)
+        async with _client(replay) as wcl:
+            start = time.perf_counter()
+            await wcl.query("query R", variables={"code": "ABC"})
+            assert time.perf_counter() - start >= 0.02
@@ -0,0 +1,146 @@
+import asyncio
+
+import httpx
+import pytest
+import respx
+
+from shukketsu.wcl.auth import WCLAuth
+from shukketsu.wcl.client import WCLClient
+from shukketsu.wcl.rate_limiter import RateLimiter
+from shukketsu.wcl.scheduler import Priority, WCLScheduler
+
+API_URL = "https://fresh.warcraftlogs.com/api/v2/client"
+OAUTH_URL = "https://fresh.warcraftlogs.com/oauth/token"
+
+
+async def _spend(limiter, spent, limit=1000, reset_in=3600):
+    await limiter.update({
+        "pointsSpentThisHour": spent, "limitPerHour": limit, "pointsResetIn": reset_in,
+    })
+
+
+class TestPriorityOrder:
+    async def test_free_slot_granted_immediately(self):
+        scheduler = WCLScheduler(RateLimiter(), max_in_flight=2)
+        await asyncio.wait_for(scheduler.acquire(Priority.BACKFILL), 1)
+        assert scheduler.status()["in_flight"] == 1
+
+    async def test_waiters_served_by_priority_then_arrival(self):
+        scheduler = WCLScheduler(RateLimiter(), max_in_flight=1)
+        await scheduler.acquire(Priority.INTERACTIVE)
+        order = []
+
+        async def job(priority, name):
+            async with scheduler.slot(priority):
+                order.append(name)
+
+        tasks = [
+            asyncio.create_task(job(Priority.BACKFILL, "backfill")),
+            asyncio.create_task(job(Priority.AUTO_INGEST, "auto-1")),
+            asyncio.create_task(job(Priority.INTERACTIVE, "user")),
+            asyncio.create_task(job(Priority.AUTO_INGEST, "auto-2")),
+        ]
+        await asyncio.sleep(0)
+        assert scheduler.queue_depth() == {
+            "interactive": 1, "auto_ingest": 2, "backfill": 1,
+        }
+
+        scheduler.release()
+        await asyncio.gather(*tasks)
+        assert order == ["user", "auto-1", "auto-2", "backfill"]
+        assert scheduler.status()["in_flight"] == 0
+
+    async def test_cancelled_waiter_does_not_leak_slot(self):
+        scheduler = WCLScheduler(RateLimiter(), max_in_flight=1)
+        await scheduler.acquire(Priority.INTERACTIVE)
+        waiter = asyncio.create_task(scheduler.acquire(Priority.BACKFILL))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        scheduler.release()
+        await asyncio.wait_for(scheduler.acquire(Priority.AUTO_INGEST), 1)
+        assert scheduler.status()["in_flight"] == 1
+
+
+class TestPointReservations:
+    async def test_backfill_pauses_at_its_reservation(self):
+        limiter = RateLimiter()
+        scheduler = WCLScheduler(limiter, max_in_flight=4)
+        await _spend(limiter, 700)  # above backfill ceiling (65%), below auto (85%)
+
+        backfill = asyncio.create_task(scheduler.acquire(Priority.BACKFILL))
+        await asyncio.sleep(0)
+        assert not backfill.done()
+
+        # Higher classes still get through ahead of the paused backfill
+        await asyncio.wait_for(scheduler.acquire(Priority.AUTO_INGEST), 1)
+        await asyncio.wait_for(scheduler.acquire(Priority.INTERACTIVE), 1)
+        status = scheduler.status()
+        assert status["budget_blocked"] == {
+            "interactive": False, "auto_ingest": False, "backfill": True,
+        }
+        assert status["queued"]["backfill"] == 1
+
+        backfill.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await backfill
+
+    async def test_interactive_keeps_reserve_when_auto_ingest_blocked(self):
+        limiter = RateLimiter()
+        scheduler = WCLScheduler(limiter)
+        await _spend(limiter, 900)
+
+        auto = asyncio.create_task(scheduler.acquire(Priority.AUTO_INGEST))
+        await asyncio.sleep(0)
+        assert not auto.done()
+        await asyncio.wait_for(scheduler.acquire(Priority.INTERACTIVE), 1)
+
+        auto.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await auto
+
+    async def test_blocked_waiter_resumes_after_budget_reset(self, monkeypatch):
+        monkeypatch.setattr("shukketsu.wcl.scheduler.BUDGET_RECHECK_SECONDS", 0)
+        limiter = RateLimiter()
+        scheduler = WCLScheduler(limiter)
+        await _spend(limiter, 700, reset_in=1)
+
+        backfill = asyncio.create_task(scheduler.acquire(Priority.BACKFILL))
+        await asyncio.sleep(0)
+        assert not backfill.done()
+
+        # Rate limiter reports the hour has rolled over; the recheck timer fires
+        limiter._updated_at -= 2
+        await asyncio.wait_for(backfill, 3)
+
+    async def test_custom_headroom(self):
+        limiter = RateLimiter()
+        scheduler = WCLScheduler(limiter, headroom={Priority.BACKFILL: 0.9})
+        await _spend(limiter, 150)
+        assert scheduler.status()["budget_blocked"]["backfill"] is True
+        assert scheduler.status()["budget_blocked"]["auto_ingest"] is False
+
+
+class TestClientIntegration:
+    @respx.mock
+    async def test_client_requests_go_through_scheduler(self):
+        respx.post(OAUTH_URL).mock(return_value=httpx.Response(
+            200, json={"access_token": "tok", "expires_in": 3600},
+        ))
+        respx.post(API_URL).mock(return_value=httpx.Response(
+            200, json={"data": {"ok": True}},
+        ))
+        limiter = RateLimiter()
+        scheduler = WCLScheduler(limiter)
+        auth = WCLAuth("id", "secret", OAUTH_URL)
+
+        async with WCLClient(
+            auth, limiter, api_url=API_URL,
+            scheduler=scheduler, priority=Priority.AUTO_INGEST,
+        ) as wcl:
+            assert await wcl.query("query { ok }") == {"ok": True}
+
+        assert scheduler.granted[Priority.AUTO_INGEST] == 1
+        assert scheduler.status()["in_flight"] == 0